@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/4.1/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Klerly.settings')
 
-application = get_asgi_application()
+# as get_asgi_application does, with the handler that streams off the loop
+django.setup(set_prefix=False)
+
+# imported once the settings are configured, they read them on import
+from core.modules.http import ASGIHandler, DisconnectMiddleware  # noqa: E402
+
+application = DisconnectMiddleware(ASGIHandler())
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/4.1/ref/settings/
 """
 
 from pathlib import Path
+from typing import List
 import os
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -152,6 +153,167 @@ GOOGLE_OAUTH2_REDIRECT_URI = os.getenv('GOOGLE_OAUTH2_REDIRECT_URI')
 
 
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+# Provider calls are spread across these keys, comma separated "key" or
+# "key:organization" entries. Defaults to OPENAI_API_KEY alone
+OPENAI_API_KEYS = [
+    entry for entry in os.getenv('OPENAI_API_KEYS', '').split(',') if entry.strip()
+]
+# seconds a key sits out after a rate limit or server error, doubled on
+# every consecutive failure up to the max
+OPENAI_KEY_COOLDOWN = 30
+OPENAI_KEY_MAX_COOLDOWN = 60 * 10
+
+# Result cache for prompts that opt in to it
+GENERATION_CACHE_MAX_SIZE = 1024
+# how long an expired entry may still be served when the provider fails
+GENERATION_CACHE_STALE_SECONDS = 60 * 60 * 24
+
+# Concurrent identical generations share one provider call
+GENERATION_SINGLE_FLIGHT = True
+# also share calls across processes, using the database as the lock
+GENERATION_SINGLE_FLIGHT_DB = False
+# age after which a flight whose process died is taken over
+GENERATION_SINGLE_FLIGHT_LEASE_SECONDS = 120
+
+# Batch generation: most inputs per request, and the provider requests
+# kept in flight for providers without multi-prompt requests
+GENERATION_BATCH_MAX_SIZE = 20
+GENERATION_BATCH_CONCURRENCY = 4
+
+# Seconds a generation or document completion request may take before
+# it fails with a 504, provider calls are bounded by the time left
+GENERATION_TIMEOUT = 90
+COMPLETION_TIMEOUT = 120
+
+# Hedged requests: a GPT3 call slower than the observed quantile of its
+# model's latencies is sent again and the first response wins.
+# Models hedged, e.g. ['text-davinci-003']
+GENERATION_HEDGE_MODELS: List[str] = []
+GENERATION_HEDGE_QUANTILE = 0.9
+# most extra calls, as a share of the model's calls
+GENERATION_HEDGE_MAX_EXTRA = 0.05
+# calls seen before hedging starts
+GENERATION_HEDGE_MIN_SAMPLES = 20
+# threads per process running the sync calls that may be hedged, a call
+# made while all are busy runs unhedged on the caller's thread
+GENERATION_HEDGE_MAX_THREADS = 32
+
+# GPT3 max_tokens is capped at 1.5 times the 95th percentile length of the
+# prompt's last GENERATION_LEARN_MAX_TOKENS_WINDOW outputs, relearned
+# every GENERATION_LEARN_MAX_TOKENS_TTL seconds
+GENERATION_LEARN_MAX_TOKENS = True
+GENERATION_LEARN_MAX_TOKENS_WINDOW = 200
+# outputs needed before a prompt is capped
+GENERATION_LEARN_MAX_TOKENS_MIN_SAMPLES = 20
+GENERATION_LEARN_MAX_TOKENS_TTL = 60 * 60
+
+# Backend answering ?search= on the buyer prompt lists, a dotted path to a
+# jarvis.modules.search.SearchBackend. By default Postgres full-text search
+# on Postgres and FTS5 on SQLite
+PROMPT_SEARCH_BACKEND = None
+
+# Parsed prompt templates kept in memory
+PROMPT_TEMPLATE_CACHE_MAX_SIZE = 2048
+
+# Background generation jobs, run by the run_generation_workers command
+GENERATION_JOB_WORKERS = 4
+GENERATION_JOB_POLL_INTERVAL = 1.0
+GENERATION_JOB_MAX_ATTEMPTS = 3
+# seconds before the first retry, doubled on every attempt
+GENERATION_JOB_RETRY_BACKOFF = 5
+# running jobs older than this are assumed lost with their worker
+GENERATION_JOB_LEASE_SECONDS = 60 * 10
+
+# Prompt chains: steps of a chain run at most CHAIN_CONCURRENCY at a time
+CHAIN_CONCURRENCY = 4
+CHAIN_MAX_STEPS = 10
+
+# Seller evaluation jobs over CSV/XLSX datasets, run by the
+# run_generation_workers command
+EVALUATION_ROOT = BASE_DIR / 'media' / 'evaluations'
+EVALUATION_MAX_ROWS = 50000
+# rows run and checkpointed at a time
+EVALUATION_CHUNK_SIZE = 50
+# seconds a worker runs a job before queueing it again for its next chunks
+EVALUATION_CLAIM_SECONDS = 60
+# provider calls in flight per job
+EVALUATION_CONCURRENCY = 4
+
+# Output pools: the generation workers keep pool_size outputs ready for
+# each pool input of the prompts that opt in, handed out to the buyers
+# instead of a live generation
+GENERATION_POOL_ENABLED = True
+# most outputs generated per pooled prompt and minute
+GENERATION_POOL_REFILLS_PER_MINUTE = 10
+# bounds of the pool settings of a prompt, its outputs are paid by the
+# platform whether or not they are bought
+GENERATION_POOL_MAX_SIZE = 10
+GENERATION_POOL_MAX_INPUTS = 20
+# seconds
+GENERATION_POOL_MIN_TTL = 60 * 60
+
+# seconds between the recounts of the catalog's output counts, run by
+# each generation worker
+CATALOG_COUNT_INTERVAL = 10 * 60
+
+# Generated images are copied to a local content addressed store
+# since the provider's urls expire
+IMAGE_STORE_ENABLED = True
+IMAGE_STORE_ROOT = BASE_DIR / 'media' / 'images'
+# prepended to the stored image paths, e.g. https://api.klerly.com
+IMAGE_STORE_BASE_URL = os.getenv('IMAGE_STORE_BASE_URL', '')
+IMAGE_DOWNLOAD_TIMEOUT = 30
+
+# Provider scheduler: every OpenAI call is admitted within the limits of
+# its model, and callers waiting for capacity are served round robin by user.
+# The limits are for all of OPENAI_API_KEYS and all processes together:
+# the schedulers do not share state, each of the PROVIDER_PROCESSES admits
+# its equal share of them.
+# "images" is the image endpoint, "default" applies to unlisted models
+PROVIDER_RATE_LIMITS = {
+    'default': {'requests_per_minute': 3000, 'tokens_per_minute': 250000},
+    'images': {'requests_per_minute': 50},
+}
+# processes calling the provider, by default the WEB_CONCURRENCY web
+# processes and one run_generation_workers process
+PROVIDER_PROCESSES = int(os.getenv(
+    'PROVIDER_PROCESSES', int(os.getenv('WEB_CONCURRENCY', 1)) + 1))
+# concurrent calls per model across the processes, halved on a rate limit
+# response and raised back as calls succeed. The minimum is per process
+PROVIDER_INITIAL_CONCURRENCY = 16
+PROVIDER_MIN_CONCURRENCY = 1
+PROVIDER_MAX_CONCURRENCY = 512
+# a call not admitted within this many seconds fails as rate limited
+PROVIDER_QUEUE_TIMEOUT = 60
+# seconds a model gets no new calls after a rate limit response
+PROVIDER_RATE_LIMIT_COOLDOWN = 1.0
+
+# Outbound HTTP of the payment, login and mail integrations: keep-alive
+# connections per host, timeouts in seconds and retries of the idempotent
+# calls, the backoff doubled on every retry
+HTTP_POOL_MAXSIZE = 10
+HTTP_CONNECT_TIMEOUT = 5
+HTTP_READ_TIMEOUT = 30
+HTTP_MAX_RETRIES = 2
+HTTP_RETRY_BACKOFF = 0.5
+
+# Circuit breakers of the OpenAI lanes ("openai:<model>", "openai:images"),
+# Paystack and LazerPay. A breaker opens when failure_rate of its last
+# `window` calls failed or were slower than slow_call_seconds, fails the
+# calls at once for open_seconds, then lets half_open_calls trial calls
+# through. Entries are matched by name, then by the part before the colon
+CIRCUIT_BREAKERS = {
+    'default': {
+        'failure_rate': 0.5,
+        'window': 20,
+        'min_calls': 10,
+        'open_seconds': 30,
+        'half_open_calls': 3,
+    },
+    'openai': {'slow_call_seconds': 60},
+    'paystack': {'slow_call_seconds': 10},
+    'lazerpay': {'slow_call_seconds': 10},
+}
 
 
 LAZERPAY_SECRET_KEY = os.getenv('LAZERPAY_SECRET_KEY')
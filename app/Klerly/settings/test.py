@@ -15,3 +15,16 @@ DATABASES = {
         'NAME': BASE_DIR / 'db.sqlite3',
     }
 }
+
+# tests do not download the images generated by the mocked provider
+IMAGE_STORE_ENABLED = False
+
+# the mocked provider has no rate limits
+PROVIDER_RATE_LIMITS = {'default': {}}
+
+# the mocked providers fail on purpose, their breakers must not open
+# for the tests that follow
+CIRCUIT_BREAKERS = {'default': {'enabled': False}}
+
+# the mocked provider is called through the SDK's requestor, which needs a key
+OPENAI_API_KEYS = ['sk-test']
@@ -18,6 +18,7 @@ from account.apis.user import (
 )
 from rest_framework.permissions import IsAuthenticated
 from account.permissions import IsVerified
+from core.testing import QueryCountTestMixin
 
 
 class UserAPITestCase(TestCase):
@@ -181,3 +182,16 @@ class PublicSellerAPITestCase(TestCase):
             set(response.data['results'][0].keys()),  # type: ignore
             set(PublicSellerSerializer().fields.keys())
         )
+
+
+class PublicSellerListQueryCountTestCase(QueryCountTestMixin, TestCase):
+    def test_list(self):
+        def add_seller(index):
+            user = User.objects.create(
+                username='seller{}'.format(index),
+                email='seller{}@example.com'.format(index),
+            )
+            Seller.objects.create(user=user, handle='seller{}'.format(index), name='Seller')
+        self.assertConstantQueries(
+            lambda: APIClient().get(reverse('account:account-public-seller-list')),
+            add_seller)
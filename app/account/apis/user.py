@@ -18,6 +18,7 @@ from rest_framework.permissions import IsAuthenticated
 from typing import List, Any
 from account.models import User, Seller
 from rest_framework import filters
+from core.views import EagerLoadingMixin
 
 
 class UserAPI(APIView):
@@ -31,7 +32,7 @@ class UserAPI(APIView):
         return SuccessResponse(data)
 
 
-class PublicSellerListAPI(ListAPIView):
+class PublicSellerListAPI(EagerLoadingMixin, ListAPIView):
     """ List all sellers 
 
         This API is public and does not require authentication.
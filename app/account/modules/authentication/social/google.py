@@ -4,7 +4,7 @@ from core.exceptions import AuthorizationError
 from google.oauth2 import id_token
 from google.auth.transport import requests as google_requests
 from account.models import User
-import requests
+from core.modules.http import http_transport
 from .abstract import AbstractSocialProvider
 from rest_framework.exceptions import ValidationError
 
@@ -27,7 +27,7 @@ class GoogleProvider(AbstractSocialProvider):
                 AuthorizationError: If the token is invalid
         """
 
-        response = requests.post(
+        response = http_transport.post(
             'https://oauth2.googleapis.com/token',
             data={
                 'code': self.token,
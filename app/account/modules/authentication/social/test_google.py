@@ -13,7 +13,7 @@ class GoogleProviderTestCase(TestCase):
         self.mock_response.status_code = 200
         self.mock_response.json.return_value = {'id_token': '12345'}
         self.patch_requests_post = mock.patch(
-            'account.modules.authentication.social.google.requests.post',
+            'account.modules.authentication.social.google.http_transport.post',
             return_value=self.mock_response
         )
         self.patch_requests_post.start()
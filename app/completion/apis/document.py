@@ -5,6 +5,8 @@ from completion.serializers import DocumentListCreateSerializer, DocumentRetriev
 from core.response import SuccessResponse
 from rest_framework.exceptions import PermissionDenied
 from core.exceptions import HttpValidationError
+from django.conf import settings
+from jarvis.modules.provider import Deadline
 
 
 class DocumentListCreateAPI(generics.ListCreateAPIView):
@@ -51,8 +53,10 @@ class DocumentCompleteAPI(APIView):
 
         This method receives the text to be added to the document, calls the
         `complete` method of the `DocumentModel` object, and returns the
-        completed text.
+        completed text. The request fails with a 504 if the completion is
+        not done within COMPLETION_TIMEOUT seconds.
         """
+        deadline = Deadline(settings.COMPLETION_TIMEOUT)
         try:
             document = DocumentModel.objects.get(pk=pk)
         except DocumentModel.DoesNotExist:
@@ -65,4 +69,4 @@ class DocumentCompleteAPI(APIView):
         if not new_text:
             return HttpValidationError({'text': 'Missing text'})
 
-        return SuccessResponse({'text': document.complete(new_text)})
+        return SuccessResponse({'text': document.complete(new_text, deadline=deadline)})
@@ -70,20 +70,30 @@ class DocumentModel(BaseModel):
     def __str__(self):
         return "{} - {}".format(self.user, self.name)
 
-    def complete(self, new_text: str):
-        import openai
-        openai.api_key = settings.OPENAI_API_KEY
+    def complete(self, new_text: str, deadline=None):
+        """ Complete the document with the provider
+
+            Args:
+                new_text (str): Text appended to the document's prompt
+                deadline (Deadline, optional): Bounds the provider call
+            Raises:
+                ValidationError: If the document leaves no room for the completion
+                GatewayTimeoutError: If the deadline passes first
+        """
+        from jarvis.modules.provider import (
+            OpenAIClient, clamp_max_tokens, deadline_scope, provider_scheduler)
         prompt = self.prompt.prompt + new_text
-        response = openai.Completion.create(
-            model="text-davinci-003",
-            prompt=prompt,
-            temperature=0,
-            max_tokens=3000,
-            top_p=1.0,
-            stream=False,
-            frequency_penalty=0.0,
-            presence_penalty=0.0
-        )
+        with provider_scheduler.for_user(self.user), deadline_scope(deadline):
+            response = OpenAIClient().create_completion(
+                model="text-davinci-003",
+                prompt=prompt,
+                temperature=0,
+                max_tokens=clamp_max_tokens("text-davinci-003", prompt, 3000),
+                top_p=1.0,
+                stream=False,
+                frequency_penalty=0.0,
+                presence_penalty=0.0
+            )
         res_text = response["choices"][0]["text"]  # type: ignore
 
         CompletionModel.objects.create(
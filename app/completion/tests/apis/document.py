@@ -1,4 +1,5 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from jarvis.modules.provider.testing import patch_completion
 from rest_framework.test import APIClient
 from django.urls import reverse
 from account.models import User
@@ -165,3 +166,51 @@ class DocumentRetrieveUpdateDestroyAPITestCase(TestCase):
         self.assertEqual(response.status_code, 204)
         document.refresh_from_db()
         self.assertFalse(document.is_active)
+
+
+class DocumentCompleteAPITestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.prompt = PromptModel.objects.create(
+            heading='Test Prompt',
+            image='https://example.com/image.jpg',
+            description='Test description',
+            prompt='Test prompt'
+        )
+        self.user = User.objects.create_user(  # type: ignore
+            username='test@example.com',
+            email='test@example.com',
+            password='testpass',
+            is_verified=True
+        )
+        self.document = DocumentModel.objects.create(
+            user=self.user,
+            prompt=self.prompt,
+            name='Test Document',
+            text='Test text'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('completion:document-complete', kwargs={'pk': self.document.pk})
+
+    def test_complete(self):
+        """ Test the provider call is bounded by the request deadline """
+        with override_settings(COMPLETION_TIMEOUT=30), patch_completion() as mock_create:
+            mock_create.return_value = {
+                'id': 'test-id',
+                'choices': [{'text': 'Some newly generated text'}]
+            }
+            response = self.client.post(self.url, {'text': ' More text'}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['text'], 'Some newly generated text')
+        self.assertLessEqual(mock_create.call_args.kwargs['request_timeout'], 30)
+
+    @override_settings(COMPLETION_TIMEOUT=0)
+    def test_complete_deadline(self):
+        """ Test a completion past its deadline fails with a 504 """
+        with patch_completion() as mock_create:
+            response = self.client.post(self.url, {'text': ' More text'}, format='json')
+            mock_create.assert_not_called()
+
+        self.assertEqual(response.status_code, 504)
+        self.assertIn('elapsed', response.json())
@@ -1,7 +1,7 @@
 from django.test import TestCase
 from django.utils import timezone
 from model_bakery import baker
-from unittest.mock import patch
+from jarvis.modules.provider.testing import patch_completion
 
 from account.models import User
 from completion.models import DocumentModel, PromptModel, CompletionModel
@@ -30,7 +30,7 @@ class DocumentModelTestCase(TestCase):
 
     def test_complete(self):
 
-        with patch('openai.Completion.create') as mock_create:
+        with patch_completion() as mock_create:
             mock_create.return_value = {
                 'id': 'test-id',
                 'object': 'text_completion',
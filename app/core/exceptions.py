@@ -27,3 +27,10 @@ class AuthorizationError(HttpValidationError):
 
     def __init__(self, detail):
         super().__init__(detail)
+
+
+class GatewayTimeoutError(HttpValidationError):
+    status_code = status.HTTP_504_GATEWAY_TIMEOUT
+
+    def __init__(self, detail):
+        super().__init__(detail)
@@ -0,0 +1,7 @@
+from .histogram import LatencyHistogram
+from .breaker import (
+    CircuitBreaker,
+    CircuitBreakerRegistry,
+    CircuitOpenError,
+    circuit_breakers
+)
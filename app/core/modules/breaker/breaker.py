@@ -0,0 +1,255 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from django.conf import settings
+from rest_framework import status
+from core.exceptions import HttpValidationError
+from core.modules.breaker.histogram import LatencyHistogram
+from typing import Any, Callable, Deque, Dict, Iterator, Optional
+
+
+class CircuitOpenError(HttpValidationError):
+    """ Raised instead of calling a provider whose breaker is open """
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+    def __init__(self, name: str, retry_after: float):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(
+            "The {} service is unavailable, try again in {} seconds".format(
+                name.split(":")[0], max(int(retry_after), 1))
+        )
+
+
+class _Call:
+    """ Outcome of one call made through a breaker """
+
+    def __init__(self):
+        self.is_failure = False
+        self.started = time.monotonic()
+        self.latency: Optional[float] = None
+
+    def fail(self):
+        """ Count the call as failed although it raised nothing, e.g. on a 5xx """
+        self.is_failure = True
+
+    def responded(self):
+        """ Time the call until now rather than until the block ends, e.g.
+            a stream read long after the provider answered
+        """
+        if self.latency is None:
+            self.latency = time.monotonic() - self.started
+
+
+class CircuitBreaker:
+    """ Stops calling a provider that is failing or too slow
+
+        Closed, calls go through and their outcomes are kept in a window.
+        When at least `failure_rate` of the last `window` calls failed or
+        took longer than `slow_call_seconds`, the breaker opens: calls fail
+        at once with CircuitOpenError for `open_seconds`. It is then half
+        open and lets `half_open_calls` trial calls through, closing when
+        they all succeed and opening again as soon as one fails.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = 0.5,
+        slow_call_seconds: Optional[float] = None,
+        window: int = 20,
+        min_calls: int = 10,
+        open_seconds: float = 30,
+        half_open_calls: int = 3,
+        is_failure: Optional[Callable[[BaseException], bool]] = None,
+        enabled: bool = True,
+    ):
+        """
+        Args:
+            name (str): The provider, e.g. "paystack"
+            failure_rate (float): Share of bad calls that opens the breaker
+            slow_call_seconds (float, optional): Calls slower than this count as bad
+            window (int): Calls the failure rate is measured over
+            min_calls (int): Calls needed before the breaker can open
+            open_seconds (float): Seconds the breaker stays open
+            half_open_calls (int): Trial calls made when half open
+            is_failure (callable, optional): Whether an exception counts as a
+                failure of the provider, every exception does by default
+            enabled (bool): Whether the breaker can open, latencies are
+                recorded either way
+        """
+        self.name = name
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.is_failure = is_failure or (lambda exc: True)
+        self.enabled = enabled
+        self.latency = LatencyHistogram()
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._trials = 0
+        self._trial_successes = 0
+        self._rejected = 0
+        self._times_opened = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._get_state()
+
+    def _get_state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = self.HALF_OPEN
+            self._trials = 0
+            self._trial_successes = 0
+        return self._state
+
+    def before(self):
+        """ Admit a call
+
+            Raises:
+                CircuitOpenError: If the breaker is open, or half open with
+                    all its trial calls in flight
+        """
+        with self._lock:
+            state = self._get_state()
+            if state == self.CLOSED:
+                return
+            if state == self.HALF_OPEN and self._trials < self.half_open_calls:
+                self._trials += 1
+                return
+            self._rejected += 1
+            retry_after = self.open_seconds - (time.monotonic() - self._opened_at)
+        raise CircuitOpenError(self.name, retry_after)
+
+    def record(self, latency: float, failed: bool):
+        """ Record the outcome of a call admitted by before """
+        self.latency.observe(latency)
+        if not self.enabled:
+            return
+        bad = failed or (
+            self.slow_call_seconds is not None and latency > self.slow_call_seconds)
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                if bad:
+                    self._open()
+                else:
+                    self._trial_successes += 1
+                    if self._trial_successes >= self.half_open_calls:
+                        self._state = self.CLOSED
+                        self._outcomes.clear()
+                return
+            if self._state == self.OPEN:
+                # a call admitted before the breaker opened
+                return
+            self._outcomes.append(bad)
+            if len(self._outcomes) >= self.min_calls and \
+                    sum(self._outcomes) >= self.failure_rate * len(self._outcomes):
+                self._open()
+
+    def _open(self):
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self._times_opened += 1
+
+    @contextmanager
+    def guard(self) -> Iterator[_Call]:
+        """ Run the block as a call through the breaker
+
+            Raises:
+                CircuitOpenError: If the breaker does not admit the call
+        """
+        self.before()
+        call = _Call()
+        try:
+            yield call
+        except BaseException as exc:
+            call.is_failure = isinstance(exc, Exception) and self.is_failure(exc)
+            raise
+        finally:
+            call.responded()
+            self.record(call.latency, call.is_failure)  # type: ignore
+
+    def call(self, fn: Callable[[], Any]) -> Any:
+        with self.guard():
+            return fn()
+
+    async def acall(self, fn: Callable[[], Any]) -> Any:
+        with self.guard():
+            return await fn()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {
+                "state": self._get_state(),
+                "failure_rate": sum(self._outcomes) / len(self._outcomes) if self._outcomes else 0.0,
+                "rejected": self._rejected,
+                "times_opened": self._times_opened,
+            }
+        stats["latency"] = self.latency.stats()
+        return stats
+
+    def reset(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._outcomes.clear()
+            self._trials = 0
+            self._trial_successes = 0
+            self._rejected = 0
+            self._times_opened = 0
+        self.latency.clear()
+
+
+class CircuitBreakerRegistry:
+    """ The breaker of each provider, created on first use
+
+        Breakers are configured by name from `config`, see CIRCUIT_BREAKERS,
+        names are matched as is and then by their part before a colon,
+        e.g. "openai:text-davinci-003" falls back to "openai".
+    """
+
+    def __init__(self, config: Dict[str, Dict[str, Any]]):
+        self.config = config
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str, **kwargs) -> CircuitBreaker:
+        """
+        Args:
+            kwargs (dict): Arguments of CircuitBreaker used when it is created
+        """
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                options = dict(self.config.get("default", {}))
+                options.update(self.config.get(name.split(":")[0], {}))
+                options.update(self.config.get(name, {}))
+                options.update(kwargs)
+                breaker = self._breakers[name] = CircuitBreaker(name, **options)
+            return breaker
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {breaker.name: breaker.stats() for breaker in breakers}
+
+    def reset(self):
+        with self._lock:
+            breakers = list(self._breakers.values())
+        for breaker in breakers:
+            breaker.reset()
+
+
+circuit_breakers = CircuitBreakerRegistry(
+    getattr(settings, "CIRCUIT_BREAKERS", {})
+)
@@ -0,0 +1,61 @@
+import bisect
+import threading
+from typing import Any, Dict, List, Sequence
+
+# upper bounds in seconds, the last bucket takes everything slower
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class LatencyHistogram:
+    """ Counts of call latencies in fixed buckets
+
+        Unlike a window of recent latencies it costs the same whatever the
+        traffic, and operators can diff two snapshots to see the latencies
+        of the calls made in between.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts: List[int] = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, latency: float):
+        index = bisect.bisect_left(self.buckets, latency)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += latency
+
+    def quantile(self, quantile: float) -> float:
+        """ Upper bound of the bucket holding the quantile, 0 without calls
+
+            Calls slower than the last bucket are reported at twice its bound.
+        """
+        with self._lock:
+            counts = list(self._counts)
+        total = sum(counts)
+        if not total:
+            return 0.0
+        rank, seen = quantile * total, 0
+        for index, count in enumerate(counts):
+            seen += count
+            if seen >= rank:
+                break
+        if index < len(self.buckets):
+            return self.buckets[index]
+        return self.buckets[-1] * 2
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts, total_seconds = list(self._counts), self._sum
+        bounds = ["{:g}".format(bound) for bound in self.buckets] + ["+Inf"]
+        return {
+            "count": sum(counts),
+            "sum": total_seconds,
+            "buckets": dict(zip(bounds, counts)),
+        }
+
+    def clear(self):
+        with self._lock:
+            self._counts = [0] * (len(self.buckets) + 1)
+            self._sum = 0.0
@@ -0,0 +1,124 @@
+from unittest import mock
+from django.test import SimpleTestCase
+from core.modules.breaker import (
+    CircuitBreaker,
+    CircuitBreakerRegistry,
+    CircuitOpenError
+)
+
+
+class CircuitBreakerTest(SimpleTestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch(
+            "core.modules.breaker.breaker.time.monotonic", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker(
+            "paystack", window=4, min_calls=4, open_seconds=30, half_open_calls=2)
+
+    def fail(self, breaker=None):
+        with self.assertRaises(ValueError):
+            with (breaker or self.breaker).guard():
+                raise ValueError("down")
+
+    def succeed(self, breaker=None, seconds=0.0):
+        with (breaker or self.breaker).guard():
+            self.now += seconds
+
+    def test_opens_on_failure_rate(self):
+        self.succeed()
+        self.fail()
+        self.succeed()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.fail()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+        with self.assertRaises(CircuitOpenError) as context:
+            self.breaker.call(lambda: "called")
+        self.assertEqual(context.exception.status_code, 503)
+        self.assertEqual(self.breaker.stats()["rejected"], 1)
+
+    def test_needs_min_calls(self):
+        self.fail()
+        self.fail()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_slow_calls(self):
+        breaker = CircuitBreaker("lazerpay", slow_call_seconds=5, window=2, min_calls=2)
+        self.succeed(breaker, seconds=6)
+        self.succeed(breaker, seconds=1)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+    def test_responded(self):
+        breaker = CircuitBreaker("openai", slow_call_seconds=5, window=1, min_calls=1)
+        with breaker.guard() as call:
+            self.now += 1
+            call.responded()
+            # e.g. reading a stream, the provider has answered
+            self.now += 60
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_failed_without_exception(self):
+        breaker = CircuitBreaker("lazerpay", window=1, min_calls=1)
+        with breaker.guard() as call:
+            call.fail()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+    def test_ignored_errors(self):
+        breaker = CircuitBreaker(
+            "openai", window=1, min_calls=1,
+            is_failure=lambda exc: not isinstance(exc, KeyError))
+        with self.assertRaises(KeyError):
+            with breaker.guard():
+                raise KeyError("invalid request")
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def open(self):
+        for _ in range(4):
+            self.fail()
+        self.now += 30
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+
+    def test_half_open_closes(self):
+        self.open()
+        self.succeed()
+        self.succeed()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_half_open_reopens(self):
+        self.open()
+        self.succeed()
+        self.fail()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(self.breaker.stats()["times_opened"], 2)
+
+    def test_half_open_limits_trials(self):
+        self.open()
+        self.breaker.before()
+        self.breaker.before()
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before()
+
+    def test_disabled(self):
+        breaker = CircuitBreaker("openai", window=1, min_calls=1, enabled=False)
+        self.fail(breaker)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(breaker.stats()["latency"]["count"], 1)
+
+
+class CircuitBreakerRegistryTest(SimpleTestCase):
+    def test_config(self):
+        registry = CircuitBreakerRegistry({
+            "default": {"open_seconds": 10, "window": 5},
+            "openai": {"open_seconds": 20},
+            "openai:images": {"open_seconds": 40},
+        })
+        self.assertEqual(registry.get("paystack").open_seconds, 10)
+        self.assertEqual(registry.get("openai:text-davinci-003").open_seconds, 20)
+        self.assertEqual(registry.get("openai:images").open_seconds, 40)
+        self.assertIs(registry.get("paystack"), registry.get("paystack"))
+        self.assertEqual(
+            set(registry.stats()),
+            {"paystack", "openai:text-davinci-003", "openai:images"}
+        )
@@ -0,0 +1,24 @@
+from django.test import SimpleTestCase
+from core.modules.breaker import LatencyHistogram
+
+
+class LatencyHistogramTest(SimpleTestCase):
+    def test_observe(self):
+        histogram = LatencyHistogram(buckets=(0.1, 1, 10))
+        for latency in (0.05, 0.1, 0.5, 3, 30):
+            histogram.observe(latency)
+        stats = histogram.stats()
+        self.assertEqual(stats["count"], 5)
+        self.assertAlmostEqual(stats["sum"], 33.65)
+        self.assertEqual(stats["buckets"], {"0.1": 2, "1": 1, "10": 1, "+Inf": 1})
+
+    def test_quantile(self):
+        histogram = LatencyHistogram(buckets=(0.1, 1, 10))
+        self.assertEqual(histogram.quantile(0.5), 0)
+        for _ in range(9):
+            histogram.observe(0.05)
+        histogram.observe(5)
+        self.assertEqual(histogram.quantile(0.5), 0.1)
+        self.assertEqual(histogram.quantile(0.95), 10)
+        histogram.observe(100)
+        self.assertEqual(histogram.quantile(1), 20)
@@ -0,0 +1,5 @@
+from .aio import AsyncHTTPClient, AsyncHTTPResponse
+from .asgi import ASGIHandler
+from .ranges import parse_range, RangeNotSatisfiable
+from .disconnect import DisconnectMiddleware, get_disconnected
+from .transport import HTTPTransport, HostLatency, http_transport
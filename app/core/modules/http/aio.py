@@ -0,0 +1,280 @@
+import asyncio
+import json as jsonlib
+import ssl
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+class AsyncHTTPResponse:
+    """ A fully read HTTP response returned by AsyncHTTPClient """
+
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def json(self) -> Any:
+        return jsonlib.loads(self.body.decode("utf-8"))
+
+    def __repr__(self):
+        return "<AsyncHTTPResponse [{}]>".format(self.status)
+
+
+class _Connection:
+    def __init__(self, key: Tuple[str, str, int], reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.key = key
+        self.reader = reader
+        self.writer = writer
+        self.reused = False
+
+    def is_usable(self) -> bool:
+        return not self.reader.at_eof() and not self.writer.is_closing()
+
+    def close(self):
+        if not self.writer.is_closing():
+            self.writer.close()
+
+    def abort(self):
+        """ Close at once, without flushing or a TLS goodbye """
+        self.writer.transport.abort()
+
+
+class AsyncHTTPClient:
+    """
+    Minimal HTTP/1.1 client built on asyncio streams.
+
+    Idle keep-alive connections are pooled per (scheme, host, port) and per
+    event loop, so one process can keep hundreds of requests in flight
+    without dedicating a thread to each of them. A loop's pool is closed
+    with the loop: asyncio.run and async_to_sync cancel the tasks left on
+    a loop before closing it, one of which closes the pool.
+    """
+
+    def __init__(
+        self,
+        max_idle_per_host: int = 100,
+        connect_timeout: float = 10.0,
+        read_timeout: float = 600.0,
+    ):
+        """
+        Args:
+            max_idle_per_host (int): Idle connections kept open per host.
+            connect_timeout (float): Seconds allowed to open a connection.
+            read_timeout (float): Seconds allowed for a whole request/response exchange.
+        """
+        self.max_idle_per_host = max_idle_per_host
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._pools: Dict[asyncio.AbstractEventLoop, Dict[Tuple[str, str, int], List[_Connection]]] = {}
+        # the loop only holds weak references to its tasks
+        self._closers: Dict[asyncio.AbstractEventLoop, "asyncio.Task[None]"] = {}
+        self._ssl_context: Optional[ssl.SSLContext] = None
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        json: Any = None,
+        body: Optional[bytes] = None,
+        timeout: Optional[float] = None,
+    ) -> AsyncHTTPResponse:
+        """ Send a request and read the whole response body
+
+            Args:
+                method (str): HTTP method e.g. "POST"
+                url (str): Absolute http or https url
+                headers (dict, optional): Extra request headers
+                json (Any, optional): Object sent as a JSON body
+                body (bytes, optional): Raw request body
+                timeout (float, optional): Overrides the client read timeout
+
+            Returns:
+                AsyncHTTPResponse: The response
+
+            Raises:
+                asyncio.TimeoutError: If the exchange takes longer than the timeout
+                ConnectionError: If the connection is dropped
+        """
+        key, target, payload, request_headers = self._prepare(
+            method, url, headers, json, body)
+        return await asyncio.wait_for(
+            self._exchange(method, key, target, request_headers, payload),
+            timeout or self.read_timeout
+        )
+
+    def _prepare(self, method, url, headers, json, body):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError("Unsupported url scheme: {}".format(parts.scheme))
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        key = (parts.scheme, parts.hostname or "", port)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+
+        request_headers = {
+            "Host": parts.netloc,
+            "Connection": "keep-alive",
+            "Accept-Encoding": "identity",
+        }
+        if json is not None:
+            body = jsonlib.dumps(json).encode("utf-8")
+            request_headers["Content-Type"] = "application/json"
+        payload = body or b""
+        if payload or method.upper() in ("POST", "PUT", "PATCH"):
+            request_headers["Content-Length"] = str(len(payload))
+        request_headers.update(headers or {})
+        return key, target, payload, request_headers
+
+    async def _exchange(self, method, key, target, headers, payload) -> AsyncHTTPResponse:
+        # a pooled connection may have been closed by the server while it
+        # sat idle, in which case the request is retried once on a new one
+        for attempt in range(2):
+            conn = await self._acquire(key, fresh=attempt > 0)
+            try:
+                await self._send(conn, method, target, headers, payload)
+                status, response_headers = await self._read_head(conn.reader)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                conn.close()
+                if conn.reused and attempt == 0:
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+
+            try:
+                chunks = [chunk async for chunk in self._iter_body(
+                    conn.reader, response_headers, method)]
+            except BaseException:
+                conn.close()
+                raise
+            self._release(conn, response_headers)
+            return AsyncHTTPResponse(status, response_headers, b"".join(chunks))
+        raise ConnectionError("Unable to complete request")  # pragma: no cover
+
+    def _get_pool(self, key) -> List[_Connection]:
+        loop = asyncio.get_running_loop()
+        pools = self._pools.get(loop)
+        if pools is None:
+            pools = self._pools[loop] = {}
+            self._closers[loop] = loop.create_task(self._close_pools(loop))
+        return pools.setdefault(key, [])
+
+    async def _close_pools(self, loop: asyncio.AbstractEventLoop):
+        """ Wait for the loop to shut down, then close its idle connections
+
+            The pooled connections hold on to the loop, without this every
+            short-lived loop and its sockets would be kept forever.
+        """
+        try:
+            await loop.create_future()
+        finally:
+            del self._closers[loop]
+            for pool in self._pools.pop(loop, {}).values():
+                for conn in pool:
+                    conn.abort()
+            # let the transports close their sockets before the loop closes
+            await asyncio.sleep(0)
+
+    def _get_ssl_context(self) -> ssl.SSLContext:
+        if self._ssl_context is None:
+            self._ssl_context = ssl.create_default_context()
+        return self._ssl_context
+
+    async def _acquire(self, key, fresh: bool = False) -> _Connection:
+        pool = self._get_pool(key)
+        while pool and not fresh:
+            conn = pool.pop()
+            if conn.is_usable():
+                conn.reused = True
+                return conn
+            conn.close()
+
+        scheme, host, port = key
+        use_ssl = scheme == "https"
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(
+                host,
+                port,
+                ssl=self._get_ssl_context() if use_ssl else None,
+                server_hostname=host if use_ssl else None,
+            ),
+            self.connect_timeout
+        )
+        return _Connection(key, reader, writer)
+
+    def _release(self, conn: _Connection, headers: Dict[str, str]):
+        pool = self._get_pool(conn.key)
+        keep_alive = headers.get("connection", "").lower() != "close"
+        if keep_alive and conn.is_usable() and len(pool) < self.max_idle_per_host:
+            pool.append(conn)
+        else:
+            conn.close()
+
+    @staticmethod
+    async def _send(conn: _Connection, method, target, headers, payload):
+        lines = ["{} {} HTTP/1.1".format(method.upper(), target)]
+        lines.extend("{}: {}".format(name, value)
+                     for name, value in headers.items())
+        head = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+        conn.writer.write(head + payload)
+        await conn.writer.drain()
+
+    @staticmethod
+    async def _read_head(reader: asyncio.StreamReader) -> Tuple[int, Dict[str, str]]:
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("Connection closed before a response was received")
+        parts = status_line.decode("latin-1").split(" ", 2)
+        if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+            raise ConnectionError("Malformed status line: {!r}".format(status_line))
+        status = int(parts[1])
+
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return status, headers
+
+    @staticmethod
+    async def _iter_body(reader: asyncio.StreamReader, headers: Dict[str, str], method: str) -> AsyncIterator[bytes]:
+        """ Yield the response body as it arrives off the wire """
+        if method.upper() == "HEAD":
+            return
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            while True:
+                size_line = await reader.readline()
+                if not size_line:
+                    raise asyncio.IncompleteReadError(b"", None)
+                size = int(size_line.split(b";")[0].strip(), 16)
+                if size == 0:
+                    # skip any trailers
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    return
+                yield await reader.readexactly(size)
+                await reader.readexactly(2)
+
+        elif "content-length" in headers:
+            remaining = int(headers["content-length"])
+            while remaining > 0:
+                chunk = await reader.read(min(remaining, 65536))
+                if not chunk:
+                    raise asyncio.IncompleteReadError(b"", remaining)
+                remaining -= len(chunk)
+                yield chunk
+
+        else:
+            # body is delimited by the server closing the connection
+            headers["connection"] = "close"
+            while True:
+                chunk = await reader.read(65536)
+                if not chunk:
+                    return
+                yield chunk
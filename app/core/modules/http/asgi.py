@@ -0,0 +1,81 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from core.modules.http.disconnect import DISCONNECTED_KEY
+from django.core.handlers.asgi import ASGIHandler as DjangoASGIHandler
+from django.db import connections
+from django.http import HttpResponseBase
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+# the disconnect event of the request being handled, see DisconnectMiddleware
+_disconnected: ContextVar[Optional[asyncio.Event]] = ContextVar("asgi_disconnected", default=None)
+
+
+class ASGIHandler(DjangoASGIHandler):
+    """ Django's ASGI handler, reading streaming responses off the loop
+
+        Django 4.1 iterates a streaming response on the event loop: every
+        chunk its iterator waits for, e.g. a token of a provider stream,
+        stalls every other request of the process, and the database calls
+        it makes, e.g. recording the output once the stream ends, fail as
+        async-unsafe. Here the iterator is advanced, and the response
+        closed, on a thread of its own.
+
+        Behind DisconnectMiddleware, a stream whose client went away is
+        closed before its next chunk is read, so its generators end as
+        they would on a WSGI disconnect, e.g. recording a partial output.
+    """
+
+    async def handle(self, scope: Dict[str, Any], receive, send):
+        token = _disconnected.set(scope.get(DISCONNECTED_KEY))
+        try:
+            await super().handle(scope, receive, send)
+        finally:
+            _disconnected.reset(token)
+
+    async def send_response(self, response: HttpResponseBase, send: Callable[[Dict[str, Any]], Awaitable[None]]):
+        if not response.streaming:
+            return await super().send_response(response, send)
+
+        await send({
+            "type": "http.response.start",
+            "status": response.status_code,
+            "headers": self.get_response_headers(response),
+        })
+        loop = asyncio.get_running_loop()
+        disconnected = _disconnected.get()
+        # a single thread, the iterator keeps one database connection
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="asgi-stream")
+        parts = iter(response)
+        try:
+            while disconnected is None or not disconnected.is_set():
+                part = await loop.run_in_executor(executor, next, parts, None)
+                if part is None:
+                    await send({"type": "http.response.body"})
+                    break
+                for chunk, _ in self.chunk_bytes(part):
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        finally:
+            await loop.run_in_executor(executor, self.close_response, response)
+            executor.shutdown(wait=False)
+
+    @staticmethod
+    def get_response_headers(response: HttpResponseBase) -> List[Tuple[bytes, bytes]]:
+        """ The headers and cookies of a response, as Django sends them """
+        headers = []
+        for header, value in response.items():
+            if isinstance(header, str):
+                header = header.encode("ascii")
+            if isinstance(value, str):
+                value = value.encode("latin1")
+            headers.append((bytes(header), bytes(value)))
+        for cookie in response.cookies.values():
+            headers.append(
+                (b"Set-Cookie", cookie.output(header="").encode("ascii").strip()))
+        return headers
+
+    @staticmethod
+    def close_response(response: HttpResponseBase):
+        response.close()
+        connections.close_all()
@@ -0,0 +1,61 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+# scope key of the asyncio.Event set when the client goes away
+DISCONNECTED_KEY = "klerly.disconnected"
+
+Scope = Dict[str, Any]
+Message = Dict[str, Any]
+
+
+class DisconnectMiddleware:
+    """ ASGI middleware that notices clients going away mid-request
+
+        Django reads the request body and then stops listening to the
+        connection, so a client that disconnects while its view runs goes
+        unnoticed. Once the body is read this keeps receiving on behalf of
+        the application and sets the event stored in the scope when an
+        http.disconnect arrives. Views reach it with get_disconnected.
+    """
+
+    def __init__(self, app: Callable[..., Awaitable[None]]):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Callable[[], Awaitable[Message]], send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        disconnected = asyncio.Event()
+        scope[DISCONNECTED_KEY] = disconnected
+        watcher: Optional[asyncio.Future] = None
+
+        async def watch():
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    disconnected.set()
+                    return
+
+        async def receive_body() -> Message:
+            nonlocal watcher
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                disconnected.set()
+            elif not message.get("more_body", False) and watcher is None:
+                watcher = asyncio.ensure_future(watch())
+            return message
+
+        try:
+            await self.app(scope, receive_body, send)
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+
+
+def get_disconnected(request) -> Optional[asyncio.Event]:
+    """ The disconnect event of an ASGI request, None when not available """
+    scope = getattr(request, "scope", None)
+    if scope is None:
+        return None
+    return scope.get(DISCONNECTED_KEY)
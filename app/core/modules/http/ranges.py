@@ -0,0 +1,48 @@
+from typing import Optional, Tuple
+
+
+class RangeNotSatisfiable(Exception):
+    """ The requested range lies outside of the resource """
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """ Parse a single byte range from a Range header
+
+        Args:
+            header (str): The Range header e.g. "bytes=0-499"
+            size (int): Size of the resource in bytes
+
+        Returns:
+            Tuple[int, int]: The first and last byte positions, inclusive.
+            None when the whole resource should be sent, i.e. there is no
+            header, it is malformed or it asks for several ranges.
+
+        Raises:
+            RangeNotSatisfiable: If the range starts past the end of the resource
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+
+    try:
+        if not first:
+            # suffix range, the last N bytes
+            length = int(last)
+            if length <= 0 or size == 0:
+                raise RangeNotSatisfiable
+            return max(size - length, 0), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+
+    if last and start > end:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable
+    return start, min(end, size - 1)
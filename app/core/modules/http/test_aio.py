@@ -0,0 +1,83 @@
+import asyncio
+from django.test import SimpleTestCase
+from core.modules.http import AsyncHTTPClient
+
+
+class AsyncHTTPClientTest(SimpleTestCase):
+    async def _serve(self, responses):
+        """ Start a local server answering each request with the next response """
+        self.connections = 0
+        self.requests = []
+
+        async def handle(reader, writer):
+            self.connections += 1
+            while responses:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.decode().split("\r\n"):
+                    if line.lower().startswith("content-length"):
+                        length = int(line.split(":")[1])
+                body = await reader.readexactly(length)
+                self.requests.append((head, body))
+                writer.write(responses.pop(0))
+                await writer.drain()
+            writer.close()
+
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        return server, "http://127.0.0.1:{}".format(port)
+
+    async def test_request_content_length(self):
+        server, url = await self._serve([
+            b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+            b"Content-Length: 12\r\n\r\n{\"ok\": true}",
+        ])
+        async with server:
+            client = AsyncHTTPClient()
+            response = await client.request("POST", url + "/v1", json={"a": 1})
+
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.json(), {"ok": True})
+        head, body = self.requests[0]
+        self.assertTrue(head.startswith(b"POST /v1 HTTP/1.1"))
+        self.assertEqual(body, b'{"a": 1}')
+
+    async def test_request_chunked(self):
+        server, url = await self._serve([
+            b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+            b"5\r\nhello\r\n6\r\n world\r\n0\r\n\r\n",
+        ])
+        async with server:
+            response = await AsyncHTTPClient().request("GET", url)
+
+        self.assertEqual(response.body, b"hello world")
+
+    async def test_connection_reused(self):
+        ok = b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok"
+        server, url = await self._serve([ok, ok])
+        async with server:
+            client = AsyncHTTPClient()
+            await client.request("GET", url)
+            await client.request("GET", url)
+
+        self.assertEqual(self.connections, 1)
+        self.assertEqual(len(self.requests), 2)
+
+    def test_pool_closed_with_loop(self):
+        ok = b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok"
+        client = AsyncHTTPClient()
+        pooled = []
+
+        async def main():
+            server, url = await self._serve([ok])
+            async with server:
+                await client.request("GET", url)
+                pooled.extend(conn for pool in client._pools[asyncio.get_running_loop()].values()
+                              for conn in pool)
+
+        for _ in range(3):
+            asyncio.run(main())
+        # every loop dropped its pool and closed its connection on shutdown
+        self.assertEqual(client._pools, {})
+        self.assertEqual(len(pooled), 3)
+        self.assertTrue(all(conn.writer.transport.is_closing() for conn in pooled))
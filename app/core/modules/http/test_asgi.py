@@ -0,0 +1,99 @@
+import asyncio
+import threading
+import time
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import SimpleTestCase
+from core.modules.http import ASGIHandler
+from core.modules.http.asgi import _disconnected
+
+
+class ASGIHandlerTest(SimpleTestCase):
+    def send_response(self, response, during=None):
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        async def main():
+            task = asyncio.ensure_future(during()) if during else None
+            await ASGIHandler().send_response(response, send)
+            if task is not None:
+                task.cancel()
+        asyncio.run(main())
+        return messages
+
+    def test_streaming(self):
+        threads = []
+        ticks = []
+
+        def content():
+            threads.append(threading.get_ident())
+            try:
+                for part in (b"a", b"b", b"c"):
+                    time.sleep(0.05)
+                    yield part
+            finally:
+                threads.append(threading.get_ident())
+
+        async def tick():
+            while True:
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        response = StreamingHttpResponse(content(), content_type="text/event-stream")
+        response.set_cookie("seen", "1")
+        messages = self.send_response(response, tick)
+
+        self.assertEqual(messages[0]["status"], 200)
+        self.assertIn((b"Content-Type", b"text/event-stream"), messages[0]["headers"])
+        self.assertTrue(any(name == b"Set-Cookie" for name, _ in messages[0]["headers"]))
+        self.assertEqual(b"".join(message.get("body", b"") for message in messages[1:]), b"abc")
+        self.assertFalse(messages[-1].get("more_body", False))
+        # the iterator ran on another thread while the loop kept going
+        self.assertNotIn(threading.get_ident(), threads)
+        self.assertGreater(len(ticks), 5)
+
+    def test_closed_on_failure(self):
+        closed = []
+
+        def content():
+            try:
+                yield b"a"
+                raise ValueError("broken")
+            finally:
+                closed.append(True)
+
+        response = StreamingHttpResponse(content())
+        response._resource_closers.append(lambda: closed.append("response"))
+        with self.assertRaises(ValueError):
+            self.send_response(response)
+        self.assertEqual(closed, [True, "response"])
+
+    def test_disconnected(self):
+        disconnected = asyncio.Event()
+        read = []
+
+        def content():
+            for part in (b"a", b"b", b"c"):
+                read.append(part)
+                # the client goes away after the first part
+                disconnected.set()
+                yield part
+
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        async def main():
+            _disconnected.set(disconnected)
+            await ASGIHandler().send_response(StreamingHttpResponse(content()), send)
+        asyncio.run(main())
+
+        self.assertEqual(read, [b"a"])
+        self.assertEqual([message.get("body") for message in messages[1:]], [b"a"])
+        self.assertTrue(messages[-1]["more_body"])
+
+    def test_not_streaming(self):
+        messages = self.send_response(HttpResponse(b"done"))
+        self.assertEqual(messages[-1]["body"], b"done")
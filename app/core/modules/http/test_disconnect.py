@@ -0,0 +1,67 @@
+import asyncio
+import os
+import subprocess
+import sys
+from django.conf import settings
+from django.test import SimpleTestCase
+from types import SimpleNamespace
+from core.modules.http import DisconnectMiddleware, get_disconnected
+from core.modules.http.disconnect import DISCONNECTED_KEY
+
+
+class DisconnectMiddlewareTest(SimpleTestCase):
+    def run_app(self, messages, app):
+        async def main():
+            queue: asyncio.Queue = asyncio.Queue()
+            for message in messages:
+                queue.put_nowait(message)
+            scope = {"type": "http"}
+            await DisconnectMiddleware(app)(scope, queue.get, None)
+            return scope
+        return asyncio.run(main())
+
+    def test_disconnect(self):
+        seen = []
+
+        async def app(scope, receive, send):
+            message = await receive()
+            self.assertEqual(message["body"], b"{}")
+            # the view runs while the middleware keeps listening
+            await asyncio.wait_for(scope[DISCONNECTED_KEY].wait(), 1)
+            seen.append(True)
+
+        self.run_app([
+            {"type": "http.request", "body": b"{}", "more_body": False},
+            {"type": "http.disconnect"},
+        ], app)
+        self.assertEqual(seen, [True])
+
+    def test_connected(self):
+        async def app(scope, receive, send):
+            await receive()
+            await asyncio.sleep(0.01)
+            self.assertFalse(scope[DISCONNECTED_KEY].is_set())
+
+        self.run_app([{"type": "http.request", "body": b"", "more_body": False}], app)
+
+    def test_other_scopes(self):
+        async def app(scope, receive, send):
+            self.assertNotIn(DISCONNECTED_KEY, scope)
+
+        async def main():
+            await DisconnectMiddleware(app)({"type": "lifespan"}, None, None)
+        asyncio.run(main())
+
+    def test_get_disconnected(self):
+        event = asyncio.Event()
+        self.assertIs(get_disconnected(SimpleNamespace(scope={DISCONNECTED_KEY: event})), event)
+        self.assertIsNone(get_disconnected(SimpleNamespace()))
+
+    def test_asgi_application_loads(self):
+        # the server imports the module before any settings are configured
+        env = {key: value for key, value in os.environ.items()
+               if key != "DJANGO_SETTINGS_MODULE"}
+        result = subprocess.run(
+            [sys.executable, "-c", "import Klerly.asgi"],
+            cwd=settings.BASE_DIR.parent, env=env, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
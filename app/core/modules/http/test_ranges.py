@@ -0,0 +1,21 @@
+from django.test import SimpleTestCase
+from core.modules.http import parse_range, RangeNotSatisfiable
+
+
+class ParseRangeTest(SimpleTestCase):
+    def test_parse_range(self):
+        self.assertEqual(parse_range("bytes=0-499", 1000), (0, 499))
+        self.assertEqual(parse_range("bytes=500-", 1000), (500, 999))
+        self.assertEqual(parse_range("bytes=-200", 1000), (800, 999))
+        # the end is clamped to the size of the resource
+        self.assertEqual(parse_range("bytes=900-2000", 1000), (900, 999))
+        self.assertEqual(parse_range("bytes=-2000", 1000), (0, 999))
+
+    def test_parse_range_whole(self):
+        for header in (None, "", "items=0-1", "bytes=0-1,5-6", "bytes=a-b", "bytes=5-1", "bytes"):
+            self.assertIsNone(parse_range(header, 1000), header)
+
+    def test_parse_range_not_satisfiable(self):
+        self.assertRaises(RangeNotSatisfiable, parse_range, "bytes=1000-", 1000)
+        self.assertRaises(RangeNotSatisfiable, parse_range, "bytes=-0", 1000)
+        self.assertRaises(RangeNotSatisfiable, parse_range, "bytes=-10", 0)
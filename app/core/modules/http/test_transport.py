@@ -0,0 +1,115 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from django.test import SimpleTestCase
+from requests.exceptions import ConnectionError, ConnectTimeout
+from core.modules.http import HTTPTransport
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _respond(self):
+        server = self.server
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        server.requests.append((self.command, self.client_address[1]))  # type: ignore
+        status = server.statuses.pop(0) if server.statuses else 200  # type: ignore
+        body = b'{"ok": true}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Set-Cookie", "session=1")
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = _respond
+
+    def log_message(self, format, *args):
+        pass
+
+
+class HTTPTransportTest(SimpleTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.requests = []  # type: ignore
+        self.server.statuses = []  # type: ignore
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = "http://127.0.0.1:{}/v1".format(self.server.server_address[1])
+        self.host = "127.0.0.1:{}".format(self.server.server_address[1])
+        self.transport = HTTPTransport(backoff=0)
+
+    def tearDown(self):
+        self.transport.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_connection_reused(self):
+        for _ in range(3):
+            self.assertEqual(self.transport.get(self.url).json(), {"ok": True})
+        ports = {port for _, port in self.server.requests}  # type: ignore
+        self.assertEqual(len(ports), 1)
+
+    def test_no_cookies_kept(self):
+        self.transport.get(self.url)
+        self.assertEqual(len(self.transport.session.cookies), 0)
+
+    def test_idempotent_retried(self):
+        self.server.statuses = [503, 502]  # type: ignore
+        response = self.transport.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.server.requests), 3)  # type: ignore
+        self.assertEqual(self.transport.stats()[self.host]["retries"], 2)
+
+    def test_retries_exhausted(self):
+        self.server.statuses = [503, 503, 503]  # type: ignore
+        self.assertEqual(self.transport.get(self.url).status_code, 503)
+        self.assertEqual(len(self.server.requests), 3)  # type: ignore
+
+    def test_post_not_retried(self):
+        self.server.statuses = [503]  # type: ignore
+        self.assertEqual(self.transport.post(self.url).status_code, 503)
+        self.assertEqual(len(self.server.requests), 1)  # type: ignore
+
+    def test_post_retried_when_idempotent(self):
+        self.server.statuses = [503]  # type: ignore
+        response = self.transport.post(self.url, idempotent=True)
+        self.assertEqual(response.status_code, 200)
+
+    def test_post_retried_on_connect_timeout(self):
+        with mock.patch.object(
+            self.transport.session, "request",
+            side_effect=[ConnectTimeout(), mock.Mock(status_code=200)]
+        ) as request:
+            self.assertEqual(self.transport.post(self.url).status_code, 200)
+        self.assertEqual(request.call_count, 2)
+
+    def test_post_not_retried_on_connection_error(self):
+        with mock.patch.object(
+            self.transport.session, "request", side_effect=ConnectionError()
+        ) as request:
+            with self.assertRaises(ConnectionError):
+                self.transport.post(self.url)
+        self.assertEqual(request.call_count, 1)
+        self.assertEqual(self.transport.stats()[self.host]["errors"], 1)
+
+    def test_timeouts(self):
+        transport = HTTPTransport(connect_timeout=2, read_timeout=7)
+        with mock.patch.object(transport.session, "request") as request:
+            request.return_value.status_code = 200
+            transport.get(self.url)
+            transport.get(self.url, timeout=1)
+        self.assertEqual(request.call_args_list[0].kwargs["timeout"], (2, 7))
+        self.assertEqual(request.call_args_list[1].kwargs["timeout"], 1)
+
+    def test_latency_stats(self):
+        self.transport.get(self.url)
+        stats = self.transport.stats()[self.host]
+        self.assertEqual(stats["requests"], 1)
+        self.assertEqual(stats["errors"], 0)
+        self.assertGreater(stats["p95"], 0)
+
+    def test_backoff_bounded(self):
+        transport = HTTPTransport(backoff=1, max_backoff=3)
+        for attempt in range(6):
+            self.assertLessEqual(transport.get_backoff(attempt), 3)
@@ -0,0 +1,229 @@
+import math
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from http.cookiejar import DefaultCookiePolicy
+from django.conf import settings
+from core.modules.breaker import CircuitBreaker
+from requests import Response, Session
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, ConnectTimeout, Timeout
+from typing import Any, Deque, Dict, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+
+# methods that can be sent again without changing the outcome
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS", "PUT", "DELETE"))
+# responses worth retrying, the server did not act on the request
+RETRY_STATUSES = frozenset((429, 502, 503, 504))
+
+TimeoutType = Union[float, Tuple[float, float]]
+
+
+class HostLatency:
+    """ Latencies and errors of the requests made to each host """
+
+    def __init__(self, window: int = 200):
+        self._latencies: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=window))
+        self._requests: Dict[str, int] = defaultdict(int)
+        self._errors: Dict[str, int] = defaultdict(int)
+        self._retries: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, host: str, latency: float, error: bool = False):
+        with self._lock:
+            self._requests[host] += 1
+            self._latencies[host].append(latency)
+            if error:
+                self._errors[host] += 1
+
+    def record_retry(self, host: str):
+        with self._lock:
+            self._retries[host] += 1
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {host: {
+                "requests": self._requests[host],
+                "errors": self._errors[host],
+                "retries": self._retries[host],
+                "p50": self._quantile(self._latencies[host], 0.5),
+                "p95": self._quantile(self._latencies[host], 0.95),
+            } for host in self._requests}
+
+    def clear(self):
+        with self._lock:
+            self._latencies.clear()
+            self._requests.clear()
+            self._errors.clear()
+            self._retries.clear()
+
+    @staticmethod
+    def _quantile(latencies: Deque[float], quantile: float) -> Optional[float]:
+        if not latencies:
+            return None
+        ordered = sorted(latencies)
+        return ordered[min(math.ceil(quantile * len(ordered)) - 1, len(ordered) - 1)]
+
+
+class HTTPTransport:
+    """ The outbound HTTP transport shared by the third party integrations
+
+        Connections are kept alive in a pool per host, every request is
+        bounded by a connect and a read timeout, and idempotent requests
+        that fail on the network or with a 429/502/503/504 are retried
+        with jittered exponential backoff. Non idempotent requests are
+        only retried when the connection could not be opened, since the
+        server then never saw them.
+    """
+
+    def __init__(
+        self,
+        pool_maxsize: int = 10,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        max_retries: int = 2,
+        backoff: float = 0.5,
+        max_backoff: float = 5.0,
+    ):
+        """
+        Args:
+            pool_maxsize (int): Connections kept open per host
+            connect_timeout (float): Seconds allowed to open a connection
+            read_timeout (float): Seconds allowed between bytes of the response
+            max_retries (int): Retries after the first attempt
+            backoff (float): Seconds before the first retry, doubled on every retry
+            max_backoff (float): Most seconds between two attempts
+        """
+        self.pool_maxsize = pool_maxsize
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.latency = HostLatency()
+        self._session: Optional[Session] = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> Session:
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._make_session()
+        return self._session
+
+    def _make_session(self) -> Session:
+        session = Session()
+        # the session is shared by every user, it must not keep cookies
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_maxsize,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=0,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        idempotent: Optional[bool] = None,
+        timeout: Optional[TimeoutType] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        **kwargs
+    ) -> Response:
+        """ Send a request, retrying it when that is safe
+
+            Args:
+                method (str): HTTP method e.g. "POST"
+                url (str): Absolute url
+                idempotent (bool, optional): Whether the request may be sent
+                    again, defaults to whether the method is idempotent
+                timeout (float, optional): Overrides the (connect, read) timeouts
+                breaker (CircuitBreaker, optional): Breaker of the provider,
+                    network errors and 5xx responses count as its failures
+                kwargs (dict): Keyword arguments of requests.Session.request
+            Returns:
+                requests.Response: The response, whatever its status
+            Raises:
+                requests.RequestException: If the last attempt failed
+                CircuitOpenError: If the breaker is open
+        """
+        if breaker is None:
+            return self._request(method, url, idempotent, timeout, **kwargs)
+        with breaker.guard() as call:
+            response = self._request(method, url, idempotent, timeout, **kwargs)
+            if response.status_code >= 500:
+                call.fail()
+        return response
+
+    def _request(
+        self,
+        method: str,
+        url: str,
+        idempotent: Optional[bool],
+        timeout: Optional[TimeoutType],
+        **kwargs
+    ) -> Response:
+        method = method.upper()
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        host = urlsplit(url).netloc
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            try:
+                response = self.session.request(
+                    method, url, timeout=timeout or self.timeout, **kwargs)
+            except (ConnectionError, Timeout) as error:
+                self.latency.record(host, time.monotonic() - started, error=True)
+                retryable = idempotent or isinstance(error, ConnectTimeout)
+                if not retryable or attempt >= self.max_retries:
+                    raise
+            else:
+                self.latency.record(
+                    host, time.monotonic() - started, error=response.status_code >= 500)
+                if not (idempotent and response.status_code in RETRY_STATUSES) \
+                        or attempt >= self.max_retries:
+                    return response
+                response.close()
+            self.latency.record_retry(host)
+            time.sleep(self.get_backoff(attempt))
+            attempt += 1
+
+    def get_backoff(self, attempt: int) -> float:
+        """ Full jitter backoff so retrying callers do not retry in step """
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def get(self, url: str, **kwargs) -> Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> Response:
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> Response:
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> Response:
+        return self.request("DELETE", url, **kwargs)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return self.latency.stats()
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+http_transport = HTTPTransport(
+    pool_maxsize=getattr(settings, "HTTP_POOL_MAXSIZE", 10),
+    connect_timeout=getattr(settings, "HTTP_CONNECT_TIMEOUT", 5.0),
+    read_timeout=getattr(settings, "HTTP_READ_TIMEOUT", 30.0),
+    max_retries=getattr(settings, "HTTP_MAX_RETRIES", 2),
+    backoff=getattr(settings, "HTTP_RETRY_BACKOFF", 0.5),
+)
@@ -1,6 +1,8 @@
 import mailchimp_transactional
-from mailchimp_transactional.api_client import ApiClientError
+from mailchimp_transactional.api_client import ApiClient, ApiClientError
 from django.conf import settings
+from core.modules.http import http_transport
+import json
 import logging
 import abc
 
@@ -38,6 +40,18 @@ class AbstractMail(abc.ABC):
         raise NotImplementedError
 
 
+class TransportApiClient(ApiClient):
+    """
+    Mailchimp Transactional API client sending its requests through the shared http transport.
+    """
+
+    def request(self, method, url, body=None, headers=None, timeout=None):
+        if method != 'POST':
+            raise ValueError("http method must be `POST`")
+        return http_transport.post(
+            url, data=json.dumps(body), headers=headers, timeout=timeout)
+
+
 class MailChimp(AbstractMail):
     """
     Concrete subclass of AbstractMail that sends emails using the MailChimp Transactional Email API.
@@ -53,6 +67,9 @@ class MailChimp(AbstractMail):
         super().__init__(key)
         # Create a new MailchimpTransactional.Client instance using the API key
         self.mailchimp = mailchimp_transactional.Client(key)
+        # Send the client's requests through the shared http transport
+        self.mailchimp.api_client = TransportApiClient()
+        self.mailchimp.set_api_key(key)
 
     def send(self, to, subject, text, html=None):
         """
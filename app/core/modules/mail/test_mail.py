@@ -59,6 +59,16 @@ class MailChimpTestCase(TestCase):
             result = mailchimp.send("to@example.com", "subject", "text")
             self.assertFalse(result)
 
+    @patch('core.modules.mail.http_transport.post')
+    def test_requests_use_http_transport(self, mock_post):
+        mock_post.return_value.ok = True
+        mock_post.return_value.headers = {'content-type': 'application/json'}
+        mock_post.return_value.json.return_value = [{'status': 'sent'}]
+        mailchimp = MailChimp()
+        self.assertTrue(mailchimp.send("to@example.com", "subject", "text"))
+        url = mock_post.call_args.args[0]
+        self.assertEqual(url, "https://mandrillapp.com/api/1.0/messages/send.json")
+
 
 class MailTestCase(TestCase):
     def setUp(self):
@@ -2,8 +2,9 @@ from account.models import User
 from wallet.models import TransactionModel
 from core.modules.payment import AbstractPayment
 from django.conf import settings
+from core.modules.breaker import circuit_breakers
+from core.modules.http import http_transport
 from requests.models import Response
-import requests
 
 
 class LazerPay(AbstractPayment):
@@ -22,7 +23,13 @@ class LazerPay(AbstractPayment):
             'x-api-key': settings.LAZERPAY_PUBLIC_KEY,
             "Authorization": "Bearer {token}".format(token=settings.LAZERPAY_SECRET_KEY),
         }
-        response = requests.request(method, url, headers=headers, data=payload)
+        response = http_transport.request(
+            method,
+            url,
+            headers=headers,
+            data=payload,
+            breaker=circuit_breakers.get("lazerpay")
+        )
         return self._handle_response(response)
 
     @staticmethod
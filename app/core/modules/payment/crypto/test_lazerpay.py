@@ -2,6 +2,7 @@ from django.test import TestCase
 from unittest.mock import patch
 from unittest import mock
 from account.models import User
+from core.modules.breaker import circuit_breakers
 from core.modules.payment.crypto.lazerpay import LazerPay
 from wallet.models import TransactionModel
 from requests.models import Response
@@ -34,7 +35,7 @@ class LazerPayTest(TestCase):
 
     def test_make_request(self):
         with self.settings(LAZERPAY_PUBLIC_KEY='public_key', LAZERPAY_SECRET_KEY='secret_key'):
-            with patch('requests.request') as mock_request:
+            with patch('core.modules.payment.crypto.lazerpay.http_transport.request') as mock_request:
                 response = Response()
                 response.status_code = 200
                 response._content = b'{"status": "success", "data": "valid_data"}'
@@ -52,7 +53,9 @@ class LazerPayTest(TestCase):
                                                     'x-api-key': 'public_key',
                                                     'Authorization': 'Bearer secret_key',
                                                 },
-                                                data=payload
+                                                data=payload,
+                                                breaker=circuit_breakers.get(
+                                                    "lazerpay")
                                                 )
 
     @patch('core.modules.payment.crypto.lazerpay.LazerPay._make_request')
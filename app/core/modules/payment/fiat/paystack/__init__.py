@@ -1,14 +1,60 @@
 from django.conf import settings
+import paystackapi
+from paystackapi.base import PayStackBase, PayStackRequests
 from paystackapi.transaction import Transaction as T
+from core.modules.breaker import circuit_breakers
+from core.modules.http import http_transport
 from account.models import User
 from core.modules.payment.fiat.paystack import ResponseType
 from core.modules.payment import AbstractPayment
 from wallet.models import TransactionModel
 
 
+class TransportPayStackRequests(PayStackRequests):
+    """ paystackapi requests sent through the shared http transport """
+
+    def _send(self, method: str, resource_uri: str, **kwargs):
+        response = http_transport.request(
+            method,
+            self.API_BASE_URL + resource_uri,
+            json=kwargs.get('data'),
+            headers=self.headers,
+            params=kwargs.get('qs'),
+            breaker=circuit_breakers.get("paystack")
+        )
+        return response.json()
+
+    def get(self, endpoint, **kwargs):
+        return self._send("GET", endpoint, **kwargs)
+
+    def post(self, endpoint, **kwargs):
+        return self._send("POST", endpoint, **kwargs)
+
+    def put(self, endpoint, **kwargs):
+        return self._send("PUT", endpoint, **kwargs)
+
+
+def use_http_transport():
+    """ Send the requests of the paystackapi resources through http_transport
+
+        paystackapi keeps its requests object in state shared by every
+        resource class, it is replaced once.
+    """
+    if isinstance(PayStackBase._shared_state.get("requests"), TransportPayStackRequests):
+        return
+    secret_key = settings.PAYSTACK_SECRET_KEY or paystackapi.SECRET_KEY
+    PayStackBase._shared_state.update(requests=TransportPayStackRequests(
+        api_url=paystackapi.API_URL,
+        headers={
+            "Authorization": paystackapi.HEADERS["Authorization"].format(secret_key)
+        }
+    ))
+
+
 class Paystack(AbstractPayment):
     def __init__(self, user: User):
         self.user = user
+        use_http_transport()
 
     @staticmethod
     def _convert_to_kobo(amount: int):
@@ -208,3 +208,13 @@ class PaystackTest(TestCase):
         self.assertRaises(Exception, self.paystack.verify, reference)
         mock_verify.assert_called_with(reference='invalid_reference')
         mock_handle_response.assert_called_once()
+
+    @patch('core.modules.payment.fiat.paystack.http_transport.request')
+    def test_requests_use_http_transport(self, mock_request):
+        mock_request.return_value.json.return_value = {
+            'status': True, 'data': {'status': 'success'}}
+        success, _ = self.paystack.verify('valid_reference')
+        self.assertTrue(success)
+        method, url = mock_request.call_args.args
+        self.assertEqual(method, 'GET')
+        self.assertTrue(url.endswith('transaction/verify/valid_reference'))
@@ -0,0 +1,2 @@
+from .blob import BlobStore
+from .files import SettingFileSystemStorage
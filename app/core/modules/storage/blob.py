@@ -0,0 +1,98 @@
+import hashlib
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Iterable, Union
+
+
+DIGEST_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+# leading bytes of the formats the store is expected to hold
+SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+
+class BlobStore:
+    """
+    Content addressed file store.
+
+    A blob is written once under the sha256 hex digest of its content,
+    so identical content is only stored once and a stored blob never
+    changes. Blobs are streamed in and out in chunks and never held in
+    memory whole.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, root: Union[str, Path]):
+        """
+        Args:
+            root (str): Directory holding the blobs.
+        """
+        self.root = Path(root)
+
+    def path(self, digest: str) -> Path:
+        """ Location of a blob, e.g. root/ab/cd/abcd...
+
+            Raises:
+                ValueError: If the digest is not a sha256 hex digest
+        """
+        if not DIGEST_PATTERN.match(digest):
+            raise ValueError("Invalid blob digest: {!r}".format(digest))
+        return self.root / digest[:2] / digest[2:4] / digest
+
+    def exists(self, digest: str) -> bool:
+        try:
+            return self.path(digest).is_file()
+        except ValueError:
+            return False
+
+    def open(self, digest: str) -> BinaryIO:
+        return open(self.path(digest), "rb")
+
+    def put(self, chunks: Iterable[bytes]) -> str:
+        """ Store the content of chunks
+
+            The content is written to a temporary file while it is hashed
+            and then moved in place, unless the blob already exists.
+
+            Returns:
+                str: The digest of the content
+        """
+        tmp_dir = self.root / "tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        sha256 = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                for chunk in chunks:
+                    sha256.update(chunk)
+                    tmp.write(chunk)
+            digest = sha256.hexdigest()
+            path = self.path(digest)
+            if path.is_file():
+                os.unlink(tmp_path)
+            else:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return digest
+
+    def get_content_type(self, digest: str) -> str:
+        """ Content type of a blob, from its leading bytes """
+        with self.open(digest) as blob:
+            head = blob.read(16)
+        for signature, content_type in SIGNATURES:
+            if head.startswith(signature):
+                return content_type
+        if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+            return "image/webp"
+        return "application/octet-stream"
@@ -0,0 +1,30 @@
+import os
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible(path="core.modules.storage.SettingFileSystemStorage")
+class SettingFileSystemStorage(FileSystemStorage):
+    """
+    File system storage rooted at the directory named by a setting.
+
+    The setting is read on every use rather than when the model fields
+    are defined, so it can be overridden e.g. in tests.
+    """
+
+    def __init__(self, setting: str, **kwargs):
+        """
+        Args:
+            setting (str): Name of the setting holding the root directory.
+        """
+        super().__init__(**kwargs)
+        self.setting = setting
+
+    @property
+    def base_location(self):  # type: ignore
+        return str(getattr(settings, self.setting))
+
+    @property
+    def location(self):  # type: ignore
+        return os.path.abspath(self.base_location)
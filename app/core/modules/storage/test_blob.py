@@ -0,0 +1,53 @@
+import hashlib
+import tempfile
+from django.test import SimpleTestCase
+from core.modules.storage import BlobStore
+
+
+class BlobStoreTest(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = BlobStore(self.tmp.name)
+        self.png = b"\x89PNG\r\n\x1a\n" + b"image" * 100
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_put(self):
+        digest = self.store.put([self.png[:10], self.png[10:]])
+        self.assertEqual(digest, hashlib.sha256(self.png).hexdigest())
+        self.assertTrue(self.store.exists(digest))
+        self.assertEqual(
+            self.store.path(digest).relative_to(self.tmp.name).parts,
+            (digest[:2], digest[2:4], digest)
+        )
+        with self.store.open(digest) as blob:
+            self.assertEqual(blob.read(), self.png)
+
+    def test_put_deduplicates(self):
+        first = self.store.put([self.png])
+        second = self.store.put(iter([self.png[:3], self.png[3:]]))
+        self.assertEqual(first, second)
+        # nothing is left behind in the temporary directory
+        self.assertEqual(list((self.store.root / "tmp").iterdir()), [])
+
+    def test_put_failed(self):
+        def chunks():
+            yield b"partial"
+            raise ConnectionError
+
+        with self.assertRaises(ConnectionError):
+            self.store.put(chunks())
+        self.assertEqual(list((self.store.root / "tmp").iterdir()), [])
+
+    def test_path_invalid(self):
+        self.assertRaises(ValueError, self.store.path, "../../etc/passwd")
+        self.assertFalse(self.store.exists("abc"))
+
+    def test_get_content_type(self):
+        self.assertEqual(
+            self.store.get_content_type(self.store.put([self.png])), "image/png")
+        self.assertEqual(
+            self.store.get_content_type(self.store.put([b"text"])),
+            "application/octet-stream"
+        )
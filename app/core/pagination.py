@@ -0,0 +1,163 @@
+import base64
+import binascii
+import datetime
+import decimal
+import json
+import uuid
+from collections import OrderedDict
+from django.db.models import Q, QuerySet
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class KeysetPagination(BasePagination):
+    """ Pages through a list by the position of its last row instead of
+        an offset, and without counting the rows
+
+        The queryset's own ordering is used, newest first by default,
+        with the primary key appended to break ties, so each page is an
+        index range scan that costs the same however deep it is. The
+        position is sent back to the client as an opaque ?cursor= in the
+        next and previous links. Every field ordered by must be non null
+        and a column or annotation of the queryset.
+    """
+    cursor_query_param = 'cursor'
+    limit_query_param = 'limit'
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = 100
+    invalid_cursor_message = _('Invalid cursor')
+
+    def paginate_queryset(self, queryset: QuerySet, request, view=None) -> List[Any]:
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.ordering = self.get_ordering(queryset)
+        position, self.reverse = self.decode_cursor(request)
+
+        fields = self.ordering
+        if self.reverse:
+            fields = [(name, not descending) for name, descending in fields]
+        queryset = queryset.order_by(*(
+            "-" + name if descending else name for name, descending in fields))
+        if position is not None:
+            queryset = queryset.filter(self.get_position_filter(fields, position))
+
+        rows = list(queryset[:self.limit + 1])
+        has_more = len(rows) > self.limit
+        rows = rows[:self.limit]
+        if self.reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        self.rows = rows
+        return rows
+
+    def get_limit(self, request) -> int:
+        try:
+            limit = int(request.query_params[self.limit_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(limit, 1), self.max_page_size)
+
+    def get_ordering(self, queryset: QuerySet) -> List[Tuple[str, bool]]:
+        """ The (field, descending) pairs the queryset is ordered by,
+            ending with its primary key
+        """
+        opts = queryset.model._meta
+        ordering = queryset.query.order_by or opts.ordering or ('-pk',)
+        fields = []
+        for field in ordering:
+            if not isinstance(field, str):
+                raise TypeError(
+                    "KeysetPagination cannot order by expressions, got %r" % (field,))
+            descending = field.startswith("-")
+            name = field.lstrip("-")
+            if name == "pk":
+                name = opts.pk.name
+            fields.append((name, descending))
+            if name == opts.pk.name:
+                break
+        else:
+            fields.append((opts.pk.name, fields[0][1]))
+        return fields
+
+    @staticmethod
+    def get_position_filter(fields: List[Tuple[str, bool]], position: List[Any]) -> Q:
+        """ Rows after `position`: (a, b) > (x, y) is a > x OR (a = x AND b > y) """
+        after = Q()
+        for index, (name, descending) in enumerate(fields):
+            condition = Q(**{"{}__{}".format(name, "lt" if descending else "gt"): position[index]})
+            for equal, (previous, _descending) in enumerate(fields[:index]):
+                condition &= Q(**{previous: position[equal]})
+            after |= condition
+        # bounds the first column too so the database scans a range of its index
+        name, descending = fields[0]
+        return Q(**{"{}__{}".format(name, "lte" if descending else "gte"): position[0]}) & after
+
+    def get_position(self, row) -> List[Any]:
+        return [self.encode_value(getattr(row, name)) for name, _descending in self.ordering]
+
+    @staticmethod
+    def encode_value(value: Any) -> Any:
+        if isinstance(value, (datetime.date, datetime.time)):
+            return value.isoformat()
+        if isinstance(value, (decimal.Decimal, uuid.UUID)):
+            return str(value)
+        return value
+
+    def decode_cursor(self, request) -> Tuple[Optional[List[Any]], bool]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+            position, reverse = cursor["p"], bool(cursor.get("r"))
+        except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, position: List[Any], reverse: bool) -> str:
+        cursor: Dict[str, Any] = {"p": position}
+        if reverse:
+            cursor["r"] = 1
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(cursor, separators=(",", ":")).encode()).decode("ascii")
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next or not self.rows:
+            return None
+        return self.encode_cursor(self.get_position(self.rows[-1]), False)
+
+    def get_previous_link(self) -> Optional[str]:
+        if not self.has_previous:
+            return None
+        if not self.rows:
+            return remove_query_param(
+                self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.encode_cursor(self.get_position(self.rows[0]), True)
+
+    def get_paginated_response(self, data) -> Response:
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,83 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from account.models import User
+from core.pagination import KeysetPagination
+from wallet.models import TransactionModel
+
+
+class KeysetPaginationTestCase(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create_user(  # type: ignore
+            username='testuser',
+            password='password',
+        )
+        for index in range(7):
+            TransactionModel.objects.create(
+                user=self.user, amount=100 * index, reference='ref{}'.format(index))
+        # ties on created_at are broken by the primary key
+        TransactionModel.objects.filter(
+            reference__in=['ref2', 'ref3', 'ref4']).update(created_at=timezone.now())
+        self.queryset = TransactionModel.objects.filter(user=self.user)
+        self.expected = list(
+            self.queryset.order_by('-created_at', '-reference').values_list('reference', flat=True))
+
+    def paginate(self, url):
+        paginator = KeysetPagination()
+        request = Request(self.factory.get(url))
+        rows = paginator.paginate_queryset(self.queryset, request)
+        return [row.reference for row in rows], paginator
+
+    def test_get_ordering(self):
+        paginator = KeysetPagination()
+        self.assertEqual(paginator.get_ordering(self.queryset), [
+            ('created_at', True), ('reference', True),
+        ])
+        self.assertEqual(paginator.get_ordering(self.queryset.order_by('amount', 'pk')), [
+            ('amount', False), ('reference', False),
+        ])
+
+    def test_pages_forward_and_back(self):
+        pages = []
+        rows, paginator = self.paginate('/transactions?limit=3')
+        self.assertIsNone(paginator.get_previous_link())
+        while True:
+            pages.append(rows)
+            next_link = paginator.get_next_link()
+            if next_link is None:
+                break
+            rows, paginator = self.paginate(next_link)
+        self.assertEqual([len(rows) for rows in pages], [3, 3, 1])
+        self.assertEqual(sum(pages, []), self.expected)
+
+        for expected in reversed(pages[:-1]):
+            rows, paginator = self.paginate(paginator.get_previous_link())
+            self.assertEqual(rows, expected)
+        self.assertIsNone(paginator.get_previous_link())
+
+    def test_no_count_or_offset(self):
+        _rows, paginator = self.paginate('/transactions?limit=2')
+        _rows, paginator = self.paginate(paginator.get_next_link())
+        with CaptureQueriesContext(connection) as queries:
+            rows, _paginator = self.paginate(paginator.get_next_link())
+        self.assertEqual(rows, self.expected[4:6])
+        self.assertEqual(len(queries), 1)
+        sql = queries[0]['sql'].upper()
+        self.assertNotIn('COUNT(', sql)
+        self.assertNotIn('OFFSET', sql)
+
+    def test_limit(self):
+        rows, _paginator = self.paginate('/transactions?limit=500')
+        self.assertEqual(len(rows), 7)
+        rows, _paginator = self.paginate('/transactions?limit=nope')
+        self.assertEqual(len(rows), 7)
+
+    def test_invalid_cursor(self):
+        for cursor in ['nope', 'bm9wZQ==', 'eyJwIjpbMV19']:
+            with self.assertRaises(NotFound):
+                self.paginate('/transactions?cursor=' + cursor)
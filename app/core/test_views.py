@@ -0,0 +1,17 @@
+from django.test import SimpleTestCase
+from core.views import get_eager_loading
+from jarvis.serializers.job import GenerationJobSerializer
+from jarvis.serializers.language.gpt3 import GPT3PromptBuyerSerializer
+
+
+class GetEagerLoadingTestCase(SimpleTestCase):
+    def test_declared(self):
+        self.assertEqual(get_eager_loading(GPT3PromptBuyerSerializer), (
+            ['user__seller_profile'], []))
+
+    def test_nested(self):
+        self.assertEqual(get_eager_loading(GenerationJobSerializer), ([
+            'output',
+            'output__model_user__seller_profile',
+            'output__model_version',
+        ], []))
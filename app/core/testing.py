@@ -0,0 +1,38 @@
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+from typing import Any, Callable
+
+
+class QueryCountTestMixin(SimpleTestCase):
+    """ Assertions on the queries made by list endpoints, mixed into a
+        TestCase
+    """
+
+    def assertConstantQueries(
+        self,
+        fetch: Callable[[], Any],
+        add_row: Callable[[int], Any],
+        rows: int = 4
+    ):
+        """ Assert a page of `rows` rows costs the queries of a page of one
+
+            Args:
+                fetch (callable): Requests the page, returns the response
+                add_row (callable): Creates the nth row of the page
+                rows (int): Rows on the larger page
+        """
+        add_row(0)
+        with CaptureQueriesContext(connection) as one:
+            response = fetch()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 1)
+
+        for index in range(1, rows):
+            add_row(index)
+        with CaptureQueriesContext(connection) as many:
+            response = fetch()
+        self.assertEqual(len(response.data["results"]), rows)
+        self.assertEqual(
+            len(many), len(one),
+            "\n".join(query["sql"] for query in many.captured_queries))
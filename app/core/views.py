@@ -1,3 +1,51 @@
-from django.shortcuts import render
+from django.db.models import QuerySet
+from rest_framework import serializers
+from typing import List, Tuple, Type
 
-# Create your views here.
+
+def get_eager_loading(serializer_class: Type[serializers.BaseSerializer]) -> Tuple[List[str], List[str]]:
+    """ The relations a serializer reads for every instance
+
+        Declared on its Meta as `select_related` and `prefetch_related`,
+        e.g. select_related = ('user__seller_profile',). The relations of
+        nested serializers are included, prefixed with their source.
+
+        Returns:
+            Tuple[List[str], List[str]]: The select_related and the
+                prefetch_related lookups
+    """
+    meta = getattr(serializer_class, "Meta", None)
+    select = list(getattr(meta, "select_related", ()))
+    prefetch = list(getattr(meta, "prefetch_related", ()))
+    for name, field in getattr(serializer_class, "_declared_fields", {}).items():
+        many = isinstance(field, serializers.ListSerializer)
+        if many:
+            field = field.child
+        if not isinstance(field, serializers.BaseSerializer):
+            continue
+        source = field.source or name
+        if source == "*" or "." in source:
+            continue
+        nested_select, nested_prefetch = get_eager_loading(type(field))
+        if many:
+            prefetch += [source] + ["{}__{}".format(source, lookup)
+                                    for lookup in nested_select + nested_prefetch]
+        else:
+            select += [source] + ["{}__{}".format(source, lookup) for lookup in nested_select]
+            prefetch += ["{}__{}".format(source, lookup) for lookup in nested_prefetch]
+    return select, prefetch
+
+
+class EagerLoadingMixin:
+    """ Loads the relations declared by the view's serializer with the
+        queryset, so a page costs the same queries whatever its size
+    """
+
+    def filter_queryset(self, queryset: QuerySet) -> QuerySet:
+        queryset = super().filter_queryset(queryset)  # type: ignore
+        select, prefetch = get_eager_loading(self.get_serializer_class())  # type: ignore
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
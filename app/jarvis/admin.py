@@ -2,6 +2,14 @@ from jarvis.models import (
     GPT3PromptModel,
     Dalle2PromptModel,
     PromptOutputModel,
+    PromptVersionModel,
+    GenerationJobModel,
+    PooledOutputModel,
+    PromptChainModel,
+    EvaluationJobModel,
+    RenderedOutputModel,
+    PromptSearchIndexModel,
+    PromptCatalogModel,
 )
 from django.contrib import admin
 
@@ -9,3 +17,11 @@ from django.contrib import admin
 admin.site.register(GPT3PromptModel)
 admin.site.register(Dalle2PromptModel)
 admin.site.register(PromptOutputModel)
+admin.site.register(PromptVersionModel)
+admin.site.register(GenerationJobModel)
+admin.site.register(PooledOutputModel)
+admin.site.register(PromptChainModel)
+admin.site.register(EvaluationJobModel)
+admin.site.register(RenderedOutputModel)
+admin.site.register(PromptSearchIndexModel)
+admin.site.register(PromptCatalogModel)
@@ -0,0 +1,25 @@
+from rest_framework.generics import ListAPIView
+from rest_framework import filters
+from django_filters.rest_framework import DjangoFilterBackend
+from core.pagination import KeysetPagination
+from jarvis.models import PromptCatalogModel
+from jarvis.modules.search import PromptSearchFilter
+from jarvis.serializers.catalog import PromptCatalogSerializer
+from core.views import EagerLoadingMixin
+
+
+class PromptCatalogListAPIView(EagerLoadingMixin, ListAPIView):
+    """ List the prompts of every model together
+
+        Filter with ?type= and ?model_name=, order by
+        ?ordering=-output_count,-id for the most used first, newest first
+        by default; ?search= ranks by relevance instead. Pages are
+        followed through the next and previous links.
+    """
+    queryset = PromptCatalogModel.objects.all()
+    serializer_class = PromptCatalogSerializer
+    pagination_class = KeysetPagination
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, PromptSearchFilter]
+    filterset_fields = ['type', 'model_name']
+    ordering_fields = ['created_at', 'output_count', 'id']
+    ordering = ['-created_at', '-id']
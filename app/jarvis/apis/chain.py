@@ -0,0 +1,68 @@
+from rest_framework.generics import (
+    GenericAPIView,
+    ListAPIView,
+    RetrieveAPIView,
+    ListCreateAPIView,
+    RetrieveUpdateDestroyAPIView
+)
+from rest_framework.response import Response
+from jarvis.models import PromptChainModel
+from jarvis.serializers.chain import (
+    PromptChainSellerSerializer,
+    PromptChainBuyerSerializer
+)
+from jarvis.apis.common.mixins import DeadlineMixin
+from core.views import EagerLoadingMixin
+
+
+class PromptChainSellerListCreateAPIView(EagerLoadingMixin, ListCreateAPIView):
+    """ List all the prompt chains created by the seller
+        and create a new chain
+    """
+    serializer_class = PromptChainSellerSerializer
+
+    def get_queryset(self):
+        return PromptChainModel.objects.active().filter(
+            user=self.request.user
+        )
+
+
+class PromptChainSellerRetrieveUpdateDestroyAPIView(
+    RetrieveUpdateDestroyAPIView
+):
+    """ Retrieve, Update, Destroy a prompt chain"""
+    serializer_class = PromptChainSellerSerializer
+
+    def get_queryset(self):
+        return PromptChainModel.objects.active().filter(
+            user=self.request.user
+        )
+
+
+class PromptChainBuyerListAPIView(EagerLoadingMixin, ListAPIView):
+    """ List all the prompt chains available
+        to be bought by the buyer
+    """
+    queryset = PromptChainModel.objects.active_for_buyer()
+    serializer_class = PromptChainBuyerSerializer
+
+
+class PromptChainBuyerRetrieveAPIView(RetrieveAPIView):
+    """ Retrieve a prompt chain available
+        to be bought by the buyer
+    """
+    queryset = PromptChainModel.objects.active_for_buyer()
+    serializer_class = PromptChainBuyerSerializer
+
+
+class PromptChainRunAPIView(DeadlineMixin, GenericAPIView):
+    """ Run every step of a prompt chain in one request,
+        independent steps are generated concurrently
+    """
+    queryset = PromptChainModel.objects.active_for_buyer()
+    serializer_class = PromptChainBuyerSerializer
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(self.get_object(), data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(serializer.run())
@@ -0,0 +1,58 @@
+import asyncio
+from rest_framework.response import Response
+from asgiref.sync import sync_to_async
+from core.modules.http import get_disconnected
+
+# nginx's status for a request the client closed before the response
+CLIENT_CLOSED_REQUEST = 499
+
+
+class AsyncGeneratePromptMixin:
+    """
+    Generate a prompt from a model instance without blocking
+    the event loop while the provider call is in flight.
+
+    The generation is cancelled when the client disconnects or the
+    request deadline, if any, passes.
+    """
+
+    async def agenerate(self, request, *args, **kwargs):
+        serializer = await sync_to_async(self.get_generate_serializer)(
+            request, *args, **kwargs)
+        generation = asyncio.ensure_future(self.perform_agenerate(serializer))
+        disconnected = get_disconnected(request)
+        disconnect = asyncio.ensure_future(
+            disconnected.wait()) if disconnected is not None else None
+        deadline = getattr(self, 'deadline', None)
+        try:
+            done, _ = await asyncio.wait(
+                [task for task in (generation, disconnect) if task is not None],
+                timeout=deadline.remaining() if deadline is not None else None,
+                return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            for task in (generation, disconnect):
+                if task is not None and not task.done():
+                    task.cancel()
+
+        if generation in done:
+            return Response(generation.result())
+        # let the cancelled generation release what it holds
+        await asyncio.wait([generation])
+        if disconnected is not None and disconnected.is_set():
+            # nobody is left to read the response
+            return Response(status=CLIENT_CLOSED_REQUEST)
+        raise deadline.exceeded()  # type: ignore
+
+    def get_generate_serializer(self, request, *args, **kwargs):
+        # the lookup and validation touch the database so they
+        # run in a single hop to the sync thread
+        partial = kwargs.pop('partial', False)
+        instance = self.get_object()  # type: ignore
+        serializer = self.get_serializer(  # type: ignore
+            instance, data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        return serializer
+
+    async def perform_agenerate(self, serializer):
+        return await serializer.agenerate()
@@ -0,0 +1,24 @@
+from django.conf import settings
+from jarvis.modules.provider import Deadline
+
+
+class DeadlineMixin:
+    """
+    Bound a request by a deadline, GENERATION_TIMEOUT seconds after it
+    arrives. The deadline is passed to the serializer in its context.
+    """
+    timeout = None
+
+    def get_timeout(self) -> float:
+        if self.timeout is not None:
+            return self.timeout
+        return settings.GENERATION_TIMEOUT
+
+    def initial(self, request, *args, **kwargs):
+        self.deadline = Deadline(self.get_timeout())
+        super().initial(request, *args, **kwargs)  # type: ignore
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()  # type: ignore
+        context['deadline'] = getattr(self, 'deadline', None)
+        return context
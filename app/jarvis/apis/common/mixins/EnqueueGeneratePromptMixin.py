@@ -0,0 +1,19 @@
+from rest_framework import status
+from rest_framework.response import Response
+
+
+class EnqueueGeneratePromptMixin:
+    """
+    Queue the generation of a prompt as a background job.
+    """
+
+    def enqueue_generate(self, request, *args, **kwargs):
+        instance = self.get_object()  # type: ignore
+        serializer = self.get_serializer(  # type: ignore
+            instance, data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = self.perform_enqueue_generate(serializer)
+        return Response(data, status=status.HTTP_202_ACCEPTED)
+
+    def perform_enqueue_generate(self, serializer):
+        return serializer.enqueue()
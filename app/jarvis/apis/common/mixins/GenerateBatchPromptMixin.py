@@ -0,0 +1,18 @@
+from rest_framework.response import Response
+
+
+class GenerateBatchPromptMixin:
+    """
+    Generate a prompt output for each item of a batch of inputs.
+    """
+
+    def generate_batch(self, request, *args, **kwargs):
+        instance = self.get_object()  # type: ignore
+        serializer = self.get_serializer(  # type: ignore
+            instance, data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = self.perform_generate_batch(serializer)
+        return Response(data)
+
+    def perform_generate_batch(self, serializer):
+        return serializer.generate_batch()
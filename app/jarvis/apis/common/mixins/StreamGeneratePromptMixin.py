@@ -0,0 +1,48 @@
+import json
+import logging
+from django.http import StreamingHttpResponse
+
+
+class StreamGeneratePromptMixin:
+    """
+    Generate a prompt from a model instance, relaying the
+    output to the client as Server-Sent Events.
+    """
+
+    def generate_stream(self, request, *args, **kwargs):
+        partial = kwargs.pop('partial', False)
+        instance = self.get_object()  # type: ignore
+        serializer = self.get_serializer(  # type: ignore
+            instance, data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        events = self.perform_generate_stream(serializer)
+
+        response = StreamingHttpResponse(
+            self.get_event_stream(events),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        # stop nginx from buffering the stream
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    def perform_generate_stream(self, serializer):
+        return serializer.generate_stream()
+
+    @staticmethod
+    def format_event(event: str, data) -> bytes:
+        return "event: {}\ndata: {}\n\n".format(
+            event, json.dumps(data)
+        ).encode('utf-8')
+
+    def get_event_stream(self, events):
+        # closing this generator (e.g. when the client disconnects)
+        # closes the provider stream, which records the output
+        try:
+            for event, data in events:
+                yield self.format_event(event, data)
+        except Exception as exc:
+            logging.exception("Prompt stream failed")
+            yield self.format_event("error", {"detail": str(exc)})
+        finally:
+            events.close()
@@ -1 +1,6 @@
 from .GeneratePromptMixin import GeneratePromptMixin
+from .AsyncGeneratePromptMixin import AsyncGeneratePromptMixin
+from .StreamGeneratePromptMixin import StreamGeneratePromptMixin
+from .GenerateBatchPromptMixin import GenerateBatchPromptMixin
+from .EnqueueGeneratePromptMixin import EnqueueGeneratePromptMixin
+from .DeadlineMixin import DeadlineMixin
@@ -0,0 +1,46 @@
+import asyncio
+from rest_framework.generics import GenericAPIView
+from asgiref.sync import sync_to_async
+from jarvis.apis.common import mixins
+
+
+class AsyncGenerateAPIView(mixins.DeadlineMixin,
+                           mixins.AsyncGeneratePromptMixin,
+                           GenericAPIView):
+    """
+    Concrete async view for generating a prompt.
+
+    Authentication, permissions and the object lookup run in the
+    sync thread; the provider call and the output write are awaited
+    so an ASGI worker can serve other requests in the meantime.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(),
+                                  self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(
+            request, response, *args, **kwargs)
+        return self.response
+
+    async def post(self, request, *args, **kwargs):
+        return await self.agenerate(request, *args, **kwargs)
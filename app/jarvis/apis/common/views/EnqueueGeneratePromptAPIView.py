@@ -0,0 +1,12 @@
+from rest_framework.generics import GenericAPIView
+from jarvis.apis.common import mixins
+
+
+class EnqueueGenerateAPIView(mixins.EnqueueGeneratePromptMixin,
+                             GenericAPIView):
+    """
+    Concrete view for queueing the generation of a prompt.
+    """
+
+    def post(self, request, *args, **kwargs):
+        return self.enqueue_generate(request, *args, **kwargs)
@@ -0,0 +1,13 @@
+from rest_framework.generics import GenericAPIView
+from jarvis.apis.common import mixins
+
+
+class GenerateBatchAPIView(mixins.DeadlineMixin,
+                           mixins.GenerateBatchPromptMixin,
+                           GenericAPIView):
+    """
+    Concrete view for generating a batch of prompts.
+    """
+
+    def post(self, request, *args, **kwargs):
+        return self.generate_batch(request, *args, **kwargs)
@@ -2,7 +2,8 @@ from rest_framework.generics import GenericAPIView
 from jarvis.apis.common import mixins
 
 
-class GenerateAPIView(mixins.GeneratePromptMixin,
+class GenerateAPIView(mixins.DeadlineMixin,
+                      mixins.GeneratePromptMixin,
                       GenericAPIView):
     """
     Concrete view for generating a prompt.
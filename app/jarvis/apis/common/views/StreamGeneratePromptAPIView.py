@@ -0,0 +1,13 @@
+from rest_framework.generics import GenericAPIView
+from jarvis.apis.common import mixins
+
+
+class StreamGenerateAPIView(mixins.DeadlineMixin,
+                            mixins.StreamGeneratePromptMixin,
+                            GenericAPIView):
+    """
+    Concrete view for generating a prompt as a Server-Sent-Events stream.
+    """
+
+    def post(self, request, *args, **kwargs):
+        return self.generate_stream(request, *args, **kwargs)
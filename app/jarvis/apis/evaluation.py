@@ -0,0 +1,45 @@
+from django.http import FileResponse, Http404
+from rest_framework.generics import ListCreateAPIView, RetrieveAPIView
+from rest_framework.parsers import MultiPartParser
+from jarvis.models import EvaluationJobModel
+from jarvis.serializers.evaluation import EvaluationJobSerializer
+from core.views import EagerLoadingMixin
+
+
+class EvaluationJobListCreateAPIView(EagerLoadingMixin, ListCreateAPIView):
+    """ List the seller's evaluation jobs and queue a new one
+        from an uploaded CSV or XLSX dataset
+    """
+    serializer_class = EvaluationJobSerializer
+    parser_classes = [MultiPartParser]
+
+    def get_queryset(self):
+        return EvaluationJobModel.objects.filter(user=self.request.user)
+
+
+class EvaluationJobRetrieveAPIView(RetrieveAPIView):
+    """ Progress of an evaluation job """
+    serializer_class = EvaluationJobSerializer
+
+    def get_queryset(self):
+        return EvaluationJobModel.objects.filter(user=self.request.user)
+
+
+class EvaluationJobResultsAPIView(RetrieveAPIView):
+    """ Download the results of an evaluation job as CSV,
+        available as soon as its first rows are done
+    """
+
+    def get_queryset(self):
+        return EvaluationJobModel.objects.filter(user=self.request.user)
+
+    def get(self, request, *args, **kwargs):
+        job: EvaluationJobModel = self.get_object()
+        if not job.results:
+            raise Http404("The evaluation has no results yet")
+        return FileResponse(
+            job.results.open("rb"),
+            as_attachment=True,
+            filename="evaluation-{}.csv".format(job.pk),
+            content_type="text/csv"
+        )
@@ -0,0 +1,105 @@
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseNotModified,
+    StreamingHttpResponse,
+)
+from django.utils.http import http_date, parse_http_date_safe
+from django.views import View
+from core.modules.http import parse_range, RangeNotSatisfiable
+from jarvis.modules.images import get_image_store
+from typing import BinaryIO
+
+
+class FileRange:
+    """ Iterates over `length` bytes of a file from its current position """
+
+    def __init__(self, blob: BinaryIO, length: int, chunk_size: int = 64 * 1024):
+        self.blob = blob
+        self.length = length
+        self.chunk_size = chunk_size
+
+    def __iter__(self):
+        remaining = self.length
+        while remaining > 0:
+            chunk = self.blob.read(min(remaining, self.chunk_size))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+    def close(self):
+        self.blob.close()
+
+
+class ImageBlobView(View):
+    """ Serve an image from the local image store
+
+        Stored images never change so responses carry the digest as a
+        strong ETag and may be cached indefinitely. Conditional requests
+        and single byte ranges are answered from the file on disk.
+
+        A plain Django view rather than an APIView so serving an image
+        skips authentication and content negotiation.
+    """
+    http_method_names = ['get', 'head', 'options']
+
+    def get(self, request, digest):
+        store = get_image_store()
+        if not store.exists(digest):
+            raise Http404
+        stat = store.path(digest).stat()
+        etag = '"{}"'.format(digest)
+        headers = {
+            "ETag": etag,
+            "Last-Modified": http_date(stat.st_mtime),
+            "Cache-Control": "public, max-age=31536000, immutable",
+            "Accept-Ranges": "bytes",
+        }
+
+        if self.is_not_modified(request, etag, stat.st_mtime):
+            return self.with_headers(HttpResponseNotModified(), headers)
+
+        byte_range = None
+        if_range = request.headers.get("If-Range")
+        if if_range is None or if_range in (etag, headers["Last-Modified"]):
+            try:
+                byte_range = parse_range(request.headers.get("Range"), stat.st_size)
+            except RangeNotSatisfiable:
+                response = HttpResponse(status=416)
+                response["Content-Range"] = "bytes */{}".format(stat.st_size)
+                return self.with_headers(response, headers)
+
+        content_type = store.get_content_type(digest)
+        blob = store.open(digest)
+        if byte_range is None:
+            response = FileResponse(blob, content_type=content_type)
+        else:
+            start, end = byte_range
+            blob.seek(start)
+            response = StreamingHttpResponse(
+                FileRange(blob, end - start + 1),
+                status=206,
+                content_type=content_type
+            )
+            response["Content-Range"] = "bytes {}-{}/{}".format(
+                start, end, stat.st_size)
+            response["Content-Length"] = str(end - start + 1)
+        return self.with_headers(response, headers)
+
+    @staticmethod
+    def is_not_modified(request, etag: str, mtime: float) -> bool:
+        # If-None-Match takes precedence over If-Modified-Since
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            return "*" in tags or etag in tags or "W/" + etag in tags
+        since = parse_http_date_safe(request.headers.get("If-Modified-Since") or "")
+        return since is not None and int(mtime) <= since
+
+    @staticmethod
+    def with_headers(response, headers):
+        for name, value in headers.items():
+            response[name] = value
+        return response
@@ -13,10 +13,15 @@ from jarvis.serializers.image.dalle2 import (
 )
 
 from jarvis.apis.common.views.GeneratePromptAPIView import GenerateAPIView
-from rest_framework import filters
+from jarvis.apis.common.views.AsyncGeneratePromptAPIView import AsyncGenerateAPIView
+from jarvis.apis.common.views.GenerateBatchPromptAPIView import GenerateBatchAPIView
+from jarvis.apis.common.views.EnqueueGeneratePromptAPIView import EnqueueGenerateAPIView
+from jarvis.modules.search import PromptSearchFilter
+from core.pagination import KeysetPagination
+from core.views import EagerLoadingMixin
 
 
-class Dalle2PromptSellerListCreateAPIView(ListCreateAPIView):
+class Dalle2PromptSellerListCreateAPIView(EagerLoadingMixin, ListCreateAPIView):
     serializer_class = Dalle2PromptSellerSerializer
 
     def get_queryset(self):
@@ -38,16 +43,11 @@ class Dalle2PromptSellerRetrieveUpdateDestroyAPIView(
         )
 
 
-class Dalle2PromptBuyerListAPIView(ListAPIView):
+class Dalle2PromptBuyerListAPIView(EagerLoadingMixin, ListAPIView):
     queryset = Dalle2PromptModel.objects.active_for_buyer()
     serializer_class = Dalle2PromptBuyerSerializer
-    filter_backends = [filters.SearchFilter]
-    search_fields = [
-        'heading',
-        'description',
-        'template_params',
-        'template'
-    ]
+    pagination_class = KeysetPagination
+    filter_backends = [PromptSearchFilter]
 
 
 class Dalle2PromptBuyerRetrieveAPIView(RetrieveAPIView):
@@ -59,3 +59,25 @@ class Dalle2PromptGeneratorAPIView(GenerateAPIView):
     """ Generate a prompt using the GPT3 API"""
     queryset = Dalle2PromptModel.objects.active_for_buyer()
     serializer_class = Dalle2PromptBuyerSerializer
+
+
+class Dalle2PromptAsyncGeneratorAPIView(AsyncGenerateAPIView):
+    """ Generate a prompt using the DALL-E API without
+        holding a worker for the provider round trip
+    """
+    queryset = Dalle2PromptModel.objects.active_for_buyer()
+    serializer_class = Dalle2PromptBuyerSerializer
+
+
+class Dalle2PromptBatchGeneratorAPIView(GenerateBatchAPIView):
+    """ Generate a prompt for each input of a batch using the DALL-E API"""
+    queryset = Dalle2PromptModel.objects.active_for_buyer()
+    serializer_class = Dalle2PromptBuyerSerializer
+
+
+class Dalle2PromptJobGeneratorAPIView(EnqueueGenerateAPIView):
+    """ Queue the generation of a prompt using the DALL-E API,
+        the result is polled from the generation job
+    """
+    queryset = Dalle2PromptModel.objects.active_for_buyer()
+    serializer_class = Dalle2PromptBuyerSerializer
@@ -0,0 +1,62 @@
+import tempfile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from jarvis.modules.images import get_image_store
+
+
+class ImageBlobViewTestCase(TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(IMAGE_STORE_ROOT=self.tmp.name)
+        self.settings_override.enable()
+        self.content = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 4
+        self.digest = get_image_store().put([self.content])
+        self.url = reverse("jarvis:image-blob", kwargs={"digest": self.digest})
+
+    def tearDown(self) -> None:
+        self.settings_override.disable()
+        self.tmp.cleanup()
+
+    def test_get(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), self.content)  # type: ignore
+        self.assertEqual(response["Content-Type"], "image/png")
+        self.assertEqual(response["Content-Length"], str(len(self.content)))
+        self.assertEqual(response["ETag"], '"{}"'.format(self.digest))
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertIn("immutable", response["Cache-Control"])
+
+    def test_get_not_found(self):
+        response = self.client.get(reverse("jarvis:image-blob", kwargs={"digest": "0" * 64}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_get_not_modified(self):
+        response = self.client.get(
+            self.url, HTTP_IF_NONE_MATCH='"{}"'.format(self.digest))
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], '"{}"'.format(self.digest))
+
+        last_modified = self.client.get(self.url)["Last-Modified"]
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH='"other"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_get_range(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=8-15")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), self.content[8:16])  # type: ignore
+        self.assertEqual(response["Content-Range"], "bytes 8-15/{}".format(len(self.content)))
+        self.assertEqual(response["Content-Length"], "8")
+
+    def test_get_range_if_range_stale(self):
+        response = self.client.get(
+            self.url, HTTP_RANGE="bytes=8-15", HTTP_IF_RANGE='"other"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_get_range_not_satisfiable(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=100000-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */{}".format(len(self.content)))
@@ -8,6 +8,7 @@ from jarvis.apis.image.dalle2 import (
 )
 from jarvis.models import (
     Dalle2PromptModel,
+    GenerationJobModel,
 )
 from account.models import User, Seller
 from jarvis.serializers.image.dalle2 import (
@@ -17,6 +18,7 @@ from jarvis.serializers.image.dalle2 import (
 from rest_framework.permissions import IsAuthenticated
 from account.permissions import IsVerified
 import json
+from unittest.mock import patch
 
 
 class Dalle2PromptSellerTestCase(APITestCase):
@@ -258,3 +260,92 @@ class Dalle2PromptBuyerTestCase(APITestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json()["id"],
                          self.prompt1.id)
+
+
+class Dalle2PromptJobGeneratorTestCase(APITestCase):
+    def setUp(self) -> None:
+        self.user: User = User.objects.create(
+            email='test@example.com',
+            first_name='Test',
+            last_name='User',
+            is_verified=True,
+        )
+        self.seller: Seller = Seller.objects.create(  # type: ignore
+            user=self.user,
+            handle='testhandle',
+            name='Test Name',
+        )
+        self.prompt = Dalle2PromptModel.objects.create(
+            icon="https://www.google.com",
+            heading="Sample Heading",
+            description="Sample Description",
+            template="A logo for a business named {business_name}",
+            template_params=[
+                {
+                    "name": "business_name",
+                    "description": "The name of the business"
+                }
+            ],
+            user=self.user,
+        )
+        self.url = reverse("jarvis:dalle2-prompt-job-generator", kwargs={
+            "pk": self.prompt.id
+        })
+
+    def test_enqueue(self):
+        self.client.force_authenticate(user=self.user)  # type: ignore
+        with patch("jarvis.modules.provider.OpenAIClient.create_image") as mock:
+            response = self.client.post(self.url, {
+                "prompt_params": {"business_name": "Vitamin Group"},
+                "size": Dalle2PromptModel.ImageSizes.SMALL,
+            }, format="json")
+            mock.assert_not_called()
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()["status"], "queued")
+        job = GenerationJobModel.objects.get(pk=response.json()["id"])
+        self.assertEqual(job.kwargs, {
+            "business_name": "Vitamin Group",
+            "size": Dalle2PromptModel.ImageSizes.SMALL,
+        })
+
+    def test_enqueue_invalid_params(self):
+        self.client.force_authenticate(user=self.user)  # type: ignore
+        response = self.client.post(self.url, {
+            "prompt_params": {"unknown": "Vitamin Group"}
+        }, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(GenerationJobModel.objects.exists())
+
+    def test_job_status(self):
+        self.client.force_authenticate(user=self.user)  # type: ignore
+        job_id = self.client.post(self.url, {
+            "prompt_params": {"business_name": "Vitamin Group"}
+        }, format="json").json()["id"]
+        status_url = reverse("jarvis:generation-job-detail", kwargs={"pk": job_id})
+
+        with patch("jarvis.modules.provider.OpenAIClient.create_image", return_value={
+            "data": [{"url": "https://example.com/image.png"}]
+        }):
+            GenerationJobModel.objects.claim("worker-1").execute()
+
+        response = self.client.get(status_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], "succeeded")
+        self.assertEqual(
+            response.json()["output"]["output"], "https://example.com/image.png")
+
+    def test_job_status_other_user(self):
+        other: User = User.objects.create(
+            username='other',
+            email='other@example.com',
+            first_name='Other',
+            last_name='User',
+            is_verified=True,
+        )
+        job = GenerationJobModel.objects.enqueue(
+            other, self.prompt, business_name="Vitamin Group")
+        self.client.force_authenticate(user=self.user)  # type: ignore
+        response = self.client.get(
+            reverse("jarvis:generation-job-detail", kwargs={"pk": job.pk}))
+        self.assertEqual(response.status_code, 404)
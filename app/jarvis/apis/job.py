@@ -0,0 +1,15 @@
+from rest_framework.generics import RetrieveAPIView
+from jarvis.models import GenerationJobModel
+from jarvis.serializers.job import GenerationJobSerializer
+from core.views import EagerLoadingMixin
+
+
+class GenerationJobRetrieveAPIView(EagerLoadingMixin, RetrieveAPIView):
+    """ Status of a queued generation, with its output once it succeeded
+    """
+    serializer_class = GenerationJobSerializer
+
+    def get_queryset(self):
+        return GenerationJobModel.objects.filter(
+            user=self.request.user
+        )
@@ -12,10 +12,15 @@ from jarvis.serializers.language.gpt3 import (
     GPT3PromptBuyerSerializer
 )
 from jarvis.apis.common.views.GeneratePromptAPIView import GenerateAPIView
-from rest_framework import filters
+from jarvis.apis.common.views.AsyncGeneratePromptAPIView import AsyncGenerateAPIView
+from jarvis.apis.common.views.GenerateBatchPromptAPIView import GenerateBatchAPIView
+from jarvis.apis.common.views.StreamGeneratePromptAPIView import StreamGenerateAPIView
+from jarvis.modules.search import PromptSearchFilter
+from core.pagination import KeysetPagination
+from core.views import EagerLoadingMixin
 
 
-class GPT3PromptSellerListCreateAPIView(ListCreateAPIView):
+class GPT3PromptSellerListCreateAPIView(EagerLoadingMixin, ListCreateAPIView):
     """ List all the prompts created by the seller
         and create a new prompt
     """
@@ -41,19 +46,14 @@ class GPT3PromptSellerRetrieveUpdateDestroyAPIView(
         )
 
 
-class GPT3PromptBuyerListAPIView(ListAPIView):
+class GPT3PromptBuyerListAPIView(EagerLoadingMixin, ListAPIView):
     """ List all the prompts available
         to be bought by the buyer
     """
     queryset = GPT3PromptModel.objects.active_for_buyer()
     serializer_class = GPT3PromptBuyerSerializer
-    filter_backends = [filters.SearchFilter]
-    search_fields = [
-        'heading',
-        'description',
-        'template_params',
-        'template'
-    ]
+    pagination_class = KeysetPagination
+    filter_backends = [PromptSearchFilter]
 
 
 class GPT3PromptBuyerRetrieveAPIView(RetrieveAPIView):
@@ -68,3 +68,25 @@ class GPT3PromptGeneratorAPIView(GenerateAPIView):
     """ Generate a prompt using the GPT3 API"""
     queryset = GPT3PromptModel.objects.active_for_buyer()
     serializer_class = GPT3PromptBuyerSerializer
+
+
+class GPT3PromptAsyncGeneratorAPIView(AsyncGenerateAPIView):
+    """ Generate a prompt using the GPT3 API without
+        holding a worker for the provider round trip
+    """
+    queryset = GPT3PromptModel.objects.active_for_buyer()
+    serializer_class = GPT3PromptBuyerSerializer
+
+
+class GPT3PromptStreamGeneratorAPIView(StreamGenerateAPIView):
+    """ Generate a prompt using the GPT3 API, relaying
+        the tokens as Server-Sent Events as they arrive
+    """
+    queryset = GPT3PromptModel.objects.active_for_buyer()
+    serializer_class = GPT3PromptBuyerSerializer
+
+
+class GPT3PromptBatchGeneratorAPIView(GenerateBatchAPIView):
+    """ Generate a prompt for each input of a batch using the GPT3 API"""
+    queryset = GPT3PromptModel.objects.active_for_buyer()
+    serializer_class = GPT3PromptBuyerSerializer
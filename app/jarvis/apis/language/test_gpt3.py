@@ -1,15 +1,23 @@
-from rest_framework.test import APITestCase
+import asyncio
+import threading
+from rest_framework.test import APITestCase, APITransactionTestCase
+from django.test import override_settings
 from django.urls import reverse
+from django.conf import settings
 from jarvis.apis.language.gpt3 import (
     GPT3PromptSellerListCreateAPIView,
     GPT3PromptSellerRetrieveUpdateDestroyAPIView,
     GPT3PromptBuyerListAPIView,
-    GPT3PromptBuyerRetrieveAPIView
+    GPT3PromptBuyerRetrieveAPIView,
+    GPT3PromptAsyncGeneratorAPIView,
+    GPT3PromptBatchGeneratorAPIView
 )
 from jarvis.models import (
     GPT3PromptModel,
+    PromptOutputModel
 )
 from account.models import User, Seller
+from account.models.authentication import TokenAuthenticationProxyModel
 from jarvis.serializers.language.gpt3 import (
     GPT3PromptSellerSerializer,
     GPT3PromptBuyerSerializer
@@ -17,6 +25,8 @@ from jarvis.serializers.language.gpt3 import (
 from rest_framework.permissions import IsAuthenticated
 from account.permissions import IsVerified
 import json
+from unittest.mock import patch, AsyncMock
+from jarvis.modules.provider.testing import patch_completion
 
 
 class GPT3PromptSellerTestCase(APITestCase):
@@ -258,3 +268,382 @@ class GPT3PromptBuyerTestCase(APITestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json()["id"],
                          self.prompt1.id)
+
+
+class GPT3PromptAsyncGeneratorTestCase(APITestCase):
+    def setUp(self) -> None:
+        self.user: User = User.objects.create(
+            email='test@example.com',
+            first_name='Test',
+            last_name='User',
+            is_verified=True,
+        )
+        self.seller: Seller = Seller.objects.create(  # type: ignore
+            user=self.user,
+            handle='testhandle',
+            name='Test Name',
+        )
+        self.prompt = GPT3PromptModel.objects.create(
+            icon="https://www.google.com",
+            heading="Sample Heading",
+            description="Sample Description",
+            template="Generate a business name acronym: {business_name}",
+            template_params=[
+                {
+                    "name": "business_name",
+                    "description": "The name of the business"
+                }
+            ],
+            user=self.user,
+        )
+        self.url = reverse("jarvis:gpt3-prompt-async-generator", kwargs={
+            "pk": self.prompt.id
+        })
+        self.response = {
+            "id": "cmpl-async",
+            "choices": [{"text": "VIT GROUP", "index": 0}],
+        }
+
+    def test_permission_classes(self):
+        self.assertEqual(
+            GPT3PromptAsyncGeneratorAPIView.permission_classes,
+            [IsAuthenticated, IsVerified]
+        )
+
+    def test_generate(self):
+        self.client.force_authenticate(user=self.user)  # type: ignore
+        with patch(
+            "jarvis.modules.provider.OpenAIClient.acreate_completion",
+            new_callable=AsyncMock,
+            return_value=self.response
+        ) as mock:
+            response = self.client.post(self.url, {
+                "prompt_params": {"business_name": "Vitamin Group"}
+            }, format="json")
+            mock.assert_awaited_once()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["output"], "VIT GROUP")
+        self.assertEqual(PromptOutputModel.objects.count(), 1)
+
+    @override_settings(GENERATION_TIMEOUT=0.05)
+    def test_generate_deadline(self):
+        cancelled = []
+
+        async def create(**params):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        self.client.force_authenticate(user=self.user)  # type: ignore
+        with patch(
+            "jarvis.modules.provider.OpenAIClient.acreate_completion",
+            side_effect=create
+        ):
+            response = self.client.post(self.url, {
+                "prompt_params": {"business_name": "Vitamin Group"}
+            }, format="json")
+
+        self.assertEqual(response.status_code, 504)
+        self.assertEqual(response.json()["timeout"], ["0.05"])
+        # the provider call is cancelled and nothing is recorded
+        self.assertEqual(cancelled, [True])
+        self.assertEqual(PromptOutputModel.objects.count(), 0)
+
+    def test_generate_invalid_params(self):
+        self.client.force_authenticate(user=self.user)  # type: ignore
+        response = self.client.post(self.url, {
+            "prompt_params": {"unknown": "Vitamin Group"}
+        }, format="json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_generate_unauthenticated(self):
+        response = self.client.post(self.url, {
+            "prompt_params": {"business_name": "Vitamin Group"}
+        }, format="json")
+        self.assertEqual(response.status_code, 401)
+
+
+class GPT3PromptStreamGeneratorTestCase(APITestCase):
+    def setUp(self) -> None:
+        self.user: User = User.objects.create(
+            email='test@example.com',
+            first_name='Test',
+            last_name='User',
+            is_verified=True,
+        )
+        self.seller: Seller = Seller.objects.create(  # type: ignore
+            user=self.user,
+            handle='testhandle',
+            name='Test Name',
+        )
+        self.prompt = GPT3PromptModel.objects.create(
+            icon="https://www.google.com",
+            heading="Sample Heading",
+            description="Sample Description",
+            template="Generate a business name acronym: {business_name}",
+            template_params=[
+                {
+                    "name": "business_name",
+                    "description": "The name of the business"
+                }
+            ],
+            user=self.user,
+        )
+        self.url = reverse("jarvis:gpt3-prompt-stream-generator", kwargs={
+            "pk": self.prompt.id
+        })
+        self.chunks = [{
+            "id": "cmpl-stream",
+            "choices": [{"text": text, "index": 0}]
+        } for text in ("VIT", " GROUP")]
+
+    def test_generate_stream(self):
+        self.client.force_authenticate(user=self.user)  # type: ignore
+        with patch_completion(return_value=iter(self.chunks)):
+            response = self.client.post(self.url, {
+                "prompt_params": {"business_name": "Vitamin Group"}
+            }, format="json")
+            content = b"".join(response.streaming_content).decode()  # type: ignore
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertIn('event: token\ndata: {"text": "VIT"}', content)
+        self.assertIn('event: token\ndata: {"text": " GROUP"}', content)
+        self.assertIn("event: output", content)
+        self.assertEqual(PromptOutputModel.objects.get().output, "VIT GROUP")
+
+    def test_generate_stream_invalid_params(self):
+        self.client.force_authenticate(user=self.user)  # type: ignore
+        response = self.client.post(self.url, {
+            "prompt_params": {"unknown": "Vitamin Group"}
+        }, format="json")
+        self.assertEqual(response.status_code, 400)
+
+
+class GPT3PromptGeneratorASGITestCase(APITransactionTestCase):
+    """ The generate views served by the ASGI application, whose views and
+        streams touch the database from other threads than the test's
+    """
+
+    setUp = GPT3PromptStreamGeneratorTestCase.setUp
+
+    def request(self, on_body=None):
+        """ POST to the stream through the ASGI application
+
+            Args:
+                on_body (callable): Called with the receive queue for each
+                    body message sent
+        """
+        token = TokenAuthenticationProxyModel.objects.create(user=self.user)
+        return asyncio.run(self.asgi_request(self.url, token, on_body))
+
+    async def asgi_request(self, path, token, on_body=None, business_name="Vitamin Group"):
+        from Klerly.asgi import application
+        body = json.dumps({"prompt_params": {"business_name": business_name}}).encode()
+        messages = []
+        requests: asyncio.Queue = asyncio.Queue()
+        requests.put_nowait({"type": "http.request", "body": body, "more_body": False})
+
+        async def send(message):
+            messages.append(message)
+            if message["type"] == "http.response.body" and on_body is not None:
+                on_body(requests)
+
+        await application({
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "POST",
+            "scheme": "http",
+            "path": path,
+            "root_path": "",
+            "query_string": b"",
+            "headers": [
+                (b"host", b"testserver"),
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"authorization", "Token {}".format(token.key).encode()),
+            ],
+            "server": ("testserver", 80),
+            "client": ("127.0.0.1", 50000),
+        }, requests.get, send)
+        return messages
+
+    def test_generate_stream(self):
+        with patch_completion(return_value=iter(self.chunks)):
+            messages = self.request()
+
+        content = b"".join(message.get("body", b"") for message in messages[1:]).decode()
+        self.assertEqual(messages[0]["status"], 200)
+        self.assertIn('event: token\ndata: {"text": "VIT"}', content)
+        self.assertIn("event: output", content)
+        self.assertEqual(PromptOutputModel.objects.get().output, "VIT GROUP")
+
+    def test_generate_stream_disconnected(self):
+        read = []
+        closed = []
+
+        def chunks():
+            try:
+                for index in range(100):
+                    read.append(index)
+                    yield {"id": "cmpl-stream", "choices": [{"text": str(index), "index": 0}]}
+            finally:
+                closed.append(True)
+
+        def on_body(requests):
+            # the client goes away once the first token is sent
+            if not requests.qsize():
+                requests.put_nowait({"type": "http.disconnect"})
+
+        with patch_completion(return_value=chunks()):
+            messages = self.request(on_body)
+
+        # the provider stream was closed early, the output read so far recorded
+        self.assertEqual(closed, [True])
+        self.assertLess(len(read), 100)
+        output = PromptOutputModel.objects.get().output
+        self.assertEqual(output, "".join(str(index) for index in read))
+        self.assertNotIn("event: output", b"".join(
+            message.get("body", b"") for message in messages[1:]).decode())
+
+
+    def test_generate_concurrent(self):
+        token = TokenAuthenticationProxyModel.objects.create(user=self.user)
+        url = reverse("jarvis:gpt3-prompt-generator", kwargs={"pk": self.prompt.id})
+        # each call waits for the other, serialized calls would time out
+        barrier = threading.Barrier(2, timeout=5)
+
+        def complete(**params):
+            barrier.wait()
+            return {"id": "cmpl-1", "choices": [{"text": "VIT GROUP", "index": 0}]}
+
+        async def main():
+            # different inputs, identical ones would share a provider call
+            return await asyncio.gather(*(
+                self.asgi_request(url, token, business_name=name)
+                for name in ("Vitamin Group", "Mineral Group")
+            ))
+
+        with patch_completion(side_effect=complete):
+            responses = asyncio.run(main())
+
+        # the sync views ran at the same time, each on a thread of its own
+        self.assertEqual([messages[0]["status"] for messages in responses], [200, 200])
+        self.assertEqual(PromptOutputModel.objects.count(), 2)
+
+
+class GPT3PromptBatchGeneratorTestCase(APITestCase):
+    def setUp(self) -> None:
+        self.user: User = User.objects.create(
+            email='test@example.com',
+            first_name='Test',
+            last_name='User',
+            is_verified=True,
+        )
+        self.seller: Seller = Seller.objects.create(  # type: ignore
+            user=self.user,
+            handle='testhandle',
+            name='Test Name',
+        )
+        self.prompt = GPT3PromptModel.objects.create(
+            icon="https://www.google.com",
+            heading="Sample Heading",
+            description="Sample Description",
+            template="Generate a business name acronym: {business_name}",
+            template_params=[
+                {
+                    "name": "business_name",
+                    "description": "The name of the business"
+                }
+            ],
+            user=self.user,
+        )
+        self.url = reverse("jarvis:gpt3-prompt-batch-generator", kwargs={
+            "pk": self.prompt.id
+        })
+        self.response = {
+            "id": "cmpl-batch",
+            "choices": [
+                {"text": "MIN GROUP", "index": 1},
+                {"text": "VIT GROUP", "index": 0},
+            ],
+        }
+
+    def test_permission_classes(self):
+        self.assertEqual(
+            GPT3PromptBatchGeneratorAPIView.permission_classes,
+            [IsAuthenticated, IsVerified]
+        )
+
+    def test_generate_batch_request_timeout(self):
+        self.client.force_authenticate(user=self.user)  # type: ignore
+        with override_settings(GENERATION_TIMEOUT=30), patch_completion(
+            return_value={"id": "cmpl-batch", "choices": [{"text": "VIT GROUP", "index": 0}]}
+        ) as mock:
+            self.client.post(self.url, {
+                "batch": [{"business_name": "Vitamin Group"}]
+            }, format="json")
+        # the provider call is bounded by what is left of the deadline
+        self.assertLessEqual(mock.call_args.kwargs["request_timeout"], 30)
+
+    @override_settings(GENERATION_TIMEOUT=0)
+    def test_generate_batch_deadline(self):
+        self.client.force_authenticate(user=self.user)  # type: ignore
+        with patch_completion() as mock:
+            response = self.client.post(self.url, {
+                "batch": [{"business_name": "Vitamin Group"}]
+            }, format="json")
+            mock.assert_not_called()
+        self.assertEqual(response.status_code, 504)
+        self.assertEqual(PromptOutputModel.objects.count(), 0)
+
+    def test_generate_batch(self):
+        self.client.force_authenticate(user=self.user)  # type: ignore
+        with patch_completion(return_value=self.response) as mock:
+            response = self.client.post(self.url, {
+                "batch": [
+                    {"business_name": "Vitamin Group"},
+                    {"business_name": "Mineral Group"},
+                ]
+            }, format="json")
+            mock.assert_called_once()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [output["output"] for output in response.json()],
+            ["VIT GROUP", "MIN GROUP"]
+        )
+        self.assertEqual(PromptOutputModel.objects.count(), 2)
+
+    def test_generate_batch_invalid_item(self):
+        self.client.force_authenticate(user=self.user)  # type: ignore
+        with patch_completion() as mock:
+            response = self.client.post(self.url, {
+                "batch": [
+                    {"business_name": "Vitamin Group"},
+                    {"unknown": "Mineral Group"},
+                ]
+            }, format="json")
+            mock.assert_not_called()
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.json()["batch"].keys()), ["1"])
+        self.assertEqual(PromptOutputModel.objects.count(), 0)
+
+    def test_generate_batch_missing(self):
+        self.client.force_authenticate(user=self.user)  # type: ignore
+        response = self.client.post(self.url, {}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("batch", response.json())
+
+    def test_generate_batch_too_large(self):
+        self.client.force_authenticate(user=self.user)  # type: ignore
+        response = self.client.post(self.url, {
+            "batch": [{"business_name": "Vitamin Group"}] * (
+                settings.GENERATION_BATCH_MAX_SIZE + 1)
+        }, format="json")
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,56 @@
+from rest_framework.views import APIView
+from core.modules.breaker import circuit_breakers
+from core.modules.http import http_transport
+from rest_framework.permissions import IsAdminUser
+from core.response import SuccessResponse
+from django.db.models import Count
+from django.utils import timezone
+from jarvis.models import GenerationJobModel, PooledOutputModel
+from jarvis.modules.provider import (
+    generation_cache,
+    hedger,
+    key_pool,
+    provider_scheduler,
+    single_flight
+)
+
+
+class ProviderMetricsAPIView(APIView):
+    """ Operational metrics of the jarvis provider layer and the other
+        external providers, with the state and latency histogram of each
+        circuit breaker
+
+        Only available to staff users.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return SuccessResponse({
+            "cache": generation_cache.stats(),
+            "single_flight": single_flight.stats(),
+            "jobs": self.get_job_counts(),
+            "scheduler": provider_scheduler.stats(),
+            "keys": key_pool.stats(),
+            "hedging": hedger.stats(),
+            "pool": self.get_pool_counts(),
+            "http": http_transport.stats(),
+            "breakers": circuit_breakers.stats(),
+        })
+
+    @staticmethod
+    def get_job_counts():
+        counts = dict(GenerationJobModel.objects.values_list(
+            "status").annotate(count=Count("pk")).order_by())
+        return {
+            status: counts.get(status, 0)
+            for status in GenerationJobModel.Statuses.values
+        }
+
+    @staticmethod
+    def get_pool_counts():
+        return {
+            "ready": PooledOutputModel.objects.filter(
+                claimed_at__isnull=True, expires_at__gt=timezone.now()).count(),
+            "handed_out": PooledOutputModel.objects.filter(
+                claimed_at__isnull=False).count(),
+        }
@@ -5,10 +5,13 @@ from rest_framework.generics import (
 from jarvis.models import PromptOutputModel
 from jarvis.serializers.output import PromptOutputSerializer
 from rest_framework import filters
+from core.pagination import KeysetPagination
+from core.views import EagerLoadingMixin
 
 
-class PromptOutputListAPIView(ListAPIView):
+class PromptOutputListAPIView(EagerLoadingMixin, ListAPIView):
     serializer_class = PromptOutputSerializer
+    pagination_class = KeysetPagination
     filter_backends = [filters.SearchFilter]
     search_fields = [
         'output',
@@ -28,7 +31,8 @@ class PromptOutputRetrieveAPIView(RetrieveAPIView):
     serializer_class = PromptOutputSerializer
 
     def get_queryset(self):
-        queryset = PromptOutputModel.objects.active()
+        queryset = PromptOutputModel.objects.active().select_related(
+            'model_version')
         return queryset.filter(
             user=self.request.user
         )
@@ -0,0 +1,95 @@
+from rest_framework.test import APITestCase
+from django.urls import reverse
+from account.models import User, Seller
+from jarvis.models import Dalle2PromptModel, GPT3PromptModel, PromptCatalogModel
+
+
+class PromptCatalogAPITestCase(APITestCase):
+    def setUp(self) -> None:
+        self.user: User = User.objects.create(
+            email='test@example.com',
+            first_name='Test',
+            last_name='User',
+            is_verified=True,
+        )
+        Seller.objects.create(  # type: ignore
+            user=self.user,
+            handle='testhandle',
+            name='Test Name',
+        )
+        self.slogans = GPT3PromptModel.objects.create(
+            heading="Slogans",
+            description="Catchy business slogans",
+            template="Write a slogan for {business}",
+            template_params=[{"name": "business", "description": "The business"}],
+            user=self.user
+        )
+        self.posters = Dalle2PromptModel.objects.create(
+            heading="Posters",
+            description="Posters for a business",
+            template="A poster of {thing}",
+            template_params=[{"name": "thing", "description": "The thing"}],
+            user=self.user
+        )
+        self.url = reverse("jarvis:prompt-catalog-list")
+        self.client.force_authenticate(user=self.user)  # type: ignore
+
+    def get_results(self, query=""):
+        response = self.client.get(self.url + query)
+        self.assertEqual(response.status_code, 200)
+        return [
+            (result["model_name"], result["prompt_id"])
+            for result in response.json()["results"]
+        ]
+
+    def test_list(self):
+        self.assertEqual(self.get_results(), [
+            ("dalle2", self.posters.pk),
+            ("gpt3", self.slogans.pk),
+        ])
+        result = self.client.get(self.url).json()["results"][0]
+        self.assertEqual(result["seller_handle"], "testhandle")
+        self.assertEqual(result["type"], "image")
+
+    def test_filter(self):
+        self.assertEqual(self.get_results("?type=text"), [("gpt3", self.slogans.pk)])
+        self.assertEqual(self.get_results("?model_name=dalle2"), [("dalle2", self.posters.pk)])
+
+    def test_ordering(self):
+        PromptCatalogModel.objects.filter(prompt_id=self.slogans.pk, model_name="gpt3").update(
+            output_count=5)
+        self.assertEqual(self.get_results("?ordering=-output_count,-id"), [
+            ("gpt3", self.slogans.pk),
+            ("dalle2", self.posters.pk),
+        ])
+
+    def test_search(self):
+        self.assertEqual(self.get_results("?search=slogan"), [("gpt3", self.slogans.pk)])
+        self.assertEqual(self.get_results("?search=poster&type=text"), [])
+        # every word of the search must match
+        self.assertEqual(self.get_results("?search=posters business"), [
+            ("dalle2", self.posters.pk),
+        ])
+
+    def test_pagination(self):
+        page = self.client.get(self.url + "?limit=1").json()
+        self.assertNotIn("count", page)
+        self.assertEqual(page["results"][0]["prompt_id"], self.posters.pk)
+        page = self.client.get(page["next"]).json()
+        self.assertEqual(page["results"][0]["prompt_id"], self.slogans.pk)
+        self.assertIsNone(page["next"])
+        page = self.client.get(page["previous"]).json()
+        self.assertEqual(page["results"][0]["prompt_id"], self.posters.pk)
+        self.assertIsNone(page["previous"])
+
+    def test_pagination_search(self):
+        page = self.client.get(self.url + "?search=business&limit=1").json()
+        first = page["results"][0]["model_name"]
+        page = self.client.get(page["next"]).json()
+        self.assertEqual(len(page["results"]), 1)
+        self.assertNotEqual(page["results"][0]["model_name"], first)
+        self.assertIsNone(page["next"])
+
+    def test_unlisted(self):
+        self.slogans.delete()
+        self.assertEqual(self.get_results(), [("dalle2", self.posters.pk)])
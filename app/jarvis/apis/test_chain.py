@@ -0,0 +1,98 @@
+from rest_framework.test import APITestCase
+from django.urls import reverse
+from jarvis.models import GPT3PromptModel, PromptChainModel
+from account.models import User, Seller
+from unittest.mock import patch
+from jarvis.modules.provider.testing import patch_completion
+
+
+class PromptChainAPITestCase(APITestCase):
+    def setUp(self) -> None:
+        self.user: User = User.objects.create(
+            email='test@example.com',
+            first_name='Test',
+            last_name='User',
+            is_verified=True,
+        )
+        self.seller: Seller = Seller.objects.create(  # type: ignore
+            user=self.user,
+            handle='testhandle',
+            name='Test Name',
+        )
+        self.outline = GPT3PromptModel.objects.create(
+            heading="Outline",
+            description="Outline",
+            template="Outline an article about {topic}",
+            template_params=[{"name": "topic", "description": "The topic"}],
+            user=self.user
+        )
+        self.summary = GPT3PromptModel.objects.create(
+            heading="Summary",
+            description="Summary",
+            template="Summarize {text}",
+            template_params=[{"name": "text", "description": "The text"}],
+            user=self.user
+        )
+        self.chain_data = {
+            "heading": "Article",
+            "description": "An outlined article",
+            "template_params": [{"name": "topic", "description": "The topic"}],
+            "steps": [
+                {"name": "outline", "model_name": "gpt3", "prompt_id": self.outline.pk,
+                 "params": {"topic": "{topic}"}},
+                {"name": "summary", "model_name": "gpt3", "prompt_id": self.summary.pk,
+                 "params": {"text": "{outline}"}},
+            ],
+        }
+        self.client.force_authenticate(user=self.user)  # type: ignore
+
+    def test_create(self):
+        response = self.client.post(
+            reverse("jarvis:prompt-chain-seller-create"), self.chain_data, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(PromptChainModel.objects.get().user, self.user)
+
+    def test_create_cycle(self):
+        self.chain_data["steps"][0]["params"] = {"topic": "{summary}"}
+        response = self.client.post(
+            reverse("jarvis:prompt-chain-seller-create"), self.chain_data, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(PromptChainModel.objects.exists())
+
+    def test_retrieve_hides_step_params(self):
+        chain = PromptChainModel.objects.create(user=self.user, **self.chain_data)
+        response = self.client.get(
+            reverse("jarvis:prompt-chain-buyer-detail", kwargs={"pk": chain.pk}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["steps"], [
+            {"name": "outline", "model_name": "gpt3"},
+            {"name": "summary", "model_name": "gpt3"},
+        ])
+
+    def test_run(self):
+        chain = PromptChainModel.objects.create(user=self.user, **self.chain_data)
+        responses = iter([
+            {"id": "cmpl-1", "choices": [{"index": 0, "text": "1. Leaves"}]},
+            {"id": "cmpl-2", "choices": [{"index": 0, "text": "About leaves"}]},
+        ])
+        with patch_completion(side_effect=lambda **params: next(responses)) as mock:
+            response = self.client.post(
+                reverse("jarvis:prompt-chain-run", kwargs={"pk": chain.pk}),
+                {"prompt_params": {"topic": "tea"}},
+                format="json"
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock.call_args.kwargs["prompt"], "Summarize 1. Leaves")
+        self.assertEqual(response.json()["outline"]["output"], "1. Leaves")
+        self.assertEqual(response.json()["summary"]["output"], "About leaves")
+
+    def test_run_invalid_params(self):
+        chain = PromptChainModel.objects.create(user=self.user, **self.chain_data)
+        with patch_completion() as mock:
+            response = self.client.post(
+                reverse("jarvis:prompt-chain-run", kwargs={"pk": chain.pk}),
+                {"prompt_params": {"subject": "tea"}},
+                format="json"
+            )
+        self.assertEqual(response.status_code, 400)
+        mock.assert_not_called()
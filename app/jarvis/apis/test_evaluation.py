@@ -0,0 +1,105 @@
+import io
+import shutil
+import tempfile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from jarvis.models import EvaluationJobModel, GPT3PromptModel
+from account.models import User, Seller
+from openpyxl import Workbook
+from jarvis.modules.provider.testing import patch_completion
+
+
+class EvaluationJobAPITestCase(APITestCase):
+    def setUp(self) -> None:
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        settings_override = override_settings(EVALUATION_ROOT=root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user: User = User.objects.create(
+            email='test@example.com',
+            first_name='Test',
+            last_name='User',
+            is_verified=True,
+        )
+        Seller.objects.create(user=self.user, handle='testhandle', name='Test Name')
+        self.prompt = GPT3PromptModel.objects.create(
+            heading="Slogan",
+            description="Slogan",
+            template="A slogan for {business_name} selling {business_type}",
+            template_params=[
+                {"name": "business_name", "description": "The name"},
+                {"name": "business_type", "description": "The type"},
+            ],
+            user=self.user
+        )
+        self.url = reverse("jarvis:evaluation-job-list")
+        self.client.force_authenticate(user=self.user)  # type: ignore
+
+    def upload(self, name, content):
+        return self.client.post(self.url, {
+            "model_name": "gpt3",
+            "prompt_id": self.prompt.pk,
+            "dataset": SimpleUploadedFile(name, content),
+        }, format="multipart")
+
+    def test_create_csv(self):
+        response = self.upload("rows.csv", b"business_type,business_name\nvitamins,Vitamin Group\ntea,Tea Ltd\n")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["total_rows"], 2)
+        self.assertEqual(EvaluationJobModel.objects.get().status, EvaluationJobModel.Statuses.QUEUED)
+
+    def test_create_xlsx(self):
+        workbook = Workbook()
+        workbook.active.append(["business_name", "business_type"])
+        workbook.active.append(["Vitamin Group", "vitamins"])
+        file = io.BytesIO()
+        workbook.save(file)
+        response = self.upload("rows.xlsx", file.getvalue())
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["total_rows"], 1)
+
+    def test_create_invalid(self):
+        invalid = [
+            ("rows.csv", b"business_name\nVitamin Group\n"),
+            ("rows.csv", b"business_name,business_type\n"),
+            ("rows.csv", b"business_name,business_type\nVitamin Group,vitamins,extra\n"),
+            ("rows.txt", b"business_name,business_type\nVitamin Group,vitamins\n"),
+        ]
+        for name, content in invalid:
+            with self.subTest(content=content):
+                response = self.upload(name, content)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("dataset", response.json())
+        self.assertFalse(EvaluationJobModel.objects.exists())
+
+    @override_settings(EVALUATION_MAX_ROWS=2)
+    def test_create_too_many_rows(self):
+        response = self.upload("rows.csv", b"business_name,business_type\na,b\nc,d\ne,f\n")
+        self.assertEqual(response.status_code, 400)
+
+    def test_create_other_sellers_prompt(self):
+        other = User.objects.create(email='other@example.com', username='other', is_verified=True)
+        self.client.force_authenticate(user=other)  # type: ignore
+        response = self.upload("rows.csv", b"business_name,business_type\na,b\n")
+        self.assertEqual(response.status_code, 400)
+
+    def test_results(self):
+        self.upload("rows.csv", b"business_name,business_type\nVitamin Group,vitamins\n")
+        job = EvaluationJobModel.objects.get()
+        results_url = reverse("jarvis:evaluation-job-results", kwargs={"pk": job.pk})
+        self.assertEqual(self.client.get(results_url).status_code, 404)
+
+        with patch_completion(return_value={
+                "id": "cmpl-1", "choices": [{"index": 0, "text": "Vitaminize"}]}):
+            EvaluationJobModel.objects.claim("worker-1").execute()
+        response = self.client.get(results_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            b"".join(response.streaming_content),  # type: ignore
+            b"business_name,business_type,output,error\r\nVitamin Group,vitamins,Vitaminize,\r\n")
+        detail = self.client.get(reverse("jarvis:evaluation-job-detail", kwargs={"pk": job.pk}))
+        self.assertEqual(detail.json()["status"], EvaluationJobModel.Statuses.SUCCEEDED)
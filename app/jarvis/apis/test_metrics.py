@@ -0,0 +1,31 @@
+from rest_framework.test import APITestCase
+from django.urls import reverse
+from account.models import User
+
+
+class ProviderMetricsTestCase(APITestCase):
+    def setUp(self) -> None:
+        self.user: User = User.objects.create(
+            email='test@example.com',
+            first_name='Test',
+            last_name='User',
+            is_verified=True,
+        )
+        self.url = reverse("jarvis:provider-metrics")
+
+    def test_metrics_staff_only(self):
+        self.client.force_authenticate(user=self.user)  # type: ignore
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+
+    def test_metrics(self):
+        self.user.is_staff = True
+        self.user.save()
+        self.client.force_authenticate(user=self.user)  # type: ignore
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("hits", response.json()["cache"])
+        self.assertIsInstance(response.json()["scheduler"], dict)
+        self.assertEqual(response.json()["pool"], {"ready": 0, "handed_out": 0})
+        self.assertIsInstance(response.json()["http"], dict)
+        self.assertIsInstance(response.json()["breakers"], dict)
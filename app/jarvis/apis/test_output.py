@@ -11,6 +11,8 @@ from jarvis.models.abstract import AbstractPromptModel
 from account.models import User, Seller
 from jarvis.serializers.output import PromptOutputSerializer
 
+from unittest import mock
+from jarvis.modules import markdown
 from rest_framework.permissions import IsAuthenticated
 from account.permissions import IsVerified
 
@@ -99,3 +101,42 @@ class PromptOutputTestCase(APITestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json()["id"],
                          self.output.id)  # type: ignore
+
+    def test_prompt_output_html_opt_in(self):
+        self.client.force_authenticate(user=self.user)  # type: ignore
+        response = self.client.get(self.detail_url)
+        self.assertNotIn("output_html", response.json())
+
+        response = self.client.get(self.detail_url + "?html=true")
+        self.assertEqual(response.json()["output_html"], "<p>test output 1</p>")
+
+    def test_prompt_output_html_rendered_once(self):
+        self.client.force_authenticate(user=self.user)  # type: ignore
+        PromptOutputModel.objects.create(
+            uid="id2",  # type: ignore
+            user=self.user,
+            model_name=AbstractPromptModel.Names.DALLE2,
+            model_input="xxx",
+            input={'prompt': 'test prompt 2'},
+            output='https://image.png',
+            cost=0.0,
+            type=AbstractPromptModel.Types.IMAGE,
+            model_user=self.user,
+            model_snapshot={"description": "test description"}
+        )
+        with mock.patch(
+            "jarvis.modules.markdown.render_markdown",
+            wraps=markdown.render_markdown
+        ) as render:
+            for _ in range(2):
+                response = self.client.get(self.list_url + "?html=true")
+                results = {
+                    output["type"]: output["output_html"]
+                    for output in response.json()["results"]
+                }
+                self.assertEqual(results, {
+                    "text": "<p>test output 1</p>",
+                    "image": None,
+                })
+            self.client.get(self.detail_url + "?html=true")
+        self.assertEqual(render.call_count, 1)
@@ -0,0 +1,111 @@
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from account.models import User, Seller
+from core.testing import QueryCountTestMixin
+from jarvis.models import (
+    AbstractPromptModel,
+    Dalle2PromptModel,
+    EvaluationJobModel,
+    GPT3PromptModel,
+    PromptChainModel,
+    PromptOutputModel,
+)
+
+
+class ListQueryCountTestCase(QueryCountTestMixin, APITestCase):
+    """ Every list endpoint makes the same queries whatever its page size """
+
+    def setUp(self) -> None:
+        self.user = self.make_seller("buyer")
+        self.client.force_authenticate(user=self.user)  # type: ignore
+
+    def make_seller(self, name) -> User:
+        user: User = User.objects.create(
+            username=name,
+            email='{}@example.com'.format(name),
+            is_verified=True,
+        )
+        Seller.objects.create(user=user, handle=name, name=name)  # type: ignore
+        return user
+
+    def make_prompt(self, model=GPT3PromptModel, user=None):
+        return model.objects.create(
+            heading="Articles",
+            description="Articles about a topic",
+            template="Write about {topic}",
+            template_params=[{"name": "topic", "description": "The topic"}],
+            user=user or self.make_seller("seller{}".format(model.objects.count())),
+        )
+
+    def make_chain(self, user=None):
+        prompt = self.make_prompt(user=user)
+        return PromptChainModel.objects.create(
+            heading="Chain",
+            description="A chain",
+            template_params=[{"name": "topic", "description": "The topic"}],
+            steps=[{"name": "article", "model_name": "gpt3", "prompt_id": prompt.pk,
+                    "params": {"topic": "{topic}"}}],
+            user=prompt.user,
+        )
+
+    def get(self, name):
+        return lambda: self.client.get(reverse("jarvis:" + name))
+
+    def test_gpt3_seller_list(self):
+        self.assertConstantQueries(
+            self.get("gpt3-prompt-seller-create"),
+            lambda index: self.make_prompt(user=self.user))
+
+    def test_gpt3_buyer_list(self):
+        self.assertConstantQueries(
+            self.get("gpt3-prompt-buyer-list"),
+            lambda index: self.make_prompt())
+
+    def test_dalle2_seller_list(self):
+        self.assertConstantQueries(
+            self.get("dalle2-prompt-seller-create"),
+            lambda index: self.make_prompt(Dalle2PromptModel, user=self.user))
+
+    def test_dalle2_buyer_list(self):
+        self.assertConstantQueries(
+            self.get("dalle2-prompt-buyer-list"),
+            lambda index: self.make_prompt(Dalle2PromptModel))
+
+    def test_chain_seller_list(self):
+        self.assertConstantQueries(
+            self.get("prompt-chain-seller-create"),
+            lambda index: self.make_chain(user=self.user))
+
+    def test_chain_buyer_list(self):
+        self.assertConstantQueries(
+            self.get("prompt-chain-buyer-list"),
+            lambda index: self.make_chain())
+
+    def test_output_list(self):
+        def add_output(index):
+            prompt = self.make_prompt()
+            PromptOutputModel.objects.create(
+                user=self.user,
+                model_name=AbstractPromptModel.Names.GPT3,
+                model_input="Write about cats",
+                input={"topic": "cats"},
+                output="Cats",
+                cost=0.0,
+                type=AbstractPromptModel.Types.TEXT,
+                model_user=prompt.user,
+                model_version=prompt.version,
+            )
+        self.assertConstantQueries(self.get("prompt-output-list"), add_output)
+
+    def test_evaluation_list(self):
+        prompt = self.make_prompt(user=self.user)
+        self.assertConstantQueries(
+            self.get("evaluation-job-list"),
+            lambda index: EvaluationJobModel.objects.create(
+                user=self.user, model_name="gpt3", prompt_id=prompt.pk,
+                dataset="datasets/{}.csv".format(index)))
+
+    def test_catalog_list(self):
+        self.assertConstantQueries(
+            self.get("prompt-catalog-list"),
+            lambda index: self.make_prompt())
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class JarvisConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'jarvis'
+
+    def ready(self) -> None:
+        import jarvis.signals
@@ -0,0 +1,215 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.urls import reverse
+
+
+class StandInProviderHandler(BaseHTTPRequestHandler):
+    """ Answers completion requests like the OpenAI API after a fixed delay """
+    protocol_version = "HTTP/1.1"
+    delay = 0.5
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        time.sleep(self.delay)
+        body = json.dumps({
+            "id": "cmpl-benchmark",
+            "object": "text_completion",
+            "model": "text-davinci-003",
+            "choices": [{
+                "text": "benchmark output",
+                "index": 0,
+                "logprobs": None,
+                "finish_reason": "stop"
+            }],
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInProviderServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # the default backlog of 5 would make the stand-in the bottleneck
+    request_queue_size = 1024
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares the throughput of the /generate and /generate/async '
+        'endpoints, served by the ASGI application on a throwaway test '
+        'database, against a local stand-in for the provider that answers '
+        'after a delay'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Number of generations to run per endpoint')
+        parser.add_argument('--delay', type=float, default=0.5,
+                            help='Seconds the stand-in provider takes to answer')
+        parser.add_argument('--concurrency', type=int, default=200,
+                            help='Requests the benchmark keeps in flight')
+        parser.add_argument('--provider-concurrency', type=int,
+                            help='Provider calls this process admits at first, '
+                                 'defaults to the scheduler\'s')
+
+    def handle(self, *args, **options):
+        import openai
+        from django.test.utils import (
+            setup_databases, setup_test_environment,
+            teardown_databases, teardown_test_environment,
+        )
+        from jarvis.modules.provider import provider_scheduler
+
+        handler = type("Handler", (StandInProviderHandler,), {
+            "delay": options["delay"]
+        })
+        server = StandInProviderServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        api_base = openai.api_base
+        openai.api_base = "http://127.0.0.1:{}/v1".format(
+            server.server_address[1])
+        initial_concurrency = provider_scheduler.initial_concurrency
+        max_concurrency = provider_scheduler.max_concurrency
+        if options["provider_concurrency"]:
+            provider_scheduler.initial_concurrency = options["provider_concurrency"]
+            provider_scheduler.max_concurrency = max(
+                max_concurrency, options["provider_concurrency"])
+
+        database_dir = tempfile.TemporaryDirectory()
+        if connection.vendor == "sqlite":
+            # the in-memory test database locks whole tables, writers fail
+            # at once where a file waits for the lock
+            connection.settings_dict["TEST"]["NAME"] = os.path.join(
+                database_dir.name, "benchmark.sqlite3")
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            paths = self.create_prompt()
+            self.stdout.write(
+                "{} generations per endpoint, {} in flight, provider delay {}s".format(
+                    options["requests"], options["concurrency"], options["delay"]))
+            self.stdout.write(
+                "provider scheduler: {} calls in flight at first, at most {}, "
+                "in each of {} processes".format(
+                    provider_scheduler.initial_concurrency,
+                    provider_scheduler.max_concurrency,
+                    provider_scheduler.processes))
+            for name, path in paths:
+                # every endpoint starts from the same limit
+                provider_scheduler.reset()
+                elapsed, failed = asyncio.run(self.run(
+                    path, name, options["requests"], options["concurrency"]))
+                self.stdout.write("{:<16} {:.2f}s, {:.1f} req/s, {} failed".format(
+                    name, elapsed, options["requests"] / elapsed, failed))
+                for lane, stats in provider_scheduler.stats().items():
+                    self.stdout.write(
+                        "  {}: limit {}, waited {:.2f}s on average, "
+                        "{:.2f}s at most".format(
+                            lane, stats["concurrency"], stats["wait_avg"],
+                            stats["wait_max"]))
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+            database_dir.cleanup()
+            provider_scheduler.initial_concurrency = initial_concurrency
+            provider_scheduler.max_concurrency = max_concurrency
+            provider_scheduler.reset()
+            openai.api_base = api_base
+            server.shutdown()
+            server.server_close()
+
+    def create_prompt(self):
+        """ The prompt generated by the benchmark and its owner's token
+
+            Returns:
+                list: (name, path) of the endpoints to benchmark
+        """
+        from account.models import User, Seller
+        from account.models.authentication import TokenAuthenticationProxyModel
+        from jarvis.models import GPT3PromptModel
+
+        user = User.objects.create(
+            email='benchmark@example.com',
+            first_name='Benchmark',
+            last_name='User',
+            is_verified=True,
+        )
+        Seller.objects.create(user=user, handle='benchmark', name='Benchmark')
+        prompt = GPT3PromptModel.objects.create(
+            icon="https://www.example.com",
+            heading="Benchmark",
+            description="Benchmark",
+            template="Write a slogan for {business_name}",
+            template_params=[{
+                "name": "business_name",
+                "description": "The name of the business",
+            }],
+            user=user,
+        )
+        self.token = TokenAuthenticationProxyModel.objects.create(user=user)
+        return [
+            ("/generate", reverse("jarvis:gpt3-prompt-generator", kwargs={"pk": prompt.id})),
+            ("/generate/async", reverse("jarvis:gpt3-prompt-async-generator", kwargs={"pk": prompt.id})),
+        ]
+
+    async def run(self, path, name, total, concurrency):
+        """ POST `total` generations to `path` through the ASGI application
+
+            Returns:
+                tuple: Seconds taken and the number of failed requests
+        """
+        from Klerly.asgi import application
+
+        semaphore = asyncio.Semaphore(concurrency)
+        statuses = []
+
+        async def generate(index):
+            # distinct inputs, identical ones would be cached or coalesced
+            body = json.dumps({"prompt_params": {
+                "business_name": "{} business {}".format(name, index)
+            }}).encode()
+            requests: asyncio.Queue = asyncio.Queue()
+            requests.put_nowait({"type": "http.request", "body": body, "more_body": False})
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    statuses.append(message["status"])
+
+            async with semaphore:
+                await application({
+                    "type": "http",
+                    "asgi": {"version": "3.0"},
+                    "http_version": "1.1",
+                    "method": "POST",
+                    "scheme": "http",
+                    "path": path,
+                    "root_path": "",
+                    "query_string": b"",
+                    "headers": [
+                        (b"host", b"testserver"),
+                        (b"content-type", b"application/json"),
+                        (b"content-length", str(len(body)).encode()),
+                        (b"authorization", "Token {}".format(self.token.key).encode()),
+                    ],
+                    "server": ("testserver", 80),
+                    "client": ("127.0.0.1", 50000),
+                }, requests.get, send)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(generate(index) for index in range(total)))
+        elapsed = time.perf_counter() - started
+        return elapsed, sum(1 for status in statuses if status != 200)
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from jarvis.models import PromptCatalogModel
+
+
+class Command(BaseCommand):
+    help = "Relist every listed prompt in the catalog and recount their outputs, e.g. after bulk updates"
+
+    def handle(self, *args, **options):
+        count = PromptCatalogModel.objects.rebuild()
+        self.stdout.write("Listed {} prompts".format(count))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from jarvis.models import Dalle2PromptModel, GPT3PromptModel, PromptSearchIndexModel
+
+
+class Command(BaseCommand):
+    help = "Index every active prompt for search, e.g. after bulk updates"
+
+    def handle(self, *args, **options):
+        for prompt_model in (GPT3PromptModel, Dalle2PromptModel):
+            count = PromptSearchIndexModel.objects.rebuild(prompt_model)
+            self.stdout.write("Indexed {} {} prompts".format(count, prompt_model.name))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from jarvis.models import PromptOutputModel, RenderedOutputModel
+from jarvis.models.abstract import AbstractPromptModel
+
+
+class Command(BaseCommand):
+    help = "Render the html of the text outputs ahead of their views"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=500,
+            help="Outputs rendered per query"
+        )
+        parser.add_argument(
+            "--limit", type=int, default=None,
+            help="Most recent outputs to render, all of them by default"
+        )
+
+    def handle(self, *args, **options):
+        outputs = PromptOutputModel.objects.active().filter(
+            type=AbstractPromptModel.Types.TEXT
+        ).order_by("-created_at").values_list("output", flat=True)
+        if options["limit"] is not None:
+            outputs = outputs[:options["limit"]]
+
+        batch_size = options["batch_size"]
+        batch, total = [], 0
+        for output in outputs.iterator(chunk_size=batch_size):
+            batch.append(output)
+            if len(batch) >= batch_size:
+                total += len(RenderedOutputModel.objects.get_html_many(batch))
+                batch = []
+        if batch:
+            total += len(RenderedOutputModel.objects.get_html_many(batch))
+        self.stdout.write("{} distinct texts have their html stored".format(total))
@@ -0,0 +1,109 @@
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+from typing import Optional
+
+
+def work(poll_interval: float, lease_seconds: float, burst: bool = False, stop=None):
+    """ Claim and run generation jobs until stopped
+
+        Evaluation jobs run a chunk at a time, after the generation jobs.
+        Idle workers top up the output pools of the pooled prompts. The
+        catalog's output counts are recounted every CATALOG_COUNT_INTERVAL.
+
+        Args:
+            poll_interval (float): Seconds to wait when no job is due
+            lease_seconds (float): Age after which running jobs are requeued
+            burst (bool): Return once no job is due instead of waiting
+            stop (Event, optional): Set to stop after the current job
+    """
+    from jarvis.models import (
+        EvaluationJobModel,
+        GenerationJobModel,
+        PooledOutputModel,
+        PromptCatalogModel,
+    )
+
+    worker = "{}:{}".format(socket.gethostname(), os.getpid())
+    counted_at: Optional[float] = None
+    while stop is None or not stop.is_set():
+        close_old_connections()
+        if counted_at is None or time.monotonic() - counted_at >= settings.CATALOG_COUNT_INTERVAL:
+            PromptCatalogModel.objects.update_output_counts()
+            counted_at = time.monotonic()
+        GenerationJobModel.objects.requeue_stale(lease_seconds)
+        EvaluationJobModel.objects.requeue_stale(lease_seconds)
+        job = GenerationJobModel.objects.claim(worker) \
+            or EvaluationJobModel.objects.claim(worker)
+        if job is not None:
+            job.execute()
+            continue
+        # one output at a time so queued jobs are not held up
+        if settings.GENERATION_POOL_ENABLED and PooledOutputModel.objects.refill_pools(limit=1):
+            continue
+        if burst:
+            return
+        if stop is not None:
+            stop.wait(poll_interval)
+        else:
+            time.sleep(poll_interval)
+
+
+def work_process(**options):
+    """ Entry point of a worker process """
+    import django
+    django.setup()
+    # the parent stops the workers between jobs on interrupt
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    work(**options)
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs a pool of worker processes executing the queued generation jobs'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int,
+                            default=settings.GENERATION_JOB_WORKERS,
+                            help='Number of worker processes')
+        parser.add_argument('--poll-interval', type=float,
+                            default=settings.GENERATION_JOB_POLL_INTERVAL,
+                            help='Seconds a worker waits when no job is due')
+        parser.add_argument('--burst', action='store_true',
+                            help='Exit once no job is due')
+
+    def handle(self, *args, **options):
+        work_options = {
+            "poll_interval": options["poll_interval"],
+            "lease_seconds": settings.GENERATION_JOB_LEASE_SECONDS,
+            "burst": options["burst"],
+        }
+        if options["concurrency"] <= 1:
+            work(**work_options)
+            return
+
+        # the workers must not share the parent's database connections
+        connections.close_all()
+        stop = multiprocessing.Event()
+        workers = [
+            multiprocessing.Process(
+                target=work_process, kwargs={**work_options, "stop": stop}, daemon=True)
+            for _ in range(options["concurrency"])
+        ]
+        for process in workers:
+            process.start()
+        self.stdout.write("Started {} generation workers".format(len(workers)))
+
+        def shutdown(signum, frame):
+            stop.set()
+
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+        for process in workers:
+            process.join()
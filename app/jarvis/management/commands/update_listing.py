@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from jarvis.models import PromptCatalogModel
+from jarvis.signals import LISTED_MODELS
+
+
+class Command(BaseCommand):
+    help = "Recompute which prompts buyers can see, e.g. after bulk updates of users or sellers"
+
+    def handle(self, *args, **options):
+        for model in LISTED_MODELS:
+            model.objects.update_listed()
+            self.stdout.write("{}: {} listed".format(
+                model._meta.verbose_name_plural, model.objects.active_for_buyer().count()))
+        PromptCatalogModel.objects.rebuild()
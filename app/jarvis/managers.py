@@ -1,12 +1,438 @@
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.db import models
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from core.managers import BaseModelManager
+from typing import Any, Dict, Iterable, List, Tuple, Type
 
 
 class PromptModelManager(BaseModelManager):
     def active_for_buyer(self, *args, **kwargs):
-        return super().active().filter(
+        """ The listed prompts, see update_listed """
+        return self.filter(
             *args,
             **kwargs,
-            user__seller_profile__is_active=True,
-            user__is_active=True,
-            user__is_verified=True
+            is_listed=True
         )
+
+    @staticmethod
+    def get_listable_sellers():
+        """ The seller profiles whose prompts buyers can see """
+        from account.models import Seller
+        return Seller.objects.active(user__is_active=True, user__is_verified=True)
+
+    def update_listed(self, *args, **kwargs) -> int:
+        """ Recompute is_listed of the prompts matching the filters in bulk,
+            e.g. update_listed(user=user) after a seller is deactivated
+
+            A prompt is listed while it is active and its user is an
+            active, verified user with an active seller profile.
+
+            Returns:
+                int: The prompts updated
+        """
+        prompts = self.filter(*args, **kwargs)
+        listable = models.Exists(self.get_listable_sellers().filter(user=models.OuterRef("user")))
+        return prompts.filter(is_active=True).update(is_listed=listable) + \
+            prompts.filter(is_active=False, is_listed=True).update(is_listed=False)
+
+
+class PromptVersionManager(models.Manager):
+    def get_for_snapshot(self, snapshot: Dict[str, Any]):
+        """ The version holding this snapshot, created if it is new
+
+            Args:
+                snapshot (dict): The prompt snapshot, see AbstractPromptModel.get_snapshot
+        """
+        from jarvis.models.version import make_snapshot_hash
+        version, _ = self.get_or_create(
+            hash=make_snapshot_hash(snapshot),
+            defaults={"snapshot": snapshot}
+        )
+        return version
+
+
+class JobQueueManager(models.Manager):
+    """ Claims of queued jobs by the workers, for models with the job fields:
+        status, attempts, max_attempts, run_after, locked_by and locked_at
+    """
+
+    def claim(self, worker: str):
+        """ Claim the next job that is due, None if there is none
+
+            The claim is a conditional update so concurrent workers never
+            run the same job, on any database backend.
+        """
+        now = timezone.now()
+        candidates = self.filter(
+            status=self.model.Statuses.QUEUED,
+            run_after__lte=now
+        ).order_by('run_after', 'pk').values_list('pk', flat=True)
+        for pk in candidates[:10]:
+            claimed = self.filter(
+                pk=pk, status=self.model.Statuses.QUEUED
+            ).update(
+                status=self.model.Statuses.RUNNING,
+                locked_by=worker,
+                locked_at=now,
+                attempts=models.F('attempts') + 1,
+                updated_at=now,
+            )
+            if claimed:
+                return self.get(pk=pk)
+        return None
+
+    def requeue_stale(self, lease_seconds: float) -> int:
+        """ Queue again the jobs whose worker stopped while running them
+
+            Jobs that have used up their attempts are failed instead.
+        """
+        stale = self.filter(
+            status=self.model.Statuses.RUNNING,
+            locked_at__lt=timezone.now() - timedelta(seconds=lease_seconds)
+        )
+        stale.filter(attempts__gte=models.F('max_attempts')).update(
+            status=self.model.Statuses.FAILED,
+            error="The worker running the job stopped",
+            locked_by=None,
+            locked_at=None,
+        )
+        return stale.update(
+            status=self.model.Statuses.QUEUED,
+            locked_by=None,
+            locked_at=None,
+        )
+
+
+class GenerationJobManager(JobQueueManager):
+    def enqueue(self, user, prompt, **kwargs):
+        """ Queue a generation of the prompt for the workers
+
+            Args:
+                prompt (AbstractPromptModel): The prompt to generate
+                kwargs (dict): The keyword arguments of prompt.generate
+        """
+        return self.create(
+            user=user,
+            model_name=prompt.name,
+            prompt_id=prompt.pk,
+            kwargs=kwargs,
+            max_attempts=settings.GENERATION_JOB_MAX_ATTEMPTS,
+        )
+
+
+class EvaluationJobManager(JobQueueManager):
+    def enqueue(self, user, prompt, dataset, total_rows: int, options: Dict[str, Any]):
+        """ Queue the evaluation of the prompt over a validated dataset
+
+            Args:
+                prompt (AbstractPromptModel): The prompt to evaluate
+                dataset (File): The uploaded CSV or XLSX file
+                options (dict): Generation options e.g. the image size
+        """
+        return self.create(
+            user=user,
+            model_name=prompt.name,
+            prompt_id=prompt.pk,
+            dataset=dataset,
+            total_rows=total_rows,
+            options=options,
+            max_attempts=settings.GENERATION_JOB_MAX_ATTEMPTS,
+        )
+
+
+class PooledOutputManager(models.Manager):
+    # window of the per prompt refill rate limit
+    REFILL_WINDOW = timedelta(minutes=1)
+
+    def for_prompt(self, prompt):
+        return self.filter(model_name=prompt.name, prompt_id=prompt.pk)
+
+    def fresh(self, prompt):
+        """ The outputs of the prompt that can still be handed out """
+        return self.for_prompt(prompt).filter(
+            version_id=prompt.version_id,
+            claimed_at__isnull=True,
+            expires_at__gt=timezone.now()
+        )
+
+    def claim(self, prompt, prompt_params: Dict[str, Any], options: Dict[str, Any]):
+        """ Hand out the oldest fresh output of the input, None if there is none
+
+            The claim is a conditional update so an output is never
+            handed to two buyers, on any database backend.
+        """
+        from jarvis.models.pool import make_pool_key
+        candidates = self.fresh(prompt).filter(
+            key=make_pool_key(prompt_params, options)
+        ).order_by('created_at', 'pk').values_list('pk', flat=True)
+        for pk in candidates[:10]:
+            claimed = self.filter(pk=pk, claimed_at__isnull=True).update(
+                claimed_at=timezone.now())
+            if claimed:
+                return self.get(pk=pk)
+        return None
+
+    def fill(self, prompt, prompt_params: Dict[str, Any], options: Dict[str, Any]):
+        """ Generate an output of the input into the pool """
+        from jarvis.models.pool import make_pool_key
+        from jarvis.modules.provider import provider_scheduler
+        model_input = prompt.get_prompt(**prompt_params)
+        # straight to the provider, the result cache would
+        # fill the pool with copies of one output
+        with provider_scheduler.for_user(prompt.user):
+            response = prompt.request(
+                prompt.get_request_params(model_input, **options))
+        return self.create(
+            model_name=prompt.name,
+            prompt_id=prompt.pk,
+            version_id=prompt.version_id,
+            key=make_pool_key(prompt_params, options),
+            input=prompt_params,
+            options=options,
+            model_input=model_input,
+            response=response,
+            expires_at=timezone.now() + timedelta(seconds=prompt.pool_ttl),
+        )
+
+    def get_counts(self, **filters) -> Tuple[Dict[Tuple[str, int], int], Dict[Tuple[str, int, int, str], int]]:
+        """ The pool counts, in a single grouped query
+
+            Returns:
+                Tuple[dict, dict]: The outputs generated within the refill
+                    window per (model_name, prompt_id), and the fresh
+                    outputs per (model_name, prompt_id, version_id, key)
+        """
+        now = timezone.now()
+        rows = self.filter(**filters).order_by().values(
+            'model_name', 'prompt_id', 'version_id', 'key'
+        ).annotate(
+            recent=models.Count('pk', filter=models.Q(created_at__gte=now - self.REFILL_WINDOW)),
+            ready=models.Count('pk', filter=models.Q(claimed_at__isnull=True, expires_at__gt=now)),
+        )
+        recent: Dict[Tuple[str, int], int] = defaultdict(int)
+        ready: Dict[Tuple[str, int, int, str], int] = {}
+        for row in rows:
+            recent[row['model_name'], row['prompt_id']] += row['recent']
+            ready[row['model_name'], row['prompt_id'], row['version_id'], row['key']] = row['ready']
+        return recent, ready
+
+    def refill(self, prompt, limit: int, counts=None) -> int:
+        """ Top up the pool of each pool input of the prompt
+
+            At most GENERATION_POOL_REFILLS_PER_MINUTE outputs of the
+            prompt are generated per minute, across the workers.
+            Args:
+                limit (int): Most outputs generated by this call
+                counts (tuple, optional): The get_counts of the pools,
+                    counted for the prompt when not given
+            Returns:
+                int: The outputs generated
+        """
+        from jarvis.models.pool import make_pool_key
+        recent, ready = counts or self.get_counts(model_name=prompt.name, prompt_id=prompt.pk)
+        limit = min(limit, settings.GENERATION_POOL_REFILLS_PER_MINUTE
+                    - recent.get((prompt.name, prompt.pk), 0))
+        filled = 0
+        for kwargs in prompt.get_pool_inputs():
+            if filled >= limit:
+                break
+            prompt_params, options = prompt.split_generate_kwargs(kwargs)
+            missing = prompt.pool_size - ready.get(
+                (prompt.name, prompt.pk, prompt.version_id, make_pool_key(prompt_params, options)), 0)
+            for _ in range(min(missing, limit - filled)):
+                self.fill(prompt, prompt_params, options)
+                filled += 1
+        return filled
+
+    def refill_pools(self, limit: int = 1) -> int:
+        """ Top up the pools of the pooled prompts, purging the stale outputs
+
+            Prompts whose generation fails are skipped until the next call.
+            Args:
+                limit (int): Most outputs generated by this call
+            Returns:
+                int: The outputs generated
+        """
+        from jarvis.models import AbstractPromptModel, Dalle2PromptModel, GPT3PromptModel
+        self.purge()
+        counts = self.get_counts()
+        filled = 0
+        prompt_models: List[Type[AbstractPromptModel]] = [GPT3PromptModel, Dalle2PromptModel]
+        for prompt_model in prompt_models:
+            for prompt in prompt_model.objects.active_for_buyer(pool_size__gt=0):
+                if filled >= limit:
+                    return filled
+                try:
+                    filled += self.refill(prompt, limit - filled, counts)
+                except Exception:
+                    logging.exception("Unable to refill the output pool of %s", prompt)
+        return filled
+
+    def purge(self) -> int:
+        """ Delete the expired outputs and the claimed ones past the rate window """
+        now = timezone.now()
+        deleted, _ = self.filter(
+            models.Q(expires_at__lte=now)
+            | models.Q(claimed_at__isnull=False, created_at__lt=now - self.REFILL_WINDOW)
+        ).delete()
+        return deleted
+
+
+class RenderedOutputManager(models.Manager):
+    def get_html_many(self, texts: Iterable[str]) -> Dict[str, str]:
+        """ The html of each text, rendering and storing the missing ones
+
+            Args:
+                texts (list): The markdown texts
+            Returns:
+                dict: The html of each text, by make_content_hash
+        """
+        from jarvis.modules.markdown import make_content_hash, render_markdown
+        texts_by_hash = {make_content_hash(text): text for text in texts}
+        rendered = dict(self.filter(
+            hash__in=list(texts_by_hash)).values_list("hash", "html"))
+        missing = [
+            self.model(hash=hash, html=render_markdown(text))
+            for hash, text in texts_by_hash.items() if hash not in rendered
+        ]
+        if missing:
+            # a concurrent request may have stored the same render
+            self.bulk_create(missing, ignore_conflicts=True)
+            rendered.update((render.hash, render.html) for render in missing)
+        return rendered
+
+
+class PromptSearchIndexManager(models.Manager):
+    @staticmethod
+    def get_document(prompt) -> Dict[str, str]:
+        """ The indexed title and body of a prompt """
+        params = [
+            " ".join(str(value) for value in param.values())
+            if isinstance(param, dict) else str(param)
+            for param in prompt.template_params or []
+        ]
+        return {
+            "title": prompt.heading,
+            "body": "\n".join([prompt.description, *params, prompt.template]),
+        }
+
+    def update_for(self, prompt):
+        """ Index the prompt, or drop it from the index once it is deleted """
+        if not prompt.is_active:
+            self.filter(model_name=prompt.name, prompt_id=prompt.pk).delete()
+            return
+        self.update_or_create(
+            model_name=prompt.name,
+            prompt_id=prompt.pk,
+            defaults=self.get_document(prompt)
+        )
+
+    def rebuild(self, prompt_model) -> int:
+        """ Index every active prompt of the model, dropping the others
+
+            Returns:
+                int: The prompts indexed
+        """
+        self.filter(model_name=prompt_model.name).exclude(
+            prompt_id__in=prompt_model.objects.active().values("pk")).delete()
+        count = 0
+        for prompt in prompt_model.objects.active().iterator():
+            self.update_for(prompt)
+            count += 1
+        return count
+
+
+class PromptCatalogManager(models.Manager):
+    @staticmethod
+    def get_prompt_models() -> List[Type[models.Model]]:
+        """ The prompt models listed in the catalog """
+        from jarvis.models import Dalle2PromptModel, GPT3PromptModel
+        return [GPT3PromptModel, Dalle2PromptModel]
+
+    def update_for(self, prompt):
+        """ List the prompt while it is listed, see PromptModelManager.update_listed,
+            or drop it from the catalog
+        """
+        if not prompt.is_listed:
+            self.filter(model_name=prompt.name, prompt_id=prompt.pk).delete()
+            return
+        seller = prompt.user.seller_profile
+        self.update_or_create(
+            model_name=prompt.name,
+            prompt_id=prompt.pk,
+            defaults={
+                "type": prompt.type,
+                "icon": prompt.icon,
+                "heading": prompt.heading,
+                "description": prompt.description,
+                "user": prompt.user,
+                "seller_handle": seller.handle,
+                "seller_name": seller.name,
+                "version_id": prompt.version_id,
+                "created_at": prompt.created_at,
+            }
+        )
+
+    def sync_user(self, user_id) -> int:
+        """ Follow the listing of a user's prompts once it is recomputed
+
+            The rows of the prompts no longer listed are dropped and the
+            seller columns of the others refreshed with one update; only
+            newly listed prompts are copied one by one.
+
+            Returns:
+                int: The prompts newly listed
+        """
+        from account.models import Seller
+        seller = Seller.objects.filter(user=user_id).first()
+        count = 0
+        for prompt_model in self.get_prompt_models():
+            listed = prompt_model.objects.filter(user=user_id, is_listed=True)
+            rows = self.filter(model_name=prompt_model.name, user=user_id)
+            rows.exclude(prompt_id__in=listed.values("pk")).delete()
+            if seller is not None:
+                rows.exclude(seller_handle=seller.handle, seller_name=seller.name).update(
+                    seller_handle=seller.handle, seller_name=seller.name)
+            for prompt in listed.exclude(pk__in=rows.values("prompt_id")).iterator():
+                self.update_for(prompt)
+                count += 1
+        return count
+
+    def update_output_counts(self) -> int:
+        """ Recount the outputs generated with each listed prompt, its
+            popularity rank, in one update
+
+            Run periodically by the generation workers rather than counted
+            on every generation, which would write the prompt's row on the
+            request path.
+
+            Returns:
+                int: The rows updated
+        """
+        from jarvis.models import PromptOutputModel
+        outputs = PromptOutputModel.objects.filter(
+            model_name=models.OuterRef("model_name"),
+            prompt_id=models.OuterRef("prompt_id"),
+        ).order_by().values("prompt_id").annotate(count=models.Count("pk")).values("count")
+        return self.update(output_count=Coalesce(models.Subquery(outputs), 0))
+
+    def rebuild(self) -> int:
+        """ Relist every listed prompt, dropping the rows of the others
+
+            Returns:
+                int: The prompts listed
+        """
+        count = 0
+        for prompt_model in self.get_prompt_models():
+            listed = prompt_model.objects.filter(is_listed=True)
+            self.filter(model_name=prompt_model.name).exclude(
+                prompt_id__in=listed.values("pk")).delete()
+            for prompt in listed.select_related("user__seller_profile").iterator():
+                self.update_for(prompt)
+                count += 1
+        self.update_output_counts()
+        return count
\ No newline at end of file
@@ -0,0 +1,33 @@
+# Generated by Django 4.1.4 on 2026-10-18 19:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jarvis', '0008_promptoutputmodel_model_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dalle2promptmodel',
+            name='cache_enabled',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='dalle2promptmodel',
+            name='cache_ttl',
+            field=models.PositiveIntegerField(default=3600),
+        ),
+        migrations.AddField(
+            model_name='gpt3promptmodel',
+            name='cache_enabled',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='gpt3promptmodel',
+            name='cache_ttl',
+            field=models.PositiveIntegerField(default=3600),
+        ),
+    ]
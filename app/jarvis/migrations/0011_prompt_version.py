@@ -0,0 +1,47 @@
+# Generated by Django 4.1.4 on 2026-10-18 19:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jarvis', '0010_generation_flight'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PromptVersionModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hash', models.CharField(max_length=64, unique=True)),
+                ('snapshot', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Prompt Version',
+                'verbose_name_plural': 'Prompt Versions',
+            },
+        ),
+        migrations.AlterField(
+            model_name='promptoutputmodel',
+            name='model_snapshot',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='dalle2promptmodel',
+            name='version',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='jarvis.promptversionmodel'),
+        ),
+        migrations.AddField(
+            model_name='gpt3promptmodel',
+            name='version',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='jarvis.promptversionmodel'),
+        ),
+        migrations.AddField(
+            model_name='promptoutputmodel',
+            name='model_version',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='outputs', to='jarvis.promptversionmodel'),
+        ),
+    ]
@@ -0,0 +1,90 @@
+import hashlib
+import json
+from django.db import migrations
+
+
+BATCH_SIZE = 1000
+
+# the fields of jarvis.models.version.UNVERSIONED_FIELDS the prompts have
+# at the time of this migration
+UNVERSIONED_FIELDS = ("updated_at", "is_active", "cache_enabled", "cache_ttl")
+
+
+def make_snapshot_hash(snapshot):
+    data = {
+        key: value for key, value in snapshot.items()
+        if key not in UNVERSIONED_FIELDS
+    }
+    raw = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def get_snapshot(prompt):
+    snapshot = {
+        field.attname: getattr(prompt, field.attname)
+        for field in prompt._meta.concrete_fields
+        if field.name != "version"
+    }
+    snapshot["created_at"] = snapshot["created_at"].isoformat()
+    snapshot["updated_at"] = snapshot["updated_at"].isoformat()
+    return snapshot
+
+
+def dedupe_snapshots(apps, schema_editor):
+    PromptVersionModel = apps.get_model("jarvis", "PromptVersionModel")
+    PromptOutputModel = apps.get_model("jarvis", "PromptOutputModel")
+    version_ids = {}
+
+    def get_version_id(snapshot):
+        key = make_snapshot_hash(snapshot)
+        if key not in version_ids:
+            version, _ = PromptVersionModel.objects.get_or_create(
+                hash=key, defaults={"snapshot": snapshot})
+            version_ids[key] = version.pk
+        return version_ids[key]
+
+    for model_name in ("GPT3PromptModel", "Dalle2PromptModel"):
+        PromptModel = apps.get_model("jarvis", model_name)
+        for prompt in PromptModel.objects.filter(version__isnull=True).iterator():
+            PromptModel.objects.filter(pk=prompt.pk).update(
+                version_id=get_version_id(get_snapshot(prompt)))
+
+    outputs = PromptOutputModel.objects.filter(
+        model_version__isnull=True,
+        model_snapshot__isnull=False
+    ).only("pk", "model_snapshot")
+    while True:
+        batch = list(outputs[:BATCH_SIZE])
+        if not batch:
+            break
+        for output in batch:
+            output.model_version_id = get_version_id(output.model_snapshot)
+            output.model_snapshot = None
+        PromptOutputModel.objects.bulk_update(
+            batch, ["model_version", "model_snapshot"])
+
+
+def restore_snapshots(apps, schema_editor):
+    PromptOutputModel = apps.get_model("jarvis", "PromptOutputModel")
+    outputs = PromptOutputModel.objects.filter(
+        model_version__isnull=False,
+        model_snapshot__isnull=True
+    ).select_related("model_version").only("pk", "model_version__snapshot")
+    while True:
+        batch = list(outputs[:BATCH_SIZE])
+        if not batch:
+            break
+        for output in batch:
+            output.model_snapshot = output.model_version.snapshot
+        PromptOutputModel.objects.bulk_update(batch, ["model_snapshot"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jarvis', '0011_prompt_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_snapshots, restore_snapshots),
+    ]
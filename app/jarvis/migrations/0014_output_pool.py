@@ -0,0 +1,70 @@
+# Generated by Django 4.1.4 on 2026-10-18 19:59
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jarvis', '0013_generation_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dalle2promptmodel',
+            name='pool_inputs',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='dalle2promptmodel',
+            name='pool_size',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dalle2promptmodel',
+            name='pool_ttl',
+            field=models.PositiveIntegerField(default=86400),
+        ),
+        migrations.AddField(
+            model_name='gpt3promptmodel',
+            name='pool_inputs',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='gpt3promptmodel',
+            name='pool_size',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='gpt3promptmodel',
+            name='pool_ttl',
+            field=models.PositiveIntegerField(default=86400),
+        ),
+        migrations.CreateModel(
+            name='PooledOutputModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_name', models.CharField(choices=[('gpt3', 'GPT3'), ('dalle2', 'DALLE2')], max_length=255)),
+                ('prompt_id', models.PositiveIntegerField()),
+                ('key', models.CharField(max_length=64)),
+                ('input', models.JSONField(default=dict)),
+                ('options', models.JSONField(default=dict)),
+                ('model_input', models.TextField()),
+                ('response', models.JSONField()),
+                ('expires_at', models.DateTimeField()),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('version', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='jarvis.promptversionmodel')),
+            ],
+            options={
+                'verbose_name': 'Pooled Output',
+                'verbose_name_plural': 'Pooled Outputs',
+                'ordering': ('created_at',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='pooledoutputmodel',
+            index=models.Index(fields=['model_name', 'prompt_id', 'key'], name='jarvis_pool_model_n_4218ac_idx'),
+        ),
+    ]
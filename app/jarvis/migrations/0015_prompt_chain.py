@@ -0,0 +1,36 @@
+# Generated by Django 4.1.4 on 2026-10-18 20:02
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('jarvis', '0014_output_pool'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PromptChainModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('icon', models.URLField(default='https://icon.ico', max_length=255)),
+                ('heading', models.CharField(max_length=255)),
+                ('description', models.TextField()),
+                ('template_params', models.JSONField(default=list)),
+                ('steps', models.JSONField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='prompt_chains', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Prompt Chain',
+                'verbose_name_plural': 'Prompt Chains',
+                'ordering': ('-created_at',),
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.1.4 on 2026-10-18 20:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import jarvis.models.evaluation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('jarvis', '0015_prompt_chain'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EvaluationJobModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_name', models.CharField(choices=[('gpt3', 'GPT3'), ('dalle2', 'DALLE2')], max_length=255)),
+                ('prompt_id', models.PositiveIntegerField()),
+                ('options', models.JSONField(default=dict)),
+                ('dataset', models.FileField(storage=jarvis.models.evaluation.get_evaluation_storage, upload_to='datasets/')),
+                ('results', models.FileField(blank=True, null=True, storage=jarvis.models.evaluation.get_evaluation_storage, upload_to='results/')),
+                ('total_rows', models.PositiveIntegerField(default=0)),
+                ('processed_rows', models.PositiveIntegerField(default=0)),
+                ('failed_rows', models.PositiveIntegerField(default=0)),
+                ('results_size', models.PositiveBigIntegerField(default=0)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], db_index=True, default='queued', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('max_attempts', models.PositiveIntegerField(default=3)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('locked_by', models.CharField(blank=True, max_length=255, null=True)),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='evaluation_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Evaluation Job',
+                'verbose_name_plural': 'Evaluation Jobs',
+                'ordering': ('-created_at',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='evaluationjobmodel',
+            index=models.Index(fields=['status', 'run_after'], name='jarvis_eval_status_23e56e_idx'),
+        ),
+    ]
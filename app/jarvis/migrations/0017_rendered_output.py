@@ -0,0 +1,26 @@
+# Generated by Django 4.1.4 on 2026-10-18 20:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jarvis', '0016_evaluation_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RenderedOutputModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hash', models.CharField(max_length=64, unique=True)),
+                ('html', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Rendered Output',
+                'verbose_name_plural': 'Rendered Outputs',
+            },
+        ),
+    ]
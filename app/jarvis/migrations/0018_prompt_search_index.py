@@ -0,0 +1,117 @@
+# Generated by Django 4.1.4 on 2026-10-18 20:19
+
+from django.db import migrations, models
+
+
+TABLE = 'jarvis_promptsearchindexmodel'
+FTS5_TABLE = 'jarvis_promptsearchindexmodel_fts'
+
+POSTGRES_SQL = [
+    """
+    ALTER TABLE {table} ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(body, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX {table}_vector_gin ON {table} USING gin (search_vector)",
+]
+POSTGRES_REVERSE_SQL = [
+    "DROP INDEX IF EXISTS {table}_vector_gin",
+    "ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector",
+]
+
+# external content FTS5 table, kept in sync with the index table by triggers
+SQLITE_SQL = [
+    """
+    CREATE VIRTUAL TABLE {fts} USING fts5(
+        title, body, content='{table}', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER {table}_ai AFTER INSERT ON {table} BEGIN
+        INSERT INTO {fts}(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER {table}_ad AFTER DELETE ON {table} BEGIN
+        INSERT INTO {fts}({fts}, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER {table}_au AFTER UPDATE ON {table} BEGIN
+        INSERT INTO {fts}({fts}, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO {fts}(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+]
+SQLITE_REVERSE_SQL = [
+    "DROP TRIGGER IF EXISTS {table}_ai",
+    "DROP TRIGGER IF EXISTS {table}_ad",
+    "DROP TRIGGER IF EXISTS {table}_au",
+    "DROP TABLE IF EXISTS {fts}",
+]
+
+
+def run_vendor_sql(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement.format(table=TABLE, fts=FTS5_TABLE))
+    return run
+
+
+def index_prompts(apps, schema_editor):
+    Index = apps.get_model('jarvis', 'PromptSearchIndexModel')
+    for model_name, prompt_model in (
+        ('gpt3', apps.get_model('jarvis', 'GPT3PromptModel')),
+        ('dalle2', apps.get_model('jarvis', 'Dalle2PromptModel')),
+    ):
+        for prompt in prompt_model.objects.filter(is_active=True).iterator():
+            params = [
+                " ".join(str(value) for value in param.values())
+                if isinstance(param, dict) else str(param)
+                for param in prompt.template_params or []
+            ]
+            Index.objects.create(
+                model_name=model_name,
+                prompt_id=prompt.pk,
+                title=prompt.heading,
+                body="\n".join([prompt.description, *params, prompt.template]),
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jarvis', '0017_rendered_output'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PromptSearchIndexModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_name', models.CharField(choices=[('gpt3', 'GPT3'), ('dalle2', 'DALLE2')], max_length=255)),
+                ('prompt_id', models.PositiveBigIntegerField()),
+                ('title', models.CharField(max_length=255)),
+                ('body', models.TextField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Prompt Search Index',
+                'verbose_name_plural': 'Prompt Search Index',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='promptsearchindexmodel',
+            constraint=models.UniqueConstraint(fields=('model_name', 'prompt_id'), name='unique_prompt_search_index'),
+        ),
+        migrations.RunPython(
+            run_vendor_sql({'postgresql': POSTGRES_SQL, 'sqlite': SQLITE_SQL}),
+            run_vendor_sql({'postgresql': POSTGRES_REVERSE_SQL, 'sqlite': SQLITE_REVERSE_SQL}),
+        ),
+        migrations.RunPython(index_prompts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 4.1.4 on 2026-10-18 20:23
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def list_prompts(apps, schema_editor):
+    Catalog = apps.get_model('jarvis', 'PromptCatalogModel')
+    Seller = apps.get_model('account', 'Seller')
+    sellers = {
+        seller.user_id: seller for seller in Seller.objects.filter(
+            is_active=True, user__is_active=True, user__is_verified=True)
+    }
+    for model_name, prompt_model in (
+        ('gpt3', apps.get_model('jarvis', 'GPT3PromptModel')),
+        ('dalle2', apps.get_model('jarvis', 'Dalle2PromptModel')),
+    ):
+        for prompt in prompt_model.objects.filter(
+                is_active=True, user_id__in=list(sellers)).iterator():
+            seller = sellers[prompt.user_id]
+            Catalog.objects.create(
+                model_name=model_name,
+                prompt_id=prompt.pk,
+                type=prompt.type,
+                icon=prompt.icon,
+                heading=prompt.heading,
+                description=prompt.description,
+                user_id=prompt.user_id,
+                seller_handle=seller.handle,
+                seller_name=seller.name,
+                version_id=prompt.version_id,
+                created_at=prompt.created_at,
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('account', '0009_alter_seller_earnings_alter_seller_pending_earnings'),
+        ('jarvis', '0018_prompt_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PromptCatalogModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_name', models.CharField(choices=[('gpt3', 'GPT3'), ('dalle2', 'DALLE2')], max_length=255)),
+                ('prompt_id', models.PositiveBigIntegerField()),
+                ('type', models.CharField(choices=[('text', 'Text'), ('image', 'Image')], max_length=255)),
+                ('icon', models.URLField(max_length=255)),
+                ('heading', models.CharField(max_length=255)),
+                ('description', models.TextField()),
+                ('seller_handle', models.CharField(max_length=255)),
+                ('seller_name', models.CharField(max_length=255)),
+                ('output_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('version', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='jarvis.promptversionmodel')),
+            ],
+            options={
+                'verbose_name': 'Prompt Catalog Entry',
+                'verbose_name_plural': 'Prompt Catalog',
+                'ordering': ('-created_at', '-id'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='promptcatalogmodel',
+            index=models.Index(fields=['-created_at', '-id'], name='catalog_newest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='promptcatalogmodel',
+            index=models.Index(fields=['-output_count', '-id'], name='catalog_popular_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='promptcatalogmodel',
+            index=models.Index(fields=['type', '-created_at', '-id'], name='catalog_type_newest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='promptcatalogmodel',
+            index=models.Index(fields=['model_name', '-created_at', '-id'], name='catalog_name_newest_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='promptcatalogmodel',
+            constraint=models.UniqueConstraint(fields=('model_name', 'prompt_id'), name='unique_prompt_catalog_entry'),
+        ),
+        migrations.RunPython(list_prompts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.1.4 on 2026-10-18 20:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jarvis', '0019_prompt_catalog'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='promptoutputmodel',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='output_user_newest_idx'),
+        ),
+    ]
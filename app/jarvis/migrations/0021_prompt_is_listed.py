@@ -0,0 +1,55 @@
+# Generated by Django 4.1.4 on 2026-10-18 20:33
+
+from django.db import migrations, models
+
+
+def list_prompts(apps, schema_editor):
+    Seller = apps.get_model('account', 'Seller')
+    listable = Seller.objects.filter(
+        user=models.OuterRef('user'),
+        is_active=True,
+        user__is_active=True,
+        user__is_verified=True,
+    )
+    for name in ('GPT3PromptModel', 'Dalle2PromptModel', 'PromptChainModel'):
+        apps.get_model('jarvis', name).objects.filter(is_active=True).update(
+            is_listed=models.Exists(listable))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0009_alter_seller_earnings_alter_seller_pending_earnings'),
+        ('jarvis', '0020_output_user_newest_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dalle2promptmodel',
+            name='is_listed',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='gpt3promptmodel',
+            name='is_listed',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='promptchainmodel',
+            name='is_listed',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='dalle2promptmodel',
+            index=models.Index(condition=models.Q(('is_listed', True)), fields=['-created_at', '-id'], name='dalle2promptmodel_listed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gpt3promptmodel',
+            index=models.Index(condition=models.Q(('is_listed', True)), fields=['-created_at', '-id'], name='gpt3promptmodel_listed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='promptchainmodel',
+            index=models.Index(condition=models.Q(('is_listed', True)), fields=['-created_at', '-id'], name='chain_listed_idx'),
+        ),
+        migrations.RunPython(list_prompts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.1.4 on 2026-10-18 20:49
+
+from collections import defaultdict
+from django.db import migrations, models
+
+
+def set_prompt_ids(apps, schema_editor):
+    PromptOutputModel = apps.get_model('jarvis', 'PromptOutputModel')
+    PromptVersionModel = apps.get_model('jarvis', 'PromptVersionModel')
+    for version in PromptVersionModel.objects.iterator():
+        PromptOutputModel.objects.filter(model_version=version).update(
+            prompt_id=version.snapshot.get('id'))
+    # legacy outputs hold their own snapshot
+    legacy = PromptOutputModel.objects.filter(
+        model_version__isnull=True, model_snapshot__isnull=False)
+    outputs_by_prompt = defaultdict(list)
+    for output in legacy.only('id', 'model_snapshot').iterator():
+        prompt_id = (output.model_snapshot or {}).get('id')
+        if prompt_id is not None:
+            outputs_by_prompt[prompt_id].append(output.pk)
+    for prompt_id, pks in outputs_by_prompt.items():
+        for start in range(0, len(pks), 500):
+            PromptOutputModel.objects.filter(pk__in=pks[start:start + 500]).update(
+                prompt_id=prompt_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jarvis', '0021_prompt_is_listed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='promptoutputmodel',
+            name='prompt_id',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='promptoutputmodel',
+            index=models.Index(fields=['model_name', 'prompt_id', '-created_at'], name='output_prompt_newest_idx'),
+        ),
+        migrations.RunPython(set_prompt_ids, migrations.RunPython.noop),
+    ]
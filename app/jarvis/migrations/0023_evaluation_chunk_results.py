@@ -0,0 +1,18 @@
+# Generated by Django 4.1.4 on 2026-10-18 21:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jarvis', '0022_output_prompt_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='evaluationjobmodel',
+            name='chunk_results',
+            field=models.JSONField(default=dict),
+        ),
+    ]
@@ -0,0 +1,73 @@
+import hashlib
+import json
+from django.db import migrations
+
+
+BATCH_SIZE = 1000
+
+# kept in sync with jarvis.models.version at the time of this migration
+UNVERSIONED_FIELDS = (
+    "updated_at",
+    "is_active",
+    "is_listed",
+    "cache_enabled",
+    "cache_ttl",
+    "pool_size",
+    "pool_inputs",
+    "pool_ttl",
+)
+
+# the models referencing a version, by the name of their foreign key
+VERSION_REFERENCES = (
+    ("GPT3PromptModel", "version"),
+    ("Dalle2PromptModel", "version"),
+    ("PromptOutputModel", "model_version"),
+    ("PooledOutputModel", "version"),
+    ("PromptCatalogModel", "version"),
+)
+
+
+def make_snapshot_hash(snapshot):
+    data = {
+        key: value for key, value in snapshot.items()
+        if key not in UNVERSIONED_FIELDS
+    }
+    raw = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def rehash_versions(apps, schema_editor):
+    """ Hash the versions without the operational fields 0012 hashed,
+        merging the versions that only differed in those
+    """
+    PromptVersionModel = apps.get_model("jarvis", "PromptVersionModel")
+    version_ids = {}
+    duplicates = {}
+    rehashed = []
+    for version in PromptVersionModel.objects.only("pk", "hash", "snapshot").order_by("pk").iterator():
+        key = make_snapshot_hash(version.snapshot)
+        if key in version_ids:
+            duplicates[version.pk] = version_ids[key]
+            continue
+        version_ids[key] = version.pk
+        if version.hash != key:
+            version.hash = key
+            rehashed.append(version)
+
+    for duplicate_id, version_id in duplicates.items():
+        for model_name, field_name in VERSION_REFERENCES:
+            apps.get_model("jarvis", model_name).objects.filter(
+                **{field_name: duplicate_id}).update(**{field_name: version_id})
+    PromptVersionModel.objects.filter(pk__in=list(duplicates)).delete()
+    PromptVersionModel.objects.bulk_update(rehashed, ["hash"], batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jarvis', '0023_evaluation_chunk_results'),
+    ]
+
+    operations = [
+        migrations.RunPython(rehash_versions, migrations.RunPython.noop),
+    ]
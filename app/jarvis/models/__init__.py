@@ -1,4 +1,13 @@
+from .version import PromptVersionModel
 from .output import PromptOutputModel
 from .abstract import AbstractPromptModel
 from .image import Dalle2PromptModel
 from .language import GPT3PromptModel
+from .flight import GenerationFlightModel
+from .job import GenerationJobModel
+from .pool import PooledOutputModel
+from .chain import PromptChainModel
+from .evaluation import EvaluationJobModel
+from .rendered import RenderedOutputModel
+from .search import PromptSearchIndexModel
+from .catalog import PromptCatalogModel
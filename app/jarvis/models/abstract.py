@@ -1,11 +1,28 @@
-from django.db import models
+from django.db import connection, models
 from core.models import BaseModel
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 from rest_framework.exceptions import ValidationError
 from jarvis.managers import PromptModelManager
+from jarvis.modules.provider import (
+    generation_cache,
+    make_request_key,
+    provider_scheduler,
+    single_flight
+)
+from jarvis.modules.template import CompiledTemplate, template_cache
+from jarvis.models.version import PromptVersionModel
 from django.core.exceptions import ObjectDoesNotExist
+from django.dispatch import Signal
 from account.models import User
+from asgiref.sync import sync_to_async
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+# sent at the end of AbstractPromptModel.save with the saved `instance`,
+# unlike post_save once its version is current
+prompt_saved = Signal()
 
 
 class AbstractPromptModel(BaseModel):
@@ -32,6 +49,32 @@ class AbstractPromptModel(BaseModel):
         related_name="%(app_label)s_%(class)s_related",
     )
 
+    # serve identical generations from the result cache
+    cache_enabled = models.BooleanField(default=False)
+    cache_ttl = models.PositiveIntegerField(default=60 * 60)
+
+    # outputs generated ahead of the buyers for each pool input, 0 disables
+    # the pool, see PooledOutputModel
+    pool_size = models.PositiveIntegerField(default=0)
+    # generate kwargs of the pooled inputs, parameterless prompts pool the empty input
+    pool_inputs = models.JSONField(null=True, blank=True)
+    # seconds a pooled output is handed out for
+    pool_ttl = models.PositiveIntegerField(default=24 * 60 * 60)
+
+    # whether buyers can see the prompt, kept current by save and by the
+    # user and seller signals, see PromptModelManager.update_listed
+    is_listed = models.BooleanField(default=False, editable=False)
+
+    # the version outputs are recorded against, kept current by save
+    version = models.ForeignKey(
+        PromptVersionModel,
+        on_delete=models.PROTECT,
+        related_name="+",
+        null=True,
+        blank=True,
+        editable=False,
+    )
+
     # To be overridden by subclasses
     type = models.CharField(
         max_length=255,
@@ -42,17 +85,40 @@ class AbstractPromptModel(BaseModel):
         verbose_name_plural = _('Prompts')
         ordering = ('-created_at',)
         abstract = True
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], condition=models.Q(is_listed=True),
+                         name='%(class)s_listed_idx'),
+        ]
+
+    @staticmethod
+    def get_model(name: str) -> Type["AbstractPromptModel"]:
+        """ The concrete prompt model of a name e.g. "gpt3"
+
+            Raises:
+                ValidationError: If no prompt model has the name
+        """
+        for model in AbstractPromptModel.__subclasses__():
+            if model.name == name:
+                return model
+        raise ValidationError("The model \"{}\" is invalid".format(name))
 
     def __str__(self):
         return self.heading
 
+    def get_compiled_template(self) -> CompiledTemplate:
+        """ The parsed template, shared by every request for this prompt
+        """
+        if self.pk is None or self.updated_at is None:
+            return CompiledTemplate(self.template, self.template_params)
+        return template_cache.get(
+            (self.name, self.pk, self.updated_at),  # type: ignore
+            self.template,
+            self.template_params
+        )
+
     def get_prompt(self, **kwargs):
-        from langchain import PromptTemplate
         self.validate_prompt(**kwargs)
-        return PromptTemplate(
-            input_variables=[param["name"] for param in self.template_params],
-            template=self.template
-        ).format(**kwargs)
+        return self.get_compiled_template().render(kwargs)
 
     def _validate_example(self):
         """ Validate the examples the seller has provided
@@ -103,75 +169,161 @@ class AbstractPromptModel(BaseModel):
                 ValidationError: If the user input is invalid
 
         """
-        if len(kwargs) != len(self.template_params):
-            raise ValidationError("Invalid number of parameters passed")
+        self.get_compiled_template().validate_params(kwargs)
 
-        for kwarg in kwargs:
-            if kwarg not in [param["name"] for param in self.template_params]:
-                raise ValidationError(
-                    "Invalid parameter passed.\n \"{}\" is not a valid parameter".format(kwarg))
+    def _validate_pool_inputs(self):
+        """ Validate the pool settings and the inputs the seller pools outputs for
 
-    def validate_template(self):
-        # Check that the template_params is a list
-        if not isinstance(self.template_params, list):
+            Raises:
+                ValidationError: If a setting is out of the platform's
+                bounds, an input is invalid or a pooled prompt with
+                parameters has no inputs
+        """
+        if self.pool_size > settings.GENERATION_POOL_MAX_SIZE:
+            raise ValidationError("Pool size must be at most {}".format(
+                settings.GENERATION_POOL_MAX_SIZE))
+        if self.pool_ttl < settings.GENERATION_POOL_MIN_TTL:
+            raise ValidationError("Pool ttl must be at least {} seconds".format(
+                settings.GENERATION_POOL_MIN_TTL))
+        if self.pool_inputs is not None:
+            if not isinstance(self.pool_inputs, list) or not all(
+                    isinstance(kwargs, dict) for kwargs in self.pool_inputs):
+                raise ValidationError("Pool inputs must be a list of dicts")
+            if len(self.pool_inputs) > settings.GENERATION_POOL_MAX_INPUTS:
+                raise ValidationError("Pool inputs must be at most {}".format(
+                    settings.GENERATION_POOL_MAX_INPUTS))
+            for kwargs in self.pool_inputs:
+                prompt_params, _ = self.split_generate_kwargs(kwargs)
+                self.validate_prompt(**prompt_params)
+        if self.pool_size and not self.get_pool_inputs():
             raise ValidationError(
-                'The template parameters must be a list. Ensure that the input has the format [{"name": "name", "description": "text description"}]'
-            )
+                "Pool inputs are required to pool a prompt with template params")
 
-        # Check that the template_params is a list of dicts
-        if not all(isinstance(param, dict) for param in self.template_params):
-            raise ValidationError(
-                'The template parameters must be a list of dicts. Ensure that the input has the format [{"name": "name", "description": "text description"}]'
-            )
+    def validate_template(self):
+        """ Validate the template against the template parameters
 
-        for param in self.template_params:
-            if "name" not in param:
-                raise ValidationError(
-                    'The template parameter is missing the "name" key. Ensure that the input has the format {{ "name": "Sample name", "description": "text description" }}'
-                )
-            if "description" not in param:
-                raise ValidationError(
-                    'The template parameter is missing the "description" key. Ensure that the input has the format {{ "name": "Sample Name", "description": "text description" }}'
-                )
+            Raises:
+                ValidationError: If a parameter is malformed, missing from
+                the template or repeated, or the template has a placeholder
+                that is not a parameter
+        """
+        self.get_compiled_template().validate()
 
-        import re
-        matches = re.findall(r"{(.*?)}", self.template)
-        if matches:
-            for match in matches:
-                if match not in [param["name"] for param in self.template_params]:
-                    if " " in match:
-                        raise ValidationError(
-                            'The template parameter "{}" has an invalid white space. Ensure that the input has the format "{{{}}}"'.format(
-                                match, match
-                            )
-                        )
-                    raise ValidationError(
-                        'The template parameter is missing the "{}" key. Ensure that the input has the format {{ "name": "Sample name", "description": "text description" }}'.format(
-                            match
-                        )
-                    )
-
-        for param in self.template_params:
-            name = param["name"]
-            if "{{{}}}".format(name) not in self.template:
-                if name in self.template:
-                    raise ValidationError(
-                        'The template parameter "{}" is missing curly braces. Ensure that the input has the format "{{{}}}"'.format(
-                            name, name
-                        )
-                    )
-                else:
-                    raise ValidationError(
-                        'The template parameter "{}" is missing. Ensure that the input has the format "{{{}}}"'.format(
-                            name, name
-                        )
-                    )
-            if self.template.count("{{{}}}".format(name)) > 1:
-                raise ValidationError(
-                    'The template parameter "{}" appears more than once in the template. Ensure that the parameter appears only once'.format(
-                        name
-                    )
-                )
+    def get_request_params(self, prompt: str, **options) -> Dict[str, Any]:
+        """ Build the keyword arguments sent to the provider
+
+            Args:
+                prompt (str): The rendered prompt
+                options (dict): Generation options e.g. the image size
+            Returns:
+                dict: The provider request parameters
+        """
+        raise NotImplementedError
+
+    def split_generate_kwargs(self, kwargs: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """ Split the keyword arguments of generate into the user input
+            and the generation options e.g. the image size
+        """
+        return dict(kwargs), {}
+
+    def get_pool_inputs(self) -> List[Dict[str, Any]]:
+        """ The generate kwargs outputs are pooled for """
+        if self.pool_inputs:
+            return self.pool_inputs  # type: ignore
+        return [] if self.template_params else [{}]
+
+    @property
+    def pool_enabled(self) -> bool:
+        return bool(self.pool_size) and settings.GENERATION_POOL_ENABLED
+
+    def get_pooled_response(self, prompt_params: Dict[str, Any], options: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """ Take a response generated ahead for this input out of the pool
+
+            Returns:
+                dict: The response, None if the pool has none ready
+        """
+        from jarvis.models.pool import PooledOutputModel
+        if not self.pool_enabled:
+            return None
+        pooled = PooledOutputModel.objects.claim(self, prompt_params, options)
+        return pooled.response if pooled is not None else None
+
+    async def aget_request_params(self, prompt: str, **options) -> Dict[str, Any]:
+        """ Async counterpart of get_request_params, for params that need the database """
+        return self.get_request_params(prompt, **options)
+
+    def get_request_key(self, params: Dict[str, Any]) -> str:
+        """ Key of the result cache and single-flight for a request, see
+            make_request_key
+        """
+        return make_request_key(self.name, params)  # type: ignore
+
+    def request(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """ Send the request to the provider and return its response """
+        raise NotImplementedError
+
+    async def arequest(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """ Async counterpart of request """
+        raise NotImplementedError
+
+    def parse_response(self, response: Dict[str, Any]) -> Tuple[Optional[str], str]:
+        """ Extract the provider id and the output from a response
+
+            Returns:
+                Tuple[Optional[str], str]: The provider id and the output
+        """
+        raise NotImplementedError
+
+    def get_snapshot(self) -> Dict[str, Any]:
+        """ JSON snapshot of the prompt, stored once per PromptVersionModel """
+        model_snapshot = {
+            field.attname: getattr(self, field.attname)
+            for field in self._meta.concrete_fields
+            if field.name != "version"
+        }
+        model_snapshot["created_at"] = model_snapshot["created_at"].isoformat()
+        model_snapshot["updated_at"] = model_snapshot["updated_at"].isoformat()
+        return model_snapshot
+
+    def update_version(self):
+        """ Point the prompt at the version matching its current content
+        """
+        version = PromptVersionModel.objects.get_for_snapshot(
+            self.get_snapshot())
+        if version.pk != self.version_id:  # type: ignore
+            type(self).objects.filter(pk=self.pk).update(version=version)
+            self.version = version
+
+    def get_output_fields(
+        self,
+        user: User,
+        prompt_params: Dict[str, Any],
+        prompt: str,
+        response: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """ The field values of the PromptOutputModel recording a generation
+
+            Only ids are used for the relations so this is safe to call
+            from async code.
+        """
+        uid, output = self.parse_response(response)
+        fields = {
+            "uid": uid,
+            "user": user,
+            "input": prompt_params or None,
+            "output": output,
+            "cost": 0.0,
+            "type": self.type,
+            "model_name": self.name,  # type: ignore
+            "model_input": prompt,
+            "model_user_id": self.user_id,  # type: ignore
+            "model_version_id": self.version_id,  # type: ignore
+            "prompt_id": self.pk,
+        }
+        if self.version_id is None:  # type: ignore
+            # saved without save(), e.g. with bulk_create
+            fields["model_snapshot"] = self.get_snapshot()
+        return fields
 
     def generate(self, user: User, **kwargs) -> models.Model:
         """ Generate a prompt from the template and the user input
@@ -180,16 +332,170 @@ class AbstractPromptModel(BaseModel):
             Returns:
                 PromptOutputModel: The generated prompt
         """
+        return self._generate(user, kwargs)
+
+    async def agenerate(self, user: User, **kwargs) -> models.Model:
+        """ Async counterpart of generate
+
+            The provider call does not block the event loop
+            and the output is written with the async ORM.
+        """
+        return await self._agenerate(user, kwargs)
+
+    def generate_batch(self, user: User, prompt_params_list: List[Dict[str, Any]], **options) -> List[models.Model]:
+        """ Generate a prompt for each set of user input
+
+            Every input is validated before any request is made and the
+            outputs are written with a single bulk insert.
+            Args:
+                prompt_params_list (list): The user inputs
+                options (dict): Generation options e.g. the image size
+            Returns:
+                List[PromptOutputModel]: The outputs, in input order
+        """
+        return self._generate_batch(user, prompt_params_list, **options)
+
+    def generate_stream(self, user: User, **kwargs):
+        """ Generate a prompt, relaying the output as the provider produces it
+
+            Returns:
+                CompletionStream: Iterator over the output text. The
+                PromptOutputModel is recorded when the stream closes.
+        """
         raise NotImplementedError
 
+    def get_response(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """ Request a response, going through the result cache if enabled
+
+            Concurrent identical requests share one provider call
+            (GENERATION_SINGLE_FLIGHT), each caller still records its own output.
+        """
+        key = self.get_request_key(params)
+        if self.cache_enabled:
+            response = generation_cache.get(key)
+            if response is not None:
+                return response
+        try:
+            if settings.GENERATION_SINGLE_FLIGHT:
+                response = single_flight.do(key, lambda: self.request(params))
+            else:
+                response = self.request(params)
+        except Exception:
+            response = generation_cache.get_stale(key) if self.cache_enabled else None
+            if response is None:
+                raise
+            return response
+        if self.cache_enabled:
+            generation_cache.set(key, response, self.cache_ttl)
+        return response
+
+    async def aget_response(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """ Async counterpart of get_response """
+        key = self.get_request_key(params)
+        if self.cache_enabled:
+            response = generation_cache.get(key)
+            if response is not None:
+                return response
+        try:
+            if settings.GENERATION_SINGLE_FLIGHT:
+                response = await single_flight.ado(key, lambda: self.arequest(params))
+            else:
+                response = await self.arequest(params)
+        except Exception:
+            response = generation_cache.get_stale(key) if self.cache_enabled else None
+            if response is None:
+                raise
+            return response
+        if self.cache_enabled:
+            generation_cache.set(key, response, self.cache_ttl)
+        return response
+
+    def get_batch_responses(self, params_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """ Request a response for each set of request params
+
+            Providers without multi-prompt requests get one request per
+            item, at most GENERATION_BATCH_CONCURRENCY at a time.
+            Returns:
+                list: The responses, in the order of params_list
+        """
+        workers = min(settings.GENERATION_BATCH_CONCURRENCY, len(params_list))
+        # the worker threads keep the caller's scheduler user
+        contexts = [copy_context() for _ in params_list]
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+            return list(pool.map(
+                lambda context, params: context.run(self._get_response_in_thread, params),
+                contexts,
+                params_list
+            ))
+
+    def _get_response_in_thread(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return self.get_response(params)
+        finally:
+            # the worker thread's connection, if single-flight opened one
+            connection.close()
+
+    def _generate(self, user: User, prompt_params: Dict[str, Any], **options) -> models.Model:
+        from jarvis.models.output import PromptOutputModel
+        prompt = self.get_prompt(**prompt_params)
+        response = self.get_pooled_response(prompt_params, options)
+        if response is None:
+            with provider_scheduler.for_user(user):
+                response = self.get_response(self.get_request_params(prompt, **options))
+        return PromptOutputModel.objects.create(
+            **self.get_output_fields(user, prompt_params, prompt, response)
+        )
+
+    async def _agenerate(self, user: User, prompt_params: Dict[str, Any], **options) -> models.Model:
+        from jarvis.models.output import PromptOutputModel
+        prompt = self.get_prompt(**prompt_params)
+        response = None
+        if self.pool_enabled:
+            response = await sync_to_async(self.get_pooled_response)(prompt_params, options)
+        if response is None:
+            with provider_scheduler.for_user(user):
+                response = await self.aget_response(await self.aget_request_params(prompt, **options))
+        return await PromptOutputModel.objects.acreate(
+            **self.get_output_fields(user, prompt_params, prompt, response)
+        )
+
+    def _generate_batch(self, user: User, prompt_params_list: List[Dict[str, Any]], **options) -> List[models.Model]:
+        from jarvis.models.output import PromptOutputModel
+        # rendering validates every input before anything is sent
+        prompts = [self.get_prompt(**prompt_params)
+                   for prompt_params in prompt_params_list]
+        with provider_scheduler.for_user(user):
+            responses = self.get_batch_responses([
+                self.get_request_params(prompt, **options) for prompt in prompts
+            ])
+        return PromptOutputModel.objects.bulk_create([
+            PromptOutputModel(**self.get_output_fields(
+                user, prompt_params, prompt, response))
+            for prompt_params, prompt, response
+            in zip(prompt_params_list, prompts, responses)
+        ])
+
     def save(self, *args, **kwargs):
         self.validate_template()
         self._validate_example()
+        self._validate_pool_inputs()
         if not self.pk:
             user: User = self.user
             if not user.is_seller():
                 raise ValueError(
                     "User with id {} is not a seller".format(user.pk)
                 )
+        self.is_listed = self.is_active and type(self).objects.get_listable_sellers().filter(
+            user=self.user_id).exists()  # type: ignore
 
         super().save(*args, **kwargs)
+        self.update_version()
+        self.update_search_index()
+        prompt_saved.send(sender=type(self), instance=self)
+
+    def update_search_index(self):
+        """ Keep the prompt's entry in the full-text search index current,
+            also run on the soft delete since it saves the prompt
+        """
+        from jarvis.models.search import PromptSearchIndexModel
+        PromptSearchIndexModel.objects.update_for(self)
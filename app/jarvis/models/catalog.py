@@ -0,0 +1,77 @@
+from django.conf import settings
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+from jarvis.managers import PromptCatalogManager
+from jarvis.models.abstract import AbstractPromptModel
+from jarvis.models.version import PromptVersionModel
+
+
+class PromptCatalogModel(models.Model):
+    """ One row per listed prompt of any type
+
+        A denormalized copy of what the storefront lists, so prompts of
+        every model are paginated, ordered and searched together on one
+        indexed table. Kept in sync by the signals in jarvis.signals; only
+        the prompts whose is_listed is set have a row.
+    """
+
+    objects = PromptCatalogManager()
+
+    # columns naming the prompt, for jarvis.modules.search
+    search_index_fields = ("model_name", "prompt_id")
+
+    model_name = models.CharField(
+        max_length=255, choices=AbstractPromptModel.Names.choices)
+    prompt_id = models.PositiveBigIntegerField()
+    type = models.CharField(
+        max_length=255, choices=AbstractPromptModel.Types.choices)
+
+    icon = models.URLField(max_length=255)
+    heading = models.CharField(max_length=255)
+    description = models.TextField()
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    seller_handle = models.CharField(max_length=255)
+    seller_name = models.CharField(max_length=255)
+
+    version = models.ForeignKey(
+        PromptVersionModel,
+        on_delete=models.SET_NULL,
+        related_name="+",
+        null=True,
+        blank=True,
+    )
+    """ The prompt's current version """
+
+    output_count = models.PositiveIntegerField(default=0)
+    """ Outputs generated with the prompt, the popularity rank, recounted
+        periodically by update_output_counts """
+
+    created_at = models.DateTimeField()
+    """ When the prompt was created """
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _('Prompt Catalog Entry')
+        verbose_name_plural = _('Prompt Catalog')
+        ordering = ('-created_at', '-id')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['model_name', 'prompt_id'],
+                name='unique_prompt_catalog_entry'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='catalog_newest_idx'),
+            models.Index(fields=['-output_count', '-id'], name='catalog_popular_idx'),
+            models.Index(fields=['type', '-created_at', '-id'], name='catalog_type_newest_idx'),
+            models.Index(fields=['model_name', '-created_at', '-id'], name='catalog_name_newest_idx'),
+        ]
+
+    def __str__(self):
+        return self.heading
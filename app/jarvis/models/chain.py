@@ -0,0 +1,250 @@
+from core.models import BaseModel
+from django.conf import settings
+from django.db import connection, models
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import ValidationError
+from string import Formatter
+from jarvis.managers import PromptModelManager
+from jarvis.models.abstract import AbstractPromptModel
+from jarvis.models.output import PromptOutputModel
+from jarvis.modules.chain import run_dag, topological_order
+from jarvis.modules.provider import provider_scheduler
+from typing import Any, Dict, List, Set
+
+_formatter = Formatter()
+
+
+def get_references(value: str) -> List[str]:
+    """ The names between curly braces in a step parameter
+
+        Raises:
+            ValidationError: If the braces are unbalanced or a name is
+            more than a plain name e.g. "{outline.title}"
+    """
+    try:
+        fields = [field for _, field, _, _ in _formatter.parse(value) if field is not None]
+    except ValueError:
+        raise ValidationError(
+            "The step parameter \"{}\" has unbalanced curly braces".format(value))
+    for field in fields:
+        if not field.isidentifier():
+            raise ValidationError(
+                "The step parameter \"{}\" has an invalid reference \"{{{}}}\"".format(value, field))
+    return fields
+
+
+def render(value: str, context: Dict[str, Any]) -> str:
+    return "".join(
+        literal + ("" if field is None else str(context[field]))
+        for literal, field, _, _ in _formatter.parse(value)
+    )
+
+
+class PromptChainModel(BaseModel):
+    """ Prompts of a seller linked into one multi step product
+
+        Each step generates one of the seller's prompts. The parameters of
+        a step are templates over the chain's input and the outputs of
+        other steps, e.g. {"outline": "{outline}"}, and a step runs once
+        the steps it references are done. Independent steps run
+        concurrently, at most CHAIN_CONCURRENCY at a time.
+        E.g. steps = [
+            {"name": "outline", "model_name": "gpt3", "prompt_id": 1,
+             "params": {"topic": "{topic}"}},
+            {"name": "logo", "model_name": "dalle2", "prompt_id": 2,
+             "params": {"topic": "{topic}"}, "options": {"size": "256x256"}},
+            {"name": "summary", "model_name": "gpt3", "prompt_id": 3,
+             "params": {"text": "{outline}"}},
+        ]
+    """
+
+    objects = PromptModelManager()
+
+    icon = models.URLField(max_length=255, default="https://icon.ico")
+    heading = models.CharField(max_length=255)
+    description = models.TextField()
+    template_params = models.JSONField(default=list)
+    """ Input of the chain, in the format of the prompts' template_params """
+
+    steps = models.JSONField()
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.DO_NOTHING,
+        related_name="prompt_chains",
+    )
+    # whether buyers can see the chain, see PromptModelManager.update_listed
+    is_listed = models.BooleanField(default=False, editable=False)
+
+    class Meta:
+        verbose_name = _('Prompt Chain')
+        verbose_name_plural = _('Prompt Chains')
+        ordering = ('-created_at',)
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], condition=models.Q(is_listed=True),
+                         name='chain_listed_idx'),
+        ]
+
+    def __str__(self):
+        return self.heading
+
+    @property
+    def param_names(self) -> Set[str]:
+        return {param["name"] for param in self.template_params}
+
+    def get_dependencies(self) -> Dict[str, Set[str]]:
+        """ The steps each step references in its parameters """
+        names = {step["name"] for step in self.steps}
+        return {
+            step["name"]: {
+                field
+                for value in step["params"].values()
+                for field in get_references(value)
+                if field in names
+            }
+            for step in self.steps
+        }
+
+    def get_prompts(self, for_buyer: bool = False) -> Dict[str, AbstractPromptModel]:
+        """ The prompt of each step
+
+            Raises:
+                ValidationError: If a prompt is not found, or is not the
+                seller's
+        """
+        prompts = {}
+        for step in self.steps:
+            prompt_model = AbstractPromptModel.get_model(step["model_name"])
+            queryset = prompt_model.objects.active_for_buyer() if for_buyer \
+                else prompt_model.objects.active(user_id=self.user_id)  # type: ignore
+            try:
+                prompts[step["name"]] = queryset.get(pk=step["prompt_id"])
+            except prompt_model.DoesNotExist:
+                raise ValidationError(
+                    "The prompt of the step \"{}\" was not found".format(step["name"]))
+        return prompts
+
+    def validate_template_params(self):
+        if not isinstance(self.template_params, list) or not all(
+                isinstance(param, dict) and "name" in param and "description" in param
+                for param in self.template_params):
+            raise ValidationError(
+                'The template parameters must be a list. Ensure that the input has the format [{"name": "name", "description": "text description"}]')
+
+    def validate_steps(self):
+        """ Validate the steps and the graph they make
+
+            Raises:
+                ValidationError: If a step is malformed, references an
+                unknown name or a prompt of another seller, or the steps
+                depend on each other in a cycle
+        """
+        steps = self.steps
+        if not isinstance(steps, list) or not steps or not all(isinstance(step, dict) for step in steps):
+            raise ValidationError("Steps must be a non empty list of dicts")
+        if len(steps) > settings.CHAIN_MAX_STEPS:
+            raise ValidationError(
+                "A chain can have at most {} steps".format(settings.CHAIN_MAX_STEPS))
+
+        names: Set[str] = set()
+        for step in steps:
+            if not all(key in step for key in ["name", "model_name", "prompt_id", "params"]):
+                raise ValidationError(
+                    "All steps must have the keys 'name', 'model_name', 'prompt_id' and 'params'")
+            name = step["name"]
+            if not isinstance(name, str) or not name.isidentifier():
+                raise ValidationError("The step name \"{}\" is invalid".format(name))
+            if name in names or name in self.param_names:
+                raise ValidationError("The step name \"{}\" is used twice".format(name))
+            names.add(name)
+            if not isinstance(step["params"], dict) or not all(
+                    isinstance(value, str) for value in step["params"].values()):
+                raise ValidationError(
+                    "The params of the step \"{}\" must be a dict of strings".format(name))
+            if not isinstance(step.get("options", {}), dict):
+                raise ValidationError(
+                    "The options of the step \"{}\" must be a dict".format(name))
+
+        known = names | self.param_names
+        for step in steps:
+            for value in step["params"].values():
+                for field in get_references(value):
+                    if field not in known:
+                        raise ValidationError(
+                            "The step \"{}\" references the unknown \"{}\"".format(step["name"], field))
+        try:
+            topological_order(self.get_dependencies())
+        except ValueError as error:
+            raise ValidationError("The steps {}".format(error))
+
+        for name, prompt in self.get_prompts().items():
+            step = next(step for step in steps if step["name"] == name)
+            prompt_params, _ = prompt.split_generate_kwargs({
+                **{key: "" for key in step["params"]},
+                **step.get("options", {}),
+            })
+            prompt.validate_prompt(**prompt_params)
+
+    def validate_params(self, **params):
+        """ Validate the user input against the chain's template parameters
+
+            Raises:
+                ValidationError: If the user input is invalid
+        """
+        if set(params) != self.param_names:
+            raise ValidationError("Invalid parameters passed, expected {}".format(
+                ", ".join(sorted(self.param_names)) or "none"))
+
+    def run(self, user, **params) -> Dict[str, PromptOutputModel]:
+        """ Generate every step of the chain
+
+            The provider calls run on a pool of threads, the prompts are
+            rendered and the outputs recorded on the calling thread.
+            Args:
+                params (dict): The user input
+            Returns:
+                dict: The PromptOutputModel of each step, by step name
+        """
+        self.validate_params(**params)
+        steps = {step["name"]: step for step in self.steps}
+        prompts = self.get_prompts(for_buyer=True)
+        rendered: Dict[str, Any] = {}
+
+        def prepare(name: str, outputs: Dict[str, PromptOutputModel]):
+            step, prompt = steps[name], prompts[name]
+            context = {**params, **{done: output.output for done, output in outputs.items()}}
+            prompt_params, options = prompt.split_generate_kwargs({
+                **{key: render(value, context) for key, value in step["params"].items()},
+                **step.get("options", {}),
+            })
+            model_input = prompt.get_prompt(**prompt_params)
+            request_params = prompt.get_request_params(model_input, **options)
+            rendered[name] = (prompt_params, model_input)
+            return lambda: self._get_response(prompt, request_params)
+
+        def finish(name: str, response: Dict[str, Any]) -> PromptOutputModel:
+            prompt_params, model_input = rendered[name]
+            return PromptOutputModel.objects.create(**prompts[name].get_output_fields(
+                user, prompt_params, model_input, response))
+
+        with provider_scheduler.for_user(user):
+            return run_dag(
+                self.get_dependencies(),
+                prepare,
+                finish,
+                max_workers=settings.CHAIN_CONCURRENCY
+            )
+
+    @staticmethod
+    def _get_response(prompt: AbstractPromptModel, request_params: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return prompt.get_response(request_params)
+        finally:
+            # the worker thread's connection, if single-flight opened one
+            connection.close()
+
+    def save(self, *args, **kwargs):
+        self.validate_template_params()
+        self.validate_steps()
+        self.is_listed = self.is_active and type(self).objects.get_listable_sellers().filter(
+            user=self.user_id).exists()  # type: ignore
+        return super().save(*args, **kwargs)
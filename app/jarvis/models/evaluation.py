@@ -0,0 +1,227 @@
+import csv
+import os
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from datetime import timedelta
+from itertools import islice
+from core.modules.storage import SettingFileSystemStorage
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from jarvis.managers import EvaluationJobManager
+from jarvis.models.abstract import AbstractPromptModel
+from jarvis.modules.dataset import DatasetReader, get_dataset_format
+from jarvis.modules.provider import is_retryable_error, provider_scheduler
+from typing import Any, Dict, List, Optional, Tuple
+
+evaluation_storage = SettingFileSystemStorage("EVALUATION_ROOT")
+
+
+def get_evaluation_storage():
+    return evaluation_storage
+
+
+class EvaluationJobModel(models.Model):
+    """ A seller's prompt run over every row of an uploaded dataset
+
+        The dataset is a CSV or XLSX file whose columns are the prompt's
+        template params. Workers claim the job and run it a chunk of
+        EVALUATION_CHUNK_SIZE rows at a time, at most EVALUATION_CONCURRENCY
+        provider calls at once. After every chunk the outputs are appended
+        to the CSV results file and the job checkpointed, so a job whose
+        worker stops resumes from its last checkpoint. The rows of a chunk that
+        fail with a retryable provider error are run again with a backoff,
+        the results of its other rows kept with the job until then.
+    """
+    class Statuses(models.TextChoices):
+        QUEUED = 'queued', _('Queued')
+        RUNNING = 'running', _('Running')
+        SUCCEEDED = 'succeeded', _('Succeeded')
+        FAILED = 'failed', _('Failed')
+
+    objects = EvaluationJobManager()
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL,
+                             on_delete=models.CASCADE,
+                             related_name="evaluation_jobs",
+                             )
+    """ Seller who owns the prompt """
+
+    model_name = models.CharField(
+        max_length=255,
+        choices=AbstractPromptModel.Names.choices
+    )
+    prompt_id = models.PositiveIntegerField()
+    options = models.JSONField(default=dict)
+    """ Generation options e.g. {"size": "512x512"} """
+
+    dataset = models.FileField(upload_to="datasets/", storage=get_evaluation_storage)
+    results = models.FileField(upload_to="results/", storage=get_evaluation_storage,
+                               null=True, blank=True)
+    """ CSV of the dataset's columns followed by the output and error of each row """
+
+    total_rows = models.PositiveIntegerField(default=0)
+    processed_rows = models.PositiveIntegerField(default=0)
+    """ Rows whose results are checkpointed """
+    failed_rows = models.PositiveIntegerField(default=0)
+    results_size = models.PositiveBigIntegerField(default=0)
+    """ Bytes of the results file at the last checkpoint """
+    chunk_results = models.JSONField(default=dict)
+    """ [output, error] by index of the current chunk's rows that are not
+        retried, while the others are
+    """
+
+    status = models.CharField(
+        max_length=20,
+        choices=Statuses.choices,
+        default=Statuses.QUEUED,
+        db_index=True
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    """ Attempts at the current chunk """
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=255, null=True, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _('Evaluation Job')
+        verbose_name_plural = _('Evaluation Jobs')
+        ordering = ('-created_at',)
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+        ]
+
+    def __str__(self):
+        return "{} {} - {}".format(self.model_name, self.prompt_id, self.status)
+
+    def get_prompt(self) -> AbstractPromptModel:
+        return AbstractPromptModel.get_model(self.model_name).objects.active(  # type: ignore
+            user=self.user, pk=self.prompt_id).get()
+
+    @staticmethod
+    def evaluate(prompt: AbstractPromptModel, rows: List[Dict[str, str]],
+                 options: Dict[str, Any]) -> List[Tuple[str, Optional[Exception]]]:
+        """ Generate each row, returning its output or its error
+
+            The prompts are rendered on the calling thread and the provider
+            calls made on a pool of EVALUATION_CONCURRENCY threads.
+        """
+        def respond(request_params: Dict[str, Any]) -> str:
+            try:
+                return prompt.parse_response(prompt.get_response(request_params))[1]
+            finally:
+                connection.close()
+
+        results: List[Tuple[str, Optional[Exception]]] = [("", None)] * len(rows)
+        futures = {}
+        with ThreadPoolExecutor(max_workers=settings.EVALUATION_CONCURRENCY) as pool, \
+                provider_scheduler.for_user(prompt.user):
+            for index, row in enumerate(rows):
+                try:
+                    prompt_params, row_options = prompt.split_generate_kwargs({**row, **options})
+                    request_params = prompt.get_request_params(
+                        prompt.get_prompt(**prompt_params), **row_options)
+                except Exception as exc:
+                    results[index] = ("", exc)
+                    continue
+                futures[index] = pool.submit(copy_context().run, respond, request_params)
+            for index, future in futures.items():
+                try:
+                    results[index] = (future.result(), None)
+                except Exception as exc:
+                    results[index] = ("", exc)
+        return results
+
+    def evaluate_chunk(self, prompt: AbstractPromptModel,
+                       rows: List[Dict[str, str]]) -> List[Tuple[str, Optional[Exception]]]:
+        """ Evaluate the rows of the current chunk without a result kept
+            from an earlier attempt
+        """
+        results: Dict[int, Tuple[str, Optional[Exception]]] = {
+            int(index): (output, None if error is None else Exception(error))
+            for index, (output, error) in self.chunk_results.items()
+        }
+        pending = [index for index in range(len(rows)) if index not in results]
+        results.update(zip(pending, self.evaluate(
+            prompt, [rows[index] for index in pending], self.options)))
+        return [results[index] for index in range(len(rows))]
+
+    def write_results(self, header: List[str], rows: List[Dict[str, str]],
+                      results: List[Tuple[str, Optional[Exception]]]):
+        """ Append the results of a chunk past the last checkpoint """
+        if not self.results:
+            self.results.save("{}.csv".format(self.pk), ContentFile(b""), save=False)
+        path = self.results.path
+        with open(path, "r+b") as file:
+            # drop what a stopped worker wrote after the checkpoint
+            file.truncate(self.results_size)
+        with open(path, "a", encoding="utf-8", newline="") as file:
+            writer = csv.writer(file)
+            if self.results_size == 0:
+                writer.writerow(header + ["output", "error"])
+            for row, (output, error) in zip(rows, results):
+                writer.writerow([row[name] for name in header] + [
+                    output, "" if error is None else str(error)])
+            file.flush()
+            os.fsync(file.fileno())
+        self.results_size = os.path.getsize(path)
+
+    def execute(self):
+        """ Run chunks of a claimed job, checkpointing the results of each
+
+            The job is queued again once it has run for EVALUATION_CLAIM_SECONDS
+            while rows remain, so other jobs get their turn.
+        """
+        started = time.monotonic()
+        try:
+            prompt = self.get_prompt()
+            with self.dataset.open("rb") as file, \
+                    DatasetReader(file, get_dataset_format(self.dataset.name)) as reader:
+                remaining = islice(reader, self.processed_rows, None)
+                while True:
+                    rows = list(islice(remaining, settings.EVALUATION_CHUNK_SIZE))
+                    results = self.evaluate_chunk(prompt, rows)
+                    if self.attempts < self.max_attempts and any(
+                            error is not None and is_retryable_error(error) for _, error in results):
+                        # keep the rows that need no retry, the provider
+                        # calls they cost are not made again
+                        self.chunk_results = {
+                            str(index): [output, None if error is None else str(error)]
+                            for index, (output, error) in enumerate(results)
+                            if error is None or not is_retryable_error(error)
+                        }
+                        self.status = self.Statuses.QUEUED
+                        self.run_after = timezone.now() + timedelta(
+                            seconds=settings.GENERATION_JOB_RETRY_BACKOFF * 2 ** (self.attempts - 1))
+                        break
+                    self.write_results(reader.header, rows, results)
+                    self.processed_rows += len(rows)
+                    self.failed_rows += sum(error is not None for _, error in results)
+                    self.chunk_results = {}
+                    self.attempts = 0
+                    if not rows or self.processed_rows >= self.total_rows:
+                        self.status = self.Statuses.SUCCEEDED
+                        break
+                    if time.monotonic() - started >= settings.EVALUATION_CLAIM_SECONDS:
+                        self.status = self.Statuses.QUEUED
+                        break
+                    # checkpoint, renewing the lease
+                    self.locked_at = timezone.now()
+                    self.save()
+        except Exception as exc:
+            self.error = "".join(
+                traceback.format_exception_only(type(exc), exc)).strip()
+            self.status = self.Statuses.FAILED
+
+        self.locked_by = None
+        self.locked_at = None
+        self.save()
@@ -0,0 +1,22 @@
+from django.db import models
+
+
+class GenerationFlightModel(models.Model):
+    """ A provider call in flight, shared by the processes that need it
+
+        Used by SingleFlight when GENERATION_SINGLE_FLIGHT_DB is enabled.
+        The unique key is the lock: the process that inserts the row makes
+        the provider call and stores the response, the others poll for it.
+    """
+
+    key = models.CharField(max_length=64, unique=True)
+    """ make_request_key hash of the coalesced request """
+
+    response = models.JSONField(null=True, blank=True)
+    """ Provider response, set when the call completes """
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return self.key
@@ -1,8 +1,13 @@
-from django.db import models
+import logging
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.db import models
 from django.utils.translation import gettext_lazy as _
 from jarvis.models import AbstractPromptModel, PromptOutputModel
 from rest_framework.exceptions import ValidationError
+from jarvis.modules.provider import OpenAIClient
+from jarvis.modules.images import get_image_url, persist_image
+from typing import Any, Dict, List, Optional, Tuple
 
 
 class Dalle2PromptModel(AbstractPromptModel):
@@ -25,41 +30,76 @@ class Dalle2PromptModel(AbstractPromptModel):
         if size not in [size for size in self.ImageSizes.values]:
             raise ValidationError("The size you entered is invalid")
 
+    def split_generate_kwargs(self, kwargs: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        prompt_params = dict(kwargs)
+        size = prompt_params.pop("size", self.ImageSizes.MEDIUM)
+        self.validate_size(size)
+        return prompt_params, {"size": size}
+
+    def get_request_params(self, prompt: str, **options) -> Dict[str, Any]:
+        return {
+            "size": options.get("size", self.ImageSizes.MEDIUM),
+            "user": str(self.user_id),  # type: ignore
+            "prompt": prompt,
+            "response_format": "url",  # or "b64_json"
+            "n": 1,
+        }
+
+    def request(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return self.persist_images(OpenAIClient().create_image(**params))
+
+    async def arequest(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        response = await OpenAIClient().acreate_image(**params)
+        return await sync_to_async(
+            self.persist_images, thread_sensitive=False)(response)
+
+    def persist_images(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        """ Copy the generated images to the local image store
+
+            The provider's urls expire so they are replaced with the url
+            of the stored copy. An image that cannot be stored keeps the
+            provider's url.
+        """
+        if not settings.IMAGE_STORE_ENABLED:
+            return response
+        data = []
+        for item in response["data"]:
+            try:
+                digest = persist_image(item)
+            except Exception:
+                logging.exception("Unable to store generated image")
+                data.append(item)
+                continue
+            data.append({"url": get_image_url(digest), "digest": digest})
+        return {**response, "data": data}
+
+    def parse_response(self, response: Dict[str, Any]) -> Tuple[Optional[str], str]:
+        return None, response["data"][0]["url"]
+
     def generate(
         self,
         user,
         size: ImageSizes = ImageSizes.MEDIUM,
         **kwargs
     ) -> PromptOutputModel:
+        self.validate_size(size)
+        return self._generate(user, kwargs, size=size)  # type: ignore
 
+    async def agenerate(
+        self,
+        user,
+        size: ImageSizes = ImageSizes.MEDIUM,
+        **kwargs
+    ) -> PromptOutputModel:
         self.validate_size(size)
+        return await self._agenerate(user, kwargs, size=size)  # type: ignore
 
-        import openai
-        openai.api_key = settings.OPENAI_API_KEY
-        prompt = self.get_prompt(**kwargs)
-        response = openai.Image.create(
-            size=size,
-            user=str(self.user.id),
-            prompt=prompt,
-            response_format="url",  # or "b64_json"
-            n=1
-        )
-
-        output: str = response["data"][0]["url"]  # type: ignore
-        model_snapshot = self.__dict__.copy()
-        model_snapshot.pop("_state", None)
-        model_snapshot["created_at"] = model_snapshot["created_at"].isoformat()
-        model_snapshot["updated_at"] = model_snapshot["updated_at"].isoformat()
-        outputModel = PromptOutputModel.objects.create(
-            user=user,
-            input=kwargs or None,
-            output=output,
-            cost=0.0,
-            type=self.type,
-            model_name=self.name,
-            model_input=prompt,
-            model_user=self.user,
-            model_snapshot=model_snapshot
-        )
-
-        return outputModel
+    def generate_batch(
+        self,
+        user,
+        prompt_params_list: List[Dict[str, Any]],
+        **options
+    ) -> List[models.Model]:
+        options.setdefault("size", self.ImageSizes.MEDIUM)
+        self.validate_size(options["size"])
+        return self._generate_batch(user, prompt_params_list, **options)
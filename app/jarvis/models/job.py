@@ -0,0 +1,114 @@
+import traceback
+from datetime import timedelta
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from jarvis.managers import GenerationJobManager
+from jarvis.models.abstract import AbstractPromptModel
+from jarvis.models.output import PromptOutputModel
+from jarvis.modules.provider import is_retryable_error
+
+
+class GenerationJobModel(models.Model):
+    """ A generation queued to run outside of the request
+
+        Jobs are claimed and run by the run_generation_workers command.
+        Generations that fail with a retryable provider error are queued
+        again with an exponential backoff until max_attempts is reached.
+    """
+    class Statuses(models.TextChoices):
+        QUEUED = 'queued', _('Queued')
+        RUNNING = 'running', _('Running')
+        SUCCEEDED = 'succeeded', _('Succeeded')
+        FAILED = 'failed', _('Failed')
+
+    objects = GenerationJobManager()
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL,
+                             on_delete=models.CASCADE,
+                             related_name="generation_jobs",
+                             )
+    """ User who requested the generation"""
+
+    model_name = models.CharField(
+        max_length=255,
+        choices=AbstractPromptModel.Names.choices
+    )
+    prompt_id = models.PositiveIntegerField()
+    """ Id of the prompt in the table of model_name """
+
+    kwargs = models.JSONField(default=dict)
+    """ Keyword arguments of the prompt's generate method
+        E.g. {"business_name": "Vitamin Group", "size": "512x512"}
+    """
+
+    status = models.CharField(
+        max_length=20,
+        choices=Statuses.choices,
+        default=Statuses.QUEUED,
+        db_index=True
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    """ The job is not claimed before this time, used for the retry backoff """
+
+    locked_by = models.CharField(max_length=255, null=True, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+    output = models.ForeignKey(PromptOutputModel,
+                               on_delete=models.SET_NULL,
+                               related_name="+",
+                               null=True,
+                               blank=True,
+                               )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _('Generation Job')
+        verbose_name_plural = _('Generation Jobs')
+        ordering = ('-created_at',)
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+        ]
+
+    def __str__(self):
+        return "{} {} - {}".format(self.model_name, self.prompt_id, self.status)
+
+    def get_prompt(self) -> AbstractPromptModel:
+        from jarvis.models import Dalle2PromptModel, GPT3PromptModel
+        prompt_models = {
+            AbstractPromptModel.Names.GPT3: GPT3PromptModel,
+            AbstractPromptModel.Names.DALLE2: Dalle2PromptModel,
+        }
+        return prompt_models[self.model_name].objects.active_for_buyer().get(  # type: ignore
+            pk=self.prompt_id)
+
+    def execute(self):
+        """ Run the generation of a claimed job and record the result
+
+            Retryable provider errors queue the job again while attempts
+            remain, any other error fails it.
+        """
+        try:
+            output = self.get_prompt().generate(self.user, **self.kwargs)
+        except Exception as exc:
+            self.error = "".join(
+                traceback.format_exception_only(type(exc), exc)).strip()
+            if is_retryable_error(exc) and self.attempts < self.max_attempts:
+                self.status = self.Statuses.QUEUED
+                self.run_after = timezone.now() + timedelta(
+                    seconds=settings.GENERATION_JOB_RETRY_BACKOFF * 2 ** (self.attempts - 1))
+            else:
+                self.status = self.Statuses.FAILED
+        else:
+            self.output = output
+            self.error = None
+            self.status = self.Statuses.SUCCEEDED
+
+        self.locked_by = None
+        self.locked_at = None
+        self.save()
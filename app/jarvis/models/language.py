@@ -1,7 +1,19 @@
-from django.db import models
 from django.conf import settings
+from django.db import models
 from django.utils.translation import gettext_lazy as _
 from jarvis.models import AbstractPromptModel, PromptOutputModel
+from jarvis.modules.provider import (
+    OpenAIClient,
+    CompletionStream,
+    clamp_max_tokens,
+    generation_cache,
+    hedger,
+    make_request_key,
+    max_tokens_advisor,
+    provider_scheduler,
+    single_flight
+)
+from typing import Any, Dict, List, Optional, Tuple
 
 
 class GPT3PromptModel(AbstractPromptModel):
@@ -54,40 +66,137 @@ class GPT3PromptModel(AbstractPromptModel):
         self._validate_model()
         return super().save(*args, **kwargs)
 
-    def generate(self, user, **kwargs) -> PromptOutputModel:
-        import openai
-        openai.api_key = settings.OPENAI_API_KEY
-        prompt = self.get_prompt(**kwargs)
+    def get_request_params(self, prompt: str, **options) -> Dict[str, Any]:
+        return self._get_request_params(prompt, self.get_learned_max_tokens())
 
-        response = openai.Completion.create(
-            model=self.model,
-            temperature=self.temparature,
-            max_tokens=self.max_tokens,
-            top_p=self.top_p,
-            frequency_penalty=self.frequency_penalty,
-            presence_penalty=self.presence_penalty,
-            user=str(self.user.id),
-            prompt=prompt,
-            echo=False,
-            stream=False,
-        )
+    async def aget_request_params(self, prompt: str, **options) -> Dict[str, Any]:
+        return self._get_request_params(prompt, await self.aget_learned_max_tokens())
+
+    def _get_request_params(self, prompt: str, learned_max_tokens: Optional[int]) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "temperature": self.temparature,
+            "max_tokens": clamp_max_tokens(
+                self.model, prompt, self.max_tokens, cap=learned_max_tokens),
+            "top_p": self.top_p,
+            "frequency_penalty": self.frequency_penalty,
+            "presence_penalty": self.presence_penalty,
+            "user": str(self.user_id),  # type: ignore
+            "prompt": prompt,
+            "echo": False,
+            "stream": False,
+        }
 
-        output = response["choices"][0]["text"]  # type: ignore
-        model_snapshot = self.__dict__.copy()
-        model_snapshot.pop("_state", None)
-        model_snapshot["created_at"] = model_snapshot["created_at"].isoformat()
-        model_snapshot["updated_at"] = model_snapshot["updated_at"].isoformat()
-        outputModel = PromptOutputModel.objects.create(
-            uid=response["id"],  # type: ignore
-            user=user,
-            input=kwargs or None,
-            output=output,
-            cost=0.0,
-            type=self.type,
+    def get_past_outputs(self) -> models.QuerySet:
+        """ The outputs most recently generated from this prompt, newest first """
+        return PromptOutputModel.objects.filter(
             model_name=self.name,
-            model_input=prompt,
-            model_user=self.user,
-            model_snapshot=model_snapshot
-        )
+            prompt_id=self.pk
+        ).order_by("-created_at").values_list("output", flat=True)
+
+    def get_learned_max_tokens(self) -> Optional[int]:
+        """ max_tokens cap fitting the lengths of the prompt's past outputs
+
+            Learned at most once per GENERATION_LEARN_MAX_TOKENS_TTL, None
+            until the prompt has enough outputs.
+        """
+        if not settings.GENERATION_LEARN_MAX_TOKENS or self.pk is None:
+            return None
+        found, cap = max_tokens_advisor.get(self.pk)
+        if found:
+            return cap
+        window = settings.GENERATION_LEARN_MAX_TOKENS_WINDOW
+        return max_tokens_advisor.learn(self.pk, self.get_past_outputs()[:window])
+
+    async def aget_learned_max_tokens(self) -> Optional[int]:
+        if not settings.GENERATION_LEARN_MAX_TOKENS or self.pk is None:
+            return None
+        found, cap = max_tokens_advisor.get(self.pk)
+        if found:
+            return cap
+        window = settings.GENERATION_LEARN_MAX_TOKENS_WINDOW
+        return max_tokens_advisor.learn(
+            self.pk, [output async for output in self.get_past_outputs()[:window]])
+
+    def get_request_key(self, params: Dict[str, Any]) -> str:
+        # keyed on the prompt's max_tokens rather than the clamped one, so
+        # the cached responses outlive the learned cap being relearned
+        return make_request_key(self.name, {**params, "max_tokens": self.max_tokens})  # type: ignore
+
+    @property
+    def hedge_enabled(self) -> bool:
+        return self.model in settings.GENERATION_HEDGE_MODELS
 
-        return outputModel
+    def request(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        if self.hedge_enabled:
+            return hedger.do(self.model, lambda: OpenAIClient().create_completion(**params))
+        return OpenAIClient().create_completion(**params)
+
+    async def arequest(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        if self.hedge_enabled:
+            return await hedger.ado(self.model, lambda: OpenAIClient().acreate_completion(**params))
+        return await OpenAIClient().acreate_completion(**params)
+
+    def parse_response(self, response: Dict[str, Any]) -> Tuple[Optional[str], str]:
+        return response["id"], response["choices"][0]["text"]
+
+    def get_batch_responses(self, params_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """ Send every prompt of the batch in one multi-prompt completion
+
+            The params only differ by their prompt. Each choice is matched
+            back to its prompt by index and returned as its own response.
+            Like get_response, identical concurrent batches share one call
+            and the cached responses are served if the call fails.
+        """
+        responses: List[Optional[Dict[str, Any]]] = [None] * len(params_list)
+        keys = [self.get_request_key(params) for params in params_list]
+        if self.cache_enabled:
+            responses = [generation_cache.get(key) for key in keys]
+
+        missing = [i for i, response in enumerate(responses) if response is None]
+        if missing:
+            params = {
+                **params_list[missing[0]],
+                "prompt": [params_list[i]["prompt"] for i in missing],
+                # the longest prompt sets the room left for every completion
+                "max_tokens": min(params_list[i]["max_tokens"] for i in missing),
+            }
+            try:
+                if settings.GENERATION_SINGLE_FLIGHT:
+                    response = single_flight.do(
+                        self.get_request_key(params), lambda: self.request(params))
+                else:
+                    response = self.request(params)
+            except Exception:
+                stale = [generation_cache.get_stale(keys[i]) if self.cache_enabled else None
+                         for i in missing]
+                if any(cached is None for cached in stale):
+                    raise
+                for i, cached in zip(missing, stale):
+                    responses[i] = cached
+                return responses  # type: ignore
+            for choice in response["choices"]:
+                i = missing[choice["index"]]
+                responses[i] = {"id": response["id"], "choices": [choice]}
+                if self.cache_enabled:
+                    generation_cache.set(keys[i], responses[i], self.cache_ttl)  # type: ignore
+        return responses  # type: ignore
+
+    def generate(self, user, **kwargs) -> PromptOutputModel:
+        return self._generate(user, kwargs)  # type: ignore
+
+    async def agenerate(self, user, **kwargs) -> PromptOutputModel:
+        return await self._agenerate(user, kwargs)  # type: ignore
+
+    def generate_stream(self, user, **kwargs) -> CompletionStream:
+        prompt = self.get_prompt(**kwargs)
+        with provider_scheduler.for_user(user):
+            chunks = OpenAIClient().stream_completion(
+                **self.get_request_params(prompt)
+            )
+        return CompletionStream(
+            chunks,
+            lambda response: PromptOutputModel.objects.create(
+                **self.get_output_fields(user, kwargs, prompt, response)
+            )
+        )
@@ -4,6 +4,8 @@ from django.db import models
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 from jarvis.models.abstract import AbstractPromptModel
+from jarvis.models.version import PromptVersionModel
+from typing import Any, Dict, Optional
 
 
 class PromptOutputModel(BaseModel):
@@ -69,9 +71,22 @@ class PromptOutputModel(BaseModel):
                                    )
     """ User who owns the model used to generate the output"""
 
+    model_version = models.ForeignKey(PromptVersionModel,
+                                      on_delete=models.PROTECT,
+                                      related_name="outputs",
+                                      null=True,
+                                      blank=True,
+                                      )
+    """ Version of the model used to generate the output"""
+
+    prompt_id = models.PositiveBigIntegerField(null=True, blank=True)
+    """ Id of the prompt of model_name the output was generated from,
+        kept across the prompt's versions
+    """
 
-    model_snapshot = models.JSONField()
-    """ JSON snapshot of the model used to generate the output
+    model_snapshot = models.JSONField(null=True, blank=True)
+    """ Legacy JSON snapshot of the model used to generate the output,
+        outputs now reference a model_version instead
         i.e model.__dict__
         E.g. {
             "name": "gpt3",
@@ -94,6 +109,17 @@ class PromptOutputModel(BaseModel):
         verbose_name = _('Prompt Output')
         verbose_name_plural = _('Prompt Outputs')
         ordering = ('-created_at',)
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='output_user_newest_idx'),
+            models.Index(fields=['model_name', 'prompt_id', '-created_at'], name='output_prompt_newest_idx'),
+        ]
 
     def __str__(self):
         return "{} - {}".format(self.user, self.uid)
+
+    @property
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        """ Snapshot of the model used to generate the output """
+        if self.model_version_id:  # type: ignore
+            return self.model_version.snapshot  # type: ignore
+        return self.model_snapshot
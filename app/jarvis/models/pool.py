@@ -0,0 +1,75 @@
+import hashlib
+import json
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+from jarvis.managers import PooledOutputManager
+from jarvis.models.abstract import AbstractPromptModel
+from jarvis.models.version import PromptVersionModel
+from typing import Any, Dict
+
+
+def make_pool_key(prompt_params: Dict[str, Any], options: Dict[str, Any]) -> str:
+    """ Hash identifying the input a pooled output was generated for """
+    payload = json.dumps(
+        {"input": prompt_params, "options": options},
+        sort_keys=True,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PooledOutputModel(models.Model):
+    """ An output generated ahead of the buyers of a pooled prompt
+
+        Workers keep pool_size fresh outputs of each of the prompt's pool
+        inputs. A buyer generating one of those inputs is handed a pooled
+        output, recorded as their own PromptOutputModel, instead of waiting
+        for the provider. Outputs of an older version of the prompt or
+        older than the prompt's pool_ttl are not handed out.
+    """
+
+    objects = PooledOutputManager()
+
+    model_name = models.CharField(
+        max_length=255,
+        choices=AbstractPromptModel.Names.choices
+    )
+    prompt_id = models.PositiveIntegerField()
+    """ Id of the prompt in the table of model_name """
+
+    version = models.ForeignKey(PromptVersionModel,
+                                on_delete=models.CASCADE,
+                                related_name="+",
+                                null=True,
+                                blank=True,
+                                )
+    """ Version of the prompt the output was generated from """
+
+    key = models.CharField(max_length=64)
+    """ make_pool_key hash of the input """
+
+    input = models.JSONField(default=dict)
+    options = models.JSONField(default=dict)
+    """ Generation options e.g. {"size": "512x512"} """
+
+    model_input = models.TextField()
+    response = models.JSONField()
+    """ Provider response, parsed by the prompt when handed out """
+
+    expires_at = models.DateTimeField()
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    """ When the output was handed out, claimed outputs are kept for the
+        refill rate limit and then purged """
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _('Pooled Output')
+        verbose_name_plural = _('Pooled Outputs')
+        ordering = ('created_at',)
+        indexes = [
+            models.Index(fields=['model_name', 'prompt_id', 'key']),
+        ]
+
+    def __str__(self):
+        return "{} {} - {}".format(self.model_name, self.prompt_id, self.key[:12])
@@ -0,0 +1,26 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+from jarvis.managers import RenderedOutputManager
+
+
+class RenderedOutputModel(models.Model):
+    """ The html of a text output's markdown, rendered once
+
+        Renders are content addressed so outputs with the same text share
+        one row, see jarvis.modules.markdown.make_content_hash.
+    """
+
+    objects = RenderedOutputManager()
+
+    hash = models.CharField(max_length=64, unique=True)
+    """ make_content_hash of the rendered text """
+
+    html = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _('Rendered Output')
+        verbose_name_plural = _('Rendered Outputs')
+
+    def __str__(self):
+        return self.hash
@@ -0,0 +1,41 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+from jarvis.managers import PromptSearchIndexManager
+from jarvis.models.abstract import AbstractPromptModel
+
+
+class PromptSearchIndexModel(models.Model):
+    """ The searchable text of each listed prompt
+
+        Kept current by AbstractPromptModel.save. The full-text structures
+        over it are specific to the database: a weighted tsvector column
+        with a GIN index on Postgres, an FTS5 table kept in sync by
+        triggers on SQLite. See jarvis.modules.search.
+    """
+
+    objects = PromptSearchIndexManager()
+
+    model_name = models.CharField(
+        max_length=255, choices=AbstractPromptModel.Names.choices)
+    prompt_id = models.PositiveBigIntegerField()
+
+    title = models.CharField(max_length=255)
+    """ The heading, ranked above the body """
+
+    body = models.TextField()
+    """ The description, parameters and template """
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _('Prompt Search Index')
+        verbose_name_plural = _('Prompt Search Index')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['model_name', 'prompt_id'],
+                name='unique_prompt_search_index'
+            ),
+        ]
+
+    def __str__(self):
+        return "{}:{}".format(self.model_name, self.prompt_id)
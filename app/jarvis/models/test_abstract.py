@@ -1,7 +1,9 @@
 # from jarvis.models import AbstractPromptModel, CompletionModel
 from django.test import TestCase
 from jarvis.models import (
-    GPT3PromptModel
+    GPT3PromptModel,
+    PromptChainModel,
+    PromptVersionModel
 )
 from account.models import User,Seller
 from rest_framework.exceptions import ValidationError
@@ -386,6 +388,60 @@ class AbstractPromptModelTest(TestCase):
             """
         )
 
+    def test_get_compiled_template(self):
+        compiled = self.prompt.get_compiled_template()
+        # every request loads its own instance of the prompt
+        self.assertIs(
+            self.concrete_model.objects.get(pk=self.prompt.pk).get_compiled_template(),
+            compiled
+        )
+
+        self.prompt.template = self.prompt.template.replace("sample", "new")
+        self.prompt.save()
+        prompt = self.concrete_model.objects.get(pk=self.prompt.pk)
+        self.assertIsNot(prompt.get_compiled_template(), compiled)
+        self.assertIn("This is a new template", prompt.get_prompt(
+            business_name="Test Business",
+            business_type="Test Type"
+        ))
+
+    def test_version(self):
+        version = self.prompt.version
+        self.assertIsNotNone(version)
+        self.assertEqual(version.snapshot["template"], self.prompt.template)
+
+        # saving without edits keeps the version
+        self.prompt.save()
+        self.assertEqual(self.prompt.version_id, version.pk)
+
+        self.prompt.description = "New Description"
+        self.prompt.save()
+        self.assertNotEqual(self.prompt.version_id, version.pk)
+        self.assertEqual(
+            self.concrete_model.objects.get(pk=self.prompt.pk).version_id,
+            self.prompt.version_id
+        )
+        self.assertEqual(PromptVersionModel.objects.count(), 2)
+
+    def test_version_operational_fields(self):
+        version = self.prompt.version
+        self.prompt.cache_enabled = True
+        self.prompt.pool_ttl = 2 * 60 * 60
+        self.prompt.save()
+        self.seller.delete()
+        self.prompt.save()
+        self.assertFalse(self.prompt.is_listed)
+        self.assertEqual(self.prompt.version_id, version.pk)
+        self.assertEqual(PromptVersionModel.objects.count(), 1)
+
+    def test_version_shared(self):
+        # prompts with the same content share a version
+        self.prompt.save()
+        self.assertEqual(
+            PromptVersionModel.objects.get_for_snapshot(self.prompt.get_snapshot()),
+            self.prompt.version
+        )
+
     def test_delete(self):
         self.assertEqual(
             self.concrete_model.objects.first().is_active,  # type: ignore
@@ -396,3 +452,82 @@ class AbstractPromptModelTest(TestCase):
             self.concrete_model.objects.first().is_active,  # type: ignore
             0
         )
+
+
+class PromptListingTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(  # type: ignore
+            username="testuser",
+            email="testuser@email.co",
+            password="testpassword",
+            is_verified=True,
+        )
+        self.seller: Seller = Seller.objects.create(  # type: ignore
+            user=self.user,
+            handle='testhandle',
+            name='Test Name',
+        )
+        self.prompt = GPT3PromptModel.objects.create(
+            heading="Slogans",
+            description="Slogans",
+            template="A slogan for {business}",
+            template_params=[{"name": "business", "description": "The business"}],
+            user=self.user,
+        )
+        self.chain = PromptChainModel.objects.create(
+            heading="Chain",
+            description="Chain",
+            template_params=[{"name": "business", "description": "The business"}],
+            steps=[{"name": "slogan", "model_name": "gpt3", "prompt_id": self.prompt.pk,
+                    "params": {"business": "{business}"}}],
+            user=self.user,
+        )
+
+    def assertListed(self, listed):
+        for model, pk in ((GPT3PromptModel, self.prompt.pk), (PromptChainModel, self.chain.pk)):
+            self.assertEqual(model.objects.get(pk=pk).is_listed, listed)
+            self.assertEqual(model.objects.active_for_buyer().filter(pk=pk).exists(), listed)
+
+    def test_listed(self):
+        self.assertListed(True)
+
+    def test_prompt_deleted(self):
+        self.prompt.delete()
+        self.assertFalse(GPT3PromptModel.objects.get(pk=self.prompt.pk).is_listed)
+        self.prompt.restore()
+        self.assertTrue(GPT3PromptModel.objects.get(pk=self.prompt.pk).is_listed)
+
+    def test_seller_deactivated(self):
+        self.seller.delete()
+        self.assertListed(False)
+        self.seller.restore()
+        self.assertListed(True)
+
+    def test_seller_hard_deleted(self):
+        Seller.objects.filter(pk=self.seller.pk).delete()
+        self.assertListed(False)
+
+    def test_user_unverified(self):
+        self.user.is_verified = False
+        self.user.save()
+        self.assertListed(False)
+        self.user.is_verified = True
+        self.user.save(update_fields=["is_verified"])
+        self.assertListed(True)
+
+    def test_user_deactivated(self):
+        self.user.is_active = False
+        self.user.save()
+        self.assertListed(False)
+
+    def test_update_listed(self):
+        # bulk updates send no signals
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertTrue(GPT3PromptModel.objects.get(pk=self.prompt.pk).is_listed)
+        GPT3PromptModel.objects.update_listed()
+        PromptChainModel.objects.update_listed()
+        self.assertListed(False)
+
+    def test_single_table(self):
+        query = str(GPT3PromptModel.objects.active_for_buyer().query)
+        self.assertNotIn("JOIN", query)
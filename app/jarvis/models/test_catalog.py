@@ -0,0 +1,114 @@
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from jarvis.modules.provider.testing import patch_completion
+from account.models import User, Seller
+from jarvis.models import (
+    Dalle2PromptModel,
+    GPT3PromptModel,
+    PromptCatalogModel,
+)
+
+
+class PromptCatalogModelTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(
+            email='test@example.com',
+            username='test@example.com',
+            is_verified=True,
+        )
+        self.seller = Seller.objects.create(
+            user=self.user, handle='testhandle', name='Test Name')
+        self.prompt = GPT3PromptModel.objects.create(
+            heading="Slogans",
+            description="Business slogans",
+            template="Write a slogan for {business}",
+            template_params=[{"name": "business", "description": "The business"}],
+            user=self.user
+        )
+
+    def get_entry(self, prompt=None):
+        prompt = prompt or self.prompt
+        return PromptCatalogModel.objects.get(model_name=prompt.name, prompt_id=prompt.pk)
+
+    def test_listed(self):
+        image = Dalle2PromptModel.objects.create(
+            heading="Posters",
+            description="Posters",
+            template="A poster of {thing}",
+            template_params=[{"name": "thing", "description": "The thing"}],
+            user=self.user
+        )
+        entry = self.get_entry()
+        self.assertEqual(entry.type, "text")
+        self.assertEqual(entry.seller_handle, "testhandle")
+        self.assertEqual(entry.created_at, self.prompt.created_at)
+        self.assertEqual(entry.version_id, self.prompt.version_id)
+        self.assertEqual(self.get_entry(image).type, "image")
+
+    def test_updated(self):
+        self.prompt.heading = "Taglines"
+        self.prompt.save()
+        entry = self.get_entry()
+        self.assertEqual(entry.heading, "Taglines")
+        self.assertEqual(entry.version_id, self.prompt.version_id)
+
+    def test_soft_delete(self):
+        self.prompt.delete()
+        self.assertFalse(PromptCatalogModel.objects.exists())
+        self.prompt.restore()
+        self.assertTrue(PromptCatalogModel.objects.exists())
+
+    def test_seller_deactivated(self):
+        self.seller.is_active = False
+        self.seller.save()
+        self.assertFalse(PromptCatalogModel.objects.exists())
+        self.seller.is_active = True
+        self.seller.save()
+        self.assertEqual(self.get_entry().heading, "Slogans")
+
+    def test_seller_renamed(self):
+        self.seller.handle = "newhandle"
+        self.seller.save()
+        self.assertEqual(self.get_entry().seller_handle, "newhandle")
+
+    def test_user_unverified(self):
+        self.user.is_verified = False
+        self.user.save()
+        self.assertFalse(PromptCatalogModel.objects.exists())
+        self.user.verify()
+        self.assertTrue(PromptCatalogModel.objects.exists())
+
+    def test_seller_deleted(self):
+        self.seller.delete()
+        self.assertFalse(PromptCatalogModel.objects.exists())
+
+    def test_user_save_other_fields(self):
+        with self.assertNumQueries(1):
+            self.user.save(update_fields=["first_name"])
+
+    def test_output_count(self):
+        response = {
+            "id": "cmpl",
+            "choices": [{"text": "output", "index": index} for index in range(2)]
+        }
+        with patch_completion(return_value=response):
+            self.prompt.generate(self.user, business="Vitamins")
+            self.prompt.generate_batch(
+                self.user, [{"business": "Minerals"}, {"business": "Herbs"}])
+        # generating leaves the row alone, the workers recount
+        self.assertEqual(self.get_entry().output_count, 0)
+        with self.assertNumQueries(1):
+            PromptCatalogModel.objects.update_output_counts()
+        self.assertEqual(self.get_entry().output_count, 3)
+
+    def test_rebuild(self):
+        PromptCatalogModel.objects.all().delete()
+        GPT3PromptModel.objects.filter(pk=self.prompt.pk).update(heading="Taglines")
+        self.assertEqual(PromptCatalogModel.objects.rebuild(), 1)
+        self.assertEqual(self.get_entry().heading, "Taglines")
+
+        Seller.objects.filter(pk=self.seller.pk).update(is_active=False)
+        call_command("update_listing", stdout=StringIO())
+        self.assertFalse(PromptCatalogModel.objects.exists())
+        self.assertEqual(PromptCatalogModel.objects.rebuild(), 0)
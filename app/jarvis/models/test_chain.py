@@ -0,0 +1,140 @@
+from django.test import TestCase, override_settings
+from rest_framework.exceptions import ValidationError
+from jarvis.models import (
+    Dalle2PromptModel,
+    GPT3PromptModel,
+    PromptChainModel,
+    PromptOutputModel
+)
+from account.models import User, Seller
+from unittest.mock import patch
+from jarvis.modules.provider.testing import patch_completion
+
+
+class PromptChainModelTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(  # type: ignore
+            username="testuser",
+            email="testuser@email.co",
+            password="testpassword",
+            is_verified=True,
+        )
+        self.seller: Seller = Seller.objects.create(  # type: ignore
+            user=self.user,
+            handle='testhandle',
+            name='Test Name',
+        )
+        self.outline = self.create_prompt("Outline an article about {topic}", "topic")
+        self.section = self.create_prompt("Write the section of {outline}", "outline")
+        self.summary = self.create_prompt("Summarize {text}", "text")
+        self.logo = Dalle2PromptModel.objects.create(
+            icon="https://www.google.com",
+            heading="Logo",
+            description="Logo",
+            template="A logo about {topic}",
+            template_params=[{"name": "topic", "description": "The topic"}],
+            user=self.user
+        )
+        self.steps = [
+            self.step("outline", self.outline, topic="{topic}"),
+            self.step("intro", self.section, outline="Intro of {outline}"),
+            self.step("body", self.section, outline="Body of {outline}"),
+            self.step("summary", self.summary, text="{intro}\n{body}"),
+        ]
+
+    def create_prompt(self, template, param):
+        return GPT3PromptModel.objects.create(
+            icon="https://www.google.com",
+            heading=template,
+            description=template,
+            template=template,
+            template_params=[{"name": param, "description": param}],
+            user=self.user
+        )
+
+    def step(self, name, prompt, **params):
+        return {"name": name, "model_name": prompt.name, "prompt_id": prompt.pk, "params": params}
+
+    def create_chain(self, steps):
+        return PromptChainModel.objects.create(
+            heading="Article",
+            description="An article in sections",
+            template_params=[{"name": "topic", "description": "The topic"}],
+            steps=steps,
+            user=self.user
+        )
+
+    def test_run(self):
+        chain = self.create_chain(self.steps)
+
+        def create(**params):
+            # echo the prompt so the outputs show what each step was sent
+            return {"id": "cmpl-1", "choices": [{"index": 0, "text": "<{}>".format(params["prompt"])}]}
+
+        with patch_completion(side_effect=create) as mock:
+            outputs = chain.run(self.user, topic="tea")
+        self.assertEqual(mock.call_count, 4)
+        self.assertEqual(outputs["outline"].output, "<Outline an article about tea>")
+        self.assertEqual(
+            outputs["intro"].output, "<Write the section of Intro of <Outline an article about tea>>")
+        self.assertEqual(outputs["summary"].input, {
+            "text": "{}\n{}".format(outputs["intro"].output, outputs["body"].output)})
+        # an output is recorded for every step
+        self.assertEqual(PromptOutputModel.objects.filter(user=self.user).count(), 4)
+
+    def test_run_image_step(self):
+        step = self.step("logo", self.logo, topic="{topic}")
+        step["options"] = {"size": Dalle2PromptModel.ImageSizes.SMALL}
+        chain = self.create_chain([self.steps[0], step])
+        with patch_completion(return_value={"id": "cmpl-1", "choices": [{"index": 0, "text": "Outline"}]}), \
+                patch("jarvis.modules.provider.OpenAIClient.create_image",
+                      return_value={"data": [{"url": "https://example.com/image.png"}]}) as mock:
+            outputs = chain.run(self.user, topic="tea")
+        self.assertEqual(mock.call_args.kwargs["size"], Dalle2PromptModel.ImageSizes.SMALL)
+        self.assertEqual(outputs["logo"].output, "https://example.com/image.png")
+
+    def test_run_invalid_params(self):
+        chain = self.create_chain(self.steps)
+        with self.assertRaises(ValidationError):
+            chain.run(self.user, subject="tea")
+
+    def test_run_step_failed(self):
+        chain = self.create_chain(self.steps)
+        with patch_completion(side_effect=Exception("provider error")), \
+                self.assertRaises(Exception):
+            chain.run(self.user, topic="tea")
+        self.assertEqual(PromptOutputModel.objects.count(), 0)
+
+    def test_validate_steps(self):
+        invalid = [
+            [],
+            [{"name": "outline"}],
+            [self.steps[0], self.steps[0]],
+            [self.step("outline", self.outline, topic="{subject}")],
+            [self.step("outline", self.outline, subject="{topic}")],
+            [self.step("outline", self.outline, topic="{topic")],
+            [self.step("a", self.section, outline="{b}"), self.step("b", self.section, outline="{a}")],
+            [{**self.steps[0], "model_name": "gpt4"}],
+            [{**self.steps[0], "prompt_id": self.outline.pk + 100}],
+        ]
+        for steps in invalid:
+            with self.subTest(steps=steps), self.assertRaises(ValidationError):
+                self.create_chain(steps)
+
+    def test_validate_steps_other_seller(self):
+        other = User.objects.create_user(  # type: ignore
+            username="other", email="other@email.co", password="testpassword")
+        Seller.objects.create(user=other, handle='other', name='Other')
+        with self.assertRaises(ValidationError):
+            PromptChainModel.objects.create(
+                heading="Article",
+                description="An article",
+                template_params=[{"name": "topic", "description": "The topic"}],
+                steps=self.steps,
+                user=other
+            )
+
+    @override_settings(CHAIN_MAX_STEPS=3)
+    def test_validate_max_steps(self):
+        with self.assertRaises(ValidationError):
+            self.create_chain(self.steps)
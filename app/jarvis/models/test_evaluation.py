@@ -0,0 +1,149 @@
+import csv
+import shutil
+import tempfile
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from jarvis.models import EvaluationJobModel, GPT3PromptModel
+from account.models import User, Seller
+from openai import error
+from unittest.mock import patch
+from jarvis.modules.provider.testing import patch_completion
+
+
+class EvaluationJobModelTest(TestCase):
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        settings_override = override_settings(
+            EVALUATION_ROOT=root, EVALUATION_CHUNK_SIZE=2, GENERATION_JOB_RETRY_BACKOFF=0)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(  # type: ignore
+            username="testuser",
+            email="testuser@email.co",
+            password="testpassword",
+            is_verified=True,
+        )
+        Seller.objects.create(user=self.user, handle='testhandle', name='Test Name')
+        self.prompt = GPT3PromptModel.objects.create(
+            heading="Slogan",
+            description="Slogan",
+            template="A slogan for {business_name}",
+            template_params=[{"name": "business_name", "description": "The name"}],
+            user=self.user
+        )
+        names = ["Vitamin Group", "Tea Ltd", "Orange Group", "Bean Co", "Leaf Inc"]
+        self.job = EvaluationJobModel.objects.enqueue(
+            self.user,
+            self.prompt,
+            ContentFile("business_name\n{}\n".format("\n".join(names)).encode(), name="names.csv"),
+            total_rows=len(names),
+            options={},
+        )
+
+    def complete(self, **params):
+        return {"id": "cmpl-1", "choices": [{"index": 0, "text": params["prompt"].upper()}]}
+
+    def run_job(self, claim_seconds=60, **patch_kwargs):
+        with override_settings(EVALUATION_CLAIM_SECONDS=claim_seconds), \
+                patch_completion(**patch_kwargs) as mock:
+            job = EvaluationJobModel.objects.claim("worker-1")
+            job.execute()
+        job.refresh_from_db()
+        return job, mock
+
+    def read_results(self, job):
+        with job.results.open("r") as file:
+            return list(csv.reader(file))
+
+    def test_execute(self):
+        job, mock = self.run_job(side_effect=self.complete)
+        self.assertEqual(mock.call_count, 5)
+        self.assertEqual(job.status, EvaluationJobModel.Statuses.SUCCEEDED)
+        self.assertEqual(job.processed_rows, 5)
+        rows = self.read_results(job)
+        self.assertEqual(rows[0], ["business_name", "output", "error"])
+        self.assertEqual(rows[1], ["Vitamin Group", "A SLOGAN FOR VITAMIN GROUP", ""])
+        self.assertEqual(len(rows), 6)
+
+    def test_execute_resumes(self):
+        # a chunk per claim
+        job, _ = self.run_job(claim_seconds=0, side_effect=self.complete)
+        self.assertEqual(job.status, EvaluationJobModel.Statuses.QUEUED)
+        self.assertEqual(job.processed_rows, 2)
+
+        # a worker stopped after writing rows past the checkpoint
+        with open(job.results.path, "a") as file:
+            file.write("Orange Group,LOST,\n")
+        job, mock = self.run_job(side_effect=self.complete)
+        self.assertEqual(mock.call_count, 3)
+        self.assertEqual(job.status, EvaluationJobModel.Statuses.SUCCEEDED)
+        rows = self.read_results(job)
+        self.assertEqual([row[0] for row in rows[1:]],
+                         ["Vitamin Group", "Tea Ltd", "Orange Group", "Bean Co", "Leaf Inc"])
+        self.assertNotIn("LOST", [row[1] for row in rows])
+
+    def test_execute_row_errors(self):
+        def complete(**params):
+            if "Tea" in params["prompt"]:
+                raise error.InvalidRequestError("Invalid prompt", None)
+            return self.complete(**params)
+
+        job, _ = self.run_job(side_effect=complete)
+        self.assertEqual(job.status, EvaluationJobModel.Statuses.SUCCEEDED)
+        self.assertEqual(job.failed_rows, 1)
+        self.assertEqual(self.read_results(job)[2], ["Tea Ltd", "", "Invalid prompt"])
+
+    def test_execute_retryable(self):
+        job, _ = self.run_job(side_effect=error.RateLimitError("Rate limited"))
+        # the chunk is run again rather than recorded as failed
+        self.assertEqual(job.status, EvaluationJobModel.Statuses.QUEUED)
+        self.assertEqual(job.processed_rows, 0)
+        self.assertFalse(job.results)
+
+        job, _ = self.run_job(side_effect=self.complete)
+        self.assertEqual(job.status, EvaluationJobModel.Statuses.SUCCEEDED)
+        self.assertEqual(job.failed_rows, 0)
+
+    def test_execute_retryable_rows(self):
+        def complete(**params):
+            if "Tea" in params["prompt"]:
+                raise error.RateLimitError("Rate limited")
+            return self.complete(**params)
+
+        job, mock = self.run_job(claim_seconds=0, side_effect=complete)
+        self.assertEqual(mock.call_count, 2)
+        self.assertEqual(job.status, EvaluationJobModel.Statuses.QUEUED)
+        self.assertEqual(job.chunk_results, {"0": ["A SLOGAN FOR VITAMIN GROUP", None]})
+
+        # only the rate limited row of the chunk is generated again
+        job, mock = self.run_job(side_effect=self.complete)
+        self.assertEqual(mock.call_args_list[0].kwargs["prompt"], "A slogan for Tea Ltd")
+        self.assertEqual(mock.call_count, 4)
+        self.assertEqual(job.status, EvaluationJobModel.Statuses.SUCCEEDED)
+        self.assertEqual(job.chunk_results, {})
+        rows = self.read_results(job)
+        self.assertEqual(rows[1], ["Vitamin Group", "A SLOGAN FOR VITAMIN GROUP", ""])
+        self.assertEqual(rows[2], ["Tea Ltd", "A SLOGAN FOR TEA LTD", ""])
+
+    def test_execute_retryable_errors_kept(self):
+        def complete(**params):
+            if "Tea" in params["prompt"]:
+                raise error.RateLimitError("Rate limited")
+            raise error.InvalidRequestError("Invalid prompt", None)
+
+        job, _ = self.run_job(side_effect=complete)
+        self.assertEqual(job.chunk_results, {"0": ["", "Invalid prompt"]})
+
+        # the row that failed for good is not generated again
+        job, mock = self.run_job(side_effect=self.complete)
+        self.assertEqual(mock.call_count, 4)
+        self.assertEqual(job.failed_rows, 1)
+        self.assertEqual(self.read_results(job)[1], ["Vitamin Group", "", "Invalid prompt"])
+
+    def test_execute_prompt_deleted(self):
+        self.prompt.delete()
+        job, _ = self.run_job(side_effect=self.complete)
+        self.assertEqual(job.status, EvaluationJobModel.Statuses.FAILED)
+        self.assertIn("DoesNotExist", job.error)
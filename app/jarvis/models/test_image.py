@@ -4,7 +4,14 @@ from jarvis.models import (
     PromptOutputModel
 )
 from account.models import User, Seller
+import hashlib
+import tempfile
+from django.test import override_settings
+from django.urls import reverse
+from jarvis.modules.images import get_image_store
+from unittest import mock
 from unittest.mock import patch
+from rest_framework.exceptions import ValidationError
 
 
 class Dalle2PromptModelTest(TestCase):
@@ -46,7 +53,7 @@ class Dalle2PromptModelTest(TestCase):
 
     def test_complete(self):
         with patch(
-            "openai.Image.create",
+            "jarvis.modules.provider.OpenAIClient.create_image",
             return_value={
                 "created": 1674592929,
                 "data": [
@@ -77,6 +84,83 @@ class Dalle2PromptModelTest(TestCase):
 
             self.assertEqual(PromptOutputModel.objects.count(), 1)
 
+    def test_generate_batch(self):
+        names = ["Vitamin Group", "Mineral Group", "Herbal Group"]
+
+        def create(**params):
+            name = next(name for name in names if name in params["prompt"])
+            return {"data": [{"url": "https://example.com/{}.png".format(name)}]}
+
+        with patch("jarvis.modules.provider.OpenAIClient.create_image", side_effect=create) as mock:
+            outputs = self.prompt.generate_batch(
+                self.user,
+                [{"business_name": name, "business_type": "supplements"}
+                 for name in names],
+                size=Dalle2PromptModel.ImageSizes.SMALL,
+            )
+            self.assertEqual(mock.call_count, 3)
+            for call in mock.call_args_list:
+                self.assertEqual(call.kwargs["size"], Dalle2PromptModel.ImageSizes.SMALL)
+
+        self.assertEqual(
+            [output.output for output in outputs],
+            ["https://example.com/{}.png".format(name) for name in names]
+        )
+        self.assertEqual(
+            [output.input["business_name"] for output in outputs], names)
+        self.assertTrue(all(output.pk for output in outputs))
+        self.assertEqual(PromptOutputModel.objects.count(), 3)
+
+    def test_generate_batch_invalid_size(self):
+        with patch("jarvis.modules.provider.OpenAIClient.create_image") as mock:
+            with self.assertRaises(ValidationError):
+                self.prompt.generate_batch(
+                    self.user,
+                    [{"business_name": "Vitamin Group", "business_type": "supplements"}],
+                    size="1x1",
+                )
+            mock.assert_not_called()
+
+    def test_generate_stores_image(self):
+        image = b"\x89PNG\r\n\x1a\n" + b"image" * 1000
+        download = mock.MagicMock()
+        download.iter_content.return_value = iter([image[:100], image[100:]])
+
+        with tempfile.TemporaryDirectory() as root, override_settings(
+            IMAGE_STORE_ENABLED=True,
+            IMAGE_STORE_ROOT=root
+        ), patch("jarvis.modules.provider.OpenAIClient.create_image", return_value={
+            "data": [{"url": "https://provider.example.com/image.png"}]
+        }), patch("requests.get", return_value=download) as get:
+            output = self.prompt.generate(
+                user=self.user,
+                business_name="Vitamin Group",
+                business_type="provide vitamin supplements"
+            )
+            get.assert_called_once()
+            self.assertEqual(get.call_args.kwargs["stream"], True)
+
+            digest = hashlib.sha256(image).hexdigest()
+            self.assertEqual(output.output, reverse(
+                "jarvis:image-blob", kwargs={"digest": digest}))
+            with get_image_store().open(digest) as blob:
+                self.assertEqual(blob.read(), image)
+
+    def test_generate_store_failed(self):
+        with tempfile.TemporaryDirectory() as root, override_settings(
+            IMAGE_STORE_ENABLED=True,
+            IMAGE_STORE_ROOT=root
+        ), patch("jarvis.modules.provider.OpenAIClient.create_image", return_value={
+            "data": [{"url": "https://provider.example.com/image.png"}]
+        }), patch("requests.get", side_effect=ConnectionError):
+            output = self.prompt.generate(
+                user=self.user,
+                business_name="Vitamin Group",
+                business_type="provide vitamin supplements"
+            )
+        # the provider url is kept
+        self.assertEqual(output.output, "https://provider.example.com/image.png")
+
     def test_delete(self):
         self.assertEqual(
             self.concrete_model.objects.first().is_active,  # type: ignore
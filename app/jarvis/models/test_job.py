@@ -0,0 +1,122 @@
+from datetime import timedelta
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from jarvis.models import (
+    Dalle2PromptModel,
+    GenerationJobModel,
+    PromptOutputModel
+)
+from account.models import User, Seller
+from openai import error
+from unittest.mock import patch
+
+
+class GenerationJobModelTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(  # type: ignore
+            username="testuser",
+            email="testuser@email.co",
+            password="testpassword",
+            is_verified=True,
+        )
+        self.seller: Seller = Seller.objects.create(  # type: ignore
+            user=self.user,
+            handle='testhandle',
+            name='Test Name',
+        )
+        self.prompt = Dalle2PromptModel.objects.create(
+            icon="https://www.google.com",
+            heading="Sample Heading",
+            description="Sample Description",
+            template="A logo for a business named {business_name}",
+            template_params=[
+                {
+                    "name": "business_name",
+                    "description": "The name of the business"
+                }
+            ],
+            user=self.user
+        )
+        self.job = GenerationJobModel.objects.enqueue(
+            self.user,
+            self.prompt,
+            business_name="Vitamin Group",
+            size=Dalle2PromptModel.ImageSizes.SMALL,
+        )
+        self.response = {"data": [{"url": "https://example.com/image.png"}]}
+
+    def test_enqueue(self):
+        self.assertEqual(self.job.status, GenerationJobModel.Statuses.QUEUED)
+        self.assertEqual(self.job.model_name, Dalle2PromptModel.name)
+        self.assertEqual(self.job.prompt_id, self.prompt.pk)
+        self.assertEqual(self.job.get_prompt(), self.prompt)
+
+    def test_claim(self):
+        job = GenerationJobModel.objects.claim("worker-1")
+        self.assertEqual(job, self.job)
+        self.assertEqual(job.status, GenerationJobModel.Statuses.RUNNING)
+        self.assertEqual(job.locked_by, "worker-1")
+        self.assertEqual(job.attempts, 1)
+        # a claimed job is not handed out twice
+        self.assertIsNone(GenerationJobModel.objects.claim("worker-2"))
+
+    def test_claim_not_due(self):
+        self.job.run_after = timezone.now() + timedelta(minutes=1)
+        self.job.save()
+        self.assertIsNone(GenerationJobModel.objects.claim("worker-1"))
+
+    def test_execute(self):
+        job = GenerationJobModel.objects.claim("worker-1")
+        with patch("jarvis.modules.provider.OpenAIClient.create_image", return_value=self.response) as mock:
+            job.execute()
+            self.assertEqual(mock.call_args.kwargs["size"], Dalle2PromptModel.ImageSizes.SMALL)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, GenerationJobModel.Statuses.SUCCEEDED)
+        self.assertEqual(job.output, PromptOutputModel.objects.get())
+        self.assertEqual(job.output.output, "https://example.com/image.png")
+        self.assertIsNone(job.locked_by)
+
+    def test_execute_retry(self):
+        job = GenerationJobModel.objects.claim("worker-1")
+        with patch("jarvis.modules.provider.OpenAIClient.create_image", side_effect=error.RateLimitError("Slow down")):
+            job.execute()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, GenerationJobModel.Statuses.QUEUED)
+        self.assertIn("Slow down", job.error)
+        self.assertGreater(job.run_after, timezone.now())
+
+    def test_execute_retries_exhausted(self):
+        self.job.attempts = self.job.max_attempts - 1
+        self.job.save()
+        job = GenerationJobModel.objects.claim("worker-1")
+        with patch("jarvis.modules.provider.OpenAIClient.create_image", side_effect=error.RateLimitError("Slow down")):
+            job.execute()
+        self.assertEqual(job.status, GenerationJobModel.Statuses.FAILED)
+
+    def test_execute_not_retryable(self):
+        job = GenerationJobModel.objects.claim("worker-1")
+        with patch("jarvis.modules.provider.OpenAIClient.create_image",
+                   side_effect=error.InvalidRequestError("Rejected", None)):
+            job.execute()
+        self.assertEqual(job.status, GenerationJobModel.Statuses.FAILED)
+        self.assertEqual(job.attempts, 1)
+
+    def test_requeue_stale(self):
+        job = GenerationJobModel.objects.claim("worker-1")
+        GenerationJobModel.objects.filter(pk=job.pk).update(
+            locked_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(GenerationJobModel.objects.requeue_stale(60), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, GenerationJobModel.Statuses.QUEUED)
+        self.assertIsNone(job.locked_by)
+
+    def test_run_generation_workers(self):
+        with patch("jarvis.modules.provider.OpenAIClient.create_image", return_value=self.response):
+            call_command("run_generation_workers", "--burst", "--concurrency", "1")
+
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, GenerationJobModel.Statuses.SUCCEEDED)
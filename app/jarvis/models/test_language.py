@@ -1,12 +1,20 @@
 # from jarvis.models import AbstractPromptModel, CompletionModel
-from django.test import TestCase
+import asyncio
+import threading
+from django.test import TestCase, override_settings
 from jarvis.models import (
     AbstractPromptModel,
     GPT3PromptModel,
     PromptOutputModel
 )
 from account.models import User, Seller
-from unittest.mock import patch
+from unittest.mock import patch, AsyncMock
+from jarvis.modules.provider.testing import patch_completion
+from rest_framework.exceptions import ValidationError
+from jarvis.modules.provider import (
+    generation_cache, key_pool, max_tokens_advisor, provider_scheduler, Hedger)
+from jarvis.modules.provider.scheduler import _current_user
+from jarvis.modules.provider.tokens import count_tokens
 from typing import Union
 
 
@@ -56,8 +64,7 @@ class GPT3PromptModelTest(TestCase):
             self.prompt._validate_model()  # type: ignore
 
     def test_generate(self):
-        with patch(
-            "openai.Completion.create",
+        with patch_completion(
             return_value={
                 "choices": [{
                     "finish_reason": "stop",
@@ -96,10 +103,396 @@ class GPT3PromptModelTest(TestCase):
                 ),
                 echo=False,
                 stream=False,
+                # credentials of the pool's only key
+                api_key=key_pool.keys[0].api_key,
+                organization=key_pool.keys[0].organization,
             )
 
             self.assertEqual(PromptOutputModel.objects.count(), 1)
 
+    async def test_agenerate(self):
+        response = {
+            "choices": [{
+                "finish_reason": "stop",
+                "index": 0,
+                "logprobs": None,
+                "text": "VIT GROUP"
+            }],
+            "id": "cmpl-async",
+            "model": "text-davinci-003",
+            "object": "text_completion",
+        }
+        with patch(
+            "jarvis.modules.provider.OpenAIClient.acreate_completion",
+            new_callable=AsyncMock,
+            return_value=response
+        ) as mock:
+            output = await self.prompt.agenerate(  # type: ignore
+                user=self.user,
+                business_name="Vitamin Group",
+                business_type="We provide vitamin supplements"
+            )
+            mock.assert_awaited_once()
+            self.assertEqual(
+                mock.call_args.kwargs["prompt"],
+                self.prompt.get_prompt(
+                    business_name="Vitamin Group",
+                    business_type="We provide vitamin supplements"
+                )
+            )
+
+        self.assertEqual(output.uid, "cmpl-async")
+        self.assertEqual(output.output, "VIT GROUP")
+        self.assertEqual(await PromptOutputModel.objects.acount(), 1)
+
+    def _stream_chunks(self, *texts):
+        return iter([{
+            "id": "cmpl-stream",
+            "choices": [{"text": text, "index": 0}]
+        } for text in texts])
+
+    def test_generate_stream(self):
+        with patch_completion(
+            return_value=self._stream_chunks("VIT", " GROUP")
+        ) as mock:
+            stream = self.prompt.generate_stream(  # type: ignore
+                user=self.user,
+                business_name="Vitamin Group",
+                business_type="We provide vitamin supplements"
+            )
+            self.assertTrue(mock.call_args.kwargs["stream"])
+            self.assertEqual(list(stream), ["VIT", " GROUP"])
+
+        output = PromptOutputModel.objects.get()
+        self.assertEqual(output.uid, "cmpl-stream")
+        self.assertEqual(output.output, "VIT GROUP")
+        self.assertEqual(stream.result, output)
+
+    def test_generate_stream_closed_early(self):
+        """ The partial output is recorded when the consumer goes away """
+        with patch_completion(
+            return_value=self._stream_chunks("VIT", " GROUP")
+        ):
+            stream = self.prompt.generate_stream(  # type: ignore
+                user=self.user,
+                business_name="Vitamin Group",
+                business_type="We provide vitamin supplements"
+            )
+            iterator = iter(stream)
+            next(iterator)
+            iterator.close()
+
+        self.assertEqual(PromptOutputModel.objects.get().output, "VIT")
+
+    def test_generate_batch(self):
+        names = ["Vitamin Group", "Mineral Group", "Herbal Group"]
+        response = {
+            "id": "cmpl-batch",
+            # the provider does not guarantee the order of the choices
+            "choices": [
+                {"text": "{} output".format(names[index]), "index": index}
+                for index in (2, 0, 1)
+            ]
+        }
+        batch = [
+            {"business_name": name, "business_type": "We provide supplements"}
+            for name in names
+        ]
+        with patch_completion(return_value=response) as mock:
+            outputs = self.prompt.generate_batch(self.user, batch)
+            mock.assert_called_once()
+            self.assertEqual(mock.call_args.kwargs["prompt"], [
+                self.prompt.get_prompt(**params) for params in batch
+            ])
+
+        self.assertEqual(
+            [output.output for output in outputs],
+            ["{} output".format(name) for name in names]
+        )
+        self.assertEqual([output.input for output in outputs], batch)
+        self.assertEqual(PromptOutputModel.objects.count(), 3)
+
+    def test_generate_batch_invalid_params(self):
+        batch = [
+            {"business_name": "Vitamin Group", "business_type": "supplements"},
+            {"business_name": "Vitamin Group"},
+        ]
+        with patch_completion() as mock:
+            with self.assertRaises(ValidationError):
+                self.prompt.generate_batch(self.user, batch)
+            mock.assert_not_called()
+        self.assertEqual(PromptOutputModel.objects.count(), 0)
+
+    def test_generate_batch_cached(self):
+        generation_cache.clear()
+        self.prompt.cache_enabled = True
+        batch = [
+            {"business_name": name, "business_type": "We provide supplements"}
+            for name in ("Vitamin Group", "Mineral Group")
+        ]
+        with patch_completion(return_value={
+            "id": "cmpl-single",
+            "choices": [{"text": "VIT GROUP", "index": 0}]
+        }):
+            self.prompt.generate(user=self.user, **batch[0])
+
+        with patch_completion(return_value={
+            "id": "cmpl-batch",
+            "choices": [{"text": "MIN GROUP", "index": 0}]
+        }) as mock:
+            outputs = self.prompt.generate_batch(self.user, batch)
+            # only the input missing from the cache is sent
+            self.assertEqual(mock.call_args.kwargs["prompt"], [
+                self.prompt.get_prompt(**batch[1])
+            ])
+
+        self.assertEqual(
+            [output.output for output in outputs], ["VIT GROUP", "MIN GROUP"])
+
+    def test_generate_batch_cached_stale_if_error(self):
+        generation_cache.clear()
+        self.prompt.cache_enabled = True
+        self.prompt.cache_ttl = 0  # type: ignore
+        batch = [
+            {"business_name": name, "business_type": "We provide supplements"}
+            for name in ("Vitamin Group", "Mineral Group")
+        ]
+        with patch_completion(return_value={
+            "id": "cmpl-batch",
+            "choices": [{"text": "VIT GROUP", "index": 0}, {"text": "MIN GROUP", "index": 1}]
+        }):
+            self.prompt.generate_batch(self.user, batch)
+
+        with patch_completion(side_effect=Exception("down")):
+            outputs = self.prompt.generate_batch(self.user, batch)
+        self.assertEqual(
+            [output.output for output in outputs], ["VIT GROUP", "MIN GROUP"])
+        self.assertEqual(generation_cache.stats()["stale_hits"], 2)
+
+        # an input without a cached response fails the batch
+        batch.append({"business_name": "Herbal Group", "business_type": "Herbs"})
+        with patch_completion(side_effect=Exception("down")), \
+                self.assertRaises(Exception):
+            self.prompt.generate_batch(self.user, batch)
+
+    def test_generate_version(self):
+        response = {
+            "id": "cmpl-version",
+            "choices": [{"text": "VIT GROUP", "index": 0}]
+        }
+        with patch_completion(return_value=response):
+            outputs = [self.prompt.generate(
+                user=self.user,
+                business_name="Vitamin Group",
+                business_type="We provide vitamin supplements"
+            ) for _ in range(2)]
+
+        # the outputs reference the version instead of copying the prompt
+        for output in outputs:
+            output.refresh_from_db()
+            self.assertEqual(output.model_version_id, self.prompt.version_id)
+            self.assertIsNone(output.model_snapshot)
+            self.assertEqual(output.snapshot["heading"], self.prompt.heading)
+
+    def test_generate_scheduled(self):
+        users = []
+
+        def create(**params):
+            users.append(_current_user.get())
+            return {"id": "cmpl-1", "choices": [{"index": 0, "text": "Vitaminize"}]}
+
+        granted = provider_scheduler.stats().get(self.prompt.model, {}).get("granted", 0)
+        with patch_completion(side_effect=create):
+            self.prompt.generate(
+                user=self.user,
+                business_name="Vitamin Group",
+                business_type="We provide vitamin supplements"
+            )
+        # admitted in the model's lane, on behalf of the buyer
+        self.assertEqual(users, [str(self.user.pk)])
+        self.assertEqual(
+            provider_scheduler.stats()[self.prompt.model]["granted"], granted + 1)
+
+    def test_generate_hedged(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        responses = iter([
+            {"id": "cmpl-slow", "choices": [{"index": 0, "text": "Slow"}]},
+            {"id": "cmpl-fast", "choices": [{"index": 0, "text": "Fast"}]},
+        ])
+
+        def create(**params):
+            response = next(responses)
+            if response["id"] == "cmpl-slow":
+                release.wait(5)
+            return response
+
+        hedger = Hedger(max_extra=1.0, min_samples=1)
+        hedger.record(self.prompt.model, 0.01)
+        with override_settings(GENERATION_HEDGE_MODELS=[self.prompt.model]), \
+                patch("jarvis.models.language.hedger", hedger), \
+                patch_completion(side_effect=create) as mock:
+            output = self.prompt.generate(
+                user=self.user,
+                business_name="Vitamin Group",
+                business_type="We provide vitamin supplements"
+            )
+            self.assertEqual(mock.call_count, 2)
+        # one output, from the faster call
+        self.assertEqual(output.output, "Fast")
+        self.assertEqual(PromptOutputModel.objects.count(), 1)
+
+    def test_generate_clamped(self):
+        params = {
+            "business_name": "Vitamin Group",
+            "business_type": "vitamins " * 3000,
+        }
+        response = {"id": "cmpl-1", "choices": [{"index": 0, "text": "Vitaminize"}]}
+        with patch_completion(return_value=response) as mock:
+            self.prompt.generate(user=self.user, **params)
+        # the completion only gets what the prompt leaves of the context window
+        max_tokens = mock.call_args.kwargs["max_tokens"]
+        self.assertLess(max_tokens, self.prompt.max_tokens)  # type: ignore
+        self.assertLessEqual(
+            max_tokens + count_tokens(self.prompt.get_prompt(**params)), 4097)
+
+        params["business_type"] = "vitamins " * 4100
+        with patch_completion() as mock, \
+                self.assertRaises(ValidationError):
+            self.prompt.generate(user=self.user, **params)
+        mock.assert_not_called()
+
+    def test_generate_learned_max_tokens(self):
+        max_tokens_advisor.clear()
+        self.addCleanup(max_tokens_advisor.clear)
+        params = {
+            "business_name": "Vitamin Group",
+            "business_type": "We provide vitamin supplements"
+        }
+        response = {"id": "cmpl-1", "choices": [{"index": 0, "text": "Vitaminize Your Life!"}]}
+        prompt = self.prompt.get_prompt(**params)
+        PromptOutputModel.objects.bulk_create([
+            PromptOutputModel(**self.prompt.get_output_fields(
+                self.user, params, prompt, response))
+            for _ in range(19)
+        ])
+        with patch_completion(return_value=response) as mock:
+            self.prompt.generate(user=self.user, **params)
+            # not enough outputs yet
+            self.assertEqual(
+                mock.call_args.kwargs["max_tokens"], self.prompt.max_tokens)  # type: ignore
+
+            max_tokens_advisor.clear()
+            self.prompt.generate(user=self.user, **params)
+            # 1.5 times the 6 tokens of every past output
+            self.assertEqual(mock.call_args.kwargs["max_tokens"], 9)
+
+    def test_get_past_outputs(self):
+        response = {"id": "cmpl-1", "choices": [{"index": 0, "text": "Vitaminize Your Life!"}]}
+        params = {"business_name": "Vitamin Group", "business_type": "Vitamins"}
+        PromptOutputModel.objects.create(**self.prompt.get_output_fields(
+            self.user, params, self.prompt.get_prompt(**params), response))
+        # outputs of earlier versions of the prompt count too
+        self.prompt.description = "A new description"
+        self.prompt.save()
+        PromptOutputModel.objects.create(**self.prompt.get_output_fields(
+            self.user, params, self.prompt.get_prompt(**params), response))
+        other = GPT3PromptModel.objects.create(
+            heading="Other", description="Other", template="Other {x}",
+            template_params=[{"name": "x", "description": "x"}], user=self.user)
+        PromptOutputModel.objects.create(**other.get_output_fields(
+            self.user, {"x": "y"}, "Other y", response))
+
+        with self.assertNumQueries(1):
+            self.assertEqual(len(self.prompt.get_past_outputs()), 2)
+
+    def test_generate_cached(self):
+        generation_cache.clear()
+        self.prompt.cache_enabled = True
+        response = {
+            "id": "cmpl-cached",
+            "choices": [{"text": "VIT GROUP", "index": 0}]
+        }
+        with patch_completion(return_value=response) as mock:
+            for _ in range(2):
+                self.prompt.generate(
+                    user=self.user,
+                    business_name="Vitamin Group",
+                    business_type="We provide vitamin supplements"
+                )
+            mock.assert_called_once()
+
+        # every buyer still gets their own output
+        self.assertEqual(PromptOutputModel.objects.count(), 2)
+        self.assertEqual(generation_cache.stats()["hits"], 1)
+
+    def test_generate_cached_learned_max_tokens(self):
+        max_tokens_advisor.clear()
+        self.addCleanup(max_tokens_advisor.clear)
+        generation_cache.clear()
+        self.prompt.cache_enabled = True
+        response = {
+            "id": "cmpl-cached",
+            "choices": [{"text": "VIT GROUP", "index": 0}]
+        }
+        params = {
+            "business_name": "Vitamin Group",
+            "business_type": "We provide vitamin supplements"
+        }
+        with patch_completion(return_value=response) as mock:
+            self.prompt.generate(user=self.user, **params)
+            # the learned cap changes, the cached response is still served
+            max_tokens_advisor.learn(self.prompt.pk, ["VIT GROUP"] * 20)
+            self.prompt.generate(user=self.user, **params)
+            mock.assert_called_once()
+        self.assertEqual(generation_cache.stats()["hits"], 1)
+
+    async def test_agenerate_coalesced(self):
+        response = {
+            "id": "cmpl-shared",
+            "choices": [{"text": "VIT GROUP", "index": 0}]
+        }
+
+        async def create_completion(**params):
+            await asyncio.sleep(0.01)
+            return response
+
+        with patch("jarvis.modules.provider.OpenAIClient.acreate_completion",
+                   new=AsyncMock(side_effect=create_completion)) as mock:
+            outputs = await asyncio.gather(*(
+                self.prompt.agenerate(
+                    user=self.user,
+                    business_name="Vitamin Group",
+                    business_type="We provide vitamin supplements"
+                ) for _ in range(3)
+            ))
+            mock.assert_called_once()
+
+        # one provider call, but every buyer still gets their own output
+        self.assertEqual(len({output.pk for output in outputs}), 3)
+        self.assertEqual(await PromptOutputModel.objects.acount(), 3)
+
+    def test_generate_cached_stale_if_error(self):
+        generation_cache.clear()
+        self.prompt.cache_enabled = True
+        self.prompt.cache_ttl = 0  # type: ignore
+        response = {
+            "id": "cmpl-cached",
+            "choices": [{"text": "VIT GROUP", "index": 0}]
+        }
+        params = {
+            "business_name": "Vitamin Group",
+            "business_type": "We provide vitamin supplements"
+        }
+        with patch_completion(return_value=response):
+            self.prompt.generate(user=self.user, **params)
+
+        with patch_completion(side_effect=Exception("down")):
+            output = self.prompt.generate(user=self.user, **params)
+
+        self.assertEqual(output.output, "VIT GROUP")  # type: ignore
+        self.assertEqual(generation_cache.stats()["stale_hits"], 1)
+
     def test_delete(self):
         self.assertEqual(
             self.concrete_model.objects.first().is_active,  # type: ignore
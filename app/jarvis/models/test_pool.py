@@ -0,0 +1,168 @@
+from datetime import timedelta
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from itertools import count
+from rest_framework.exceptions import ValidationError
+from jarvis.models import (
+    GPT3PromptModel,
+    PooledOutputModel,
+    PromptOutputModel
+)
+from jarvis.models.pool import make_pool_key
+from account.models import User, Seller
+from unittest.mock import patch
+from jarvis.modules.provider.testing import patch_completion
+
+
+class PooledOutputModelTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(  # type: ignore
+            username="testuser",
+            email="testuser@email.co",
+            password="testpassword",
+            is_verified=True,
+        )
+        self.seller: Seller = Seller.objects.create(  # type: ignore
+            user=self.user,
+            handle='testhandle',
+            name='Test Name',
+        )
+        self.buyer = User.objects.create_user(  # type: ignore
+            username="buyer",
+            email="buyer@email.co",
+            password="testpassword"
+        )
+        self.prompt = GPT3PromptModel.objects.create(
+            icon="https://www.google.com",
+            heading="Sample Heading",
+            description="Sample Description",
+            template="Write a joke about the weather",
+            template_params=[],
+            pool_size=2,
+            user=self.user
+        )
+        ids = count()
+        self.create = lambda **params: {
+            "id": "cmpl-{}".format(next(ids)),
+            "choices": [{"index": 0, "text": "A joke"}]
+        }
+
+    def fill(self, limit=10):
+        with patch_completion(side_effect=self.create) as mock:
+            filled = PooledOutputModel.objects.refill_pools(limit=limit)
+        return filled, mock
+
+    def test_refill(self):
+        filled, mock = self.fill()
+        self.assertEqual(filled, 2)
+        self.assertEqual(mock.call_count, 2)
+        self.assertEqual(PooledOutputModel.objects.fresh(self.prompt).count(), 2)
+        # the pool is full
+        self.assertEqual(self.fill()[0], 0)
+
+    def test_refill_limit(self):
+        self.assertEqual(self.fill(limit=1)[0], 1)
+        with override_settings(GENERATION_POOL_REFILLS_PER_MINUTE=1):
+            self.assertEqual(self.fill()[0], 0)
+
+    def test_generate_pooled(self):
+        self.fill()
+        with patch_completion() as mock:
+            output = self.prompt.generate(self.buyer)
+        mock.assert_not_called()
+        # recorded as the buyer's own output
+        self.assertEqual(output.user, self.buyer)
+        self.assertEqual(output.uid, "cmpl-0")
+        self.assertEqual(output.model_input, "Write a joke about the weather")
+        self.assertEqual(PooledOutputModel.objects.fresh(self.prompt).count(), 1)
+
+    async def test_agenerate_pooled(self):
+        await PooledOutputModel.objects.acreate(
+            model_name=self.prompt.name,
+            prompt_id=self.prompt.pk,
+            version_id=self.prompt.version_id,  # type: ignore
+            key=make_pool_key({}, {}),
+            model_input="Write a joke about the weather",
+            response=self.create(),
+            expires_at=timezone.now() + timedelta(hours=1),
+        )
+        with patch("jarvis.modules.provider.OpenAIClient.acreate_completion") as mock:
+            output = await self.prompt.agenerate(self.buyer)
+        mock.assert_not_called()
+        self.assertEqual(output.output, "A joke")
+
+    def test_generate_pool_empty(self):
+        with patch_completion(side_effect=self.create) as mock:
+            self.prompt.generate(self.buyer)
+        mock.assert_called_once()
+        self.assertEqual(PromptOutputModel.objects.count(), 1)
+
+    def test_generate_stale(self):
+        self.fill()
+        PooledOutputModel.objects.update(expires_at=timezone.now())
+        self.assertEqual(PooledOutputModel.objects.fresh(self.prompt).count(), 0)
+        self.fill()
+        # outputs of the previous template are not handed out
+        self.prompt.template = "Write a joke about the sea"
+        self.prompt.save()
+        self.assertEqual(PooledOutputModel.objects.fresh(self.prompt).count(), 0)
+        with patch_completion(side_effect=self.create) as mock:
+            output = self.prompt.generate(self.buyer)
+        mock.assert_called_once()
+        self.assertEqual(output.model_input, "Write a joke about the sea")
+
+    def test_purge(self):
+        self.fill()
+        first, second = PooledOutputModel.objects.all()
+        PooledOutputModel.objects.filter(pk=first.pk).update(expires_at=timezone.now())
+        PooledOutputModel.objects.filter(pk=second.pk).update(
+            claimed_at=timezone.now(), created_at=timezone.now() - timedelta(minutes=2))
+        self.assertEqual(PooledOutputModel.objects.purge(), 2)
+
+    def test_pool_inputs(self):
+        self.prompt.template = "Write a joke about the {topic}"
+        self.prompt.template_params = [{"name": "topic", "description": "The topic"}]
+        with self.assertRaises(ValidationError):
+            self.prompt.save()
+        self.prompt.pool_inputs = [{"subject": "weather"}]
+        with self.assertRaises(ValidationError):
+            self.prompt.save()
+        self.prompt.pool_inputs = [{"topic": "weather"}, {"topic": "sea"}]
+        self.prompt.save()
+
+        self.assertEqual(self.fill()[0], 4)
+        with patch_completion() as mock:
+            output = self.prompt.generate(self.buyer, topic="sea")
+        mock.assert_not_called()
+        self.assertEqual(output.input, {"topic": "sea"})
+
+    @override_settings(GENERATION_POOL_MAX_SIZE=5, GENERATION_POOL_MAX_INPUTS=2,
+                       GENERATION_POOL_MIN_TTL=600)
+    def test_pool_bounds(self):
+        self.prompt.pool_size = 6
+        with self.assertRaises(ValidationError):
+            self.prompt.save()
+        self.prompt.pool_size = 5
+        self.prompt.pool_ttl = 599
+        with self.assertRaises(ValidationError):
+            self.prompt.save()
+        self.prompt.pool_ttl = 600
+        self.prompt.pool_inputs = [{}, {}, {}]
+        with self.assertRaises(ValidationError):
+            self.prompt.save()
+        self.prompt.pool_inputs = [{}, {}]
+        self.prompt.save()
+
+    def test_refill_queries(self):
+        self.prompt.pk = None
+        self.prompt.save()
+        self.assertEqual(self.fill()[0], 4)
+        # one query purges, one counts every pool, two list the prompts
+        with self.assertNumQueries(4):
+            self.assertEqual(self.fill()[0], 0)
+
+    def test_run_generation_workers(self):
+        with patch_completion(side_effect=self.create):
+            call_command("run_generation_workers", "--burst", "--concurrency", "1")
+        self.assertEqual(PooledOutputModel.objects.fresh(self.prompt).count(), 2)
@@ -0,0 +1,56 @@
+import hashlib
+import json
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+from jarvis.managers import PromptVersionManager
+from typing import Any, Dict
+
+
+# snapshot keys that change without the prompt content changing, the
+# operational settings and the listing state
+UNVERSIONED_FIELDS = (
+    "updated_at",
+    "is_active",
+    "is_listed",
+    "cache_enabled",
+    "cache_ttl",
+    "pool_size",
+    "pool_inputs",
+    "pool_ttl",
+)
+
+
+def make_snapshot_hash(snapshot: Dict[str, Any]) -> str:
+    """ Content hash identifying a prompt snapshot """
+    data = {
+        key: value for key, value in snapshot.items()
+        if key not in UNVERSIONED_FIELDS
+    }
+    raw = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class PromptVersionModel(models.Model):
+    """ A prompt as it was when outputs were generated from it
+
+        Versions are content addressed so every output generated from the
+        same prompt content shares one row. A new version is only created
+        when a seller edits the prompt.
+    """
+
+    objects = PromptVersionManager()
+
+    hash = models.CharField(max_length=64, unique=True)
+    """ make_snapshot_hash of the snapshot """
+
+    snapshot = models.JSONField()
+    """ JSON snapshot of the prompt, see AbstractPromptModel.get_snapshot """
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _('Prompt Version')
+        verbose_name_plural = _('Prompt Versions')
+
+    def __str__(self):
+        return self.hash
@@ -0,0 +1 @@
+from .dag import run_dag, topological_order
@@ -0,0 +1,92 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextvars import copy_context
+from typing import Any, Callable, Collection, Dict, List, Mapping, Set
+
+
+def topological_order(dependencies: Mapping[str, Collection[str]]) -> List[str]:
+    """ Order the nodes so every node comes after its dependencies
+
+        Args:
+            dependencies (dict): The names of the nodes each node depends on
+        Raises:
+            ValueError: If a dependency is unknown or the graph has a cycle
+    """
+    for name, needs in dependencies.items():
+        for need in needs:
+            if need not in dependencies:
+                raise ValueError("{} depends on the unknown {}".format(name, need))
+
+    remaining = {name: set(needs) for name, needs in dependencies.items()}
+    order: List[str] = []
+    ready = [name for name, needs in remaining.items() if not needs]
+    while ready:
+        name = ready.pop(0)
+        order.append(name)
+        for other, needs in remaining.items():
+            if name in needs:
+                needs.discard(name)
+                if not needs:
+                    ready.append(other)
+    if len(order) != len(dependencies):
+        cycle = sorted(name for name in dependencies if name not in order)
+        raise ValueError("{} depend on each other".format(", ".join(cycle)))
+    return order
+
+
+def run_dag(
+    dependencies: Mapping[str, Collection[str]],
+    prepare: Callable[[str, Dict[str, Any]], Callable[[], Any]],
+    finish: Callable[[str, Any], Any],
+    max_workers: int,
+) -> Dict[str, Any]:
+    """ Run the nodes of a graph, each as soon as its dependencies are done
+
+        A node runs in three parts: prepare and finish run on the calling
+        thread, e.g. for database access, and the work prepare returns runs
+        on a pool of max_workers threads, with the caller's context. Once a
+        node fails no new node is started and its error is raised when the
+        running ones are done.
+        Args:
+            prepare (callable): Called with the name of a node and the
+            results of the nodes done so far, returns the node's work
+            finish (callable): Called with the name of a node and the value
+            its work returned, returns the node's result
+        Returns:
+            dict: The result of every node
+    """
+    topological_order(dependencies)
+    waiting: Dict[str, Set[str]] = {
+        name: set(needs) for name, needs in dependencies.items()}
+    results: Dict[str, Any] = {}
+    running: Dict[Future, str] = {}
+    error = None
+
+    with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as pool:
+        def start_ready():
+            for name in [name for name, needs in waiting.items() if not needs]:
+                del waiting[name]
+                work = prepare(name, results)
+                running[pool.submit(copy_context().run, work)] = name
+
+        start_ready()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = finish(name, future.result())
+                except Exception as exc:
+                    error = error or exc
+                    waiting.clear()
+                    continue
+                for needs in waiting.values():
+                    needs.discard(name)
+            if error is None:
+                try:
+                    start_ready()
+                except Exception as exc:
+                    error = exc
+                    waiting.clear()
+    if error is not None:
+        raise error
+    return results
@@ -0,0 +1,60 @@
+import threading
+from django.test import SimpleTestCase
+from jarvis.modules.chain import run_dag, topological_order
+
+
+class TopologicalOrderTest(SimpleTestCase):
+    def test_order(self):
+        order = topological_order({
+            "summary": ["intro", "body"],
+            "intro": ["outline"],
+            "body": ["outline"],
+            "outline": [],
+        })
+        self.assertEqual(order[0], "outline")
+        self.assertEqual(order[-1], "summary")
+
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            topological_order({"summary": ["outline"]})
+
+    def test_cycle(self):
+        with self.assertRaises(ValueError) as context:
+            topological_order({"a": ["b"], "b": ["a"], "c": []})
+        self.assertIn("a, b", str(context.exception))
+
+
+class RunDagTest(SimpleTestCase):
+    def test_run(self):
+        dependencies = {"outline": [], "intro": ["outline"], "body": ["outline"], "summary": ["intro", "body"]}
+        # intro and body must run at the same time to get past the barrier
+        barrier = threading.Barrier(2, timeout=5)
+
+        def prepare(name, results):
+            inputs = [results[need] for need in sorted(dependencies[name])]
+
+            def work():
+                if name in ("intro", "body"):
+                    barrier.wait()
+                return "{}({})".format(name, ",".join(inputs))
+            return work
+
+        results = run_dag(dependencies, prepare, lambda name, value: value.upper(), max_workers=2)
+        self.assertEqual(results["summary"], "SUMMARY(BODY(OUTLINE()),INTRO(OUTLINE()))")
+
+    def test_failure(self):
+        started = []
+
+        def prepare(name, results):
+            started.append(name)
+
+            def work():
+                if name == "outline":
+                    raise RuntimeError("provider error")
+                return name
+            return work
+
+        with self.assertRaises(RuntimeError):
+            run_dag({"outline": [], "summary": ["outline"]}, prepare, lambda name, value: value, max_workers=2)
+        # the dependents of a failed node never start
+        self.assertEqual(started, ["outline"])
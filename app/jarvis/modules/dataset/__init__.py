@@ -0,0 +1 @@
+from .reader import DatasetError, DatasetReader, get_dataset_format
@@ -0,0 +1,107 @@
+import csv
+import io
+import os
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
+
+FORMATS = ("csv", "xlsx")
+
+
+class DatasetError(ValueError):
+    pass
+
+
+def get_dataset_format(filename: str) -> str:
+    """ The format of a dataset from its file name
+
+        Raises:
+            DatasetError: If the format is not supported
+    """
+    extension = os.path.splitext(filename)[1].lower().lstrip(".")
+    if extension not in FORMATS:
+        raise DatasetError(
+            "The dataset must be a {} file".format(" or ".join(FORMATS).upper()))
+    return extension
+
+
+def _to_text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+class DatasetReader:
+    """ Streams the rows of a CSV or XLSX dataset
+
+        The first row is the header and every following row is yielded as
+        a dict keyed by it. Rows are read one at a time, XLSX files in
+        openpyxl's read only mode, so the file is never held in memory
+        whole. Blank rows are skipped.
+    """
+
+    def __init__(self, file: BinaryIO, format: str):
+        """
+        Args:
+            file (BinaryIO): The dataset, opened in binary mode
+            format (str): "csv" or "xlsx", see get_dataset_format
+        Raises:
+            DatasetError: If the file cannot be read
+        """
+        self.format = format
+        self.line = 0
+        """ Row number of the last row read, the header being row 1 """
+        self._workbook = None
+        try:
+            if format == "csv":
+                self._text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+                self._rows: Iterator[List[Any]] = csv.reader(self._text)
+            elif format == "xlsx":
+                from openpyxl import load_workbook
+                self._workbook = load_workbook(file, read_only=True, data_only=True)
+                self._rows = (
+                    list(row) for row in self._workbook.active.iter_rows(values_only=True))
+            else:
+                raise DatasetError("Unsupported dataset format {}".format(format))
+            header = next(self._rows, None)
+        except (UnicodeDecodeError, csv.Error) as error:
+            raise DatasetError("The dataset could not be read: {}".format(error))
+        except DatasetError:
+            raise
+        except Exception as error:
+            # openpyxl raises a variety of errors on corrupt workbooks
+            raise DatasetError("The dataset could not be read: {}".format(error))
+        self.line = 1
+        self.header: List[str] = [_to_text(name).strip() for name in header or []]
+        while self.header and not self.header[-1]:
+            # trailing empty cells of spreadsheets
+            self.header.pop()
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        try:
+            for row in self._rows:
+                self.line += 1
+                values = [_to_text(value) for value in row]
+                if not any(value.strip() for value in values):
+                    continue
+                if any(value for value in values[len(self.header):]):
+                    raise DatasetError(
+                        "Row {} has more values than the header".format(self.line))
+                values += [""] * (len(self.header) - len(values))
+                yield dict(zip(self.header, values))
+        except (UnicodeDecodeError, csv.Error) as error:
+            raise DatasetError("Row {} could not be read: {}".format(self.line, error))
+
+    def close(self):
+        if self._workbook is not None:
+            self._workbook.close()
+        elif self.format == "csv":
+            # leave the caller's file open
+            self._text.detach()
+
+    def __enter__(self) -> "DatasetReader":
+        return self
+
+    def __exit__(self, *args) -> Optional[bool]:
+        self.close()
+        return None
@@ -0,0 +1,61 @@
+import io
+from django.test import SimpleTestCase
+from openpyxl import Workbook
+from jarvis.modules.dataset import DatasetError, DatasetReader, get_dataset_format
+
+
+def make_xlsx(rows) -> io.BytesIO:
+    workbook = Workbook()
+    for row in rows:
+        workbook.active.append(row)
+    file = io.BytesIO()
+    workbook.save(file)
+    file.seek(0)
+    return file
+
+
+class DatasetReaderTest(SimpleTestCase):
+    def test_format(self):
+        self.assertEqual(get_dataset_format("rows.CSV"), "csv")
+        self.assertEqual(get_dataset_format("rows.xlsx"), "xlsx")
+        with self.assertRaises(DatasetError):
+            get_dataset_format("rows.json")
+
+    def test_csv(self):
+        file = io.BytesIO("﻿name,type\nVitamin Group,supplements\n,\n\"Tea, Ltd\",drinks\n".encode())
+        with DatasetReader(file, "csv") as reader:
+            self.assertEqual(reader.header, ["name", "type"])
+            rows = list(reader)
+            self.assertEqual(reader.line, 4)
+        # blank rows are skipped
+        self.assertEqual(rows, [
+            {"name": "Vitamin Group", "type": "supplements"},
+            {"name": "Tea, Ltd", "type": "drinks"},
+        ])
+        # the caller's file is left open
+        self.assertFalse(file.closed)
+
+    def test_csv_short_and_long_rows(self):
+        with DatasetReader(io.BytesIO(b"name,type\nVitamin Group\n"), "csv") as reader:
+            self.assertEqual(list(reader), [{"name": "Vitamin Group", "type": ""}])
+        with DatasetReader(io.BytesIO(b"name,type\na,b,c\n"), "csv") as reader, \
+                self.assertRaises(DatasetError) as context:
+            list(reader)
+        self.assertIn("Row 2", str(context.exception))
+
+    def test_csv_not_utf8(self):
+        with self.assertRaises(DatasetError):
+            DatasetReader(io.BytesIO("name\ncaf\xe9\n".encode("latin-1")), "csv").header
+
+    def test_xlsx(self):
+        file = make_xlsx([["name", "count", None], ["Vitamin Group", 3, None], [None, None], ["Tea", 2.5]])
+        with DatasetReader(file, "xlsx") as reader:
+            self.assertEqual(reader.header, ["name", "count"])
+            self.assertEqual(list(reader), [
+                {"name": "Vitamin Group", "count": "3"},
+                {"name": "Tea", "count": "2.5"},
+            ])
+
+    def test_xlsx_corrupt(self):
+        with self.assertRaises(DatasetError):
+            DatasetReader(io.BytesIO(b"not a workbook"), "xlsx")
@@ -0,0 +1 @@
+from .store import get_image_store, get_image_url, persist_image
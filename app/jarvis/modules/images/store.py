@@ -0,0 +1,47 @@
+import base64
+from contextlib import closing
+from core.modules.storage import BlobStore
+from django.conf import settings
+from django.urls import reverse
+from typing import Any, Dict, Iterator
+
+
+def get_image_store() -> BlobStore:
+    return BlobStore(settings.IMAGE_STORE_ROOT)
+
+
+def get_image_url(digest: str) -> str:
+    """ Url the stored image is served from """
+    return settings.IMAGE_STORE_BASE_URL + reverse(
+        "jarvis:image-blob", kwargs={"digest": digest})
+
+
+def persist_image(item: Dict[str, Any]) -> str:
+    """ Save a generated image to the image store
+
+        Args:
+            item (dict): An item of the provider's response data, with
+                either the image url or its base64 encoding (b64_json)
+
+        Returns:
+            str: The digest the image is stored under
+    """
+    store = get_image_store()
+    if item.get("b64_json"):
+        return store.put(_decode_base64(item["b64_json"]))
+
+    import requests
+    with closing(requests.get(
+        item["url"],
+        stream=True,
+        timeout=settings.IMAGE_DOWNLOAD_TIMEOUT
+    )) as response:
+        response.raise_for_status()
+        return store.put(response.iter_content(BlobStore.CHUNK_SIZE))
+
+
+def _decode_base64(data: str) -> Iterator[bytes]:
+    # slices of a multiple of 4 characters decode independently
+    step = BlobStore.CHUNK_SIZE // 3 * 4
+    for start in range(0, len(data), step):
+        yield base64.b64decode(data[start:start + step])
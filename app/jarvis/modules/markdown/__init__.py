@@ -0,0 +1 @@
+from .render import make_content_hash, render_markdown
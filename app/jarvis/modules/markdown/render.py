@@ -0,0 +1,59 @@
+import hashlib
+import threading
+from markdown import Markdown
+from markdown.treeprocessors import Treeprocessor
+from markdown.extensions import Extension
+from urllib.parse import urlparse
+
+# bumped when the rendering changes so stored renders are not reused
+RENDERER_VERSION = "1"
+
+SAFE_SCHEMES = ("", "http", "https", "mailto")
+
+
+class _SafeLinks(Treeprocessor):
+    """ Drops the link and image urls with a scheme such as javascript: """
+
+    def run(self, root):
+        for element in root.iter():
+            for attribute in ("href", "src"):
+                url = element.get(attribute)
+                if url is not None and urlparse(url.strip()).scheme.lower() not in SAFE_SCHEMES:
+                    del element.attrib[attribute]
+
+
+class _NoRawHtml(Extension):
+    """ Escapes the html of the text instead of passing it through """
+
+    def extendMarkdown(self, md):
+        md.preprocessors.deregister("html_block")
+        md.inlinePatterns.deregister("html")
+        md.treeprocessors.register(_SafeLinks(md), "safe_links", 0)
+
+
+_local = threading.local()
+
+
+def render_markdown(text: str) -> str:
+    """ Render generated markdown to html that is safe to display
+
+        Raw html in the text is escaped and links other than http(s)
+        and mailto are dropped.
+    """
+    # Markdown instances are not thread safe, one is kept per thread
+    md = getattr(_local, "md", None)
+    if md is None:
+        md = _local.md = Markdown(
+            extensions=["fenced_code", "tables", "sane_lists", _NoRawHtml()],
+            output_format="html",
+        )
+    try:
+        return md.convert(text)
+    finally:
+        md.reset()
+
+
+def make_content_hash(text: str) -> str:
+    """ Hash identifying the render of a text """
+    raw = "{}:{}".format(RENDERER_VERSION, text)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
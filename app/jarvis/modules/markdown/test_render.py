@@ -0,0 +1,35 @@
+from django.test import SimpleTestCase
+from jarvis.modules.markdown import make_content_hash, render_markdown
+
+
+class RenderMarkdownTest(SimpleTestCase):
+    def test_render(self):
+        html = render_markdown("# Title\n\n**bold** and `code`")
+        self.assertIn("<h1>Title</h1>", html)
+        self.assertIn("<strong>bold</strong>", html)
+        self.assertIn("<code>code</code>", html)
+
+    def test_tables_and_fenced_code(self):
+        html = render_markdown("| a | b |\n|---|---|\n| 1 | 2 |\n\n```\nx = 1\n```")
+        self.assertIn("<table>", html)
+        self.assertIn("<pre><code>x = 1", html)
+
+    def test_raw_html_escaped(self):
+        html = render_markdown("<script>alert(1)</script>\n\nhi <b onclick=x>there</b>")
+        self.assertNotIn("<script>", html)
+        self.assertNotIn("<b onclick", html)
+        self.assertIn("&lt;script&gt;", html)
+
+    def test_unsafe_links_dropped(self):
+        html = render_markdown("[a](javascript:alert(1)) [b](https://klerly.com)")
+        self.assertNotIn("javascript:", html)
+        self.assertIn('href="https://klerly.com"', html)
+
+    def test_renders_are_independent(self):
+        render_markdown("[a][ref]\n\n[ref]: https://klerly.com")
+        self.assertNotIn("href", render_markdown("[a][ref]"))
+
+    def test_content_hash(self):
+        self.assertEqual(make_content_hash("text"), make_content_hash("text"))
+        self.assertNotEqual(make_content_hash("text"), make_content_hash("text "))
+        self.assertEqual(len(make_content_hash("text")), 64)
@@ -0,0 +1,16 @@
+from .client import OpenAIClient
+from .stream import CompletionStream
+from .cache import GenerationCache, generation_cache, make_request_key
+from .singleflight import SingleFlight, single_flight
+from .errors import is_provider_failure, is_retryable_error
+from .deadline import Deadline, deadline_scope, get_deadline
+from .scheduler import ProviderScheduler, provider_scheduler, estimate_tokens
+from .keys import KeyPool, ProviderKey, key_pool
+from .hedge import Hedger, hedger
+from .tokens import (
+    count_tokens,
+    clamp_max_tokens,
+    get_context_window,
+    MaxTokensAdvisor,
+    max_tokens_advisor
+)
@@ -0,0 +1,90 @@
+import hashlib
+import json
+import threading
+import time
+from cachetools import LRUCache
+from django.conf import settings
+from typing import Any, Dict, Optional, Tuple
+
+
+# request parameters that do not change the generated output
+IGNORED_PARAMS = ("user", "stream")
+
+
+def make_request_key(name: str, params: Dict[str, Any]) -> str:
+    """ Hash identifying generations that produce equivalent outputs
+
+        Args:
+            name (str): The prompt model name e.g. gpt3
+            params (dict): The provider request parameters
+    """
+    data = {
+        key: value for key, value in params.items()
+        if key not in IGNORED_PARAMS
+    }
+    data["__name__"] = name
+    raw = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class GenerationCache:
+    """ Process-wide LRU cache of provider responses
+
+        Entries are keyed by make_request_key, i.e. the model name, the
+        rendered prompt and the sampling fields, so that identical
+        generations are served without a provider call.
+        Expired entries are kept for `stale_seconds` so they can still be
+        served when the provider fails (stale-if-error).
+    """
+
+    def __init__(self, maxsize: int, stale_seconds: int):
+        self.stale_seconds = stale_seconds
+        self._entries: LRUCache = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """ Return the cached response if it has not expired """
+        with self._lock:
+            entry: Optional[Tuple[Dict[str, Any], float]] = self._entries.get(key)
+            if entry and entry[1] > time.monotonic():
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            return None
+
+    def get_stale(self, key: str) -> Optional[Dict[str, Any]]:
+        """ Return the cached response if it is within the stale window """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] + self.stale_seconds > time.monotonic():
+                self.stale_hits += 1
+                return entry[0]
+            return None
+
+    def set(self, key: str, response: Dict[str, Any], ttl: int):
+        with self._lock:
+            self._entries[key] = (response, time.monotonic() + ttl)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.stale_hits = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale_hits": self.stale_hits,
+                "size": int(self._entries.currsize),
+                "max_size": int(self._entries.maxsize),
+            }
+
+
+generation_cache = GenerationCache(
+    maxsize=getattr(settings, "GENERATION_CACHE_MAX_SIZE", 1024),
+    stale_seconds=getattr(settings, "GENERATION_CACHE_STALE_SECONDS", 0),
+)
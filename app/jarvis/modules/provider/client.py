@@ -0,0 +1,237 @@
+import asyncio
+import sys
+from contextlib import ExitStack, contextmanager
+from core.modules.breaker import CircuitBreaker, circuit_breakers
+from core.modules.http import AsyncHTTPClient, AsyncHTTPResponse
+from jarvis.modules.provider.deadline import get_deadline
+from jarvis.modules.provider.errors import is_provider_failure
+from jarvis.modules.provider.keys import ProviderKey, key_pool
+from jarvis.modules.provider.scheduler import estimate_tokens, provider_scheduler
+from typing import Any, Dict, Iterator, Optional
+
+
+class OpenAIClient:
+    """ Gateway for every call jarvis makes to the OpenAI API
+
+        The sync methods go through the openai SDK's requestor. The async
+        methods talk to the same endpoints through a pooled asyncio HTTP
+        client so that an ASGI worker can keep many generations in flight
+        at once. Every call is admitted by the provider scheduler first and
+        made with a key from the key pool. Within a request deadline, calls are
+        bounded by the time remaining. Calls go through the circuit
+        breaker of their scheduler lane and fail at once while it is open.
+    """
+
+    COMPLETIONS = "/completions"
+    IMAGES = "/images/generations"
+
+    # scheduler lane of the image endpoint, completions use their model
+    IMAGES_LANE = "images"
+
+    # shared by every instance so keep-alive connections are reused
+    http = AsyncHTTPClient()
+
+    def create_completion(self, **params) -> Dict[str, Any]:
+        with provider_scheduler.slot(params["model"], estimate_tokens(params)) as ticket:
+            with self.get_breaker(params["model"]).guard():
+                response = self._post(self.COMPLETIONS, params)
+            ticket.record_usage(response)
+        return response
+
+    def stream_completion(self, **params) -> Iterator[Dict[str, Any]]:
+        """ Start a streamed completion
+
+            The request is sent before this returns so provider errors are
+            raised here; the returned iterator yields the completion chunks
+            as the provider produces them. The scheduler slot, the key and
+            the breaker guard are held until the iterator is exhausted,
+            fails or is closed, so errors mid-stream are reported too.
+        """
+        params["stream"] = True
+        with ExitStack() as stack:
+            stack.enter_context(provider_scheduler.slot(params["model"], estimate_tokens(params)))
+            call = stack.enter_context(self.get_breaker(params["model"]).guard())
+            key = stack.enter_context(key_pool.use())
+            stack.enter_context(self._deadline_errors())
+            responses = self._request(key, self.COMPLETIONS, params, stream=True)
+            # the breaker times the call until the provider answered
+            call.responded()
+            stream = _Stream(key, responses, stack.pop_all())
+        return stream
+
+    def create_image(self, **params) -> Dict[str, Any]:
+        with provider_scheduler.slot(self.IMAGES_LANE):
+            with self.get_breaker(self.IMAGES_LANE).guard():
+                return self._post(self.IMAGES, params)
+
+    async def acreate_completion(self, **params) -> Dict[str, Any]:
+        async with provider_scheduler.aslot(params["model"], estimate_tokens(params)) as ticket:
+            with self.get_breaker(params["model"]).guard():
+                response = await self._apost(self.COMPLETIONS, params)
+            ticket.record_usage(response)
+        return response
+
+    async def acreate_image(self, **params) -> Dict[str, Any]:
+        async with provider_scheduler.aslot(self.IMAGES_LANE):
+            with self.get_breaker(self.IMAGES_LANE).guard():
+                return await self._apost(self.IMAGES, params)
+
+    @staticmethod
+    def get_breaker(lane: str) -> CircuitBreaker:
+        """ The circuit breaker of a scheduler lane, e.g. "openai:images" """
+        return circuit_breakers.get(
+            "openai:{}".format(lane), is_failure=is_provider_failure)
+
+    @staticmethod
+    def _get_url(path: str) -> str:
+        import openai
+        return openai.api_base.rstrip("/") + path
+
+    @staticmethod
+    def _get_headers(key: ProviderKey) -> Dict[str, str]:
+        headers = {
+            "Authorization": "Bearer {}".format(key.api_key),
+        }
+        if key.organization:
+            headers["OpenAI-Organization"] = key.organization
+        return headers
+
+    @staticmethod
+    def _get_timeout() -> Optional[float]:
+        """ Seconds left before the request deadline, None without one
+
+            Raises:
+                GatewayTimeoutError: If the deadline has already passed
+        """
+        deadline = get_deadline()
+        if deadline is None:
+            return None
+        deadline.check()
+        return deadline.remaining()
+
+    def _get_timeout_params(self) -> Dict[str, Any]:
+        timeout = self._get_timeout()
+        return {} if timeout is None else {"request_timeout": timeout}
+
+    @staticmethod
+    @contextmanager
+    def _deadline_errors() -> Iterator[None]:
+        """ Report a call cut short by the request deadline as such """
+        from openai import error
+        try:
+            yield
+        except (error.Timeout, asyncio.TimeoutError) as exc:
+            deadline = get_deadline()
+            if deadline is not None and deadline.expired():
+                raise deadline.exceeded() from exc
+            raise
+
+    def _post(self, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        with key_pool.use() as key, self._deadline_errors():
+            response = self._request(key, path, params)
+            key_pool.update_quota(key, response._headers)
+        return response.data
+
+    def _request(self, key: ProviderKey, path: str, params: Dict[str, Any], stream: bool = False) -> Any:
+        """ Sync request through the SDK's requestor
+
+            The SDK's create methods only read the module global
+            credentials and drop the response headers, the requestor takes
+            the credentials per request and returns the headers, which
+            report the key's quota. A stream is returned as an iterator of
+            its chunks.
+        """
+        from openai.api_requestor import APIRequestor
+        requestor = APIRequestor(key=key.api_key, organization=key.organization)
+        response: Any
+        response, _, _ = requestor.request(
+            "post", path, params, stream=stream, **self._get_timeout_params())
+        return response
+
+    async def _apost(self, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        with key_pool.use() as key, self._deadline_errors():
+            response = await self.http.request(
+                "POST",
+                self._get_url(path),
+                headers=self._get_headers(key),
+                json=params,
+                timeout=self._get_timeout()
+            )
+            if not 200 <= response.status < 300:
+                raise self._make_error(response)
+            key_pool.update_quota(key, response.headers)
+        return response.json()
+
+    @staticmethod
+    def _make_error(response: AsyncHTTPResponse) -> Exception:
+        """ Build the same exception the openai SDK would have raised """
+        from openai import error
+        from openai.api_requestor import APIRequestor
+
+        if response.status == 503:
+            return error.ServiceUnavailableError(
+                "The server is overloaded or not ready yet.",
+                response.body,
+                response.status,
+                headers=response.headers
+            )
+        try:
+            data = response.json()
+        except ValueError:
+            return error.APIError(
+                "HTTP code {} from API ({!r})".format(
+                    response.status, response.body),
+                response.body,
+                response.status,
+                headers=response.headers
+            )
+        return APIRequestor(key="-").handle_error_response(
+            response.body, response.status, data, response.headers
+        )
+
+
+class _Stream:
+    """ The chunks of a streamed completion
+
+        Holds the contexts of the call, its scheduler slot, key and breaker
+        guard, until the stream ends, fails or is closed, and reports the
+        outcome to them. The response headers arrive with the first chunk.
+    """
+
+    def __init__(self, key: ProviderKey, responses: Iterator[Any], stack: ExitStack):
+        self._key = key
+        self._responses = responses
+        self._stack: Optional[ExitStack] = stack
+        self._started = False
+
+    def __iter__(self) -> "_Stream":
+        return self
+
+    def __next__(self) -> Dict[str, Any]:
+        try:
+            response = next(self._responses)
+        except StopIteration:
+            self.close()
+            raise
+        except BaseException:
+            stack, self._stack = self._stack, None
+            if stack is not None:
+                stack.__exit__(*sys.exc_info())
+            raise
+        if not self._started:
+            self._started = True
+            key_pool.update_quota(self._key, response._headers)
+        return response.data
+
+    def close(self):
+        stack, self._stack = self._stack, None
+        if stack is not None:
+            with stack:
+                close = getattr(self._responses, "close", None)
+                if close:
+                    close()
+
+    def __del__(self):
+        # a stream dropped unread, e.g. with a response that was never
+        # sent, still gives back its slot
+        self.close()
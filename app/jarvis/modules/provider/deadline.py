@@ -0,0 +1,71 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from core.exceptions import GatewayTimeoutError
+from typing import Iterator, Optional
+
+
+# the deadline of the request the current provider calls are made for
+_current_deadline: ContextVar[Optional["Deadline"]] = ContextVar("provider_deadline", default=None)
+
+
+class Deadline:
+    """ The point in time by which a request must be answered
+
+        Created when the request arrives and handed down to the provider
+        calls made for it, which are bounded by the time remaining.
+    """
+
+    def __init__(self, timeout: float):
+        """
+        Args:
+            timeout (float): Seconds from now
+        """
+        self.timeout = timeout
+        self.started = time.monotonic()
+        self.expires_at = self.started + timeout
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def remaining(self) -> float:
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def check(self):
+        """ Raises GatewayTimeoutError if the deadline has passed """
+        if self.expired():
+            raise self.exceeded()
+
+    def exceeded(self) -> GatewayTimeoutError:
+        return GatewayTimeoutError({
+            "non_field_errors": ["The request could not be completed in time, please try again"],
+            "elapsed": ["{:.2f}".format(self.elapsed())],
+            "timeout": ["{:.2f}".format(self.timeout)],
+        })
+
+    @contextmanager
+    def scope(self) -> Iterator["Deadline"]:
+        """ Bound the provider calls made within by this deadline """
+        token = _current_deadline.set(self)
+        try:
+            yield self
+        finally:
+            _current_deadline.reset(token)
+
+
+def get_deadline() -> Optional[Deadline]:
+    """ The deadline of the current request, if any """
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]) -> Iterator[Optional[Deadline]]:
+    """ Deadline.scope, doing nothing without a deadline """
+    if deadline is None:
+        yield None
+        return
+    with deadline.scope():
+        yield deadline
@@ -0,0 +1,34 @@
+import asyncio
+from core.modules.breaker import CircuitOpenError
+
+
+def is_retryable_error(exc: BaseException) -> bool:
+    """ Whether a failed provider call may succeed if it is sent again
+
+        Timeouts, dropped connections, rate limits and server side errors
+        are retryable, as are calls refused by an open circuit breaker;
+        invalid requests and authentication errors are not.
+    """
+    from openai import error
+    return isinstance(exc, (
+        error.APIError,
+        error.APIConnectionError,
+        error.Timeout,
+        error.TryAgain,
+        error.RateLimitError,
+        error.ServiceUnavailableError,
+        asyncio.TimeoutError,
+        ConnectionError,
+        CircuitOpenError,
+    ))
+
+
+def is_provider_failure(exc: BaseException) -> bool:
+    """ Whether a failed call counts against the provider's circuit breaker
+
+        Rate limits are the scheduler's concern, they only mean too many
+        calls were sent, not that the provider is degraded.
+    """
+    from openai import error
+    return is_retryable_error(exc) and not isinstance(
+        exc, (error.RateLimitError, CircuitOpenError))
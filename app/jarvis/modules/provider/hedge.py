@@ -0,0 +1,187 @@
+import asyncio
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextvars import copy_context
+from django.conf import settings
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+
+class Hedger:
+    """ Hedged provider calls
+
+        A call that has not returned within the `quantile` of the recent
+        latencies of its model is sent a second time and the first
+        response wins. Hedges are capped at `max_extra` of the calls made
+        for the model so a slow provider does not get twice the load.
+
+        Sync calls run on a pool of `max_threads` threads shared by the
+        process; while every thread is busy a call runs unhedged on its
+        caller's thread. A losing sync call cannot be interrupted so it is
+        left to finish and its response dropped. A losing async call is
+        cancelled.
+    """
+
+    def __init__(
+        self,
+        quantile: float = 0.9,
+        max_extra: float = 0.05,
+        min_samples: int = 20,
+        window: int = 200,
+        max_threads: int = 32,
+    ):
+        """
+        Args:
+            quantile (float): Latency quantile after which a call is hedged
+            max_extra (float): Most hedges, as a share of the calls
+            min_samples (int): Latencies needed before hedging starts
+            window (int): Latencies kept per model
+            max_threads (int): Threads running the sync calls that may be
+                hedged, and their hedges
+        """
+        self.quantile = quantile
+        self.max_extra = max_extra
+        self.min_samples = min_samples
+        self._latencies: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=window))
+        self._calls: Dict[str, int] = defaultdict(int)
+        self._hedges: Dict[str, int] = defaultdict(int)
+        self._wins: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self.max_threads = max_threads
+        self._threads = threading.BoundedSemaphore(max_threads)
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def record(self, name: str, latency: float):
+        with self._lock:
+            self._latencies[name].append(latency)
+
+    def threshold(self, name: str) -> Optional[float]:
+        """ Seconds after which a call is hedged, None until enough calls are seen """
+        with self._lock:
+            latencies = sorted(self._latencies[name])
+        if len(latencies) < self.min_samples:
+            return None
+        return latencies[min(math.ceil(self.quantile * len(latencies)) - 1, len(latencies) - 1)]
+
+    def do(self, name: str, fn: Callable[[], Any]) -> Any:
+        """ Call fn, once more if it is slow, and return the first response """
+        threshold = self._begin(name)
+        if threshold is None or not self._threads.acquire(blocking=False):
+            return self._timed(name, fn)
+
+        primary = self._start(name, fn)
+        done, _ = wait([primary], timeout=threshold)
+        if done or not self._threads.acquire(blocking=False):
+            return primary.result()
+        if not self._take_hedge(name):
+            self._threads.release()
+            return primary.result()
+
+        hedge = self._start(name, fn)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    self._won(name, future is hedge)
+                    return future.result()
+        # both failed, report the first call's error
+        return primary.result()
+
+    async def ado(self, name: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """ Async counterpart of do """
+        threshold = self._begin(name)
+        if threshold is None:
+            return await self._atimed(name, fn)
+
+        primary = asyncio.ensure_future(self._atimed(name, fn))
+        hedge: Optional[asyncio.Future] = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=threshold)
+            if done or not self._take_hedge(name):
+                return await primary
+
+            hedge = asyncio.ensure_future(self._atimed(name, fn))
+            pending = {primary, hedge}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if not task.cancelled() and task.exception() is None:
+                        self._won(name, task is hedge)
+                        return task.result()
+            return primary.result()
+        finally:
+            for future in (primary, hedge):
+                if future is not None and not future.done():
+                    future.cancel()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            names = list(self._calls)
+            stats: Dict[str, Dict[str, Any]] = {name: {
+                "calls": self._calls[name],
+                "hedged": self._hedges[name],
+                "hedge_wins": self._wins[name],
+            } for name in names}
+        for name in names:
+            stats[name]["threshold"] = self.threshold(name)
+        return stats
+
+    def _begin(self, name: str) -> Optional[float]:
+        with self._lock:
+            self._calls[name] += 1
+        return self.threshold(name)
+
+    def _take_hedge(self, name: str) -> bool:
+        with self._lock:
+            if self._hedges[name] + 1 > self.max_extra * self._calls[name]:
+                return False
+            self._hedges[name] += 1
+            return True
+
+    def _won(self, name: str, hedged: bool):
+        if hedged:
+            with self._lock:
+                self._wins[name] += 1
+
+    def _timed(self, name: str, fn: Callable[[], Any]) -> Any:
+        started = time.monotonic()
+        result = fn()
+        self.record(name, time.monotonic() - started)
+        return result
+
+    async def _atimed(self, name: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        started = time.monotonic()
+        result = await fn()
+        self.record(name, time.monotonic() - started)
+        return result
+
+    def _start(self, name: str, fn: Callable[[], Any]) -> Future:
+        """ Run fn on the pool, with the caller's context
+
+            The caller has acquired one of the pool's threads, released
+            once fn returns.
+        """
+        context = copy_context()
+
+        def run():
+            try:
+                return context.run(self._timed, name, fn)
+            finally:
+                self._threads.release()
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_threads, thread_name_prefix="hedge")
+        return self._executor.submit(run)
+
+
+hedger = Hedger(
+    quantile=getattr(settings, "GENERATION_HEDGE_QUANTILE", 0.9),
+    max_extra=getattr(settings, "GENERATION_HEDGE_MAX_EXTRA", 0.05),
+    min_samples=getattr(settings, "GENERATION_HEDGE_MIN_SAMPLES", 20),
+    max_threads=getattr(settings, "GENERATION_HEDGE_MAX_THREADS", 32),
+)
@@ -0,0 +1,203 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from django.conf import settings
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional
+
+
+class ProviderKey:
+    """ An API key, optionally bound to an organization, and its health """
+
+    def __init__(self, api_key: Optional[str], organization: Optional[str] = None):
+        self.api_key = api_key
+        self.organization = organization
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.cooldown_until = 0.0
+        # fraction of the key's rate limit left, from the response headers
+        self.remaining_requests: Optional[float] = None
+        self.remaining_tokens: Optional[float] = None
+
+    @classmethod
+    def parse(cls, entry: Optional[str]) -> "ProviderKey":
+        """ Build a key from "key" or "key:organization" """
+        if not entry:
+            return cls(None)
+        api_key, _, organization = entry.partition(":")
+        return cls(api_key.strip(), organization.strip() or None)
+
+    @property
+    def name(self) -> str:
+        """ The key with all but its last characters masked """
+        if not self.api_key:
+            return "-"
+        return "...{}".format(self.api_key[-4:])
+
+    @property
+    def quota(self) -> float:
+        known = [
+            remaining for remaining in (self.remaining_requests, self.remaining_tokens)
+            if remaining is not None
+        ]
+        return min(known) if known else 1.0
+
+    def update_quota(self, headers: Mapping[str, str]):
+        headers = {name.lower(): value for name, value in headers.items()}
+        for attr, unit in (("remaining_requests", "requests"), ("remaining_tokens", "tokens")):
+            try:
+                remaining = float(headers["x-ratelimit-remaining-{}".format(unit)])
+                limit = float(headers["x-ratelimit-limit-{}".format(unit)])
+            except (KeyError, ValueError):
+                continue
+            if limit > 0:
+                setattr(self, attr, min(max(remaining / limit, 0.0), 1.0))
+
+
+def is_key_failure(exc: BaseException) -> bool:
+    """ Whether an error says more about the key than about the request
+
+        Rate limits and server errors take the key out of rotation for a
+        while; invalid requests are the caller's and leave it in.
+    """
+    from openai import error
+    if isinstance(exc, (error.RateLimitError, error.ServiceUnavailableError,
+                        error.AuthenticationError, error.PermissionError)):
+        return True
+    return isinstance(exc, error.OpenAIError) and (exc.http_status or 0) >= 500
+
+
+class KeyPool:
+    """ Spreads provider calls across several API keys
+
+        Each call picks a key at random, weighted by the share of its rate
+        limit left, as last reported by the provider, and by the calls it
+        already has in flight. A key that fails with a rate limit or a
+        server error sits out a cooldown that doubles on every consecutive
+        failure; while every key is cooling down the one back soonest is
+        used. Credentials are passed with each request, never through the
+        openai module globals.
+    """
+
+    # floor of a key's weight, so a key reported as drained is still probed
+    MIN_WEIGHT = 0.01
+
+    def __init__(
+        self,
+        keys: List[ProviderKey],
+        cooldown: float = 30,
+        max_cooldown: float = 600,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Optional[random.Random] = None,
+    ):
+        """
+        Args:
+            cooldown (float): Seconds a key sits out after its first failure
+            max_cooldown (float): Longest a key sits out
+        """
+        if not keys:
+            raise ValueError("A key pool needs at least one key")
+        self.keys = keys
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_entries(cls, entries: List[Optional[str]], **kwargs) -> "KeyPool":
+        return cls([ProviderKey.parse(entry) for entry in entries], **kwargs)
+
+    def choose(self) -> ProviderKey:
+        """ Pick a key for a call, to be reported back with report """
+        with self._lock:
+            now = self.clock()
+            available = [key for key in self.keys if key.cooldown_until <= now]
+            if not available:
+                key = min(self.keys, key=lambda key: key.cooldown_until)
+            else:
+                weights = [
+                    max(key.quota, self.MIN_WEIGHT) / (1 + key.in_flight)
+                    for key in available
+                ]
+                key = self.rng.choices(available, weights)[0]
+            key.in_flight += 1
+            key.requests += 1
+            return key
+
+    def report(
+        self,
+        key: ProviderKey,
+        exc: Optional[BaseException] = None,
+        headers: Optional[Mapping[str, str]] = None
+    ):
+        """ Record the outcome of a call made with `key` """
+        with self._lock:
+            key.in_flight -= 1
+            if headers is None and exc is not None:
+                headers = getattr(exc, "headers", None)
+            if headers:
+                key.update_quota(headers)
+            if exc is None:
+                key.failures = 0
+            elif is_key_failure(exc):
+                key.failures += 1
+                key.cooldown_until = self.clock() + self._get_cooldown(key, exc, headers)
+
+    @contextmanager
+    def use(self) -> Iterator[ProviderKey]:
+        """ Pick a key for the calls within and report their outcome
+
+            Response headers can be recorded with update_quota.
+        """
+        key = self.choose()
+        try:
+            yield key
+        except BaseException as exc:
+            self.report(key, exc)
+            raise
+        self.report(key)
+
+    def update_quota(self, key: ProviderKey, headers: Mapping[str, str]):
+        with self._lock:
+            key.update_quota(headers)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            now = self.clock()
+            return [{
+                "key": key.name,
+                "organization": key.organization,
+                "requests": key.requests,
+                "in_flight": key.in_flight,
+                "quota": key.quota,
+                "cooling_down": key.cooldown_until > now,
+            } for key in self.keys]
+
+    def _get_cooldown(
+        self,
+        key: ProviderKey,
+        exc: BaseException,
+        headers: Optional[Mapping[str, str]]
+    ) -> float:
+        from openai import error
+        if isinstance(exc, (error.AuthenticationError, error.PermissionError)):
+            # needs someone to fix the key
+            return self.max_cooldown
+        cooldown = self.cooldown * 2 ** (key.failures - 1)
+        retry_after = None
+        if headers:
+            retry_after = {name.lower(): value for name, value in headers.items()}.get("retry-after")
+        try:
+            cooldown = max(cooldown, float(retry_after)) if retry_after else cooldown
+        except ValueError:
+            pass
+        return min(cooldown, self.max_cooldown)
+
+
+key_pool = KeyPool.from_entries(
+    getattr(settings, "OPENAI_API_KEYS", None) or [settings.OPENAI_API_KEY],
+    cooldown=getattr(settings, "OPENAI_KEY_COOLDOWN", 30),
+    max_cooldown=getattr(settings, "OPENAI_KEY_MAX_COOLDOWN", 600),
+)
@@ -0,0 +1,419 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from jarvis.modules.provider.deadline import Deadline, get_deadline
+from jarvis.modules.provider.tokens import count_tokens
+from typing import Any, Callable, Deque, Dict, Iterator, Optional
+
+
+# the buyer the current provider calls are made for, see for_user
+_current_user: ContextVar[Optional[str]] = ContextVar("provider_user", default=None)
+
+
+def estimate_tokens(params: Dict[str, Any]) -> int:
+    """ Tokens a request counts against the tokens per minute limit
+
+        The provider counts the prompt and the most tokens the request may
+        generate. Requests without max_tokens, e.g. images, cost nothing.
+    """
+    if "max_tokens" not in params:
+        return 0
+    prompts = params.get("prompt") or ""
+    if isinstance(prompts, str):
+        prompts = [prompts]
+    prompt_tokens = sum(count_tokens(prompt) for prompt in prompts)
+    return prompt_tokens + params["max_tokens"] * params.get("n", 1) * len(prompts)
+
+
+class TokenBucket:
+    """ Allows `per_minute` units a minute, refilled continuously """
+
+    def __init__(self, per_minute: float, now: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60
+        self.tokens = self.capacity
+        self.updated = now
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """ Seconds until `amount` units are available """
+        self._refill(now)
+        # a request larger than the bucket waits for a full bucket
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float, now: float):
+        self._refill(now)
+        self.tokens -= min(amount, self.capacity)
+
+    def give(self, amount: float):
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class AdaptiveLimit:
+    """ Concurrency limit with additive increase, multiplicative decrease
+
+        Every success raises the limit by one over the course of a full
+        window of requests; a rate limit response halves it.
+    """
+
+    def __init__(self, initial: int, minimum: int, maximum: int):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(min(max(initial, minimum), maximum))
+
+    @property
+    def value(self) -> int:
+        return int(self.limit)
+
+    def on_success(self):
+        self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+    def on_rate_limited(self):
+        self.limit = max(self.minimum, self.limit / 2)
+
+
+class _Waiter:
+    def __init__(self, user: Optional[str], tokens: int, now: float):
+        self.user = user
+        self.tokens = tokens
+        self.enqueued_at = now
+        self.granted = False
+        self._event = threading.Event()
+        self._aevent: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def use_loop(self):
+        self._loop = asyncio.get_running_loop()
+        self._aevent = asyncio.Event()
+
+    def wake(self):
+        if self._loop is None:
+            self._event.set()
+        else:
+            try:
+                self._loop.call_soon_threadsafe(self._aevent.set)  # type: ignore
+            except RuntimeError:
+                # the loop is closed, the waiter is gone with it
+                pass
+
+    def wait(self, timeout: float):
+        self._event.wait(timeout)
+        self._event.clear()
+
+    async def await_(self, timeout: float):
+        try:
+            await asyncio.wait_for(self._aevent.wait(), timeout)  # type: ignore
+        except asyncio.TimeoutError:
+            pass
+        self._aevent.clear()  # type: ignore
+
+
+class Ticket:
+    """ An admitted provider call, returned by ProviderScheduler.slot """
+
+    def __init__(self, lane: "_Lane", tokens: int):
+        self.lane = lane
+        self.tokens = tokens
+        self.used_tokens: Optional[int] = None
+
+    def record_usage(self, response: Any):
+        """ Refund the unused part of the token estimate """
+        try:
+            self.used_tokens = response["usage"]["total_tokens"]
+        except (KeyError, TypeError):
+            pass
+
+
+class _Lane:
+    def __init__(self, limits: Dict[str, Any], concurrency: AdaptiveLimit, now: float):
+        rpm = limits.get("requests_per_minute")
+        tpm = limits.get("tokens_per_minute")
+        self.requests = TokenBucket(rpm, now) if rpm else None
+        self.tokens = TokenBucket(tpm, now) if tpm else None
+        self.concurrency = concurrency
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        # one FIFO per user, served round robin
+        self.queues: "OrderedDict[Optional[str], Deque[_Waiter]]" = OrderedDict()
+        self.granted = 0
+        self.rate_limited = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    @property
+    def queued(self) -> int:
+        return sum(len(queue) for queue in self.queues.values())
+
+    def wait_time(self, waiter: _Waiter, now: float) -> float:
+        wait = self.blocked_until - now
+        if self.requests is not None:
+            wait = max(wait, self.requests.wait_time(1, now))
+        if self.tokens is not None and waiter.tokens:
+            wait = max(wait, self.tokens.wait_time(waiter.tokens, now))
+        return max(wait, 0.0)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self.queued,
+            "in_flight": self.in_flight,
+            "concurrency": self.concurrency.value,
+            "granted": self.granted,
+            "rate_limited": self.rate_limited,
+            "timeouts": self.timeouts,
+            "wait_avg": self.wait_total / self.granted if self.granted else 0.0,
+            "wait_max": self.wait_max,
+        }
+
+
+class ProviderScheduler:
+    """ Admission control in front of every provider call
+
+        Calls are grouped in lanes, one per provider model, each with
+        its own requests and tokens per minute buckets and an adaptive
+        concurrency limit that halves on a rate limit response and grows
+        back as calls succeed. Waiting calls are queued per user and
+        admitted round robin so one heavy buyer cannot starve the others.
+        Sync callers block their thread, async callers only their task.
+
+        The state is per process: with `processes` processes sharing the
+        provider, each admits its share of the rate and concurrency limits.
+    """
+
+    def __init__(
+        self,
+        limits: Dict[str, Dict[str, Any]],
+        initial_concurrency: int = 8,
+        min_concurrency: int = 1,
+        max_concurrency: int = 32,
+        queue_timeout: float = 60,
+        cooldown: float = 1.0,
+        processes: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            limits (dict): requests_per_minute and tokens_per_minute by
+                lane, a "default" entry applies to the other lanes
+            queue_timeout (float): Longest a call waits to be admitted
+            cooldown (float): Seconds a lane is paused after a rate limit
+            processes (int): Processes the limits and the initial and
+                maximum concurrency are split between
+        """
+        self.limits = limits
+        self.processes = max(processes, 1)
+        self.initial_concurrency = max(initial_concurrency // self.processes, min_concurrency)
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max(max_concurrency // self.processes, min_concurrency)
+        self.queue_timeout = queue_timeout
+        self.cooldown = cooldown
+        self.clock = clock
+        self._lanes: Dict[str, _Lane] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def for_user(self, user) -> Iterator[None]:
+        """ Attribute the provider calls made within to `user` """
+        token = _current_user.set(None if user is None else str(user.pk))
+        try:
+            yield
+        finally:
+            _current_user.reset(token)
+
+    @contextmanager
+    def slot(self, lane: str, tokens: int = 0) -> Iterator[Ticket]:
+        """ Run a provider call once the lane admits it
+
+            Raises:
+                openai.error.RateLimitError: If the call is not admitted
+                within the queue timeout
+                GatewayTimeoutError: If the request deadline passes first
+        """
+        ticket = self.acquire(lane, tokens)
+        try:
+            yield ticket
+        except BaseException as exc:
+            self.release(ticket, exc)
+            raise
+        self.release(ticket)
+
+    @asynccontextmanager
+    async def aslot(self, lane: str, tokens: int = 0):
+        """ Async counterpart of slot """
+        ticket = await self.aacquire(lane, tokens)
+        try:
+            yield ticket
+        except BaseException as exc:
+            self.release(ticket, exc)
+            raise
+        self.release(ticket)
+
+    def acquire(self, lane_name: str, tokens: int = 0) -> Ticket:
+        lane, waiter, retry = self._enqueue(lane_name, tokens)
+        request_deadline = get_deadline()
+        deadline = waiter.enqueued_at + self.queue_timeout
+        if request_deadline is not None:
+            deadline = min(deadline, request_deadline.expires_at)
+        try:
+            while not waiter.granted:
+                remaining = deadline - self.clock()
+                if remaining <= 0:
+                    raise self._timeout(lane, request_deadline)
+                waiter.wait(min(retry, remaining) if retry else remaining)
+                retry = self._retry(lane, waiter)
+        except BaseException:
+            self._abandon(lane, waiter)
+            raise
+        return Ticket(lane, tokens)
+
+    async def aacquire(self, lane_name: str, tokens: int = 0) -> Ticket:
+        lane, waiter, retry = self._enqueue(lane_name, tokens, use_loop=True)
+        request_deadline = get_deadline()
+        deadline = waiter.enqueued_at + self.queue_timeout
+        if request_deadline is not None:
+            deadline = min(deadline, request_deadline.expires_at)
+        try:
+            while not waiter.granted:
+                remaining = deadline - self.clock()
+                if remaining <= 0:
+                    raise self._timeout(lane, request_deadline)
+                await waiter.await_(min(retry, remaining) if retry else remaining)
+                retry = self._retry(lane, waiter)
+        except BaseException:
+            self._abandon(lane, waiter)
+            raise
+        return Ticket(lane, tokens)
+
+    def release(self, ticket: Ticket, exc: Optional[BaseException] = None):
+        """ Free the ticket's slot and adapt the lane to the outcome """
+        from openai import error
+        lane = ticket.lane
+        with self._lock:
+            now = self.clock()
+            lane.in_flight -= 1
+            if isinstance(exc, error.RateLimitError):
+                lane.rate_limited += 1
+                lane.concurrency.on_rate_limited()
+                lane.blocked_until = max(lane.blocked_until, now + self.cooldown)
+            elif exc is None:
+                lane.concurrency.on_success()
+                if lane.tokens is not None and ticket.used_tokens is not None:
+                    lane.tokens.give(max(ticket.tokens - ticket.used_tokens, 0))
+            self._dispatch(lane, now)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: lane.stats() for name, lane in self._lanes.items()}
+
+    def reset(self):
+        with self._lock:
+            self._lanes.clear()
+
+    def _get_lane(self, name: str, now: float) -> _Lane:
+        lane = self._lanes.get(name)
+        if lane is None:
+            limits = {
+                limit: value / self.processes
+                for limit, value in self.limits.get(name, self.limits.get("default", {})).items()
+            }
+            lane = self._lanes[name] = _Lane(limits, AdaptiveLimit(
+                self.initial_concurrency, self.min_concurrency, self.max_concurrency
+            ), now)
+        return lane
+
+    def _enqueue(self, lane_name: str, tokens: int, use_loop: bool = False):
+        with self._lock:
+            now = self.clock()
+            lane = self._get_lane(lane_name, now)
+            waiter = _Waiter(_current_user.get(), tokens, now)
+            if use_loop:
+                waiter.use_loop()
+            lane.queues.setdefault(waiter.user, deque()).append(waiter)
+            retry = self._dispatch(lane, now, caller=waiter)
+        return lane, waiter, retry
+
+    def _retry(self, lane: _Lane, waiter: _Waiter) -> Optional[float]:
+        with self._lock:
+            if waiter.granted:
+                return None
+            return self._dispatch(lane, self.clock(), caller=waiter)
+
+    def _dispatch(self, lane: _Lane, now: float, caller: Optional[_Waiter] = None) -> Optional[float]:
+        """ Admit queued calls while the lane has capacity
+
+            Returns:
+                float: Seconds until the next call can be admitted, None
+                when waiting on a running call to finish instead. The next
+                waiter in line is woken to time its own wait.
+        """
+        while lane.queues and lane.in_flight < lane.concurrency.value:
+            user, queue = next(iter(lane.queues.items()))
+            waiter = queue[0]
+            wait = lane.wait_time(waiter, now)
+            if wait > 0:
+                if waiter is not caller:
+                    waiter.wake()
+                return wait
+
+            queue.popleft()
+            if queue:
+                lane.queues.move_to_end(user)
+            else:
+                del lane.queues[user]
+            if lane.requests is not None:
+                lane.requests.take(1, now)
+            if lane.tokens is not None:
+                lane.tokens.take(waiter.tokens, now)
+            lane.in_flight += 1
+            lane.granted += 1
+            waited = now - waiter.enqueued_at
+            lane.wait_total += waited
+            lane.wait_max = max(lane.wait_max, waited)
+            waiter.granted = True
+            if waiter is not caller:
+                waiter.wake()
+        return None
+
+    def _abandon(self, lane: _Lane, waiter: _Waiter):
+        """ Take a timed out or cancelled waiter out of the lane """
+        with self._lock:
+            if waiter.granted:
+                # admitted just as it gave up
+                lane.in_flight -= 1
+            else:
+                queue = lane.queues.get(waiter.user)
+                if queue is not None and waiter in queue:
+                    queue.remove(waiter)
+                    if not queue:
+                        del lane.queues[waiter.user]
+            self._dispatch(lane, self.clock())
+
+    def _timeout(self, lane: _Lane, request_deadline: Optional[Deadline]) -> Exception:
+        from openai import error
+        with self._lock:
+            lane.timeouts += 1
+        if request_deadline is not None and request_deadline.expired():
+            return request_deadline.exceeded()
+        return error.RateLimitError(
+            "The provider is busy, timed out waiting for capacity")
+
+
+provider_scheduler = ProviderScheduler(
+    limits=getattr(settings, "PROVIDER_RATE_LIMITS", {}),
+    initial_concurrency=getattr(settings, "PROVIDER_INITIAL_CONCURRENCY", 16),
+    min_concurrency=getattr(settings, "PROVIDER_MIN_CONCURRENCY", 1),
+    max_concurrency=getattr(settings, "PROVIDER_MAX_CONCURRENCY", 512),
+    queue_timeout=getattr(settings, "PROVIDER_QUEUE_TIMEOUT", 60),
+    cooldown=getattr(settings, "PROVIDER_RATE_LIMIT_COOLDOWN", 1.0),
+    processes=getattr(settings, "PROVIDER_PROCESSES", 1),
+)
@@ -0,0 +1,252 @@
+import asyncio
+import threading
+import time
+import weakref
+from asgiref.sync import sync_to_async
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from jarvis.modules.provider.deadline import Deadline, get_deadline
+from typing import Any, Callable, Coroutine, Dict, Optional, Tuple
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _AsyncFlight:
+    def __init__(self, task: "asyncio.Task"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """ Coalesces concurrent identical provider calls onto one request
+
+        The first caller for a key (the leader) makes the call; callers
+        arriving while it is in flight wait for and share its response,
+        including its exception. Nothing is kept once the call returns, so
+        later callers always make a new request.
+
+        Sync callers are coalesced across the threads of a process and
+        async callers across the tasks of an event loop. With `use_db`
+        the leader also claims the key in GenerationFlightModel so callers
+        in other processes wait for the leader's stored response instead
+        of calling the provider themselves. Waiters give up at their request
+        deadline.
+    """
+
+    def __init__(self, use_db: bool = False, lease_seconds: float = 120.0, poll_interval: float = 0.1):
+        """
+        Args:
+            use_db (bool): Also coalesce across processes through the database.
+            lease_seconds (float): Age after which a database flight is
+                considered abandoned, e.g. because its process died.
+            poll_interval (float): Seconds between polls for the response of
+                a flight led by another process.
+        """
+        self.use_db = use_db
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        self._aflights: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, _AsyncFlight]]" = weakref.WeakKeyDictionary()
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """ Call fn, or wait for the in-flight call made for the same key """
+        with self._lock:
+            leading = self._flights.get(key)
+            if leading is None:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+
+        if leading is not None:
+            # bounded by the follower's own request deadline
+            deadline = get_deadline()
+            if not leading.done.wait(None if deadline is None else deadline.remaining()):
+                raise deadline.exceeded()  # type: ignore
+            if leading.error is not None:
+                raise leading.error
+            return leading.result
+
+        try:
+            flight.result = self._db_do(key, fn) if self.use_db else fn()
+            return flight.result
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    async def ado(self, key: str, fn: Callable[[], Coroutine[Any, Any, Any]]) -> Any:
+        """ Async counterpart of do
+
+            The call runs in its own task so a waiter being cancelled does
+            not cancel it for the others; it is only cancelled once every
+            waiter has gone.
+        """
+        loop = asyncio.get_running_loop()
+        flights = self._aflights.setdefault(loop, {})
+        flight = flights.get(key)
+        if flight is None:
+            task: "asyncio.Task[Any]" = loop.create_task(
+                self._adb_do(key, fn) if self.use_db else fn())
+            flight = flights[key] = _AsyncFlight(task)
+            task.add_done_callback(
+                lambda done: self._aflight_done(flights, key, done))
+        else:
+            self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    @staticmethod
+    def _aflight_done(flights: Dict[str, _AsyncFlight], key: str, task: "asyncio.Task"):
+        flight = flights.get(key)
+        if flight is not None and flight.task is task:
+            del flights[key]
+        if not task.cancelled():
+            # mark the exception as retrieved when every waiter has gone
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            in_flight = len(self._flights)
+        in_flight += sum(len(flights) for flights in list(self._aflights.values()))
+        return {
+            "coalesced": self.coalesced,
+            "in_flight": in_flight,
+        }
+
+    def _db_do(self, key: str, fn: Callable[[], Any]) -> Any:
+        flight_id, leader = self._db_join(key)
+        if flight_id is None:
+            return fn()
+        if leader:
+            try:
+                result = fn()
+            except BaseException:
+                self._db_abandon(flight_id)
+                raise
+            self._db_complete(flight_id, result)
+            return result
+
+        request_deadline, deadline = self._poll_deadline()
+        while time.monotonic() < deadline:
+            time.sleep(min(self.poll_interval, max(deadline - time.monotonic(), 0.0)))
+            found, result = self._db_poll(flight_id)
+            if not found:
+                break
+            if result is not None:
+                return result
+        if request_deadline is not None and request_deadline.expired():
+            raise request_deadline.exceeded()
+        # the leader failed or took too long, make the call ourselves
+        return fn()
+
+    async def _adb_do(self, key: str, fn: Callable[[], Coroutine[Any, Any, Any]]) -> Any:
+        flight_id, leader = await sync_to_async(self._db_join)(key)
+        if flight_id is None:
+            return await fn()
+        if leader:
+            try:
+                result = await fn()
+            except BaseException:
+                await sync_to_async(self._db_abandon)(flight_id)
+                raise
+            await sync_to_async(self._db_complete)(flight_id, result)
+            return result
+
+        request_deadline, deadline = self._poll_deadline()
+        while time.monotonic() < deadline:
+            await asyncio.sleep(min(self.poll_interval, max(deadline - time.monotonic(), 0.0)))
+            found, result = await sync_to_async(self._db_poll)(flight_id)
+            if not found:
+                break
+            if result is not None:
+                return result
+        if request_deadline is not None and request_deadline.expired():
+            raise request_deadline.exceeded()
+        return await fn()
+
+    def _poll_deadline(self) -> Tuple[Optional[Deadline], float]:
+        """ When a follower of another process' flight stops polling: once
+            the lease runs out, or before that its own request deadline
+        """
+        request_deadline = get_deadline()
+        deadline = time.monotonic() + self.lease_seconds
+        if request_deadline is not None:
+            deadline = min(deadline, request_deadline.expires_at)
+        return request_deadline, deadline
+
+    def _db_join(self, key: str) -> Tuple[Optional[int], bool]:
+        """ Claim the key or join the flight that holds it
+
+            Returns:
+                (flight_id, leader): flight_id is None when the key is held by
+                a flight that already completed, which is not joined since
+                its response was produced before this call was made.
+        """
+        from jarvis.models import GenerationFlightModel
+
+        now = timezone.now()
+        # completed flights are kept for a few polls so their waiters
+        # can read the response, abandoned ones until the lease runs out
+        GenerationFlightModel.objects.filter(key=key).filter(
+            Q(completed_at__lt=now - timedelta(seconds=self.poll_interval * 10))
+            | Q(created_at__lt=now - timedelta(seconds=self.lease_seconds))
+        ).delete()
+        try:
+            with transaction.atomic():
+                return GenerationFlightModel.objects.create(key=key).pk, True
+        except IntegrityError:
+            flight = GenerationFlightModel.objects.filter(key=key).values(
+                "pk", "completed_at").first()
+            if flight is None or flight["completed_at"] is not None:
+                return None, False
+            return flight["pk"], False
+
+    @staticmethod
+    def _db_complete(flight_id: int, result: Any):
+        from jarvis.models import GenerationFlightModel
+        GenerationFlightModel.objects.filter(pk=flight_id).update(
+            response=result, completed_at=timezone.now())
+
+    @staticmethod
+    def _db_abandon(flight_id: int):
+        from jarvis.models import GenerationFlightModel
+        GenerationFlightModel.objects.filter(pk=flight_id).delete()
+
+    @staticmethod
+    def _db_poll(flight_id: int) -> Tuple[bool, Any]:
+        """ Returns whether the flight still exists and its response if completed """
+        from jarvis.models import GenerationFlightModel
+        flight = GenerationFlightModel.objects.filter(pk=flight_id).values(
+            "response", "completed_at").first()
+        if flight is None:
+            return False, None
+        if flight["completed_at"] is None:
+            return True, None
+        return True, flight["response"]
+
+
+single_flight = SingleFlight(
+    use_db=getattr(settings, "GENERATION_SINGLE_FLIGHT_DB", False),
+    lease_seconds=getattr(settings, "GENERATION_SINGLE_FLIGHT_LEASE_SECONDS", 120),
+)
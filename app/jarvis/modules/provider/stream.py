@@ -0,0 +1,54 @@
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+class CompletionStream:
+    """ Relays the text of a streamed completion as it arrives
+
+        The chunks are folded back into a regular completion response
+        which is handed to `on_close` exactly once, when the stream is
+        exhausted, fails or is closed early by the consumer (e.g. the
+        client disconnected). Its return value is kept in `result`.
+    """
+
+    def __init__(
+        self,
+        chunks: Iterator[Dict[str, Any]],
+        on_close: Callable[[Dict[str, Any]], Any]
+    ):
+        self._chunks = chunks
+        self._on_close = on_close
+        self.id: Optional[str] = None
+        self.parts: List[str] = []
+        self.closed = False
+        self.result: Any = None
+
+    def __iter__(self) -> Iterator[str]:
+        try:
+            for chunk in self._chunks:
+                self.id = self.id or chunk.get("id")
+                text = chunk["choices"][0].get("text") or ""
+                if text:
+                    self.parts.append(text)
+                    yield text
+        finally:
+            self.close()
+
+    def get_response(self) -> Dict[str, Any]:
+        """ The completion response assembled from the chunks seen so far """
+        return {
+            "id": self.id,
+            "choices": [{"text": "".join(self.parts)}]
+        }
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+
+        close = getattr(self._chunks, "close", None)
+        if close:
+            close()
+
+        # nothing to record if the provider never answered
+        if self.id is not None:
+            self.result = self._on_close(self.get_response())
@@ -0,0 +1,52 @@
+from django.test import SimpleTestCase
+from jarvis.modules.provider import GenerationCache, make_request_key
+from unittest.mock import patch
+
+
+class GenerationCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.cache = GenerationCache(maxsize=2, stale_seconds=100)
+        self.params = {
+            "model": "text-davinci-003",
+            "prompt": "Write a slogan",
+            "temperature": 0.0,
+            "user": "1",
+        }
+
+    def test_make_request_key(self):
+        key = make_request_key("gpt3", self.params)
+        # the requesting user does not change the output
+        self.assertEqual(
+            key,
+            make_request_key("gpt3", {**self.params, "user": "2"})
+        )
+        self.assertNotEqual(
+            key,
+            make_request_key("gpt3", {**self.params, "temperature": 0.5})
+        )
+        self.assertNotEqual(key, make_request_key("dalle2", self.params))
+
+    def test_get_set(self):
+        self.assertIsNone(self.cache.get("a"))
+        self.cache.set("a", {"id": "a"}, ttl=10)
+        self.assertEqual(self.cache.get("a"), {"id": "a"})
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    def test_expired(self):
+        with patch("jarvis.modules.provider.cache.time.monotonic", return_value=0):
+            self.cache.set("a", {"id": "a"}, ttl=10)
+        with patch("jarvis.modules.provider.cache.time.monotonic", return_value=50):
+            self.assertIsNone(self.cache.get("a"))
+            self.assertEqual(self.cache.get_stale("a"), {"id": "a"})
+        with patch("jarvis.modules.provider.cache.time.monotonic", return_value=200):
+            self.assertIsNone(self.cache.get_stale("a"))
+
+    def test_lru_eviction(self):
+        self.cache.set("a", {"id": "a"}, ttl=10)
+        self.cache.set("b", {"id": "b"}, ttl=10)
+        self.cache.get("a")
+        self.cache.set("c", {"id": "c"}, ttl=10)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertIsNotNone(self.cache.get("a"))
+        self.assertEqual(self.cache.stats()["size"], 2)
@@ -0,0 +1,64 @@
+from django.test import SimpleTestCase
+from core.modules.breaker import CircuitOpenError
+from jarvis.modules.provider import (
+    OpenAIClient, is_provider_failure, is_retryable_error, provider_scheduler)
+from jarvis.modules.provider.testing import patch_completion
+
+
+class OpenAIClientBreakerTest(SimpleTestCase):
+    def setUp(self):
+        self.breaker = OpenAIClient.get_breaker("text-breaker-test")
+        self.breaker.enabled = True
+        self.addCleanup(self.breaker.reset)
+        self.addCleanup(setattr, self.breaker, "enabled", False)
+
+    def test_fails_fast_when_open(self):
+        for _ in range(self.breaker.min_calls):
+            self.breaker.record(0.1, failed=True)
+        with self.assertRaises(CircuitOpenError) as context, patch_completion() as create:
+            OpenAIClient().create_completion(model="text-breaker-test", prompt="x")
+        create.assert_not_called()
+        self.assertTrue(is_retryable_error(context.exception))
+        self.assertFalse(is_provider_failure(context.exception))
+
+    def test_provider_failures_counted(self):
+        from openai import error
+        with patch_completion() as create:
+            create.side_effect = error.ServiceUnavailableError("down")
+            with self.assertRaises(error.ServiceUnavailableError):
+                OpenAIClient().create_completion(model="text-breaker-test", prompt="x")
+
+            create.side_effect = error.InvalidRequestError("bad", "prompt")
+            with self.assertRaises(error.InvalidRequestError):
+                OpenAIClient().create_completion(model="text-breaker-test", prompt="x")
+        self.assertEqual(self.breaker.stats()["failure_rate"], 0.5)
+
+    def test_stream_failures_counted(self):
+        from openai import error
+
+        def chunks():
+            yield {"choices": [{"text": "Hi"}]}
+            raise error.ServiceUnavailableError("down")
+
+        with patch_completion(return_value=chunks()):
+            stream = OpenAIClient().stream_completion(model="text-breaker-test", prompt="x")
+            with self.assertRaises(error.ServiceUnavailableError):
+                list(stream)
+        self.assertEqual(self.breaker.stats()["failure_rate"], 1.0)
+
+    def test_stream_holds_slot(self):
+        def in_flight():
+            return provider_scheduler.stats()["text-breaker-test"]["in_flight"]
+
+        with patch_completion(return_value=[{"choices": [{"text": "Hi"}]}]):
+            stream = OpenAIClient().stream_completion(model="text-breaker-test", prompt="x")
+            self.assertEqual(in_flight(), 1)
+            stream.close()
+            self.assertEqual(in_flight(), 0)
+            self.assertEqual(self.breaker.stats()["failure_rate"], 0.0)
+
+            # a stream dropped unread gives back its slot too
+            stream = OpenAIClient().stream_completion(model="text-breaker-test", prompt="x")
+            self.assertEqual(in_flight(), 1)
+            del stream
+            self.assertEqual(in_flight(), 0)
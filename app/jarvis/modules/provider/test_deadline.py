@@ -0,0 +1,78 @@
+import time
+from openai import error
+from unittest.mock import patch
+from jarvis.modules.provider.testing import patch_completion
+from django.test import SimpleTestCase
+from core.exceptions import GatewayTimeoutError
+from jarvis.modules.provider import (
+    Deadline,
+    OpenAIClient,
+    ProviderScheduler,
+    deadline_scope,
+    get_deadline
+)
+
+
+class DeadlineTest(SimpleTestCase):
+    def test_deadline(self):
+        deadline = Deadline(60)
+        self.assertFalse(deadline.expired())
+        self.assertGreater(deadline.remaining(), 59)
+        deadline.check()
+
+    def test_exceeded(self):
+        deadline = Deadline(0)
+        self.assertTrue(deadline.expired())
+        self.assertEqual(deadline.remaining(), 0)
+        with self.assertRaises(GatewayTimeoutError) as context:
+            deadline.check()
+        self.assertEqual(context.exception.status_code, 504)
+        self.assertEqual(context.exception.detail["timeout"], ["0.00"])  # type: ignore
+        self.assertIn("elapsed", context.exception.detail)  # type: ignore
+
+    def test_scope(self):
+        deadline = Deadline(60)
+        self.assertIsNone(get_deadline())
+        with deadline_scope(deadline):
+            self.assertIs(get_deadline(), deadline)
+            with deadline_scope(None):
+                self.assertIs(get_deadline(), deadline)
+        self.assertIsNone(get_deadline())
+
+
+class OpenAIClientDeadlineTest(SimpleTestCase):
+    def create_completion(self):
+        return OpenAIClient().create_completion(model="text-ada-001", prompt="Hi", max_tokens=5)
+
+    def test_request_timeout(self):
+        with patch_completion(return_value={"choices": []}) as mock:
+            self.create_completion()
+            self.assertNotIn("request_timeout", mock.call_args.kwargs)
+            with Deadline(30).scope():
+                self.create_completion()
+            self.assertLessEqual(mock.call_args.kwargs["request_timeout"], 30)
+
+    def test_expired(self):
+        with patch_completion() as mock, Deadline(0).scope():
+            self.assertRaises(GatewayTimeoutError, self.create_completion)
+        mock.assert_not_called()
+
+    def test_provider_timeout(self):
+        def create(**params):
+            time.sleep(0.05)
+            raise error.Timeout("Request timed out")
+
+        with patch_completion(side_effect=create):
+            with Deadline(0.01).scope():
+                self.assertRaises(GatewayTimeoutError, self.create_completion)
+            # without a deadline it is the provider's error
+            self.assertRaises(error.Timeout, self.create_completion)
+
+    def test_scheduler_wait(self):
+        scheduler = ProviderScheduler(limits={}, initial_concurrency=1, max_concurrency=1)
+        ticket = scheduler.acquire("model")
+        with Deadline(0.05).scope():
+            with self.assertRaises(GatewayTimeoutError):
+                scheduler.acquire("model")
+        scheduler.release(ticket)
+        self.assertEqual(scheduler.stats()["model"]["timeouts"], 1)
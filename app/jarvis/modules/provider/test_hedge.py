@@ -0,0 +1,115 @@
+import asyncio
+import threading
+import time
+from django.test import SimpleTestCase
+from jarvis.modules.provider import Hedger
+
+
+class HedgerTest(SimpleTestCase):
+    def setUp(self):
+        self.hedger = Hedger(quantile=0.9, max_extra=1.0, min_samples=10)
+        for _ in range(10):
+            self.hedger.record("model", 0.01)
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+        self.calls = 0
+
+    def slow_then_fast(self):
+        self.calls += 1
+        if self.calls == 1:
+            self.release.wait(5)
+            return "slow"
+        return "fast"
+
+    def test_threshold(self):
+        hedger = Hedger(quantile=0.9, min_samples=3)
+        self.assertIsNone(hedger.threshold("model"))
+        for latency in range(1, 11):
+            hedger.record("model", latency)
+        self.assertEqual(hedger.threshold("model"), 9)
+
+    def test_do_fast(self):
+        self.assertEqual(self.hedger.do("model", lambda: "ok"), "ok")
+        self.assertEqual(self.hedger.stats()["model"]["hedged"], 0)
+
+    def test_do_hedged(self):
+        started = time.monotonic()
+        self.assertEqual(self.hedger.do("model", self.slow_then_fast), "fast")
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(self.calls, 2)
+        stats = self.hedger.stats()["model"]
+        self.assertEqual(stats["hedged"], 1)
+        self.assertEqual(stats["hedge_wins"], 1)
+
+    def test_do_budget(self):
+        self.hedger.max_extra = 0.0
+        self.release.set()
+        self.assertEqual(self.hedger.do("model", self.slow_then_fast), "slow")
+        self.assertEqual(self.calls, 1)
+
+    def test_do_without_samples(self):
+        hedger = Hedger(min_samples=10)
+        self.release.set()
+        self.assertEqual(hedger.do("model", self.slow_then_fast), "slow")
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(len(hedger._latencies["model"]), 1)
+
+    def test_do_pool_busy(self):
+        hedger = Hedger(quantile=0.9, max_extra=1.0, min_samples=10, max_threads=1)
+        for _ in range(10):
+            hedger.record("model", 0.01)
+        threads = []
+
+        def call():
+            threads.append(threading.get_ident())
+            return self.slow_then_fast()
+
+        threading.Timer(0.2, self.release.set).start()
+        # the slow primary call holds the only thread, so it is not hedged
+        self.assertEqual(hedger.do("model", call), "slow")
+        self.assertEqual(self.calls, 1)
+        self.assertNotEqual(threads[0], threading.get_ident())
+
+        # while the pool is busy calls run on the caller's thread
+        hedger._threads.acquire()
+        self.assertEqual(hedger.do("model", call), "fast")
+        self.assertEqual(threads[1], threading.get_ident())
+
+    def test_do_error_falls_back(self):
+        def call():
+            self.calls += 1
+            if self.calls == 1:
+                time.sleep(0.05)
+                raise ConnectionError
+            self.release.wait(5)
+            return "late"
+
+        thread = threading.Timer(0.2, self.release.set)
+        thread.start()
+        # the hedge answers although the first call failed
+        self.assertEqual(self.hedger.do("model", call), "late")
+
+    def test_do_both_failed(self):
+        def call():
+            time.sleep(0.05)
+            raise ConnectionError
+
+        self.assertRaises(ConnectionError, self.hedger.do, "model", call)
+
+    def test_ado_hedged(self):
+        cancelled = []
+
+        async def call():
+            self.calls += 1
+            if self.calls == 1:
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    cancelled.append(True)
+                    raise
+                return "slow"
+            return "fast"
+
+        self.assertEqual(asyncio.run(self.hedger.ado("model", call)), "fast")
+        # the losing call is cancelled
+        self.assertEqual(cancelled, [True])
@@ -0,0 +1,169 @@
+import random
+from openai import error
+from unittest.mock import MagicMock, patch
+from jarvis.modules.provider.testing import patch_completion
+from django.test import SimpleTestCase
+from jarvis.modules.provider import KeyPool, OpenAIClient, ProviderKey
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class ProviderKeyTest(SimpleTestCase):
+    def test_parse(self):
+        key = ProviderKey.parse("sk-abcdef:org-123")
+        self.assertEqual(key.api_key, "sk-abcdef")
+        self.assertEqual(key.organization, "org-123")
+        self.assertEqual(key.name, "...cdef")
+        self.assertIsNone(ProviderKey.parse("sk-abcdef").organization)
+
+    def test_update_quota(self):
+        key = ProviderKey("sk-1")
+        self.assertEqual(key.quota, 1.0)
+        key.update_quota({
+            "X-RateLimit-Limit-Requests": "60",
+            "X-RateLimit-Remaining-Requests": "30",
+            "x-ratelimit-limit-tokens": "1000",
+            "x-ratelimit-remaining-tokens": "100",
+        })
+        self.assertEqual(key.remaining_requests, 0.5)
+        self.assertEqual(key.quota, 0.1)
+
+
+class KeyPoolTest(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.pool = KeyPool.from_entries(
+            ["sk-1", "sk-2"],
+            cooldown=10,
+            max_cooldown=100,
+            clock=self.clock,
+            rng=random.Random(0)
+        )
+        self.first, self.second = self.pool.keys
+
+    def test_no_keys(self):
+        self.assertRaises(ValueError, KeyPool, [])
+
+    def test_choose_balances(self):
+        counts = {"sk-1": 0, "sk-2": 0}
+        for _ in range(200):
+            with self.pool.use() as key:
+                counts[key.api_key] += 1  # type: ignore
+        self.assertGreater(counts["sk-1"], 50)
+        self.assertGreater(counts["sk-2"], 50)
+
+    def test_choose_by_quota(self):
+        self.first.remaining_requests = 0.0
+        chosen = [self.pool.choose() for _ in range(50)]
+        # a drained key is only rarely probed
+        self.assertGreater(chosen.count(self.second), 45)
+
+    def test_cooldown(self):
+        with self.assertRaises(error.RateLimitError):
+            with self.pool.use() as key:
+                raise error.RateLimitError("Rate limit reached")
+        other = self.second if key is self.first else self.first
+        for _ in range(10):
+            with self.pool.use() as chosen:
+                self.assertIs(chosen, other)
+
+        # back in rotation after the cooldown
+        self.clock.now = 10
+        chosen = {self.pool.choose() for _ in range(50)}
+        self.assertEqual(chosen, {self.first, self.second})
+
+    def test_cooldown_doubles(self):
+        for cooldown in (10, 20, 40, 80, 100):
+            self.pool.choose()
+            self.pool.report(self.first, error.ServiceUnavailableError("Overloaded"))
+            self.assertEqual(self.first.cooldown_until, self.clock.now + cooldown)
+        self.pool.choose()
+        self.pool.report(self.first)
+        self.assertEqual(self.first.failures, 0)
+
+    def test_cooldown_retry_after(self):
+        self.pool.choose()
+        self.pool.report(self.first, error.RateLimitError(
+            "Rate limit reached", headers={"Retry-After": "25"}))
+        self.assertEqual(self.first.cooldown_until, 25)
+
+    def test_request_error_keeps_key(self):
+        self.pool.choose()
+        self.pool.report(self.first, error.InvalidRequestError("Invalid", "prompt"))
+        self.assertEqual(self.first.cooldown_until, 0)
+
+    def test_all_cooling_down(self):
+        self.first.cooldown_until = 20
+        self.second.cooldown_until = 10
+        self.assertIs(self.pool.choose(), self.second)
+
+    def test_stats(self):
+        self.pool.choose()
+        stats = self.pool.stats()
+        self.assertEqual([key["key"] for key in stats], ["...sk-1", "...sk-2"])
+        self.assertEqual(sum(key["in_flight"] for key in stats), 1)
+
+
+class OpenAIClientKeysTest(SimpleTestCase):
+    def setUp(self):
+        self.pool = KeyPool.from_entries(["sk-1:org-1"])
+        patcher = patch("jarvis.modules.provider.client.key_pool", self.pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_create_completion(self):
+        with patch_completion(return_value={"choices": []}, headers={
+            "x-ratelimit-limit-requests": "50",
+            "x-ratelimit-remaining-requests": "10",
+        }) as mock:
+            OpenAIClient().create_completion(model="text-ada-001", prompt="Hi", max_tokens=5)
+        self.assertEqual(mock.call_args.kwargs["api_key"], "sk-1")
+        self.assertEqual(mock.call_args.kwargs["organization"], "org-1")
+        self.assertEqual(self.pool.keys[0].remaining_requests, 0.2)
+
+    def test_stream_completion(self):
+        chunks = [{"choices": [{"text": "Hi"}]}, {"choices": [{"text": "!"}]}]
+        with patch_completion(return_value=chunks, headers={
+            "x-ratelimit-limit-requests": "50",
+            "x-ratelimit-remaining-requests": "25",
+        }):
+            stream = OpenAIClient().stream_completion(model="text-ada-001", prompt="Hi", max_tokens=5)
+            self.assertEqual(list(stream), chunks)
+        self.assertEqual(self.pool.keys[0].remaining_requests, 0.5)
+
+    def test_stream_completion_failed(self):
+        from openai import error
+
+        def chunks():
+            yield {"choices": [{"text": "Hi"}]}
+            raise error.ServiceUnavailableError("down")
+
+        with patch_completion(return_value=chunks()):
+            stream = OpenAIClient().stream_completion(model="text-ada-001", prompt="Hi", max_tokens=5)
+            # the key is in use until the stream ends
+            self.assertEqual(next(stream), {"choices": [{"text": "Hi"}]})
+            self.assertEqual(self.pool.keys[0].in_flight, 1)
+            with self.assertRaises(error.ServiceUnavailableError):
+                next(stream)
+        self.assertEqual(self.pool.keys[0].in_flight, 0)
+        self.assertEqual(self.pool.keys[0].failures, 1)
+
+    def test_create_image(self):
+        response = MagicMock(data={"data": [{"url": "https://image"}]}, _headers={
+            "x-ratelimit-limit-requests": "50",
+            "x-ratelimit-remaining-requests": "10",
+        })
+        with patch("openai.api_requestor.APIRequestor.__init__", return_value=None) as init, \
+                patch("openai.api_requestor.APIRequestor.request", return_value=(response, False, "sk-1")):
+            self.assertEqual(
+                OpenAIClient().create_image(prompt="A cat", n=1),
+                {"data": [{"url": "https://image"}]}
+            )
+        self.assertEqual(init.call_args.kwargs, {"key": "sk-1", "organization": "org-1"})
+        self.assertEqual(self.pool.keys[0].remaining_requests, 0.2)
@@ -0,0 +1,199 @@
+import asyncio
+import threading
+import time
+from openai import error
+from types import SimpleNamespace
+from django.test import SimpleTestCase
+from jarvis.modules.provider import ProviderScheduler, estimate_tokens
+from jarvis.modules.provider.scheduler import AdaptiveLimit, TokenBucket
+
+
+class TokenBucketTest(SimpleTestCase):
+    def test_bucket(self):
+        bucket = TokenBucket(60, now=0)
+        self.assertEqual(bucket.wait_time(60, now=0), 0)
+        bucket.take(60, now=0)
+        self.assertEqual(bucket.wait_time(1, now=0), 1)
+        # refilled at a unit a second
+        self.assertEqual(bucket.wait_time(1, now=1), 0)
+        self.assertEqual(bucket.wait_time(10, now=1), 9)
+        bucket.give(100)
+        self.assertEqual(bucket.tokens, 60)
+
+    def test_bucket_oversized(self):
+        bucket = TokenBucket(60, now=0)
+        self.assertEqual(bucket.wait_time(100, now=0), 0)
+
+
+class AdaptiveLimitTest(SimpleTestCase):
+    def test_limit(self):
+        limit = AdaptiveLimit(initial=8, minimum=1, maximum=10)
+        limit.on_rate_limited()
+        self.assertEqual(limit.value, 4)
+        # about one more per window of `limit` successes
+        for _ in range(5):
+            limit.on_success()
+        self.assertEqual(limit.value, 5)
+        for _ in range(10):
+            limit.on_rate_limited()
+        self.assertEqual(limit.value, 1)
+        for _ in range(1000):
+            limit.on_success()
+        self.assertEqual(limit.value, 10)
+
+
+class EstimateTokensTest(SimpleTestCase):
+    def test_estimate_tokens(self):
+        self.assertEqual(estimate_tokens({"prompt": "a" * 40, "max_tokens": 100}), 110)
+        self.assertEqual(estimate_tokens({"prompt": ["a" * 40, "b"], "max_tokens": 10}), 31)
+        self.assertEqual(estimate_tokens({"prompt": "a cat", "size": "256x256"}), 0)
+
+
+class ProviderSchedulerTest(SimpleTestCase):
+    def make_scheduler(self, limits=None, concurrency=8, max_concurrency=32, **kwargs):
+        return ProviderScheduler(
+            limits=limits or {},
+            initial_concurrency=concurrency,
+            max_concurrency=max_concurrency,
+            **kwargs
+        )
+
+    def wait_queued(self, scheduler, count):
+        deadline = time.monotonic() + 5
+        while scheduler.stats()["model"]["queued"] < count:
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.001)
+
+    def test_slot(self):
+        scheduler = self.make_scheduler()
+        with scheduler.slot("model"):
+            self.assertEqual(scheduler.stats()["model"]["in_flight"], 1)
+        stats = scheduler.stats()["model"]
+        self.assertEqual(stats["in_flight"], 0)
+        self.assertEqual(stats["granted"], 1)
+
+    def test_fair_queuing(self):
+        scheduler = self.make_scheduler(concurrency=1, max_concurrency=1)
+        first, second = SimpleNamespace(pk=1), SimpleNamespace(pk=2)
+        order = []
+
+        def call(user):
+            with scheduler.for_user(user):
+                with scheduler.slot("model"):
+                    order.append(user.pk)
+
+        ticket = scheduler.acquire("model")
+        threads = []
+        for user in (first, first, first, second):
+            thread = threading.Thread(target=call, args=(user,))
+            thread.start()
+            threads.append(thread)
+            self.wait_queued(scheduler, len(threads))
+        scheduler.release(ticket)
+        for thread in threads:
+            thread.join(5)
+
+        # the second user is served before the rest of the first user's calls
+        self.assertEqual(order, [1, 2, 1, 1])
+
+    def test_rate_limited(self):
+        scheduler = self.make_scheduler(concurrency=8)
+        with self.assertRaises(error.RateLimitError):
+            with scheduler.slot("model"):
+                raise error.RateLimitError("Rate limit reached")
+        stats = scheduler.stats()["model"]
+        self.assertEqual(stats["concurrency"], 4)
+        self.assertEqual(stats["rate_limited"], 1)
+
+        # other errors leave the limit alone
+        with self.assertRaises(error.InvalidRequestError):
+            with scheduler.slot("model"):
+                raise error.InvalidRequestError("Invalid", "prompt")
+        self.assertEqual(scheduler.stats()["model"]["concurrency"], 4)
+
+    def test_queue_timeout(self):
+        scheduler = self.make_scheduler(
+            limits={"model": {"requests_per_minute": 1}},
+            queue_timeout=0.05
+        )
+        with scheduler.slot("model"):
+            pass
+        with self.assertRaises(error.RateLimitError):
+            with scheduler.slot("model"):
+                pass
+        stats = scheduler.stats()["model"]
+        self.assertEqual(stats["timeouts"], 1)
+        self.assertEqual(stats["queued"], 0)
+
+    def test_requests_per_minute(self):
+        scheduler = self.make_scheduler(limits={"model": {"requests_per_minute": 1200}})
+        bucket = scheduler._get_lane("model", time.monotonic()).requests
+        bucket.tokens = 0  # type: ignore
+        # the bucket refills a request every 0.05 seconds
+        started = time.monotonic()
+        for _ in range(2):
+            with scheduler.slot("model"):
+                pass
+        self.assertGreaterEqual(time.monotonic() - started, 0.09)
+
+    def test_processes(self):
+        scheduler = self.make_scheduler(
+            limits={"model": {"requests_per_minute": 3000, "tokens_per_minute": 250000}},
+            concurrency=16,
+            max_concurrency=512,
+            processes=4
+        )
+        # each process admits its share of the limits
+        lane = scheduler._get_lane("model", time.monotonic())
+        self.assertEqual(lane.requests.capacity, 750)  # type: ignore
+        self.assertEqual(lane.tokens.capacity, 62500)  # type: ignore
+        self.assertEqual(lane.concurrency.value, 4)
+        self.assertEqual(lane.concurrency.maximum, 128)
+
+        # but never less than the minimum concurrency
+        scheduler = self.make_scheduler(concurrency=2, max_concurrency=2, processes=4)
+        self.assertEqual(scheduler._get_lane("model", time.monotonic()).concurrency.value, 1)
+
+    def test_tokens_refunded(self):
+        scheduler = self.make_scheduler(limits={"model": {"tokens_per_minute": 1000}})
+        with scheduler.slot("model", tokens=600) as ticket:
+            ticket.record_usage({"usage": {"total_tokens": 100}})
+        tokens = scheduler._get_lane("model", time.monotonic()).tokens
+        self.assertGreaterEqual(tokens.tokens, 900)  # type: ignore
+
+    def test_aslot(self):
+        scheduler = self.make_scheduler(concurrency=1, max_concurrency=1)
+        running = []
+        peak = []
+
+        async def call():
+            async with scheduler.aslot("model"):
+                running.append(1)
+                peak.append(len(running))
+                await asyncio.sleep(0.01)
+                running.pop()
+
+        async def main():
+            await asyncio.gather(*[call() for _ in range(3)])
+
+        asyncio.run(main())
+        self.assertEqual(max(peak), 1)
+        self.assertEqual(scheduler.stats()["model"]["granted"], 3)
+
+    def test_aslot_cancelled(self):
+        scheduler = self.make_scheduler(concurrency=1, max_concurrency=1)
+
+        async def main():
+            ticket = await scheduler.aacquire("model")
+            task = asyncio.ensure_future(scheduler.aacquire("model"))
+            await asyncio.sleep(0.01)
+            self.assertEqual(scheduler.stats()["model"]["queued"], 1)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            scheduler.release(ticket)
+
+        asyncio.run(main())
+        stats = scheduler.stats()["model"]
+        self.assertEqual(stats["queued"], 0)
+        self.assertEqual(stats["in_flight"], 0)
@@ -0,0 +1,168 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from core.exceptions import GatewayTimeoutError
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from jarvis.models import GenerationFlightModel
+from jarvis.modules.provider import Deadline, SingleFlight
+
+
+class SingleFlightTest(SimpleTestCase):
+    def setUp(self):
+        self.flight = SingleFlight()
+        self.calls = 0
+
+    def test_do_coalesces_threads(self):
+        release = threading.Event()
+
+        def call():
+            self.calls += 1
+            release.wait(5)
+            return {"id": "cmpl-1"}
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(self.flight.do, "key", call)
+                       for _ in range(4)]
+            # let every caller join before the leader returns
+            while self.flight.coalesced < 3:
+                pass
+            release.set()
+            results = [future.result() for future in futures]
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, [{"id": "cmpl-1"}] * 4)
+        self.assertEqual(self.flight.stats(), {"coalesced": 3, "in_flight": 0})
+
+    def test_do_shares_error(self):
+        release = threading.Event()
+
+        def call():
+            release.wait(5)
+            raise ValueError("provider down")
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = [pool.submit(self.flight.do, "key", call)
+                       for _ in range(2)]
+            while self.flight.coalesced < 1:
+                pass
+            release.set()
+            for future in futures:
+                self.assertRaises(ValueError, future.result)
+
+    def test_do_sequential_calls_not_shared(self):
+        def call():
+            self.calls += 1
+            return self.calls
+
+        self.assertEqual(self.flight.do("key", call), 1)
+        self.assertEqual(self.flight.do("key", call), 2)
+
+    async def test_ado_coalesces_tasks(self):
+        async def call():
+            self.calls += 1
+            await asyncio.sleep(0.01)
+            return {"id": "cmpl-1"}
+
+        results = await asyncio.gather(
+            *(self.flight.ado("key", call) for _ in range(5)),
+            self.flight.ado("other", call),
+        )
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(results, [{"id": "cmpl-1"}] * 6)
+        self.assertEqual(self.flight.stats()["in_flight"], 0)
+
+    async def test_ado_waiter_cancelled(self):
+        async def call():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        first = asyncio.ensure_future(self.flight.ado("key", call))
+        second = asyncio.ensure_future(self.flight.ado("key", call))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        # the call keeps running for the waiter that is left
+        self.assertEqual(await second, "done")
+        self.assertTrue(first.cancelled())
+
+    async def test_ado_cancelled_with_last_waiter(self):
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def call():
+            started.set()
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        waiter = asyncio.ensure_future(self.flight.ado("key", call))
+        await started.wait()
+        waiter.cancel()
+        await asyncio.wait_for(cancelled.wait(), 1)
+
+
+class SingleFlightDatabaseTest(TestCase):
+    def setUp(self):
+        self.flight = SingleFlight(use_db=True, poll_interval=0.01)
+
+    def test_db_do_leader(self):
+        self.assertEqual(self.flight.do("key", lambda: {"id": "cmpl-1"}), {"id": "cmpl-1"})
+        flight = GenerationFlightModel.objects.get(key="key")
+        self.assertEqual(flight.response, {"id": "cmpl-1"})
+        self.assertIsNotNone(flight.completed_at)
+
+    def test_db_do_leader_error(self):
+        def call():
+            raise ValueError("provider down")
+
+        self.assertRaises(ValueError, self.flight.do, "key", call)
+        self.assertFalse(GenerationFlightModel.objects.exists())
+
+    def test_db_do_joins_other_process(self):
+        # a flight led by another process
+        other = GenerationFlightModel.objects.create(key="key")
+        original = self.flight._db_poll
+
+        def poll(flight_id):
+            # the other process completes while this one is waiting
+            GenerationFlightModel.objects.filter(pk=other.pk).update(
+                response={"id": "cmpl-other"}, completed_at=timezone.now())
+            return original(flight_id)
+
+        self.flight._db_poll = poll  # type: ignore
+        result = self.flight.do("key", lambda: {"id": "cmpl-own"})
+        self.assertEqual(result, {"id": "cmpl-other"})
+
+    def test_db_do_other_process_failed(self):
+        other = GenerationFlightModel.objects.create(key="key")
+        original = self.flight._db_poll
+
+        def poll(flight_id):
+            GenerationFlightModel.objects.filter(pk=other.pk).delete()
+            return original(flight_id)
+
+        self.flight._db_poll = poll  # type: ignore
+        result = self.flight.do("key", lambda: {"id": "cmpl-own"})
+        self.assertEqual(result, {"id": "cmpl-own"})
+
+    def test_db_do_follower_deadline(self):
+        # a flight led by another process that never completes
+        GenerationFlightModel.objects.create(key="key")
+        calls = []
+        with Deadline(0.05).scope():
+            with self.assertRaises(GatewayTimeoutError):
+                self.flight.do("key", lambda: calls.append(True))
+        self.assertEqual(calls, [])
+
+    async def test_adb_do_follower_deadline(self):
+        await GenerationFlightModel.objects.acreate(key="key")
+
+        async def call():
+            raise AssertionError("the follower called the provider")
+
+        with Deadline(0.05).scope():
+            with self.assertRaises(GatewayTimeoutError):
+                await self.flight.ado("key", call)
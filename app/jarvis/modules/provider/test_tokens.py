@@ -0,0 +1,66 @@
+from django.test import SimpleTestCase
+from rest_framework.exceptions import ValidationError
+from jarvis.modules.provider import (
+    MaxTokensAdvisor,
+    clamp_max_tokens,
+    count_tokens,
+    get_context_window
+)
+from jarvis.modules.provider.tokens import recommend_max_tokens
+
+
+def words(count: int) -> str:
+    return " ".join(["word"] * count)
+
+
+class CountTokensTest(SimpleTestCase):
+    def test_count(self):
+        self.assertEqual(count_tokens(""), 0)
+        # 10 tokens with the GPT-3 tokenizer
+        self.assertEqual(count_tokens("The quick brown fox jumps over the lazy dog."), 10)
+        # 9 tokens with the GPT-3 tokenizer, errs on the high side
+        self.assertIn(count_tokens("Generate a business name for 2023, it's catchy!"), range(9, 13))
+
+    def test_count_numbers(self):
+        self.assertEqual(count_tokens("123456"), 2)
+        self.assertEqual(count_tokens("1234567"), 3)
+
+
+class ClampMaxTokensTest(SimpleTestCase):
+    def test_clamp(self):
+        self.assertEqual(get_context_window("text-davinci-003"), 4097)
+        self.assertEqual(clamp_max_tokens("text-davinci-003", words(97), 2048), 2048)
+        self.assertEqual(clamp_max_tokens("text-davinci-003", words(97), 8000), 4000)
+        self.assertEqual(clamp_max_tokens("text-ada-001", words(49), 4000), 2000)
+
+    def test_clamp_cap(self):
+        self.assertEqual(clamp_max_tokens("text-davinci-003", "word", 2048, cap=100), 100)
+        self.assertEqual(clamp_max_tokens("text-davinci-003", "word", 50, cap=100), 50)
+
+    def test_clamp_batch(self):
+        # the longest prompt sets the limit
+        self.assertEqual(
+            clamp_max_tokens("text-ada-001", ["word", words(49)], 4000), 2000)
+
+    def test_clamp_prompt_too_long(self):
+        with self.assertRaises(ValidationError):
+            clamp_max_tokens("text-ada-001", words(2049), 100)
+
+
+class RecommendMaxTokensTest(SimpleTestCase):
+    def test_recommend(self):
+        self.assertIsNone(recommend_max_tokens([10] * 19))
+        lengths = list(range(1, 101))
+        self.assertEqual(recommend_max_tokens(lengths), 143)
+        self.assertEqual(recommend_max_tokens(lengths, quantile=1.0, headroom=1.0), 100)
+
+    def test_advisor(self):
+        advisor = MaxTokensAdvisor(maxsize=10, ttl=60, min_samples=2)
+        self.assertEqual(advisor.get(1), (False, None))
+        self.assertIsNone(advisor.learn(1, ["one"]))
+        # unknown caps are remembered too
+        self.assertEqual(advisor.get(1), (True, None))
+        self.assertEqual(advisor.learn(1, ["one two", "one two three four"]), 6)
+        self.assertEqual(advisor.get(1), (True, 6))
+        advisor.clear()
+        self.assertEqual(advisor.get(1), (False, None))
@@ -0,0 +1,51 @@
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+from unittest.mock import MagicMock, patch
+from jarvis.modules.provider.client import OpenAIClient
+
+
+@contextmanager
+def patch_completion(
+    headers: Optional[Dict[str, str]] = None,
+    **kwargs
+) -> Iterator[MagicMock]:
+    """ Patch the sync completions endpoint of the OpenAI client
+
+        The mock yielded is built with `kwargs`, e.g. return_value or
+        side_effect, and called with the request params, the key and the
+        timeout as keyword arguments, as openai.Completion.create is. It
+        returns the response body, or the chunks of a stream, which are
+        closed with the stream.
+
+        Args:
+            headers (dict): Response headers, e.g. the rate limits
+    """
+    from openai.api_requestor import APIRequestor
+    from openai.openai_response import OpenAIResponse
+    create = MagicMock(**kwargs)
+
+    def request(requestor, method, url, params=None, stream=False, **options):
+        if url != OpenAIClient.COMPLETIONS:
+            raise AssertionError("Unexpected request to {}".format(url))
+        response: Any = create(
+            api_key=requestor.api_key,
+            organization=requestor.organization,
+            **options,
+            **params
+        )
+        if stream:
+            return stream_chunks(response), True, requestor.api_key
+        return OpenAIResponse(response, headers or {}), False, requestor.api_key
+
+    def stream_chunks(chunks):
+        # closed with the stream, as the SDK's stream closes its connection
+        try:
+            for chunk in chunks:
+                yield OpenAIResponse(chunk, headers or {})
+        finally:
+            close = getattr(chunks, "close", None)
+            if close:
+                close()
+
+    with patch.object(APIRequestor, "request", request):
+        yield create
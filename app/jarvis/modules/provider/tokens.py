@@ -0,0 +1,144 @@
+import math
+import re
+import threading
+from cachetools import TTLCache
+from django.conf import settings
+from rest_framework.exceptions import ValidationError
+from typing import Hashable, Iterable, List, Optional, Tuple, Union
+
+
+# the pieces GPT-2 style byte pair encoders split text into before merging:
+# contractions, words, numbers and punctuation runs, each with the space
+# before them, and whitespace
+PIECES = re.compile(
+    r"""'(?:s|t|re|ve|m|ll|d)| ?[^\W\d_]+| ?\d+| ?[^\s\w]+|\s+(?!\S)|\s+""",
+    re.UNICODE
+)
+
+# prompt plus completion tokens each model accepts
+CONTEXT_WINDOWS = {
+    "text-davinci-003": 4097,
+    "text-curie-001": 2049,
+    "text-babbage-001": 2049,
+    "text-ada-001": 2049,
+}
+DEFAULT_CONTEXT_WINDOW = 2049
+
+
+def _count_piece(piece: str) -> int:
+    word = piece.lstrip(" ")
+    if not word or word.isspace():
+        return 1
+    if word[0].isdigit():
+        # numbers are split in groups of up to three digits
+        return math.ceil(len(word) / 3)
+    if not word[0].isalpha():
+        return math.ceil(len(word) / 2)
+    if not word.isascii():
+        # accented and non latin letters take about a token each
+        return len(word)
+    # common words are a single token, rarer longer ones a few
+    return 1 if len(word) <= 8 else math.ceil(len(word) / 4)
+
+
+def count_tokens(text: str) -> int:
+    """ Estimate the number of tokens of `text` without the tokenizer
+
+        Follows the pre-tokenization of the GPT-2/3 encoders and prices
+        each piece from its length. English prose comes out within a few
+        percent of the real count, erring on the high side.
+    """
+    return sum(_count_piece(piece) for piece in PIECES.findall(text))
+
+
+def get_context_window(model: str) -> int:
+    return CONTEXT_WINDOWS.get(model, DEFAULT_CONTEXT_WINDOW)
+
+
+def clamp_max_tokens(
+    model: str,
+    prompts: Union[str, Iterable[str]],
+    max_tokens: int,
+    cap: Optional[int] = None
+) -> int:
+    """ Limit max_tokens to what the prompts leave of the context window
+
+        Args:
+            prompts (str): The prompt, or the prompts of a batch request
+            cap (int, optional): Further limit e.g. learned from past outputs
+        Raises:
+            ValidationError: If a prompt leaves no room for the completion
+    """
+    if isinstance(prompts, str):
+        prompts = [prompts]
+    prompt_tokens = max((count_tokens(prompt) for prompt in prompts), default=0)
+    available = get_context_window(model) - prompt_tokens
+    if available <= 0:
+        raise ValidationError(
+            "The prompt is too long for the model, shorten the input")
+    if cap is not None:
+        max_tokens = min(max_tokens, cap)
+    return max(min(max_tokens, available), 1)
+
+
+def recommend_max_tokens(
+    lengths: List[int],
+    quantile: float = 0.95,
+    headroom: float = 1.5,
+    min_samples: int = 20
+) -> Optional[int]:
+    """ A max_tokens cap fitting the past outputs of a prompt
+
+        Args:
+            lengths (list): Token counts of the past outputs
+            quantile (float): Share of the past outputs the cap covers
+            headroom (float): Factor applied on top of the quantile
+            min_samples (int): Outputs needed to recommend anything
+        Returns:
+            int: The cap, None without enough outputs
+    """
+    if len(lengths) < min_samples:
+        return None
+    lengths = sorted(lengths)
+    index = min(math.ceil(quantile * len(lengths)) - 1, len(lengths) - 1)
+    return max(math.ceil(lengths[index] * headroom), 1)
+
+
+class MaxTokensAdvisor:
+    """ Process-wide cache of the max_tokens caps learned per prompt
+
+        A cap is learned from the lengths of the prompt's recent outputs
+        and kept for `ttl` seconds before it is learned again.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, min_samples: int = 20):
+        self._entries: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.min_samples = min_samples
+
+    def get(self, key: Hashable) -> Tuple[bool, Optional[int]]:
+        """ Returns whether a cap is known for `key` and the cap """
+        with self._lock:
+            if key in self._entries:
+                return True, self._entries[key]
+        return False, None
+
+    def learn(self, key: Hashable, outputs: Iterable[str]) -> Optional[int]:
+        cap = recommend_max_tokens(
+            [count_tokens(output) for output in outputs],
+            min_samples=self.min_samples
+        )
+        with self._lock:
+            self._entries[key] = cap
+        return cap
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+max_tokens_advisor = MaxTokensAdvisor(
+    maxsize=getattr(settings, "GENERATION_LEARN_MAX_TOKENS_CACHE_SIZE", 4096),
+    ttl=getattr(settings, "GENERATION_LEARN_MAX_TOKENS_TTL", 60 * 60),
+    min_samples=getattr(settings, "GENERATION_LEARN_MAX_TOKENS_MIN_SAMPLES", 20),
+)
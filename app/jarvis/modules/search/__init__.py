@@ -0,0 +1,8 @@
+from .backends import (
+    SearchBackend,
+    PostgresSearchBackend,
+    SqliteSearchBackend,
+    ContainsSearchBackend,
+    get_search_backend
+)
+from .filters import PromptSearchFilter
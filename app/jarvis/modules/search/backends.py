@@ -0,0 +1,159 @@
+import re
+from django.conf import settings
+from django.db import connections
+from django.db.models import Exists, FloatField, OuterRef, Q, QuerySet
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+from typing import Any, List, Tuple
+
+# words of a search, as the FTS5 and contains backends match them
+WORDS = re.compile(r"\w+", re.UNICODE)
+
+# the FTS5 table over PromptSearchIndexModel, created by the migration
+FTS5_TABLE = "jarvis_promptsearchindexmodel_fts"
+
+
+class SearchBackend:
+    """ Filters a queryset down to the prompts matching a search, best
+        matches first
+
+        The queryset is of a prompt model, or of a model with one row per
+        prompt of any type that names its columns holding the prompt's
+        model name and id in `search_index_fields`, e.g. the catalog.
+    """
+
+    def search(self, queryset: QuerySet, query: str) -> QuerySet:
+        raise NotImplementedError
+
+    @staticmethod
+    def get_index_table(queryset: QuerySet) -> str:
+        from jarvis.models import PromptSearchIndexModel
+        return connections[queryset.db].ops.quote_name(
+            PromptSearchIndexModel._meta.db_table)
+
+    def get_index_join(self, queryset: QuerySet, table: str) -> Tuple[str, List[Any]]:
+        """ The condition matching index rows to the rows of `table`
+
+            Args:
+                table (str): The queryset's table or an alias of it
+        """
+        quote_name = connections[queryset.db].ops.quote_name
+        opts = queryset.model._meta
+        index = self.get_index_table(queryset)
+        fields = getattr(queryset.model, "search_index_fields", None)
+        if fields is None:
+            return "{}.model_name = %s AND {}.prompt_id = {}.{}".format(
+                index, index, table, quote_name(opts.pk.column)
+            ), [queryset.model.name]
+        model_name, prompt_id = (opts.get_field(field).column for field in fields)
+        return "{}.model_name = {}.{} AND {}.prompt_id = {}.{}".format(
+            index, table, quote_name(model_name), index, table, quote_name(prompt_id)
+        ), []
+
+    def filter_ranked(self, queryset: QuerySet, match_sql: str, rank_sql: str, params: List[Any]):
+        """ Keep the rows matching `match_sql`, ordered by `rank_sql`
+
+            Args:
+                match_sql (str): Condition on the index table
+                rank_sql (str): Score of the index row, higher is better
+                params (list): Parameters of both
+        """
+        quote_name = connections[queryset.db].ops.quote_name
+        table = quote_name(queryset.model._meta.db_table)
+        pk = quote_name(queryset.model._meta.pk.column)
+        index = self.get_index_table(queryset)
+
+        join, join_params = self.get_index_join(queryset, "t")
+        matches = RawSQL(
+            "SELECT t.{pk} FROM {table} t JOIN {index} ON {join} WHERE {match}".format(
+                pk=pk, table=table, index=index, join=join, match=match_sql),
+            join_params + params
+        )
+        join, join_params = self.get_index_join(queryset, table)
+        rank = RawSQL(
+            "SELECT {rank} FROM {index} WHERE {join} AND {match}".format(
+                rank=rank_sql, index=index, join=join, match=match_sql),
+            params + join_params + params,
+            output_field=FloatField()
+        )
+        return queryset.filter(pk__in=matches).annotate(
+            search_rank=rank).order_by("-search_rank", "-created_at")
+
+
+class PostgresSearchBackend(SearchBackend):
+    """ Matches the GIN indexed tsvector column, ranked with ts_rank
+
+        The search is parsed by websearch_to_tsquery so quotes, "or" and
+        "-word" work as they do on search engines.
+    """
+
+    config = "english"
+
+    def search(self, queryset: QuerySet, query: str) -> QuerySet:
+        index = self.get_index_table(queryset)
+        tsquery = "websearch_to_tsquery('{}', %s)".format(self.config)
+        return self.filter_ranked(
+            queryset,
+            "{}.search_vector @@ {}".format(index, tsquery),
+            "ts_rank({}.search_vector, {})".format(index, tsquery),
+            [query]
+        )
+
+
+class SqliteSearchBackend(SearchBackend):
+    """ Matches the FTS5 table, ranked with bm25
+
+        Every word of the search must prefix a word of the prompt, the
+        heading weighing twice the body.
+    """
+
+    @staticmethod
+    def get_match(query: str) -> str:
+        return " ".join('"{}"*'.format(word) for word in WORDS.findall(query))
+
+    def search(self, queryset: QuerySet, query: str) -> QuerySet:
+        match = self.get_match(query)
+        if not match:
+            return queryset.none()
+        index = self.get_index_table(queryset)
+        matched = "{index}.id IN (SELECT rowid FROM {fts} WHERE {fts} MATCH %s)".format(
+            index=index, fts=FTS5_TABLE)
+        rank = "(SELECT -bm25({fts}, 2.0, 1.0) FROM {fts} WHERE {fts} MATCH %s AND rowid = {index}.id)".format(
+            index=index, fts=FTS5_TABLE)
+        return self.filter_ranked(queryset, matched, rank, [match])
+
+
+class ContainsSearchBackend(SearchBackend):
+    """ Fallback for the other databases, every word of the search must
+        appear in the prompt's indexed text
+    """
+
+    def search(self, queryset: QuerySet, query: str) -> QuerySet:
+        from jarvis.models import PromptSearchIndexModel
+        words = WORDS.findall(query)
+        if not words:
+            return queryset.none()
+        entries = PromptSearchIndexModel.objects.all()
+        for word in words:
+            entries = entries.filter(Q(title__icontains=word) | Q(body__icontains=word))
+        fields = getattr(queryset.model, "search_index_fields", None)
+        if fields is None:
+            return queryset.filter(pk__in=entries.filter(
+                model_name=queryset.model.name).values("prompt_id"))
+        model_name, prompt_id = fields
+        return queryset.filter(Exists(entries.filter(
+            model_name=OuterRef(model_name), prompt_id=OuterRef(prompt_id))))
+
+
+BACKENDS = {
+    "postgresql": PostgresSearchBackend,
+    "sqlite": SqliteSearchBackend,
+}
+
+
+def get_search_backend(using: str = "default") -> SearchBackend:
+    """ The backend set in PROMPT_SEARCH_BACKEND, by default the one of the database """
+    path = getattr(settings, "PROMPT_SEARCH_BACKEND", None)
+    if path:
+        return import_string(path)()
+    return BACKENDS.get(connections[using].vendor, ContainsSearchBackend)()
@@ -0,0 +1,15 @@
+from rest_framework import filters
+from jarvis.modules.search.backends import get_search_backend
+
+
+class PromptSearchFilter(filters.SearchFilter):
+    """ SearchFilter answered by the prompt full-text index
+
+        Takes the same ?search= parameter; search_fields are not used.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, "").strip()
+        if not query:
+            return queryset
+        return get_search_backend(queryset.db).search(queryset, query)
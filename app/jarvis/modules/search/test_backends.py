@@ -0,0 +1,102 @@
+from django.test import TestCase, override_settings
+from account.models import User, Seller
+from jarvis.models import Dalle2PromptModel, GPT3PromptModel, PromptSearchIndexModel
+from jarvis.modules.search import (
+    ContainsSearchBackend,
+    SqliteSearchBackend,
+    get_search_backend
+)
+
+
+class SearchBackendTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(  # type: ignore
+            username="testuser",
+            email="testuser@email.co",
+            password="testpassword"
+        )
+        Seller.objects.create(user=self.user, handle='testhandle', name='Test Name')
+        self.slogans = self.create(
+            heading="Business slogans",
+            description="Catchy slogans for a business",
+            template="Write a slogan for {business}",
+            template_params=[{"name": "business", "description": "The business"}],
+        )
+        self.names = self.create(
+            heading="Baby names",
+            description="Names for a baby, with their meaning for the business minded",
+            template="Suggest names for a {gender} baby",
+            template_params=[{"name": "gender", "description": "Boy or girl"}],
+        )
+
+    def create(self, model=GPT3PromptModel, **fields):
+        return model.objects.create(user=self.user, **fields)
+
+    def search(self, query, backend=None, model=GPT3PromptModel):
+        backend = backend or get_search_backend()
+        return list(backend.search(model.objects.active(), query))
+
+    def test_backend(self):
+        self.assertIsInstance(get_search_backend(), SqliteSearchBackend)
+        path = "jarvis.modules.search.ContainsSearchBackend"
+        with override_settings(PROMPT_SEARCH_BACKEND=path):
+            self.assertIsInstance(get_search_backend(), ContainsSearchBackend)
+
+    def test_search(self):
+        self.assertEqual(self.search("slogan"), [self.slogans])
+        self.assertEqual(self.search("baby meaning"), [self.names])
+        self.assertEqual(self.search("gender"), [self.names])
+        self.assertEqual(self.search("pirate"), [])
+
+    def test_ranking(self):
+        # heading matches rank above body matches
+        self.assertEqual(self.search("business"), [self.slogans, self.names])
+        self.assertEqual(self.search("names"), [self.names])
+
+    def test_prefix_and_stemming(self):
+        self.assertEqual(self.search("slog"), [self.slogans])
+        self.assertEqual(self.search("babies"), [self.names])
+
+    def test_syntax_is_escaped(self):
+        self.assertEqual(self.search('slogan" OR names*'), [])
+        self.assertEqual(self.search('"slogans"'), [self.slogans])
+        self.assertEqual(self.search("*:("), [])
+
+    def test_update_on_save(self):
+        self.slogans.heading = "Pirate taglines"
+        self.slogans.save()
+        self.assertEqual(self.search("pirate"), [self.slogans])
+        self.assertEqual(self.search("slogans"), [self.slogans])
+        self.assertEqual(
+            PromptSearchIndexModel.objects.filter(prompt_id=self.slogans.pk).count(), 1)
+
+    def test_soft_delete(self):
+        self.slogans.delete()
+        self.assertEqual(self.search("slogan"), [])
+        self.assertFalse(PromptSearchIndexModel.objects.filter(
+            model_name="gpt3", prompt_id=self.slogans.pk).exists())
+        self.slogans.restore()
+        self.assertEqual(self.search("slogan"), [self.slogans])
+
+    def test_models_kept_apart(self):
+        image = self.create(
+            model=Dalle2PromptModel,
+            heading="Slogan posters",
+            description="Posters",
+            template="A poster of {slogan}",
+            template_params=[{"name": "slogan", "description": "The slogan"}],
+        )
+        self.assertEqual(self.search("poster", model=Dalle2PromptModel), [image])
+        self.assertEqual(self.search("poster"), [])
+
+    def test_contains_backend(self):
+        backend = ContainsSearchBackend()
+        self.assertEqual(self.search("slog", backend), [self.slogans])
+        self.assertEqual(set(self.search("business", backend)), {self.slogans, self.names})
+        self.assertEqual(self.search("!!", backend), [])
+
+    def test_rebuild(self):
+        PromptSearchIndexModel.objects.all().delete()
+        GPT3PromptModel.objects.filter(pk=self.names.pk).update(is_active=False)
+        self.assertEqual(PromptSearchIndexModel.objects.rebuild(GPT3PromptModel), 1)
+        self.assertEqual(self.search("business"), [self.slogans])
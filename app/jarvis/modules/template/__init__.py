@@ -0,0 +1 @@
+from .compiled import CompiledTemplate, CompiledTemplateCache, template_cache
@@ -0,0 +1,159 @@
+import re
+import threading
+from cachetools import LRUCache
+from collections import Counter
+from django.conf import settings
+from rest_framework.exceptions import ValidationError
+from string import Formatter
+from typing import Any, Dict, FrozenSet, Hashable, List, Optional, Tuple
+
+
+# anything between curly braces, as seen by validate_template
+PLACEHOLDER = re.compile(r"{(.*?)}")
+
+_formatter = Formatter()
+
+
+class CompiledTemplate:
+    """ A prompt template parsed once and reused for every generation
+
+        The template is split into (literal, field, format_spec, conversion)
+        segments with str.format semantics, so rendering is a single pass
+        over the segments. Template validation runs once at compile time and
+        its first error, if any, is kept in `error`.
+    """
+
+    def __init__(self, template: str, template_params: Any):
+        self.template = template
+        self.template_params = template_params
+        self.placeholders = Counter(PLACEHOLDER.findall(template))
+        self.error = self._find_error()
+
+        params = template_params if isinstance(template_params, list) else []
+        self.param_count = len(params)
+        self.param_names: FrozenSet[str] = frozenset(
+            param["name"] for param in params
+            if isinstance(param, dict) and "name" in param
+        )
+        self._segments: Optional[List[Tuple[str, Optional[str], str, Optional[str]]]] = None
+
+    @property
+    def segments(self) -> List[Tuple[str, Optional[str], str, Optional[str]]]:
+        # parsed on first render since an unbalanced brace raises ValueError
+        if self._segments is None:
+            self._segments = list(_formatter.parse(self.template))
+        return self._segments
+
+    def matches(self, template: str, template_params: Any) -> bool:
+        return self.template == template and self.template_params == template_params
+
+    def validate(self):
+        """ Raises the first template validation error, if any """
+        if self.error is not None:
+            raise ValidationError(self.error)
+
+    def validate_params(self, params: Dict[str, Any]):
+        """ Validate the user input against the template parameters
+
+            Raises:
+                ValidationError: If the user input is invalid
+        """
+        if len(params) != self.param_count:
+            raise ValidationError("Invalid number of parameters passed")
+
+        for name in params:
+            if name not in self.param_names:
+                raise ValidationError(
+                    "Invalid parameter passed.\n \"{}\" is not a valid parameter".format(name))
+
+    def render(self, params: Dict[str, Any]) -> str:
+        """ Substitute the user input into the template
+
+            The input is expected to have been validated with validate_params
+        """
+        parts = []
+        for literal, field, format_spec, conversion in self.segments:
+            parts.append(literal)
+            if field is None:
+                continue
+            value = params[field]
+            if conversion:
+                value = _formatter.convert_field(value, conversion)
+            parts.append(format(value, format_spec) if format_spec else str(value))
+        return "".join(parts)
+
+    def _find_error(self) -> Optional[str]:
+        template_params = self.template_params
+        if not isinstance(template_params, list):
+            return 'The template parameters must be a list. Ensure that the input has the format [{"name": "name", "description": "text description"}]'
+
+        if not all(isinstance(param, dict) for param in template_params):
+            return 'The template parameters must be a list of dicts. Ensure that the input has the format [{"name": "name", "description": "text description"}]'
+
+        for param in template_params:
+            if "name" not in param:
+                return 'The template parameter is missing the "name" key. Ensure that the input has the format {{ "name": "Sample name", "description": "text description" }}'
+            if "description" not in param:
+                return 'The template parameter is missing the "description" key. Ensure that the input has the format {{ "name": "Sample Name", "description": "text description" }}'
+
+        names = frozenset(param["name"] for param in template_params)
+        for match in self.placeholders:
+            if match not in names:
+                if " " in match:
+                    return 'The template parameter "{}" has an invalid white space. Ensure that the input has the format "{{{}}}"'.format(
+                        match, match
+                    )
+                return 'The template parameter is missing the "{}" key. Ensure that the input has the format {{ "name": "Sample name", "description": "text description" }}'.format(
+                    match
+                )
+
+        for param in template_params:
+            name = param["name"]
+            count = self.placeholders[name]
+            if count == 0:
+                if name in self.template:
+                    return 'The template parameter "{}" is missing curly braces. Ensure that the input has the format "{{{}}}"'.format(
+                        name, name
+                    )
+                return 'The template parameter "{}" is missing. Ensure that the input has the format "{{{}}}"'.format(
+                    name, name
+                )
+            if count > 1:
+                return 'The template parameter "{}" appears more than once in the template. Ensure that the parameter appears only once'.format(
+                    name
+                )
+        return None
+
+
+class CompiledTemplateCache:
+    """ Process-wide LRU cache of compiled prompt templates
+
+        Prompts are keyed by (name, pk, updated_at) so a saved edit gets a
+        new entry. The template and its parameters are also compared on
+        every hit, which catches unsaved edits to an instance.
+    """
+
+    def __init__(self, maxsize: int):
+        self._entries: LRUCache = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, template: str, template_params: Any) -> CompiledTemplate:
+        with self._lock:
+            compiled: Optional[CompiledTemplate] = self._entries.get(key)
+        if compiled is None or not compiled.matches(template, template_params):
+            compiled = CompiledTemplate(template, template_params)
+            with self._lock:
+                self._entries[key] = compiled
+        return compiled
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+template_cache = CompiledTemplateCache(
+    maxsize=getattr(settings, "PROMPT_TEMPLATE_CACHE_MAX_SIZE", 2048),
+)
@@ -0,0 +1,90 @@
+from django.test import SimpleTestCase
+from rest_framework.exceptions import ValidationError
+from jarvis.modules.template import CompiledTemplate, CompiledTemplateCache
+
+
+class CompiledTemplateTest(SimpleTestCase):
+    def setUp(self):
+        self.template_params = [
+            {"name": "name", "description": "The name"},
+            {"name": "age", "description": "The age"},
+        ]
+        self.compiled = CompiledTemplate(
+            "Write about {name} who is {age} years old", self.template_params)
+
+    def test_compile(self):
+        self.assertIsNone(self.compiled.error)
+        self.assertEqual(self.compiled.param_names, frozenset({"name", "age"}))
+        self.assertEqual(self.compiled.segments, [
+            ("Write about ", "name", "", None),
+            (" who is ", "age", "", None),
+            (" years old", None, None, None),
+        ])
+
+    def test_render(self):
+        self.assertEqual(
+            self.compiled.render({"name": "John Doe", "age": 20}),
+            "Write about John Doe who is 20 years old"
+        )
+
+    def test_render_matches_str_format(self):
+        template = "{name!r} is {age:>4}\n"
+        compiled = CompiledTemplate(template, self.template_params)
+        params = {"name": "John", "age": 20}
+        self.assertEqual(compiled.render(params), template.format(**params))
+
+    def test_validate_params(self):
+        self.compiled.validate_params({"name": "John Doe", "age": 20})
+
+        with self.assertRaises(ValidationError) as context:
+            self.compiled.validate_params({"name": "John Doe"})
+        self.assertIn("Invalid number of parameters passed", str(context.exception))
+
+        with self.assertRaises(ValidationError) as context:
+            self.compiled.validate_params({"name": "John Doe", "height": 2})
+        self.assertIn('"height" is not a valid parameter', str(context.exception))
+
+    def test_validate(self):
+        self.compiled.validate()
+
+        compiled = CompiledTemplate("{name} {name} {age}", self.template_params)
+        with self.assertRaises(ValidationError) as context:
+            compiled.validate()
+        self.assertIn('"name" appears more than once', str(context.exception))
+
+        compiled = CompiledTemplate("{name} and age", self.template_params)
+        self.assertIn('"age" is missing curly braces', compiled.error)
+
+        compiled = CompiledTemplate("{name} {age} {height}", self.template_params)
+        self.assertIn('missing the "height" key', compiled.error)
+
+        compiled = CompiledTemplate("{name}", {"name": "name"})
+        self.assertIn("must be a list", compiled.error)
+
+
+class CompiledTemplateCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.cache = CompiledTemplateCache(maxsize=2)
+        self.template_params = [{"name": "name", "description": "The name"}]
+
+    def test_get(self):
+        compiled = self.cache.get(("gpt3", 1, 1), "Hi {name}", self.template_params)
+        self.assertIs(
+            self.cache.get(("gpt3", 1, 1), "Hi {name}", list(self.template_params)),
+            compiled
+        )
+        # a saved edit has a new key
+        self.assertIsNot(
+            self.cache.get(("gpt3", 1, 2), "Hi {name}", self.template_params),
+            compiled
+        )
+
+    def test_get_unsaved_edit(self):
+        self.cache.get(("gpt3", 1, 1), "Hi {name}", self.template_params)
+        compiled = self.cache.get(("gpt3", 1, 1), "Bye {name}", self.template_params)
+        self.assertEqual(compiled.render({"name": "John"}), "Bye John")
+
+    def test_get_bounded(self):
+        for pk in range(5):
+            self.cache.get(("gpt3", pk, 1), "Hi {name}", self.template_params)
+        self.assertEqual(len(self.cache), 2)
@@ -1,3 +1,7 @@
 from .language.gpt3 import GPT3PromptSellerSerializer, GPT3PromptBuyerSerializer
 from .image.dalle2 import Dalle2PromptSellerSerializer, Dalle2PromptBuyerSerializer
 from .output import PromptOutputSerializer
+from .job import GenerationJobSerializer
+from .chain import PromptChainSellerSerializer, PromptChainBuyerSerializer
+from .evaluation import EvaluationJobSerializer
+from .catalog import PromptCatalogSerializer
@@ -1,13 +1,18 @@
 from rest_framework import serializers
+from django.conf import settings
 from jarvis.models import (
     AbstractPromptModel,
+    GenerationJobModel,
     PromptOutputModel
 )
-from typing import List, Type, Dict, Union,Any
+from typing import List, Type, Dict, Union, Any, Iterator, Tuple
 from account.models import User, Seller
 from django.core.exceptions import ObjectDoesNotExist
 from rest_framework.fields import empty
+from asgiref.sync import sync_to_async
 from jarvis.serializers.output import PromptOutputSerializer
+from jarvis.serializers.job import GenerationJobSerializer
+from jarvis.modules.provider import deadline_scope
 from account.serializers.user import PublicSellerSerializer
 
 class AbstractPromptSellerSerializer(serializers.ModelSerializer):
@@ -20,6 +25,7 @@ class AbstractPromptSellerSerializer(serializers.ModelSerializer):
         model: Type[AbstractPromptModel] = None  # type: ignore
         # type: ignore
         output_model: Type[PromptOutputModel] = PromptOutputModel
+        select_related = ('user__seller_profile',)
         read_only_fields = (
             'id',
             'created_at',
@@ -36,6 +42,11 @@ class AbstractPromptSellerSerializer(serializers.ModelSerializer):
             'template_params',
             'type',
             'examples',
+            'cache_enabled',
+            'cache_ttl',
+            'pool_size',
+            'pool_inputs',
+            'pool_ttl',
         )
 
     def __init__(self, instance=None, data=empty, **kwargs):
@@ -125,9 +136,17 @@ class AbstractPromptBuyerSerializer(serializers.ModelSerializer):
         required=False,
         write_only=True
     )
+    batch = serializers.ListField(
+        child=serializers.JSONField(),
+        required=False,
+        write_only=True,
+        allow_empty=False,
+        max_length=settings.GENERATION_BATCH_MAX_SIZE
+    )
 
     class Meta:
         model = AbstractPromptModel
+        select_related = ('user__seller_profile',)
         read_only_fields = (
             'id',
             'heading',
@@ -144,6 +163,7 @@ class AbstractPromptBuyerSerializer(serializers.ModelSerializer):
         )
         fields = read_only_fields + (
             "prompt_params",
+            "batch",
         )
 
         restricted_fields = (
@@ -223,22 +243,129 @@ class AbstractPromptBuyerSerializer(serializers.ModelSerializer):
         instance.validate_prompt(**params)
         return params
 
-    def generate(self) -> Dict[str, Any]:
-        """ Generate a prompt output
+    def validate_batch(self, batch: List[Any]):
+        """ Validate every set of prompt params in the batch
+
+            Errors are keyed by the index of the invalid item
+        """
+        errors = {}
+        for index, params in enumerate(batch):
+            try:
+                self.validate_prompt_params(params)
+            except serializers.ValidationError as error:
+                errors[index] = error.detail
+        if errors:
+            raise serializers.ValidationError(errors)
+        return batch
+
+    def get_generate_options(self) -> Dict[str, Any]:
+        """ The validated fields other than the user input e.g. the image size
+        """
+        return {
+            key: value for key, value in self.validated_data.items()  # type: ignore
+            if key not in ("prompt_params", "batch")
+        }
+
+    def get_generate_kwargs(self) -> Dict[str, Any]:
+        """ The keyword arguments passed to the model's generate method
         """
-        instance: AbstractPromptModel = self.instance  # type: ignore
         prompt_params: Dict[str, Union[str, int]] = {}
         if self.validated_data:
-            prompt_params = self.validated_data.pop(  # type: ignore
+            prompt_params = self.validated_data.get(  # type: ignore
                 'prompt_params', {}) or {}
+        return {
+            **prompt_params,
+            **self.get_generate_options()
+        }
+
+    def generate(self) -> Dict[str, Any]:
+        """ Generate a prompt output
+        """
+        instance: AbstractPromptModel = self.instance  # type: ignore
         user = self.context['request'].user
-        outputModel = instance.generate(
+        with deadline_scope(self.context.get('deadline')):
+            outputModel = instance.generate(
+                user,
+                **self.get_generate_kwargs()
+            )
+        return PromptOutputSerializer(outputModel).data
+
+    def generate_batch(self) -> List[Dict[str, Any]]:
+        """ Generate a prompt output for each item of the batch
+
+            Returns:
+                list: The serialized outputs, in the order of the batch
+        """
+        if 'batch' not in self.validated_data:  # type: ignore
+            raise serializers.ValidationError({
+                'batch': [serializers.Field.default_error_messages['required']]
+            })
+        instance: AbstractPromptModel = self.instance  # type: ignore
+        user = self.context['request'].user
+        with deadline_scope(self.context.get('deadline')):
+            outputModels = instance.generate_batch(
+                user,
+                self.validated_data['batch'],  # type: ignore
+                **self.get_generate_options()
+            )
+        return PromptOutputSerializer(outputModels, many=True).data
+
+    def enqueue(self) -> Dict[str, Any]:
+        """ Queue the generation as a job for the workers
+
+            Returns:
+                dict: The serialized GenerationJobModel
+        """
+        instance: AbstractPromptModel = self.instance  # type: ignore
+        user = self.context['request'].user
+        job = GenerationJobModel.objects.enqueue(
             user,
-            **prompt_params,
-            **self.validated_data
+            instance,
+            **self.get_generate_kwargs()
         )
-        return PromptOutputSerializer(outputModel).data
+        return GenerationJobSerializer(job).data
+
+    async def agenerate(self) -> Dict[str, Any]:
+        """ Generate a prompt output without blocking the event loop
+        """
+        instance: AbstractPromptModel = self.instance  # type: ignore
+        user = self.context['request'].user
+        with deadline_scope(self.context.get('deadline')):
+            outputModel = await instance.agenerate(
+                user,
+                **self.get_generate_kwargs()
+            )
+        return await sync_to_async(
+            lambda: PromptOutputSerializer(outputModel).data
+        )()
+
+    def generate_stream(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """ Generate a prompt output, yielding (event, data) pairs
+
+            The provider request is sent before this returns so that
+            errors surface before the response is committed. A "token"
+            event is yielded per chunk of text and an "output" event
+            with the recorded PromptOutputModel once the stream ends.
+        """
+        instance: AbstractPromptModel = self.instance  # type: ignore
+        user = self.context['request'].user
+        # the deadline bounds the start of the stream
+        with deadline_scope(self.context.get('deadline')):
+            stream = instance.generate_stream(
+                user,
+                **self.get_generate_kwargs()
+            )
+
+        def events():
+            try:
+                for text in stream:
+                    yield "token", {"text": text}
+            finally:
+                stream.close()
+            if stream.result is not None:
+                yield "output", PromptOutputSerializer(stream.result).data
 
+        return events()
 
     def create(self, validated_data):
         """ This should never be called"""
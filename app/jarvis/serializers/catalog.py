@@ -0,0 +1,24 @@
+from rest_framework import serializers
+from jarvis.models import PromptCatalogModel
+
+
+class PromptCatalogSerializer(serializers.ModelSerializer):
+    """ A listed prompt of any model, details are fetched from the
+        model's own endpoints with model_name and prompt_id
+    """
+
+    class Meta:
+        model = PromptCatalogModel
+        read_only_fields = (
+            'model_name',
+            'prompt_id',
+            'type',
+            'icon',
+            'heading',
+            'description',
+            'seller_handle',
+            'seller_name',
+            'output_count',
+            'created_at',
+        )
+        fields = read_only_fields
@@ -0,0 +1,110 @@
+from rest_framework import serializers
+from jarvis.models import PromptChainModel
+from jarvis.modules.provider import deadline_scope
+from jarvis.serializers.output import PromptOutputSerializer
+from account.models import User
+from account.serializers.user import PublicSellerSerializer
+from typing import Any, Dict
+
+
+class PromptChainSellerSerializer(serializers.ModelSerializer):
+    template_params = serializers.JSONField(
+        required=False,
+        default=[],
+    )
+    steps = serializers.JSONField()
+
+    class Meta:
+        model = PromptChainModel
+        read_only_fields = (
+            'id',
+            'created_at',
+            'updated_at',
+            'is_active',
+        )
+        fields = read_only_fields + (
+            'icon',
+            'heading',
+            'description',
+            'template_params',
+            'steps',
+        )
+
+    def create(self, validated_data):
+        user: User = self.context['request'].user
+        if not user.is_seller():
+            raise serializers.ValidationError(
+                "You must have a seller profile to create prompt chains"
+            )
+        validated_data['user'] = user
+        return super().create(validated_data)
+
+
+class PromptChainBuyerSerializer(serializers.ModelSerializer):
+    seller = serializers.SerializerMethodField()
+    steps = serializers.SerializerMethodField()
+    prompt_params = serializers.JSONField(
+        required=False,
+        write_only=True
+    )
+
+    class Meta:
+        model = PromptChainModel
+        select_related = ('user__seller_profile',)
+        read_only_fields = (
+            'id',
+            'heading',
+            'description',
+            'created_at',
+            'updated_at',
+            'icon',
+            'seller',
+            'template_params',
+            'steps',
+        )
+        fields = read_only_fields + (
+            'prompt_params',
+        )
+
+    def get_seller(self, obj: PromptChainModel):
+        return PublicSellerSerializer(obj.user.seller_profile).data  # type: ignore
+
+    def get_steps(self, obj: PromptChainModel):
+        # the step parameters are the seller's, like the prompt templates
+        return [
+            {"name": step["name"], "model_name": step["model_name"]}
+            for step in obj.steps
+        ]
+
+    def validate_prompt_params(self, params: dict):
+        if not type(params) is dict:
+            raise serializers.ValidationError(
+                "Prompt params must be a dictionary"
+            )
+        instance: PromptChainModel = self.instance  # type: ignore
+        instance.validate_params(**params)
+        return params
+
+    def run(self) -> Dict[str, Any]:
+        """ Run the chain
+
+            Returns:
+                dict: The serialized output of each step, by step name
+        """
+        instance: PromptChainModel = self.instance  # type: ignore
+        user = self.context['request'].user
+        prompt_params = self.validated_data.get('prompt_params') or {}  # type: ignore
+        with deadline_scope(self.context.get('deadline')):
+            outputs = instance.run(user, **prompt_params)
+        return {
+            name: PromptOutputSerializer(output).data
+            for name, output in outputs.items()
+        }
+
+    def create(self, validated_data):
+        """ This should never be called"""
+        raise NotImplementedError
+
+    def update(self, instance, validated_data):
+        """ This should never be called"""
+        raise NotImplementedError
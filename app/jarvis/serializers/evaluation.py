@@ -0,0 +1,96 @@
+from rest_framework import serializers
+from django.conf import settings
+from jarvis.models import AbstractPromptModel, EvaluationJobModel
+from jarvis.modules.dataset import DatasetError, DatasetReader, get_dataset_format
+from typing import Any, Dict, List
+
+# row errors reported when a dataset is rejected
+MAX_ROW_ERRORS = 20
+
+
+class EvaluationJobSerializer(serializers.ModelSerializer):
+    options = serializers.JSONField(required=False, default=dict)
+
+    class Meta:
+        model = EvaluationJobModel
+        read_only_fields = (
+            "id",
+            "status",
+            "total_rows",
+            "processed_rows",
+            "failed_rows",
+            "error",
+            "created_at",
+            "updated_at",
+        )
+        fields = read_only_fields + (
+            "model_name",
+            "prompt_id",
+            "options",
+            "dataset",
+        )
+        extra_kwargs = {
+            "dataset": {"write_only": True},
+        }
+
+    def validate_options(self, options):
+        if not isinstance(options, dict):
+            raise serializers.ValidationError("Options must be a dictionary")
+        return options
+
+    def validate(self, attrs: Dict[str, Any]) -> Dict[str, Any]:
+        """ Validate every row of the dataset against the prompt
+
+            The dataset is streamed from the upload, only the row errors
+            are kept.
+        """
+        prompt_model = AbstractPromptModel.get_model(attrs["model_name"])
+        try:
+            prompt = prompt_model.objects.active(  # type: ignore
+                user=self.context['request'].user).get(pk=attrs["prompt_id"])
+        except prompt_model.DoesNotExist:
+            raise serializers.ValidationError({"prompt_id": ["The prompt was not found"]})
+
+        dataset = attrs["dataset"]
+        errors: List[str] = []
+        total_rows = 0
+        try:
+            with DatasetReader(dataset, get_dataset_format(dataset.name)) as reader:
+                names = {param["name"] for param in prompt.template_params}
+                if len(set(reader.header)) != len(reader.header) or set(reader.header) != names:
+                    raise DatasetError("The dataset columns must be the template params: {}".format(
+                        ", ".join(sorted(names))))
+                for row in reader:
+                    total_rows += 1
+                    if total_rows > settings.EVALUATION_MAX_ROWS:
+                        raise DatasetError("The dataset has more than {} rows".format(
+                            settings.EVALUATION_MAX_ROWS))
+                    try:
+                        prompt_params, _ = prompt.split_generate_kwargs({**row, **attrs["options"]})
+                        prompt.get_prompt(**prompt_params)
+                    except serializers.ValidationError as error:
+                        errors.append("Row {}: {}".format(reader.line, " ".join(
+                            str(detail) for detail in error.detail)))  # type: ignore
+                        if len(errors) >= MAX_ROW_ERRORS:
+                            break
+        except DatasetError as error:
+            raise serializers.ValidationError({"dataset": [str(error)]})
+        finally:
+            dataset.seek(0)
+        if errors:
+            raise serializers.ValidationError({"dataset": errors})
+        if not total_rows:
+            raise serializers.ValidationError({"dataset": ["The dataset has no rows"]})
+
+        attrs["prompt"] = prompt
+        attrs["total_rows"] = total_rows
+        return attrs
+
+    def create(self, validated_data):
+        return EvaluationJobModel.objects.enqueue(
+            self.context['request'].user,
+            validated_data["prompt"],
+            validated_data["dataset"],
+            total_rows=validated_data["total_rows"],
+            options=validated_data["options"],
+        )
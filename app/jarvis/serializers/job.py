@@ -0,0 +1,22 @@
+from rest_framework import serializers
+from jarvis.models import GenerationJobModel
+from jarvis.serializers.output import PromptOutputSerializer
+
+
+class GenerationJobSerializer(serializers.ModelSerializer):
+    output = PromptOutputSerializer(read_only=True)
+
+    class Meta:
+        model = GenerationJobModel
+        read_only_fields = (
+            "id",
+            "model_name",
+            "prompt_id",
+            "status",
+            "attempts",
+            "error",
+            "output",
+            "created_at",
+            "updated_at",
+        )
+        fields = read_only_fields
@@ -1,14 +1,36 @@
 from jarvis.models import (
-    PromptOutputModel
+    PromptOutputModel,
+    RenderedOutputModel,
 )
+from jarvis.models.abstract import AbstractPromptModel
+from jarvis.modules.markdown import make_content_hash
 from rest_framework import serializers
 from account.models import Seller
 from account.serializers.user import PublicSellerSerializer
 
 
+class PromptOutputListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        # render the page's outputs with one lookup instead of one per output
+        if "output_html" in self.child.fields:
+            outputs = data.all() if hasattr(data, "all") else data
+            self.child.rendered_html = RenderedOutputModel.objects.get_html_many(
+                output.output for output in outputs
+                if output.type == AbstractPromptModel.Types.TEXT
+            )
+        return super().to_representation(data)
+
+
 class PromptOutputSerializer(serializers.ModelSerializer):
+    """ The outputs of the user
+
+        The html of the text outputs is included as output_html when the
+        request asks for it with ?html=true. Renders are stored once per
+        text so repeat views never render again.
+    """
     seller = serializers.SerializerMethodField()
-    description = serializers.CharField(source="model_snapshot.description")
+    description = serializers.CharField(source="snapshot.description")
+    output_html = serializers.SerializerMethodField()
 
     class Meta:
         model = PromptOutputModel
@@ -21,6 +43,7 @@ class PromptOutputSerializer(serializers.ModelSerializer):
             "type",
             "seller",
             "description",
+            "output_html",
         )
         fields = read_only_fields
         restricted_fields = (
@@ -28,6 +51,8 @@ class PromptOutputSerializer(serializers.ModelSerializer):
             "model_input",
             "model_snapshot",
         )
+        list_serializer_class = PromptOutputListSerializer
+        select_related = ("model_user__seller_profile", "model_version")
 
     def __init__(self, *args, **kwargs):
         if set(self.Meta.restricted_fields).intersection(set(self.Meta.fields)):
@@ -63,7 +88,23 @@ class PromptOutputSerializer(serializers.ModelSerializer):
                 )
             )
         super().__init__(*args, **kwargs)
+        self.rendered_html = {}
+        if not self.wants_html():
+            self.fields.pop("output_html")
+
+    def wants_html(self) -> bool:
+        query_params = getattr(self.context.get("request"), "query_params", {})
+        return query_params.get("html", "").lower() in ("true", "1")
 
     def get_seller(self, obj: PromptOutputModel):
         seller: Seller = obj.model_user.seller_profile
         return PublicSellerSerializer(seller).data
+
+    def get_output_html(self, obj: PromptOutputModel):
+        if obj.type != AbstractPromptModel.Types.TEXT:
+            return None
+        html = self.rendered_html.get(make_content_hash(obj.output))
+        if html is None:
+            html = RenderedOutputModel.objects.get_html_many(
+                [obj.output])[make_content_hash(obj.output)]
+        return html
@@ -0,0 +1,41 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from account.models import Seller, User
+from jarvis.models import (
+    Dalle2PromptModel,
+    GPT3PromptModel,
+    PromptCatalogModel,
+    PromptChainModel,
+)
+from jarvis.models.abstract import prompt_saved
+
+# the models buyers list, each with an is_listed column
+LISTED_MODELS = (GPT3PromptModel, Dalle2PromptModel, PromptChainModel)
+
+
+def update_listed(user_id):
+    """ Recompute is_listed of a user's prompts and their catalog rows """
+    for model in LISTED_MODELS:
+        model.objects.update_listed(user=user_id)
+    PromptCatalogModel.objects.sync_user(user_id)
+
+
+@receiver(prompt_saved)
+def update_catalog(sender, instance, **kwargs):
+    PromptCatalogModel.objects.update_for(instance)
+
+
+@receiver(post_save, sender=Seller)
+@receiver(post_delete, sender=Seller)
+def update_listing_for_seller(sender, instance, update_fields=None, **kwargs):
+    # the catalog copies the handle and name
+    if update_fields is not None and not {"is_active", "handle", "name"} & set(update_fields):
+        return
+    update_listed(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def update_listing_for_user(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields is not None and not {"is_active", "is_verified"} & set(update_fields)):
+        return
+    update_listed(instance.pk)
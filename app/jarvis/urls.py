@@ -1,23 +1,45 @@
-from django.urls import path
+from django.urls import path, re_path
 from jarvis.apis.image.dalle2 import (
     Dalle2PromptSellerListCreateAPIView,
     Dalle2PromptSellerRetrieveUpdateDestroyAPIView,
     Dalle2PromptBuyerListAPIView,
     Dalle2PromptBuyerRetrieveAPIView,
-    Dalle2PromptGeneratorAPIView
+    Dalle2PromptGeneratorAPIView,
+    Dalle2PromptAsyncGeneratorAPIView,
+    Dalle2PromptBatchGeneratorAPIView,
+    Dalle2PromptJobGeneratorAPIView
 )
 from jarvis.apis.language.gpt3 import (
     GPT3PromptSellerListCreateAPIView,
     GPT3PromptSellerRetrieveUpdateDestroyAPIView,
     GPT3PromptBuyerListAPIView,
     GPT3PromptBuyerRetrieveAPIView,
-    GPT3PromptGeneratorAPIView
+    GPT3PromptGeneratorAPIView,
+    GPT3PromptAsyncGeneratorAPIView,
+    GPT3PromptStreamGeneratorAPIView,
+    GPT3PromptBatchGeneratorAPIView
 )
 
+from jarvis.apis.chain import (
+    PromptChainSellerListCreateAPIView,
+    PromptChainSellerRetrieveUpdateDestroyAPIView,
+    PromptChainBuyerListAPIView,
+    PromptChainBuyerRetrieveAPIView,
+    PromptChainRunAPIView
+)
 from jarvis.apis.output import (
     PromptOutputListAPIView,
     PromptOutputRetrieveAPIView
 )
+from jarvis.apis.image.blob import ImageBlobView
+from jarvis.apis.job import GenerationJobRetrieveAPIView
+from jarvis.apis.evaluation import (
+    EvaluationJobListCreateAPIView,
+    EvaluationJobRetrieveAPIView,
+    EvaluationJobResultsAPIView
+)
+from jarvis.apis.metrics import ProviderMetricsAPIView
+from jarvis.apis.catalog import PromptCatalogListAPIView
 
 
 app_name = 'jarvis'
@@ -37,6 +59,15 @@ urlpatterns = [
     path('language/gpt3/generate/<int:pk>', GPT3PromptGeneratorAPIView.as_view(),
          name='gpt3-prompt-generator'
          ),
+    path('language/gpt3/generate/<int:pk>/async', GPT3PromptAsyncGeneratorAPIView.as_view(),
+         name='gpt3-prompt-async-generator'
+         ),
+    path('language/gpt3/generate/<int:pk>/stream', GPT3PromptStreamGeneratorAPIView.as_view(),
+         name='gpt3-prompt-stream-generator'
+         ),
+    path('language/gpt3/generate/<int:pk>/batch', GPT3PromptBatchGeneratorAPIView.as_view(),
+         name='gpt3-prompt-batch-generator'
+         ),
     path('image/dalle2/seller', Dalle2PromptSellerListCreateAPIView.as_view(),
          name='dalle2-prompt-seller-create'
          ),
@@ -53,10 +84,55 @@ urlpatterns = [
     path('image/dalle2/generate/<int:pk>', Dalle2PromptGeneratorAPIView.as_view(),
          name='dalle2-prompt-generator'
          ),
+    path('image/dalle2/generate/<int:pk>/async', Dalle2PromptAsyncGeneratorAPIView.as_view(),
+         name='dalle2-prompt-async-generator'
+         ),
+    path('image/dalle2/generate/<int:pk>/batch', Dalle2PromptBatchGeneratorAPIView.as_view(),
+         name='dalle2-prompt-batch-generator'
+         ),
+    path('image/dalle2/generate/<int:pk>/job', Dalle2PromptJobGeneratorAPIView.as_view(),
+         name='dalle2-prompt-job-generator'
+         ),
+    re_path(r'^image/blob/(?P<digest>[0-9a-f]{64})$', ImageBlobView.as_view(),
+            name='image-blob'
+            ),
+    path('chain/seller', PromptChainSellerListCreateAPIView.as_view(),
+         name='prompt-chain-seller-create'
+         ),
+    path('chain/seller/<int:pk>', PromptChainSellerRetrieveUpdateDestroyAPIView.as_view(),
+         name='prompt-chain-seller-detail'
+         ),
+    path('chain', PromptChainBuyerListAPIView.as_view(),
+         name='prompt-chain-buyer-list'
+         ),
+    path('chain/<int:pk>', PromptChainBuyerRetrieveAPIView.as_view(),
+         name='prompt-chain-buyer-detail'
+         ),
+    path('chain/run/<int:pk>', PromptChainRunAPIView.as_view(),
+         name='prompt-chain-run'
+         ),
     path('output', PromptOutputListAPIView.as_view(),
          name='prompt-output-list'
          ),
     path('output/<int:pk>', PromptOutputRetrieveAPIView.as_view(),
          name='prompt-output-detail'
          ),
+    path('job/<int:pk>', GenerationJobRetrieveAPIView.as_view(),
+         name='generation-job-detail'
+         ),
+    path('evaluation', EvaluationJobListCreateAPIView.as_view(),
+         name='evaluation-job-list'
+         ),
+    path('evaluation/<int:pk>', EvaluationJobRetrieveAPIView.as_view(),
+         name='evaluation-job-detail'
+         ),
+    path('evaluation/<int:pk>/results', EvaluationJobResultsAPIView.as_view(),
+         name='evaluation-job-results'
+         ),
+    path('metrics', ProviderMetricsAPIView.as_view(),
+         name='provider-metrics'
+         ),
+    path('catalog', PromptCatalogListAPIView.as_view(),
+         name='prompt-catalog-list'
+         ),
 ]
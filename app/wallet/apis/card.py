@@ -1,9 +1,10 @@
 from wallet.serializers.card import CardSerializer
 from wallet.models import CardModel
 from rest_framework import generics
+from core.views import EagerLoadingMixin
 
 
-class CardListAPI(generics.ListAPIView):
+class CardListAPI(EagerLoadingMixin, generics.ListAPIView):
     serializer_class = CardSerializer
 
     def get_queryset(self):
@@ -137,3 +137,37 @@
 #         response = self.client.delete(self.url)
 #         self.assertEqual(response.status_code, 204)
 #         self.assertEqual(CardModel.objects.count(), 1)
+
+
+from rest_framework.test import APIRequestFactory, force_authenticate
+from account.models import User
+from core.testing import QueryCountTestMixin
+from django.test import TestCase
+from wallet.apis.card import CardListAPI
+from wallet.models import CardModel
+
+
+class CardListQueryCountTestCase(QueryCountTestMixin, TestCase):
+    def test_list(self):
+        user = User.objects.create_user(  # type: ignore
+            username='testuser',
+            password='password',
+            is_verified=True
+        )
+
+        def fetch():
+            request = APIRequestFactory().get('/wallet/card')
+            force_authenticate(request, user=user)
+            return CardListAPI.as_view()(request)
+
+        self.assertConstantQueries(fetch, lambda index: CardModel.objects.create(
+            user=user,
+            type='Visa',
+            data={
+                'last4': '1234',
+                'exp_month': '01',
+                'exp_year': '2030',
+                'authorization_code': 'authcode{}'.format(index),
+                'signature': 'signature{}'.format(index),
+            },
+        ))
@@ -4,6 +4,7 @@ from account.models import User
 from django.test import TestCase
 from wallet.models import TransactionModel
 from wallet.apis.transaction import TransactionRetrieveAPI, TransactionListAPI
+from core.testing import QueryCountTestMixin
 
 
 class TransactionListAPITestCase(TestCase):
@@ -58,6 +59,21 @@ class TransactionListAPITestCase(TestCase):
         self.assertEqual(len(response.data["results"]), 2)  # type: ignore
 
 
+class TransactionListQueryCountTestCase(QueryCountTestMixin, TestCase):
+    def test_list(self):
+        user = User.objects.create_user(  # type: ignore
+            username='testuser',
+            password='password',
+            is_verified=True
+        )
+        client = APIClient()
+        client.force_authenticate(user=user)
+        self.assertConstantQueries(
+            lambda: client.get(reverse('wallet:transaction-list')),
+            lambda index: TransactionModel.objects.create(
+                user=user, amount=1000, reference='ref{}'.format(index)))
+
+
 class TransactionRetrieveAPITestCase(TestCase):
     def setUp(self):
         self.factory = APIRequestFactory()
@@ -1,10 +1,13 @@
 from wallet.serializers.transaction import TransactionSerializer
 from wallet.models import TransactionModel
 from rest_framework import generics
+from core.pagination import KeysetPagination
+from core.views import EagerLoadingMixin
 
 
-class TransactionListAPI(generics.ListAPIView):
+class TransactionListAPI(EagerLoadingMixin, generics.ListAPIView):
     serializer_class = TransactionSerializer
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         return TransactionModel.objects.filter(user=self.request.user)
@@ -0,0 +1,17 @@
+# Generated by Django 4.1.4 on 2026-10-18 20:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0005_alter_walletmodel_balance'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transactionmodel',
+            index=models.Index(fields=['user', '-created_at', '-reference'], name='transaction_user_newest_idx'),
+        ),
+    ]
@@ -51,6 +51,9 @@ class TransactionModel(BaseModel):
     class Meta(BaseModel.Meta):
         verbose_name = _('Transaction')
         verbose_name_plural = _('Transactions')
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-reference'], name='transaction_user_newest_idx'),
+        ]
 
     reference = models.CharField(
         max_length=255,
@@ -2,6 +2,12 @@
 echo "Running Server"
 if [ "$DJANGO_SETTINGS_MODULE" = "Klerly.settings.local" ]; then
     python3 manage.py migrate
+    exec uvicorn Klerly.asgi:application --host 0.0.0.0 --port $DJANGO_PORT --reload
 fi 
 
-python3 manage.py runserver 0.0.0.0:$DJANGO_PORT 
+# served over ASGI so the async views keep many generations in flight.
+# Django runs the sync views of every request on a thread of its own
+# (asgiref's ThreadSensitiveContext), so they still run in parallel as
+# under a threaded WSGI server. WEB_CONCURRENCY sets the number of worker
+# processes, which PROVIDER_PROCESSES counts as well
+exec uvicorn Klerly.asgi:application --host 0.0.0.0 --port $DJANGO_PORT --workers ${WEB_CONCURRENCY:-1}